@@ -3,8 +3,10 @@
 Endpoints (edge ↔ backend, пилот — durable доставка команд шлагбаума):
 
 * ``GET  /api/v1/access/edge/{controller_id}/commands/next`` — атомарно лизит ОДНУ
-  pending-команду ТОЛЬКО этого контроллера (``FOR UPDATE SKIP LOCKED``); long-poll
-  с небольшим таймаутом; 204 если очередь пуста.
+  pending-команду ТОЛЬКО этого контроллера (``FOR UPDATE SKIP LOCKED``); async
+  long-poll: ожидающий паркуется на сигнале ``services/command_wakeup`` (поток и
+  DB-сессия на время ожидания НЕ держатся), lease-UPDATE повторяется только по
+  сигналу о новой команде контроллера; 204 если очередь пуста.
 * ``POST /api/v1/access/edge/{controller_id}/commands/{command_id}/ack`` —
   compare-and-set по ``(command_id, controller_id, lease_token, status='leased')``;
   идемпотентный повторный ACK возвращает сохранённый результат БЕЗ повторного
@@ -18,11 +20,12 @@ HMAC тела + freshness timestamp + anti-replay nonce + IP allowlist + ста
 """
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
 import hashlib
 import json
 import logging
-import time
+import os
 import uuid
 from dataclasses import dataclass
 from uuid import UUID
@@ -34,8 +37,13 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from access_control.domain.equipment import EdgeController
+from access_control.services.command_wakeup import get_command_wakeup
 from access_control.services.device_auth import authenticate_edge
-from uk_management_bot.database.session import get_db
+from access_control.services.metrics import (
+    observe_command_pickup,
+    track_longpoll_waiter,
+)
+from uk_management_bot.database.session import get_db, run_db
 
 router = APIRouter(prefix="/api/v1/access/edge", tags=["access-commands"])
 
@@ -43,10 +51,13 @@ logger = logging.getLogger(__name__)
 
 # Lease TTL по умолчанию (§9.2): срок аренды команды edge'ом.
 DEFAULT_LEASE_TTL_SECONDS = 30
-# Long-poll: короткий цикл ожидания pending-команды (небольшой для тестов).
+# Long-poll: по умолчанию одна попытка (edge сам просит ``wait``).
 DEFAULT_LONG_POLL_SECONDS = 0.0
-LONG_POLL_INTERVAL_SECONDS = 0.25
 MAX_LONG_POLL_SECONDS = 25.0
+# Страховочная перепроверка очереди без сигнала (потерянный wakeup: сбой Redis,
+# in-process хаб при нескольких воркерах). Не интервал опроса — штатно lease
+# запускается по сигналу ``command_wakeup``.
+LONG_POLL_RECHECK_SECONDS = float(os.getenv("ACCESS_LONG_POLL_RECHECK_SECONDS", "10"))
 
 
 @dataclass(frozen=True)
@@ -125,7 +136,8 @@ def _try_lease(
                 FOR UPDATE SKIP LOCKED
                 LIMIT 1
             )
-            RETURNING command_id, barrier_id, command_type, expires_at
+            RETURNING command_id, barrier_id, command_type, expires_at,
+                      EXTRACT(EPOCH FROM (clock_timestamp() - created_at))
             """
         ),
         {"tokhash": lease_token_hash, "ttl": lease_ttl_seconds, "cid": controller_db_id},
@@ -135,6 +147,9 @@ def _try_lease(
         db.commit()
         return None
     db.commit()
+    # §10.2: «создание команды → lease edge'ом» — доля long-poll в задержке до реле.
+    if row[4] is not None:
+        observe_command_pickup(float(row[4]) * 1000.0)
     return LeasedCommand(
         command_id=str(row[0]),
         barrier_id=row[1],
@@ -150,20 +165,50 @@ def lease_next_command(
     controller_db_id: int,
     *,
     lease_ttl_seconds: int = DEFAULT_LEASE_TTL_SECONDS,
-    long_poll_seconds: float = DEFAULT_LONG_POLL_SECONDS,
 ) -> LeasedCommand | None:
     """Лизить ОДНУ pending-команду контроллера атомарно (§9.2); None если пусто.
 
     Команда скоупится по ``controller_db_id`` — чужие команды не выдаются (§9.1).
-    ``long_poll_seconds`` — короткий цикл ожидания (sync-endpoint в threadpool, не
-    блокирует event-loop); 0 — одна попытка.
+    Одна попытка без ожидания; long-poll — ``lease_next_command_async``.
+    """
+    return _try_lease(db, controller_db_id, lease_ttl_seconds)
+
+
+async def lease_next_command_async(
+    controller_db_id: int,
+    *,
+    lease_ttl_seconds: int = DEFAULT_LEASE_TTL_SECONDS,
+    long_poll_seconds: float = DEFAULT_LONG_POLL_SECONDS,
+) -> LeasedCommand | None:
+    """Long-poll lease без удержания потока и DB-сессии на время ожидания (§9.2).
+
+    Каждая попытка — отдельный unit-of-work в worker-потоке (``run_db``: сессия
+    открывается и закрывается внутри). Между попытками запрос припаркован на
+    сигнале ``command_wakeup`` своего контроллера. Ожидающий регистрируется ДО
+    первой попытки: команда, закоммиченная между пустым lease и парковкой, не
+    теряется — её сигнал уже взвёл событие.
     """
-    deadline = time.monotonic() + min(max(long_poll_seconds, 0.0), MAX_LONG_POLL_SECONDS)
-    while True:
-        leased = _try_lease(db, controller_db_id, lease_ttl_seconds)
-        if leased is not None or time.monotonic() >= deadline:
-            return leased
-        time.sleep(LONG_POLL_INTERVAL_SECONDS)
+    budget = min(max(long_poll_seconds, 0.0), MAX_LONG_POLL_SECONDS)
+
+    def _lease(db: Session) -> LeasedCommand | None:
+        return _try_lease(db, controller_db_id, lease_ttl_seconds)
+
+    if budget <= 0:
+        return await run_db(_lease)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    waiter = get_command_wakeup().register(controller_db_id)
+    try:
+        with track_longpoll_waiter():
+            while True:
+                leased = await run_db(_lease)
+                remaining = deadline - loop.time()
+                if leased is not None or remaining <= 0:
+                    return leased
+                await waiter.wait(min(remaining, LONG_POLL_RECHECK_SECONDS))
+    finally:
+        waiter.close()
 
 
 def ack_command(
@@ -248,7 +293,7 @@ class AckRequest(BaseModel):
 
 
 @router.get("/{controller_id}/commands/next")
-def get_next_command(
+async def get_next_command(
     wait: float = Query(
         DEFAULT_LONG_POLL_SECONDS, ge=0.0, le=MAX_LONG_POLL_SECONDS,
         description="long-poll ожидание, c",
@@ -256,8 +301,14 @@ def get_next_command(
     db: Session = Depends(get_db),
     controller: EdgeController = Depends(authenticate_edge),
 ) -> Response:
-    """Лизить следующую pending-команду контроллера (§9.2). 204 если очередь пуста."""
-    leased = lease_next_command(db, controller.id, long_poll_seconds=wait)
+    """Лизить следующую pending-команду контроллера (§9.2). 204 если очередь пуста.
+
+    ``db`` — та же (кэшированная FastAPI) сессия, на которой прошла device-auth:
+    закрываем её до ожидания, чтобы соединение вернулось в пул, пока edge ждёт.
+    """
+    controller_db_id = controller.id
+    db.close()
+    leased = await lease_next_command_async(controller_db_id, long_poll_seconds=wait)
     if leased is None:
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     return JSONResponse(
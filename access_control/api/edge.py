@@ -7,30 +7,33 @@ api_key + HMAC тела + timestamp + nonce + IP allowlist + изоляция п
 * ``POST /edge/{controller_id}/heartbeat`` — приём clock offset (§8.2): пишет
   ``last_heartbeat_at``/``clock_offset_ms``; |offset|>30000мс → сигнал ``fail_closed``;
   5000<|offset|≤30000мс в connected → ``warning``.
-* ``POST /edge/{controller_id}/sync-events`` (§8.4) — идемпотентный приём offline-
-  событий по ``(controller_id, event_id)``; source=``edge_offline``; НЕ расход
-  пропуска; конфликт/просроченный snapshot → отдельные поля.
-* ``GET  /edge/{controller_id}/access-snapshot`` (§8.2) — подписанный fail_closed
-  snapshot БЕЗ списка номеров; только данные аутентифицированного контроллера.
+* ``POST /edge/{controller_id}/sync-events`` (§8.4) — идемпотентный пачечный приём
+  offline-событий по ``(controller_id, event_id)``; source=``edge_offline``; НЕ
+  расход пропуска; конфликт/просроченный snapshot → отдельные поля; исход по
+  каждому событию + high-water mark для докачки (``GET …/sync-events/high-water``).
+* ``GET  /edge/{controller_id}/access-snapshot`` (§8.2) — подписанный snapshot
+  только данных аутентифицированного контроллера: fail_closed — БЕЗ списка номеров;
+  ``cached_permanent_only`` — с компактным allowlist постоянных авто зоны (полным
+  или дельтой от ``?since_version=``, см. ``services/offline_allowlist``).
 """
 from __future__ import annotations
 
-import json
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
 from fastapi.responses import JSONResponse
 from pydantic import AwareDatetime, BaseModel, Field
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 from starlette.datastructures import UploadFile
 
-from access_control.domain.enums import Direction, EventSource
+from access_control.domain.enums import Direction, EventSource, OfflineMode
 from access_control.domain.equipment import EdgeController
 from access_control.integrations.media import AccessMediaClient, get_access_media_client
-from access_control.repositories import camera_events_repo
+from access_control.repositories import camera_events_repo, sync_events_repo
 from access_control.services.device_auth import authenticate_edge
-from access_control.services.snapshot_signing import build_snapshot, sign_snapshot
+from access_control.services import offline_allowlist
+from access_control.services.snapshot_signing import build_snapshot, issue_time, sign_snapshot
 from uk_management_bot.database.session import get_db
 
 router = APIRouter(prefix="/api/v1/access/edge", tags=["access-edge"])
@@ -86,10 +89,17 @@ def post_heartbeat(
 # ------------------------------- sync-events (§8.4) -----------------------------
 
 
+# Верхняя граница пачки: edge режет offline-хвост на куски и докачивает по HWM.
+MAX_SYNC_BATCH_EVENTS = 5_000
+
+
 class SyncEvent(BaseModel):
     """Одно отложенное offline-событие edge (§8.4)."""
 
-    event_id: str = Field(..., description="Исходный event_id offline-события")
+    event_id: str = Field(..., max_length=128, description="Исходный event_id offline-события")
+    # Монотонный номер события в offline-очереди edge: по нему backend ведёт
+    # high-water mark для докачки. Опционален — старые edge шлют без него.
+    seq: int | None = Field(None, ge=0)
     captured_at: AwareDatetime | None = None
     plate_number: str | None = None
     direction: Direction = Direction.ENTRY
@@ -103,7 +113,22 @@ class SyncEvent(BaseModel):
 class SyncEventsRequest(BaseModel):
     """Пачка offline-событий на синхронизацию после восстановления связи (§8.4)."""
 
-    events: list[SyncEvent] = Field(default_factory=list)
+    events: list[SyncEvent] = Field(
+        default_factory=list, max_length=MAX_SYNC_BATCH_EVENTS
+    )
+
+
+def _stored_payload(ev: SyncEvent) -> dict:
+    # source фиксируется в payload — отдельной колонки source у таблицы нет (§8.4).
+    return {
+        **(ev.attributes or {}),
+        "source": EventSource.EDGE_OFFLINE.value,
+        "decision": ev.decision,
+        "plate_number": ev.plate_number,
+        "direction": ev.direction.value,
+        "captured_at": ev.captured_at.isoformat() if ev.captured_at else None,
+        "seq": ev.seq,
+    }
 
 
 @router.post("/{controller_id}/sync-events")
@@ -112,61 +137,81 @@ def post_sync_events(
     db: Session = Depends(get_db),
     controller: EdgeController = Depends(authenticate_edge),
 ) -> JSONResponse:
-    """Идемпотентно принять offline-события (§8.4): дедуп по (controller_id, event_id).
+    """Идемпотентно принять пачку offline-событий (§8.4): дедуп по (controller_id, event_id).
 
     source=``edge_offline``; событие НЕ превращается в расход временного пропуска и не
     создаёт команду открытия (только журналируется в ``controller_sync_events``).
-    Повтор того же event_id — no-op (``ON CONFLICT DO NOTHING``).
+    Вся пачка — одна транзакция и multi-row ``INSERT … ON CONFLICT DO NOTHING
+    RETURNING``; повтор event_id (из прошлой пачки или внутри этой) — ``duplicate``.
+
+    Ответ: агрегаты + ``items`` (исход по каждому событию в порядке запроса) +
+    ``high_water_mark`` — максимальный закоммиченный ``seq`` контроллера; edge
+    после обрыва докачивает очередь начиная с ``seq`` > HWM.
     """
-    accepted = 0
-    duplicates = 0
-    conflicts = 0
+    rows: list[dict] = []
+    seen: set[str] = set()
+    max_seq: int | None = None
     for ev in payload.events:
-        # source фиксируется в payload — отдельной колонки source у таблицы нет (§8.4).
-        stored_payload = {
-            **(ev.attributes or {}),
-            "source": EventSource.EDGE_OFFLINE.value,
-            "decision": ev.decision,
-            "plate_number": ev.plate_number,
-            "direction": ev.direction.value,
-            "captured_at": ev.captured_at.isoformat() if ev.captured_at else None,
-        }
-        row = db.execute(
-            text(
-                """
-                INSERT INTO controller_sync_events
-                  (controller_id, event_id, payload, conflict, snapshot_expired,
-                   received_at, created_at)
-                VALUES
-                  (:cid, :eid, CAST(:pl AS JSONB), :cf, :se, now(), now())
-                ON CONFLICT (controller_id, event_id) DO NOTHING
-                RETURNING id
-                """
-            ),
+        if ev.seq is not None and (max_seq is None or ev.seq > max_seq):
+            max_seq = ev.seq
+        if ev.event_id in seen:
+            continue
+        seen.add(ev.event_id)
+        rows.append(
             {
-                "cid": controller.id,
-                "eid": ev.event_id,
-                "pl": json.dumps(stored_payload),
-                "cf": ev.conflict,
-                "se": ev.snapshot_expired,
-            },
-        ).first()
-        if row is None:
-            duplicates += 1
-        else:
-            accepted += 1
-            if ev.conflict or ev.snapshot_expired:
-                conflicts += 1
+                "event_id": ev.event_id,
+                "payload": _stored_payload(ev),
+                "conflict": ev.conflict,
+                "snapshot_expired": ev.snapshot_expired,
+            }
+        )
+
+    inserted = sync_events_repo.insert_batch(db, controller.id, rows)
+    if max_seq is not None:
+        high_water_mark = sync_events_repo.advance_high_water(db, controller.id, max_seq)
+    else:
+        high_water_mark = sync_events_repo.high_water(db, controller.id)
     db.commit()
+
+    items: list[dict] = []
+    accepted = duplicates = conflicts = 0
+    for ev in payload.events:
+        # Первое вхождение event_id забирает вставку; повтор внутри пачки — дубль.
+        if ev.event_id in inserted:
+            inserted.discard(ev.event_id)
+            accepted += 1
+            flagged = ev.conflict or ev.snapshot_expired
+            conflicts += int(flagged)
+            items.append(
+                {"event_id": ev.event_id, "status": "accepted", "conflict": flagged}
+            )
+        else:
+            duplicates += 1
+            items.append(
+                {"event_id": ev.event_id, "status": "duplicate", "conflict": False}
+            )
     return JSONResponse(
         content={
             "accepted": accepted,
             "duplicates": duplicates,
             "conflicts": conflicts,
+            "high_water_mark": high_water_mark,
+            "items": items,
         }
     )
 
 
+@router.get("/{controller_id}/sync-events/high-water")
+def get_sync_high_water(
+    db: Session = Depends(get_db),
+    controller: EdgeController = Depends(authenticate_edge),
+) -> JSONResponse:
+    """HWM offline-синхронизации контроллера (§8.4): с какого ``seq`` докачивать."""
+    return JSONResponse(
+        content={"high_water_mark": sync_events_repo.high_water(db, controller.id)}
+    )
+
+
 # ----------------------------- camera-event photos (§11, §10.2) ----------------
 
 
@@ -236,18 +281,46 @@ async def post_camera_event_photos(
 
 @router.get("/{controller_id}/access-snapshot")
 def get_access_snapshot(
+    since_version: str | None = Query(
+        None, max_length=64, description="allowlist_version, уже имеющаяся на edge"
+    ),
+    db: Session = Depends(get_db),
     controller: EdgeController = Depends(authenticate_edge),
 ) -> JSONResponse:
-    """Отдать подписанный fail_closed-snapshot контроллера (§8.2), без списка номеров.
+    """Отдать подписанный snapshot контроллера (§8.2).
 
     Возвращает только данные аутентифицированного контроллера (§9.1). Snapshot
-    подписывается backend'ом (Ed25519); edge проверяет ``key_id``/подпись/срок, но в
-    ``fail_closed`` въезд не открывает (reject-only, см. ``edge/snapshot_verifier``).
+    подписывается backend'ом (Ed25519); edge проверяет ``key_id``/подпись/срок.
+    В ``fail_closed`` списка номеров нет и въезд не открывается (reject-only, см.
+    ``edge/snapshot_verifier``). В ``cached_permanent_only`` (и при заданной зоне)
+    snapshot несёт allowlist постоянных авто зоны; если ``since_version`` есть в
+    истории версий — только дельту от неё. ``issued_at`` квантован (``issue_time``),
+    поэтому повтор в пределах кванта берёт подпись из кэша.
     """
-    snapshot = build_snapshot(
-        controller_uid=controller.controller_uid,
-        zone_id=controller.zone_id,
-        offline_mode="fail_closed",
+    now = issue_time()
+    grant_capable = (
+        controller.offline_mode == OfflineMode.CACHED_PERMANENT_ONLY.value
+        and controller.zone_id is not None
     )
+    if not grant_capable:
+        snapshot = build_snapshot(
+            controller_uid=controller.controller_uid,
+            zone_id=controller.zone_id,
+            offline_mode=OfflineMode.FAIL_CLOSED.value,
+            now=now,
+        )
+    else:
+        allowlist = offline_allowlist.load_zone_allowlist(db, controller.zone_id, now=now)
+        history = offline_allowlist.allowlist_history()
+        history.record(controller.zone_id, allowlist)
+        base = history.get(controller.zone_id, since_version) if since_version else None
+        snapshot = build_snapshot(
+            controller_uid=controller.controller_uid,
+            zone_id=controller.zone_id,
+            offline_mode=OfflineMode.CACHED_PERMANENT_ONLY.value,
+            now=now,
+            allowlist=allowlist,
+            base_allowlist=base,
+        )
     signed = sign_snapshot(snapshot)
     return JSONResponse(status_code=status.HTTP_200_OK, content=signed.data)
@@ -8,14 +8,31 @@ resident), ``_limit``/``_limit_q`` ×4, ``_raise_404`` ×2, ``_Frozen`` ×3.
 
 ``services/resident.py`` держит СВОИ константы лимитов сознательно: слой
 сервисов не импортирует из ``api/`` (направление зависимостей api → services).
+
+Журналы реестра (events/vehicles/passes/requests) листаются keyset-курсором по
+``(время, id)`` — страница стоит одинаково на любой глубине, в отличие от
+OFFSET. ``total`` на широких фильтрах — оценка планировщика (EXPLAIN; без
+фильтров она берётся из ``pg_class.reltuples``) вместо ``count(*)`` по
+миллионам строк; точный подсчёт — по запросу (``exact_total=true``) или когда
+оценка мала.
 """
 from __future__ import annotations
 
+import base64
+import binascii
+import datetime as dt
+import json
+import os
+
 from fastapi import HTTPException, Query, status
 from pydantic import BaseModel, ConfigDict
+from sqlalchemy import text
+from sqlalchemy.orm import Session
 
 DEFAULT_LIMIT = 50
 MAX_LIMIT = 200
+# Оценка планировщика выше порога → ``total`` отдаётся оценкой, без count(*).
+EXACT_COUNT_THRESHOLD = int(os.getenv("ACCESS_EXACT_COUNT_THRESHOLD", "10000"))
 
 
 class Frozen(BaseModel):
@@ -32,3 +49,77 @@ def limit_query(value: int = DEFAULT_LIMIT) -> int:
 def raise_404(exc) -> None:
     """Доменное «не найдено» → HTTP 404 с текстом исключения."""
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+
+
+def cursor_query() -> str | None:
+    """Query-параметр keyset-курсора (``next_cursor`` предыдущей страницы)."""
+    return Query(
+        None,
+        max_length=128,
+        description="курсор следующей страницы (next_cursor); при нём offset не применяется",
+    )
+
+
+def encode_cursor(moment: dt.datetime, row_id: int) -> str:
+    """Непрозрачный курсор ``(время, id)`` последней строки страницы."""
+    raw = f"{moment.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[dt.datetime, int]:
+    """Разобрать курсор; битый курсор → HTTP 400 (клиентская ошибка, не 500)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        moment_s, id_s = raw.rsplit("|", 1)
+        moment = dt.datetime.fromisoformat(moment_s)
+        return moment, int(id_s)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="invalid cursor"
+        ) from None
+
+
+def keyset_condition(
+    conds: list[str], params: dict, cursor: str | None, *, ts_col: str, id_col: str
+) -> None:
+    """Добавить к фильтрам условие «строго после курсора» для сортировки DESC."""
+    if cursor is None:
+        return
+    moment, row_id = decode_cursor(cursor)
+    conds.append(f"({ts_col}, {id_col}) < (:cursor_ts, :cursor_id)")
+    params["cursor_ts"] = moment
+    params["cursor_id"] = row_id
+
+
+def next_cursor(rows: list, limit: int, *, ts_key: str, id_key: str = "id") -> str | None:
+    """Курсор следующей страницы: строк выбрано ``limit + 1`` → страница не последняя.
+
+    Лишняя (``limit + 1``-я) строка отрезается от ``rows`` на месте.
+    """
+    if len(rows) <= limit:
+        return None
+    del rows[limit:]
+    last = rows[-1]
+    return encode_cursor(last[ts_key], last[id_key])
+
+
+def page_total(
+    db: Session, from_where: str, params: dict, *, exact: bool = False
+) -> tuple[int, bool]:
+    """``(total, оценка ли это)`` для ``FROM … WHERE …`` журнала.
+
+    Сначала дешёвая оценка планировщика (``EXPLAIN``, без выполнения запроса).
+    Если она не больше ``EXACT_COUNT_THRESHOLD`` (или ``exact``) — точный
+    ``count(*)``: на узкой выборке он дешёв, а UI показывает точное число.
+    """
+    if not exact:
+        plan = db.execute(
+            text(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_where}"), params
+        ).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate > EXACT_COUNT_THRESHOLD:
+            return estimate, True
+    total = db.execute(text(f"SELECT count(*) {from_where}"), params).scalar_one()
+    return total, False
@@ -2,17 +2,23 @@
 
 Экраны охранника и менеджера. Все эндпоинты read-only (USER-API, JWT/cookie —
 ``require_approved_roles``, НЕ device-auth). Конверт ответа единый:
-``{items, total, limit, offset}`` (фронт-контракт).
+``{items, total, limit, offset, next_cursor, total_estimated}`` (фронт-контракт;
+два последних поля — keyset-пагинация журналов, см. ``api/pagination``).
 
 RBAC (§6.2/§6.3):
-* ``/events*`` и ``/passes`` — ``security_operator``/``manager``/``system_admin``;
+* ``/events*``, ``/passes`` и ``/plate-candidates`` — ``security_operator``/
+  ``manager``/``system_admin``;
 * ``/vehicles*`` и ``/requests`` — только ``manager``/``system_admin``
   (оператор не управляет базой авто/заявок).
 applicant/executor/inspector → 403; без auth → 401.
 
 PD (§11): полный номер допустим в ответах уполномоченным ролям (экран охраны/
 менеджера); в логи ПД не пишем (эндпоинты ничего не логируют). Пагинация:
-``limit`` дефолт 50, max 200; ``offset`` ≥ 0. Сортировка по времени desc.
+``limit`` дефолт 50, max 200; ``offset`` ≥ 0 (устаревший путь, глубокие страницы
+дороги) либо ``cursor`` = ``next_cursor`` предыдущей страницы — keyset по
+``(captured_at|created_at, id)``, цена страницы не зависит от глубины.
+Сортировка по времени desc. ``total`` на широких фильтрах — оценка планировщика
+(``total_estimated=true``); ``exact_total=true`` форсирует ``count(*)``.
 """
 from __future__ import annotations
 
@@ -25,7 +31,7 @@ from sqlalchemy import bindparam, text
 from sqlalchemy.orm import Session
 
 from access_control.integrations.media import AccessMediaClient, get_access_media_client
-from access_control.services import photo_urls
+from access_control.services import photo_urls, plate_index
 from access_control.services.management import write_audit
 from uk_management_bot.api.auth.service import verify_access_token
 from uk_management_bot.api.dependencies import (
@@ -48,7 +54,11 @@ PHOTO_VIEW_ROLES = ("security_operator", "manager", "system_admin")
 from access_control.api.pagination import (  # noqa: E402
     DEFAULT_LIMIT,
     Frozen as _Frozen,
+    cursor_query as _cursor,
+    keyset_condition,
     limit_query as _limit,
+    next_cursor,
+    page_total,
 )
 # Сколько последних событий по номеру отдаём в детали авто.
 VEHICLE_RECENT_EVENTS = 20
@@ -83,6 +93,8 @@ class EventsPage(_Frozen):
     total: int
     limit: int
     offset: int
+    next_cursor: str | None = None
+    total_estimated: bool = False
 
 
 class CameraEventDetail(_Frozen):
@@ -152,12 +164,25 @@ class ResidentConfirmationRow(_Frozen):
     created_at: dt.datetime
 
 
+class PlateCandidateRow(_Frozen):
+    """Подсказка оператору: зарегистрированное авто рядом с распознанным номером (§12).
+
+    Только подсказка — решения по ней не принимаются (без авто-allow по fuzzy).
+    """
+
+    vehicle_id: int
+    plate_number_normalized: str
+    status: str
+    distance: int
+
+
 class EventDetail(_Frozen):
     camera_event: CameraEventDetail
     decisions: list[DecisionRow]
     barrier_commands: list[CommandRow]
     manual_openings: list[ManualOpeningRow]
     resident_confirmations: list[ResidentConfirmationRow]
+    plate_candidates: list[PlateCandidateRow] = []
 
 
 class ApartmentLink(_Frozen):
@@ -192,6 +217,8 @@ class VehiclesPage(_Frozen):
     total: int
     limit: int
     offset: int
+    next_cursor: str | None = None
+    total_estimated: bool = False
 
 
 class VehicleEventRow(_Frozen):
@@ -236,6 +263,8 @@ class PassesPage(_Frozen):
     total: int
     limit: int
     offset: int
+    next_cursor: str | None = None
+    total_estimated: bool = False
 
 
 class RequestRow(_Frozen):
@@ -258,6 +287,8 @@ class RequestsPage(_Frozen):
     total: int
     limit: int
     offset: int
+    next_cursor: str | None = None
+    total_estimated: bool = False
 
 
 # --- Обогащение деталей: заявитель / адрес / зона (§6.2, экран менеджера) ---
@@ -530,6 +561,10 @@ def _vehicle_row(r, links: list[ApartmentLink]) -> VehicleRow:
 # ------------------------------ /events ------------------------------
 
 # Текущее решение группы = строка с max(id) (транзишн всегда имеет больший id).
+# Журнал проезда пишется с occurred_at = captured_at события (access_events_repo),
+# а access_events партиционирован по occurred_at (миграция 018): нижняя граница
+# отсекает партиции старше события на этапе исполнения (runtime pruning), и
+# lateral не обходит индекс camera_event_id каждого месяца.
 _EVENTS_FROM = """
 FROM camera_events ce
 LEFT JOIN LATERAL (
@@ -538,7 +573,8 @@ LEFT JOIN LATERAL (
     ORDER BY ad.id DESC LIMIT 1
 ) d ON true
 LEFT JOIN LATERAL (
-    SELECT occurred_at FROM access_events ae WHERE ae.camera_event_id = ce.id
+    SELECT occurred_at FROM access_events ae
+    WHERE ae.camera_event_id = ce.id AND ae.occurred_at >= ce.captured_at
     ORDER BY ae.id DESC LIMIT 1
 ) ae ON true
 """
@@ -643,6 +679,8 @@ def list_events(
     source: str | None = Query(None),
     limit: int = _limit(DEFAULT_LIMIT),
     offset: int = Query(0, ge=0),
+    cursor: str | None = _cursor(),
+    exact_total: bool = Query(False, description="точный count(*) вместо оценки"),
     db: Session = Depends(get_db),
     user=Depends(require_approved_roles(*EVENTS_PASSES_ROLES)),
 ) -> EventsPage:
@@ -674,12 +712,12 @@ def list_events(
     if source is not None:
         conds.append("ce.source = :source")
         params["source"] = source
+    total, estimated = page_total(
+        db, f"{_EVENTS_FROM} {_where(conds)}", params, exact=exact_total
+    )
+    keyset_condition(conds, params, cursor, ts_col="ce.captured_at", id_col="ce.id")
     where = _where(conds)
-
-    total = db.execute(
-        text(f"SELECT count(*) {_EVENTS_FROM} {where}"), params
-    ).scalar_one()
-    rows = db.execute(
+    rows = list(db.execute(
         text(
             "SELECT ce.id, ce.event_id, ce.controller_id, ce.zone_id, ce.gate_id, "
             " ce.direction, ce.plate_number_normalized, ce.captured_at, "
@@ -691,8 +729,9 @@ def list_events(
             f"{_EVENTS_FROM} {where} "
             "ORDER BY ce.captured_at DESC, ce.id DESC LIMIT :limit OFFSET :offset"
         ),
-        {**params, "limit": limit, "offset": offset},
-    ).mappings()
+        {**params, "limit": limit + 1, "offset": 0 if cursor else offset},
+    ).mappings())
+    cursor_next = next_cursor(rows, limit, ts_key="captured_at")
     can_view = can_view_photos(user)
     items = []
     for r in rows:
@@ -704,7 +743,10 @@ def list_events(
             r["id"], r["overview_photo_url"], "overview", can_view
         )
         items.append(EventRow(**d))
-    return EventsPage(items=items, total=total, limit=limit, offset=offset)
+    return EventsPage(
+        items=items, total=total, limit=limit, offset=offset,
+        next_cursor=cursor_next, total_estimated=estimated,
+    )
 
 
 @router.get("/events/{event_id}", response_model=EventDetail)
@@ -852,9 +894,53 @@ def get_event(
         barrier_commands=commands,
         manual_openings=manual_openings,
         resident_confirmations=resident_confirmations,
+        plate_candidates=_plate_candidates(ce["plate_number_normalized"]),
     )
 
 
+def _plate_candidates(plate: str | None) -> list[PlateCandidateRow]:
+    """Кандидаты из индекса номеров (§12), кроме точного совпадения ``normalized``.
+
+    Точное совпадение движок уже нашёл сам; совпадение только по
+    ``recognition_key`` (омоглиф) — как раз подсказка оператору.
+    """
+    if not plate:
+        return []
+    candidates = plate_index.find_plate_candidates(
+        plate, limit=plate_index.PLATE_CANDIDATES_LIMIT + 1
+    )
+    return _candidate_rows(
+        [c for c in candidates if c.plate_number_normalized != plate]
+    )[: plate_index.PLATE_CANDIDATES_LIMIT]
+
+
+def _candidate_rows(candidates: list) -> list[PlateCandidateRow]:
+    return [
+        PlateCandidateRow(
+            vehicle_id=c.vehicle_id,
+            plate_number_normalized=c.plate_number_normalized,
+            status=c.status,
+            distance=c.distance,
+        )
+        for c in candidates
+    ]
+
+
+@router.get("/plate-candidates", response_model=list[PlateCandidateRow])
+def get_plate_candidates(
+    plate: str = Query(..., min_length=1, max_length=32),
+    limit: int = Query(plate_index.PLATE_CANDIDATES_LIMIT, ge=1, le=20),
+    _user=Depends(require_approved_roles(*EVENTS_PASSES_ROLES)),
+) -> list[PlateCandidateRow]:
+    """Ранжированные зарегистрированные номера рядом с ``plate`` (§12).
+
+    Для ручного разбора: оператор вводит/видит распознанный номер и получает
+    ближайшие авто базы (не дальше ``ACCESS_PLATE_INDEX_MAX_DISTANCE`` правок). Индекс в памяти процесса — без скана ``vehicles``;
+    до первого фонового построения индекса ответ пустой.
+    """
+    return _candidate_rows(plate_index.find_plate_candidates(plate, limit=limit))
+
+
 # ------------------------------ /vehicles ------------------------------
 
 _VEHICLE_COLS = (
@@ -871,6 +957,8 @@ def list_vehicles(
     apartment_id: int | None = Query(None),
     limit: int = _limit(DEFAULT_LIMIT),
     offset: int = Query(0, ge=0),
+    cursor: str | None = _cursor(),
+    exact_total: bool = Query(False, description="точный count(*) вместо оценки"),
     db: Session = Depends(get_db),
     _user=Depends(require_approved_roles(*VEHICLES_REQUESTS_ROLES)),
 ) -> VehiclesPage:
@@ -889,23 +977,27 @@ def list_vehicles(
             "WHERE va.vehicle_id = v.id AND va.apartment_id = :apt)"
         )
         params["apt"] = apartment_id
+    total, estimated = page_total(
+        db, f"FROM vehicles v {_where(conds)}", params, exact=exact_total
+    )
+    keyset_condition(conds, params, cursor, ts_col="v.created_at", id_col="v.id")
     where = _where(conds)
-
-    total = db.execute(
-        text(f"SELECT count(*) FROM vehicles v {where}"), params
-    ).scalar_one()
     rows = list(
         db.execute(
             text(
-                f"SELECT {_VEHICLE_COLS} FROM vehicles v {where} "
-                "ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset"
+                f"SELECT {_VEHICLE_COLS}, created_at FROM vehicles v {where} "
+                "ORDER BY v.created_at DESC, v.id DESC LIMIT :limit OFFSET :offset"
             ),
-            {**params, "limit": limit, "offset": offset},
+            {**params, "limit": limit + 1, "offset": 0 if cursor else offset},
         ).mappings()
     )
+    cursor_next = next_cursor(rows, limit, ts_key="created_at")
     links = _apartments_for(db, [r["id"] for r in rows])
     items = [_vehicle_row(r, links.get(r["id"], [])) for r in rows]
-    return VehiclesPage(items=items, total=total, limit=limit, offset=offset)
+    return VehiclesPage(
+        items=items, total=total, limit=limit, offset=offset,
+        next_cursor=cursor_next, total_estimated=estimated,
+    )
 
 
 @router.get("/vehicles/{vehicle_id}", response_model=VehicleDetail)
@@ -993,6 +1085,8 @@ def list_passes(
     apartment_id: int | None = Query(None),
     limit: int = _limit(DEFAULT_LIMIT),
     offset: int = Query(0, ge=0),
+    cursor: str | None = _cursor(),
+    exact_total: bool = Query(False, description="точный count(*) вместо оценки"),
     db: Session = Depends(get_db),
     _user=Depends(require_approved_roles(*EVENTS_PASSES_ROLES)),
 ) -> PassesPage:
@@ -1008,12 +1102,12 @@ def list_passes(
     if apartment_id is not None:
         conds.append("apartment_id = :apt")
         params["apt"] = apartment_id
+    total, estimated = page_total(
+        db, f"FROM access_passes {_where(conds)}", params, exact=exact_total
+    )
+    keyset_condition(conds, params, cursor, ts_col="created_at", id_col="id")
     where = _where(conds)
-
-    total = db.execute(
-        text(f"SELECT count(*) FROM access_passes {where}"), params
-    ).scalar_one()
-    rows = db.execute(
+    rows = list(db.execute(
         text(
             "SELECT id, pass_type, apartment_id, created_by_user_id, zone_id, "
             " plate_number_original, plate_number_normalized, valid_from, valid_until, "
@@ -1021,10 +1115,14 @@ def list_passes(
             f"FROM access_passes {where} "
             "ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset"
         ),
-        {**params, "limit": limit, "offset": offset},
-    ).mappings()
+        {**params, "limit": limit + 1, "offset": 0 if cursor else offset},
+    ).mappings())
+    cursor_next = next_cursor(rows, limit, ts_key="created_at")
     items = [PassRow(**r) for r in rows]
-    return PassesPage(items=items, total=total, limit=limit, offset=offset)
+    return PassesPage(
+        items=items, total=total, limit=limit, offset=offset,
+        next_cursor=cursor_next, total_estimated=estimated,
+    )
 
 
 @router.get("/passes/{pass_id}", response_model=PassDetail)
@@ -1071,6 +1169,8 @@ def list_requests(
     apartment_id: int | None = Query(None),
     limit: int = _limit(DEFAULT_LIMIT),
     offset: int = Query(0, ge=0),
+    cursor: str | None = _cursor(),
+    exact_total: bool = Query(False, description="точный count(*) вместо оценки"),
     db: Session = Depends(get_db),
     _user=Depends(require_approved_roles(*VEHICLES_REQUESTS_ROLES)),
 ) -> RequestsPage:
@@ -1087,12 +1187,12 @@ def list_requests(
     if apartment_id is not None:
         conds.append("apartment_id = :apt")
         params["apt"] = apartment_id
+    total, estimated = page_total(
+        db, f"FROM resident_access_requests {_where(conds)}", params, exact=exact_total
+    )
+    keyset_condition(conds, params, cursor, ts_col="created_at", id_col="id")
     where = _where(conds)
-
-    total = db.execute(
-        text(f"SELECT count(*) FROM resident_access_requests {where}"), params
-    ).scalar_one()
-    rows = db.execute(
+    rows = list(db.execute(
         text(
             "SELECT id, apartment_id, created_by_user_id, vehicle_id, "
             " plate_number_original, plate_number_normalized, relation_type, status, "
@@ -1100,10 +1200,14 @@ def list_requests(
             f"FROM resident_access_requests {where} "
             "ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset"
         ),
-        {**params, "limit": limit, "offset": offset},
-    ).mappings()
+        {**params, "limit": limit + 1, "offset": 0 if cursor else offset},
+    ).mappings())
+    cursor_next = next_cursor(rows, limit, ts_key="created_at")
     items = [RequestRow(**r) for r in rows]
-    return RequestsPage(items=items, total=total, limit=limit, offset=offset)
+    return RequestsPage(
+        items=items, total=total, limit=limit, offset=offset,
+        next_cursor=cursor_next, total_estimated=estimated,
+    )
 
 
 @router.get("/requests/{request_id}", response_model=RequestDetail)
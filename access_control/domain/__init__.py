@@ -21,6 +21,8 @@ from .events import (
     AccessDecision,
     AccessEntryConfirmation,
     AccessEvent,
+    AccessRetentionWatermark,
+    AccessReviewHead,
     CameraEvent,
     ControllerSyncEvent,
 )
@@ -55,6 +57,8 @@ __all__ = [
     "AccessEvent",
     "AccessEntryConfirmation",
     "ControllerSyncEvent",
+    "AccessReviewHead",
+    "AccessRetentionWatermark",
     # commands
     "BarrierCommand",
     # audit
@@ -8,6 +8,7 @@ api_key_hash + HMAC + nonce + IP allowlist) и режимом offline (§8). ``a
 from __future__ import annotations
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     CheckConstraint,
     Column,
@@ -70,6 +71,9 @@ class EdgeController(Base):
     last_heartbeat_at = Column(DateTime(timezone=True), nullable=True)
     # Дрейф часов edge относительно backend (§8, heartbeat clock offset), мс.
     clock_offset_ms = Column(Integer, nullable=True)
+    # High-water mark offline-синхронизации (§8.4): максимальный ``seq`` события,
+    # закоммиченный backend'ом. Edge после обрыва докачивает очередь с ``seq`` > HWM.
+    sync_high_water_seq = Column(BigInteger, nullable=True)
     status = Column(String(32), nullable=False, server_default="active")
     is_active = Column(Boolean, nullable=False, server_default="true")
     created_at = created_at_column()
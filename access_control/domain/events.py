@@ -9,14 +9,22 @@
   CTO #3), не UPDATE. ``UNIQUE(camera_event_id) WHERE supersedes_decision_id IS
   NULL`` — ровно одно начальное решение на событие. Append-only (§9.7) + hash-chain.
 * ``access_events`` — иммутабельный бизнес-журнал проезда (retention 12 мес,
-  hash-chain). ``UNIQUE(controller_id, event_id)`` — один проезд на event.
-  Append-only (§9.7).
+  hash-chain). ``UNIQUE(controller_id, event_id, occurred_at)`` — один проезд на
+  event. Append-only (§9.7). На PostgreSQL партиционирован помесячно по
+  ``occurred_at`` (миграция 018): retention — DROP партиции, а не DELETE.
 * ``controller_sync_events`` — отложенные offline-события edge (§8.4).
   ``UNIQUE(controller_id, event_id)``.
+* ``access_review_heads`` — проекция «текущий pending_review события» для
+  review-expiry (§9.5): строка на событие, чьё ТЕКУЩЕЕ решение ждёт оператора.
+  Ведётся AFTER INSERT-триггером на ``access_decisions`` (миграция 016), не кодом.
+* ``access_retention_watermarks`` — курсор ``(captured_at, id)`` chunked-retention
+  фото (§11): докуда ``camera_events`` уже обработаны, чтобы прогон продолжался
+  с места остановки.
 """
 from __future__ import annotations
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     CheckConstraint,
     Column,
@@ -106,6 +114,10 @@ class CameraEvent(Base):
             "plate_number_normalized",
             "captured_at",
         ),
+        # Keyset-пагинация журнала событий по (captured_at, id) — общий и с фильтром
+        # по зоне (миграция 015).
+        Index("ix_camera_events_captured_at_id", "captured_at", "id"),
+        Index("ix_camera_events_zone_captured_at_id", "zone_id", "captured_at", "id"),
     )
 
 
@@ -179,8 +191,59 @@ class AccessDecision(Base, HashChainMixin):
     )
 
 
+class AccessReviewHead(Base):
+    """Текущий pending_review события (§9.5) — O(due) поиск просроченных.
+
+    Append-only ``access_decisions`` хранит исходные pending-строки навсегда, и
+    «текущее ли оно» требовало ``max(id)`` по истории. Проекцию ведёт триггер
+    ``access_control_review_head_sync`` (миграция 016): любая новая строка
+    решения события удаляет голову, новая ``pending_review`` с дедлайном — ставит.
+    Сервисный код сюда не пишет.
+    """
+
+    __tablename__ = "access_review_heads"
+
+    camera_event_id = Column(
+        ForeignKey("camera_events.id", ondelete="CASCADE"),
+        primary_key=True,
+        autoincrement=False,
+    )
+    decision_id = Column(
+        ForeignKey("access_decisions.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    review_deadline_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class AccessRetentionWatermark(Base):
+    """Watermark retention-прохода по ``camera_events`` (§11), строка на задачу.
+
+    ``(captured_at, camera_event_id)`` — последний обработанный ключ keyset-обхода;
+    двигается в той же транзакции, что и обработка чанка. FK на событие нет:
+    события под watermark могут уже быть удалены. ``blocked_event_id`` /
+    ``blocked_attempts`` — событие, на котором обход остановил сбой удаления, и
+    число попыток подряд (после лимита событие паркуется, миграция 025).
+    """
+
+    __tablename__ = "access_retention_watermarks"
+
+    job = Column(String(64), primary_key=True)
+    captured_at = Column(DateTime(timezone=True), nullable=False)
+    camera_event_id = Column(BigInteger, nullable=False)
+    blocked_event_id = Column(BigInteger, nullable=True)
+    blocked_attempts = Column(Integer, nullable=False, server_default=text("0"))
+    updated_at = created_at_column()
+
+
 class AccessEvent(Base, HashChainMixin):
-    """Иммутабельный бизнес-журнал проезда (§9.7, retention 12 мес)."""
+    """Иммутабельный бизнес-журнал проезда (§9.7, retention 12 мес).
+
+    На PostgreSQL — RANGE-партиции по ``occurred_at`` (миграция 018): физический
+    PK там ``(id, occurred_at)``, ``id`` — ``nextval`` отдельной sequence. Модель
+    держит PK по ``id``: он по-прежнему уникален, а составной ломал бы
+    sqlite-``create_all`` (rowid-autoincrement только у одиночного INTEGER PK).
+    """
 
     __tablename__ = "access_events"
 
@@ -227,8 +290,13 @@ class AccessEvent(Base, HashChainMixin):
     created_at = created_at_column()
 
     __table_args__ = (
+        # Ключ партиционирования обязан входить в UNIQUE partitioned-таблицы;
+        # occurred_at = captured_at события, у повтора event_id он тот же.
         UniqueConstraint(
-            "controller_id", "event_id", name="uq_access_events_controller_event"
+            "controller_id",
+            "event_id",
+            "occurred_at",
+            name="uq_access_events_controller_event",
         ),
         CheckConstraint(
             in_clause("direction", Direction), name="ck_access_events_direction"
@@ -14,6 +14,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -118,6 +119,8 @@ class AccessPass(Base):
             "used_entries >= 0 AND used_entries <= max_entries",
             name="ck_access_passes_used_entries",
         ),
+        # Keyset-пагинация журнала пропусков (миграция 015).
+        Index("ix_access_passes_created_at_id", "created_at", "id"),
     )
 
 
@@ -168,4 +171,6 @@ class ResidentAccessRequest(Base):
             + in_clause("relation_type", VehicleApartmentRelationType),
             name="ck_resident_access_requests_relation_type",
         ),
+        # Keyset-пагинация журнала заявок (миграция 015).
+        Index("ix_resident_access_requests_created_at_id", "created_at", "id"),
     )
@@ -71,6 +71,10 @@ class Vehicle(Base):
             postgresql_where=text("status <> 'archived'"),
             sqlite_where=text("status <> 'archived'"),
         ),
+        # Keyset-пагинация базы авто (миграция 015).
+        Index("ix_vehicles_created_at_id", "created_at", "id"),
+        # Догон индекса кандидатов номера (services/plate_index, миграция 026).
+        Index("ix_vehicles_updated_at_id", "updated_at", "id"),
     )
 
 
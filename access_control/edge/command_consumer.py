@@ -6,7 +6,7 @@
 обработка возвращает сохранённый результат.
 
 Дедуп-хранилище (``ProcessedStore``) ПОДКЛЮЧАЕМО: дефолт — in-memory
-(``InMemoryProcessedStore``), для продакшена есть простой персистентный
+(``InMemoryProcessedStore``), для продакшена есть персистентный append-only журнал
 (``FileProcessedStore``), переживающий рестарт процесса edge. Прод-edge ОБЯЗАН
 использовать персистентный store: с in-memory после рестарта дедуп теряется и реле
 может открыться повторно.
@@ -18,8 +18,12 @@ from __future__ import annotations
 
 import datetime as dt
 import json
+import logging
 import os
+import struct
 import tempfile
+import time
+import zlib
 from dataclasses import dataclass, replace
 from typing import Any, Protocol
 
@@ -28,7 +32,12 @@ from access_control.integrations.relay import RelayAdapter, RelayCommand, RelayR
 # репо — ровно тот класс дрейфа, что уже стрелял tz-багами, AUD5-CODE-3).
 from uk_management_bot.utils.datetime_utils import utc_now as _utcnow
 
+logger = logging.getLogger(__name__)
+
 _BASE = "/api/v1/access/edge"
+# Сколько помнить обработанный command_id. Команды живут на backend секунды–минуты
+# (TTL команды открытия), так что сутки — с большим запасом.
+DEFAULT_PROCESSED_TTL_SECONDS = 24 * 3600
 
 
 
@@ -57,22 +66,115 @@ class InMemoryProcessedStore:
 
 
 class FileProcessedStore:
-    """Персистентный дедуп на JSON-файле — переживает рестарт процесса edge (§9.2).
-
-    Минимальная реализация без БД: ``command_id -> {opened, detail}``. Запись —
-    атомарная (tmp + ``os.replace``). Для пилота (один процесс edge) достаточно;
-    прод-edge обязан персистить именно так (или таблицей), иначе дедуп теряется.
+    """Персистентный дедуп на append-only журнале — переживает рестарт edge (§9.2).
+
+    Прежняя версия переписывала весь JSON-файл на каждый ``put``: O(n) записи на
+    команду в ack-пути и износ SD-карты edge. Теперь ``put`` дописывает ОДНУ
+    запись в конец журнала и делает ``fsync``; индекс ``command_id -> результат``
+    живёт в памяти и восстанавливается чтением журнала при старте.
+
+    Формат записи: ``>II`` (длина payload, crc32 payload) + JSON payload
+    ``{"id", "opened", "detail", "ts"}``. При старте журнал читается до первой
+    битой записи (обрыв посреди записи при потере питания — torn write): хвост
+    отрезается ``truncate``, всё записанное до него сохраняется.
+
+    * TTL: записи старше ``ttl_seconds`` не попадают в индекс (команда давно
+      протухла на backend, повторно её не выдадут) и уходят при компакции;
+    * компакция: когда мёртвых записей (дубли/протухшие) накопилось больше
+      живых и не меньше ``compact_min_records``, живые переписываются в новый
+      файл (tmp + ``fsync`` + ``os.replace`` — атомарно, как раньше весь flush);
+      дубли в норме редки (command_id уникальны), поэтому ``put`` ещё и раз в
+      ``ttl_seconds`` с прошлой компакции сжимает журнал от протухших записей —
+      без этого долгоживущий edge рос бы до рестарта: журнал и индекс держат
+      не больше ~двух TTL команд;
+    * старый формат (JSON-объект целиком) распознаётся по первому байту ``{`` и
+      при старте конвертируется в журнал.
     """
 
-    def __init__(self, path: str) -> None:
+    _HEADER = struct.Struct(">II")
+    # Sanity-предел длины записи: мусорный заголовок не заставит читать гигабайты.
+    _MAX_RECORD_BYTES = 64 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        ttl_seconds: float = DEFAULT_PROCESSED_TTL_SECONDS,
+        compact_min_records: int = 1024,
+        fsync: bool = True,
+    ) -> None:
         self._path = path
+        self._ttl = ttl_seconds
+        self._compact_min = compact_min_records
+        self._fsync = fsync
         self._data: dict[str, dict] = {}
-        if os.path.exists(path):
+        self._records = 0
+        self._compacted_at = time.time()
+        legacy = self._load()
+        self._fh = open(path, "ab")
+        if legacy or self._dead_records() >= self._compact_min:
+            self.compact()
+
+    # ----------------------------- чтение -----------------------------
+
+    def _load(self) -> bool:
+        """Восстановить индекс из журнала. True — файл был в старом JSON-формате."""
+        if not os.path.exists(self._path):
+            return False
+        with open(self._path, "rb") as fh:
+            raw = fh.read()
+        if raw[:1] == b"{":
             try:
-                with open(path, encoding="utf-8") as fh:
-                    self._data = json.load(fh)
-            except (OSError, json.JSONDecodeError):
-                self._data = {}
+                legacy = json.loads(raw.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                legacy = {}
+            now = time.time()
+            for command_id, rec in legacy.items():
+                self._data[command_id] = {
+                    "opened": bool(rec.get("opened", False)),
+                    "detail": rec.get("detail"),
+                    "ts": now,
+                }
+            return True
+
+        good_end = self._replay(raw)
+        if good_end < len(raw):
+            logger.warning(
+                "processed store: torn tail dropped (%d of %d bytes kept)",
+                good_end,
+                len(raw),
+            )
+            with open(self._path, "r+b") as fh:
+                fh.truncate(good_end)
+        return False
+
+    def _replay(self, raw: bytes) -> int:
+        """Применить записи журнала к индексу; вернуть смещение конца последней целой."""
+        cutoff = time.time() - self._ttl
+        offset = 0
+        header = self._HEADER
+        while offset + header.size <= len(raw):
+            length, checksum = header.unpack_from(raw, offset)
+            start = offset + header.size
+            end = start + length
+            if length > self._MAX_RECORD_BYTES or end > len(raw):
+                break
+            payload = raw[start:end]
+            if zlib.crc32(payload) != checksum:
+                break
+            try:
+                rec = json.loads(payload)
+            except ValueError:
+                break
+            self._records += 1
+            if rec.get("ts", 0) >= cutoff:
+                self._data[rec["id"]] = {
+                    "opened": bool(rec.get("opened", False)),
+                    "detail": rec.get("detail"),
+                    "ts": rec.get("ts", 0),
+                }
+            offset = end
+        return offset
 
     def get(self, command_id: str) -> RelayResult | None:
         rec = self._data.get(command_id)
@@ -85,21 +187,59 @@ class FileProcessedStore:
             detail=rec.get("detail"),
         )
 
-    def put(self, command_id: str, result: RelayResult) -> None:
-        self._data[command_id] = {"opened": result.opened, "detail": result.detail}
-        self._flush()
+    # ----------------------------- запись -----------------------------
+
+    def _encode(self, command_id: str, rec: dict) -> bytes:
+        payload = json.dumps(
+            {"id": command_id, **rec}, separators=(",", ":")
+        ).encode("utf-8")
+        return self._HEADER.pack(len(payload), zlib.crc32(payload)) + payload
 
-    def _flush(self) -> None:
+    def put(self, command_id: str, result: RelayResult) -> None:
+        rec = {"opened": result.opened, "detail": result.detail, "ts": time.time()}
+        self._fh.write(self._encode(command_id, rec))
+        self._fh.flush()
+        if self._fsync:
+            os.fsync(self._fh.fileno())
+        self._data[command_id] = rec
+        self._records += 1
+        dead = self._dead_records()
+        if dead >= self._compact_min and dead > len(self._data):
+            self.compact()
+        elif self._records >= self._compact_min and rec["ts"] - self._compacted_at >= self._ttl:
+            # Уникальные command_id дублей не дают: протухшие уходят по времени.
+            self.compact()
+
+    def _dead_records(self) -> int:
+        return self._records - len(self._data)
+
+    def compact(self) -> None:
+        """Переписать журнал только живыми (не протухшими) записями, атомарно."""
+        cutoff = time.time() - self._ttl
+        self._data = {k: v for k, v in self._data.items() if v["ts"] >= cutoff}
         directory = os.path.dirname(self._path) or "."
         fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
         try:
-            with os.fdopen(fd, "w", encoding="utf-8") as fh:
-                json.dump(self._data, fh)
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(
+                    b"".join(self._encode(k, v) for k, v in self._data.items())
+                )
+                fh.flush()
+                os.fsync(fh.fileno())
             os.replace(tmp, self._path)
         except BaseException:
             if os.path.exists(tmp):
                 os.unlink(tmp)
             raise
+        fh_old = getattr(self, "_fh", None)
+        if fh_old is not None:
+            fh_old.close()
+        self._fh = open(self._path, "ab")
+        self._records = len(self._data)
+        self._compacted_at = time.time()
+
+    def close(self) -> None:
+        self._fh.close()
 
 
 @dataclass(frozen=True)
@@ -178,13 +318,20 @@ class EdgeCommandConsumer:
             ack_replayed=False,
         )
 
-    def pull_once(self) -> ProcessOutcome | None:
+    def pull_once(self, *, wait: float = 0.0) -> ProcessOutcome | None:
         """Один durable-цикл: lease → relay.open (дедуп) → ack. None если очередь пуста.
 
+        ``wait`` > 0 — long-poll: backend держит запрос до появления команды этого
+        контроллера (или до таймаута → None).
+
         Протухшую (``expires_at`` в прошлом) команду НЕ открываем: реле не трогаем,
         ack'аем как expired/skip, чтобы снять её с очереди (§9.2).
         """
-        resp = self._client.get(f"{self._base}/{self._uid}/commands/next")
+        url = f"{self._base}/{self._uid}/commands/next"
+        if wait > 0:
+            resp = self._client.get(url, params={"wait": wait})
+        else:
+            resp = self._client.get(url)
         if resp.status_code == 204:
             return None
         resp.raise_for_status()
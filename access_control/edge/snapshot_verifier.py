@@ -6,6 +6,14 @@ snapshot в ``fail_closed`` НЕ открывает въезд (§8.2: «даж
 может разрешить offline-въезд»). Любой провал (неизвестный key_id / неверная
 подпись / истёкший / недопустимый дрейф) → reject + переход в ``fail_closed``.
 
+Grant-capable режим ``cached_permanent_only`` (§8.1) включается ТОЛЬКО явно —
+верификатор, сконфигурированный этим режимом, принимает snapshot с компактным
+allowlist (полным или дельтой от своей версии) и отвечает ``allows(plate,
+direction)`` по HMAC нормализованного номера (ключ номеров развёртывания
+провижинится на edge вместе с pinned key), пока snapshot не истёк. Любой
+провал проверки сбрасывает список — edge снова в ``fail_closed``. Пропуска/коды/
+лимиты offline запрещены в обоих режимах (§8.2).
+
 Защита от скачка системных часов (§8.2): срок ограничивается также МОНОТОННЫМ
 временем с момента получения snapshot — перевод стенных часов назад не «омолодит»
 истёкший snapshot.
@@ -18,6 +26,10 @@ from dataclasses import dataclass
 
 from access_control.services.snapshot_signing import (
     SNAPSHOT_TTL_SECONDS,
+    allowlist_digest,
+    apply_allowlist_delta,
+    plate_hash,
+    plate_key_id,
     verify_signature,
 )
 
@@ -25,6 +37,7 @@ from access_control.services.snapshot_signing import (
 MAX_CLOCK_DRIFT_SECONDS = 30
 
 FAIL_CLOSED = "fail_closed"
+CACHED_PERMANENT_ONLY = "cached_permanent_only"
 
 # Макс. заявленный lifetime snapshot (§8.2: возраст ≤ 15 мин). Порт guard'а из B.
 MAX_SNAPSHOT_LIFETIME_SECONDS = SNAPSHOT_TTL_SECONDS
@@ -32,6 +45,10 @@ MAX_SNAPSHOT_LIFETIME_SECONDS = SNAPSHOT_TTL_SECONDS
 MAX_FUTURE_ISSUED_SECONDS = 5
 # Поля разрешающего списка, запрещённые в fail_closed-snapshot (§8.2). Порт из B.
 _FORBIDDEN_GRANT_FIELDS = frozenset({"vehicles", "plates", "passes", "grants"})
+# Поля компактного allowlist: допустимы ТОЛЬКО в cached_permanent_only (§8.2).
+_ALLOWLIST_FIELDS = frozenset(
+    {"allowlist", "allowlist_delta", "allowlist_version", "allowlist_key_id"}
+)
 
 
 @dataclass(frozen=True)
@@ -39,8 +56,10 @@ class VerifyResult:
     """Итог проверки snapshot на edge (§8.2).
 
     ``accepted`` — snapshot структурно валиден (key/подпись/срок/дрейф). ``state`` —
-    режим edge после проверки (всегда ``fail_closed`` в пилоте). ``entry_allowed`` —
-    можно ли открыть въезд: в ``fail_closed`` ВСЕГДА False (reject-only).
+    режим edge после проверки (``fail_closed``, либо ``cached_permanent_only`` для
+    принятого grant-capable snapshot). ``entry_allowed`` — можно ли открыть въезд по
+    самому snapshot: ВСЕГДА False; в ``cached_permanent_only`` решение по номеру —
+    ``SnapshotVerifier.allows``.
     """
 
     accepted: bool
@@ -61,6 +80,43 @@ def _parse_dt(value: str | None) -> dt.datetime | None:
     return parsed
 
 
+def _is_hash_map(value) -> bool:
+    return isinstance(value, dict) and all(
+        isinstance(k, str) and isinstance(v, list) and all(isinstance(h, str) for h in v)
+        for k, v in value.items()
+    )
+
+
+def _allowlist_error(snapshot: dict) -> str | None:
+    """Структура allowlist grant-capable snapshot (§8.2); None — корректна.
+
+    Полный список сверяется с подписанным ``allowlist_version``; дельта — только
+    структурно (дайджест результата проверяет ``SnapshotVerifier`` после применения).
+    """
+    version = snapshot.get("allowlist_version")
+    if not isinstance(snapshot.get("allowlist_key_id"), str):
+        return "allowlist_missing"
+    has_full = "allowlist" in snapshot
+    has_delta = "allowlist_delta" in snapshot
+    if not isinstance(version, str) or has_full == has_delta:
+        return "allowlist_missing"
+    if has_full:
+        if not _is_hash_map(snapshot["allowlist"]):
+            return "allowlist_malformed"
+        if allowlist_digest(snapshot["allowlist"]) != version:
+            return "allowlist_digest_mismatch"
+        return None
+    delta = snapshot["allowlist_delta"]
+    if not (
+        isinstance(delta, dict)
+        and isinstance(delta.get("base_version"), str)
+        and _is_hash_map(delta.get("added", {}))
+        and _is_hash_map(delta.get("removed", {}))
+    ):
+        return "allowlist_malformed"
+    return None
+
+
 def verify_snapshot(
     snapshot: dict,
     *,
@@ -73,11 +129,14 @@ def verify_snapshot(
     max_age_seconds: int = SNAPSHOT_TTL_SECONDS,
     clock_drift_seconds: float = 0.0,
     max_clock_drift_seconds: int = MAX_CLOCK_DRIFT_SECONDS,
+    offline_mode: str = FAIL_CLOSED,
 ) -> VerifyResult:
     """Проверить snapshot одним pinned ключом (§8.2). Reject-only: въезд не открывает.
 
-    Любой негативный исход → ``accepted=False`` + ``state=fail_closed``. Позитивный
-    исход → ``accepted=True``, но ``entry_allowed=False`` (fail_closed пилот).
+    ``offline_mode`` — режим, сконфигурированный на самом edge; snapshot обязан быть
+    выписан именно в нём. Любой негативный исход → ``accepted=False`` +
+    ``state=fail_closed``. Позитивный исход → ``accepted=True``, ``state`` =
+    ``offline_mode``, но ``entry_allowed=False`` (решение по номеру — ``allows``).
     """
     wall_now = now or dt.datetime.now(dt.timezone.utc)
 
@@ -106,14 +165,24 @@ def verify_snapshot(
     ):
         return _reject("controller_uid_mismatch")
 
-    # 3.6) offline_mode обязан быть fail_closed (§8.2 пилот). Порт guard'а из B:
-    # snapshot, выписанный в ином режиме, в reject-only пилоте недопустим.
-    if snapshot.get("offline_mode") != FAIL_CLOSED:
+    # 3.6) offline_mode snapshot обязан совпасть с режимом edge (§8.2). Порт guard'а
+    # из B: fail_closed-edge не примет snapshot, выписанный в ином режиме.
+    if offline_mode not in (FAIL_CLOSED, CACHED_PERMANENT_ONLY):
+        return _reject("offline_mode_forbidden")
+    if snapshot.get("offline_mode") != offline_mode:
         return _reject("offline_mode_forbidden")
 
     # 3.7) В fail_closed snapshot НЕ должно быть разрешающего списка (§8.2). Порт из B.
-    if _FORBIDDEN_GRANT_FIELDS.intersection(snapshot):
+    # Пропуска/коды/произвольные grant-поля запрещены offline в любом режиме.
+    forbidden = _FORBIDDEN_GRANT_FIELDS
+    if offline_mode == FAIL_CLOSED:
+        forbidden = forbidden | _ALLOWLIST_FIELDS
+    if forbidden.intersection(snapshot):
         return _reject("grant_fields_forbidden")
+    if offline_mode == CACHED_PERMANENT_ONLY:
+        allowlist_error = _allowlist_error(snapshot)
+        if allowlist_error is not None:
+            return _reject(allowlist_error)
 
     # 3.8) Заявленный lifetime (expires_at - issued_at) ≤ 15 мин (§8.2). Порт из B:
     # snapshot с раздутым сроком отвергается даже до наступления expires_at.
@@ -144,8 +213,8 @@ def verify_snapshot(
         if (mono - received_monotonic) > max_age_seconds:
             return _reject("monotonic_expired")
 
-    # Валиден — но в fail_closed въезд всё равно НЕ открывается (reject-only).
-    return VerifyResult(True, False, FAIL_CLOSED, None)
+    # Валиден — но сам snapshot въезд НЕ открывает (в fail_closed — никогда).
+    return VerifyResult(True, False, offline_mode, None)
 
 
 class SnapshotVerifier:
@@ -153,6 +222,10 @@ class SnapshotVerifier:
 
     Один pinned (``key_id`` + публичный ключ) — модель пилота (§8.2). ``accept``
     фиксирует монотонный момент получения для последующей защиты от скачка часов.
+    В ``cached_permanent_only`` держит текущий allowlist и его версию: дельта
+    применяется только к своей ``base_version``, результат сверяется с подписанным
+    ``allowlist_version``. Номера сверяются по HMAC ключом ``plate_hash_key`` —
+    он обязателен в ``cached_permanent_only``.
     """
 
     def __init__(
@@ -164,7 +237,10 @@ class SnapshotVerifier:
         offline_mode: str = FAIL_CLOSED,
         max_age_seconds: int = SNAPSHOT_TTL_SECONDS,
         max_clock_drift_seconds: int = MAX_CLOCK_DRIFT_SECONDS,
+        plate_hash_key: bytes | None = None,
     ) -> None:
+        if offline_mode == CACHED_PERMANENT_ONLY and not plate_hash_key:
+            raise ValueError("cached_permanent_only требует plate_hash_key")
         self._key_id = pinned_key_id
         self._public_key = pinned_public_key
         # UID собственного контроллера: snapshot чужого контроллера отвергается (H1).
@@ -172,7 +248,39 @@ class SnapshotVerifier:
         self._offline_mode = offline_mode
         self._max_age = max_age_seconds
         self._max_drift = max_clock_drift_seconds
+        self._plate_key = plate_hash_key
         self._received_monotonic: float | None = None
+        self._snapshot: dict | None = None
+        self._allowlist: dict[str, frozenset[str]] | None = None
+        self._allowlist_version: str | None = None
+
+    @property
+    def allowlist_version(self) -> str | None:
+        """Версия принятого allowlist (``since_version`` для следующего запроса)."""
+        return self._allowlist_version
+
+    def _drop(self) -> None:
+        self._snapshot = None
+        self._allowlist = None
+        self._allowlist_version = None
+
+    def _install_allowlist(self, snapshot: dict) -> str | None:
+        """Обновить allowlist из принятого snapshot. Вернуть причину отказа или None."""
+        version = snapshot["allowlist_version"]
+        if snapshot["allowlist_key_id"] != plate_key_id(self._plate_key):
+            return "allowlist_key_mismatch"
+        if "allowlist" in snapshot:
+            allowlist = snapshot["allowlist"]
+        else:
+            delta = snapshot["allowlist_delta"]
+            if self._allowlist is None or delta["base_version"] != self._allowlist_version:
+                return "allowlist_base_mismatch"
+            allowlist = apply_allowlist_delta(self._allowlist, delta)
+            if allowlist_digest(allowlist) != version:
+                return "allowlist_digest_mismatch"
+        self._allowlist = {d: frozenset(hashes) for d, hashes in allowlist.items()}
+        self._allowlist_version = version
+        return None
 
     def accept(
         self,
@@ -181,9 +289,13 @@ class SnapshotVerifier:
         now: dt.datetime | None = None,
         clock_drift_seconds: float = 0.0,
     ) -> VerifyResult:
-        """Принять snapshot: зафиксировать момент получения и проверить (§8.2)."""
+        """Принять snapshot: зафиксировать момент получения и проверить (§8.2).
+
+        Отказ сбрасывает принятый ранее allowlist (edge → ``fail_closed``); после
+        ``allowlist_base_mismatch`` edge запрашивает полный snapshot.
+        """
         self._received_monotonic = time.monotonic()
-        return verify_snapshot(
+        result = verify_snapshot(
             snapshot,
             pinned_key_id=self._key_id,
             pinned_public_key=self._public_key,
@@ -193,7 +305,45 @@ class SnapshotVerifier:
             max_age_seconds=self._max_age,
             clock_drift_seconds=clock_drift_seconds,
             max_clock_drift_seconds=self._max_drift,
+            offline_mode=self._offline_mode,
+        )
+        if not result.accepted:
+            self._drop()
+            return result
+        if self._offline_mode == CACHED_PERMANENT_ONLY:
+            reason = self._install_allowlist(snapshot)
+            if reason is not None:
+                self._drop()
+                return VerifyResult(False, False, FAIL_CLOSED, reason)
+        self._snapshot = snapshot
+        return result
+
+    def allows(
+        self,
+        plate_normalized: str,
+        direction: str,
+        *,
+        now: dt.datetime | None = None,
+        now_monotonic: float | None = None,
+        clock_drift_seconds: float = 0.0,
+    ) -> bool:
+        """Разрешён ли offline-проезд постоянного авто (§8.1 ``cached_permanent_only``).
+
+        ``plate_normalized`` — номер, нормализованный как на backend
+        (``services/normalization.normalize_plate``). Перед ответом snapshot
+        перепроверяется (срок/монотонность/дрейф): истёк → False (``fail_closed``).
+        """
+        if self._snapshot is None or self._allowlist is None:
+            return False
+        result = self.recheck(
+            self._snapshot,
+            now=now,
+            now_monotonic=now_monotonic,
+            clock_drift_seconds=clock_drift_seconds,
         )
+        if not result.accepted:
+            return False
+        return plate_hash(plate_normalized, self._plate_key) in self._allowlist.get(direction, ())
 
     def recheck(
         self,
@@ -215,4 +365,5 @@ class SnapshotVerifier:
             max_age_seconds=self._max_age,
             clock_drift_seconds=clock_drift_seconds,
             max_clock_drift_seconds=self._max_drift,
+            offline_mode=self._offline_mode,
         )
@@ -9,7 +9,8 @@
   ``X-API-Key``, multipart ``file`` + ``kind`` (plate|overview) + ``ref`` +
   опц. ``uploaded_by`` → 201 ``{media_file:{id, telegram_file_id, ...},
   file_url}``; нет канала access → 503;
-* ``GET {MEDIA_SERVICE_URL}/api/v1/media/{media_id}/file`` (``X-API-Key``) — стрим.
+* ``GET {MEDIA_SERVICE_URL}/api/v1/media/{media_id}/file`` (``X-API-Key``) — стрим;
+* ``DELETE {MEDIA_SERVICE_URL}/api/v1/media/{media_id}`` — удаление (retention §11).
 
 Пакет ``media_service`` в access-образ НЕ импортируется (его там нет) — это
 самостоятельный httpx-клиент.
@@ -95,6 +96,10 @@ class AccessMediaClient:
             timeout=self._timeout,
         )
 
+    def http_client(self) -> httpx.AsyncClient:
+        """Новый httpx-клиент медиа-сервиса для пачки запросов (закрывает вызывающий)."""
+        return self._client()
+
     # ------------------------------ операции ------------------------------
 
     async def upload_access_photo(
@@ -142,6 +147,25 @@ class AccessMediaClient:
             content_type = resp.headers.get("content-type", "application/octet-stream")
             return resp.content, content_type
 
+    async def delete_file(
+        self, media_id: int | str, *, client: httpx.AsyncClient | None = None
+    ) -> bool:
+        """Удалить файл в медиа-сервисе (retention §11).
+
+        True — удалён сейчас, False — его уже нет (404, повтор после сбоя).
+        ``client`` — общий httpx-клиент пачки удалений (``http_client``), чтобы
+        retention не открывал соединение на каждый файл. Прочие неуспешные
+        статусы пробрасываются (``httpx.HTTPError``).
+        """
+        if client is None:
+            async with self._client() as own:
+                return await self.delete_file(media_id, client=own)
+        resp = await client.delete(f"/media/{int(media_id)}")
+        if resp.status_code == httpx.codes.NOT_FOUND:
+            return False
+        resp.raise_for_status()
+        return True
+
 
 # Синглтон-клиент. Ленивый: конструируется без MEDIA_* (ошибка только при использовании).
 _default_client: AccessMediaClient | None = None
@@ -7,7 +7,7 @@ from __future__ import annotations
 from sqlalchemy.orm import Session
 
 from access_control.domain.audit import AccessAuditLog
-from access_control.services.hashchain import next_hash
+from access_control.services.hashchain import next_hash, next_hashes
 
 
 def insert(
@@ -29,10 +29,52 @@ def insert(
     дополняет ``details`` (например ``triggered_by_user_id`` для system-действий,
     где ``actor_user_id`` = None). IP включён в hash-payload — tamper-evident.
     """
+    payload = _payload(
+        actor_user_id=actor_user_id,
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        barrier_id=barrier_id,
+        source=source,
+        reason=reason,
+        ip_address=ip_address,
+        extra_details=extra_details,
+    )
+    prev_hash, row_hash = next_hash(db, "access_audit_logs", payload)
+    db.add(AccessAuditLog(**payload, prev_hash=prev_hash, row_hash=row_hash))
+
+
+def insert_many(db: Session, entries: list[dict]) -> None:
+    """Пачка append-строк audit одной вставкой (hash-chain связан в памяти).
+
+    ``entries`` — kwargs ``insert`` (без ``db``). Порядок строк в цепочке = порядок
+    ``entries``; хэши совпадают с последовательными вызовами ``insert``.
+    """
+    payloads = [_payload(**entry) for entry in entries]
+    links = next_hashes(db, "access_audit_logs", payloads)
+    db.add_all(
+        AccessAuditLog(**payload, prev_hash=prev_hash, row_hash=row_hash)
+        for payload, (prev_hash, row_hash) in zip(payloads, links)
+    )
+
+
+def _payload(
+    *,
+    actor_user_id: int | None,
+    action: str,
+    entity_type: str,
+    entity_id: int | None,
+    barrier_id: int | None,
+    source: str,
+    reason: str | None,
+    ip_address: str | None = None,
+    extra_details: dict | None = None,
+) -> dict:
+    """Hash-payload строки audit — её колонки без hash-полей."""
     details = {"barrier_id": barrier_id, "source": source, "reason": reason}
     if extra_details:
         details.update(extra_details)
-    payload = {
+    return {
         "actor_user_id": actor_user_id,
         "action": action,
         "entity_type": entity_type,
@@ -40,16 +82,3 @@ def insert(
         "details": details,
         "ip_address": ip_address,
     }
-    prev_hash, row_hash = next_hash(db, "access_audit_logs", payload)
-    db.add(
-        AccessAuditLog(
-            actor_user_id=actor_user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=str(entity_id) if entity_id is not None else None,
-            details=details,
-            ip_address=ip_address,
-            prev_hash=prev_hash,
-            row_hash=row_hash,
-        )
-    )
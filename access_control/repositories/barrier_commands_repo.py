@@ -1,7 +1,8 @@
 """Доступ к ``barrier_commands`` (durable outbox команд открытия, §9.2).
 
 Идемпотентное создание команды по ``UNIQUE(decision_id)`` и чтение команды
-решения. Транзакция/lock — в сервисе.
+решения. Транзакция/lock — в сервисе; он же по ``CommandRow.created`` помечает
+сессию для пробуждения long-poll (``services/command_wakeup``).
 """
 from __future__ import annotations
 
@@ -27,8 +28,8 @@ class CommandRow:
     command_id: str
     barrier_id: int
     expires_at: dt.datetime | None
-
-
+    # False — команда на это решение уже была (idempotent-повтор), будить некого.
+    created: bool = True
 
 
 def command_for_decision(db: Session, decision_id: int) -> BarrierCommand | None:
@@ -79,6 +80,7 @@ def create_open_command(
                 command_id=str(existing.command_id),
                 barrier_id=existing.barrier_id,
                 expires_at=existing.expires_at,
+                created=False,
             )
         return CommandRow(str(new_command_id), barrier_id, expires_at)
     db.execute(base)
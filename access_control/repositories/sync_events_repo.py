@@ -0,0 +1,69 @@
+"""Доступ к ``controller_sync_events``: пачечный идемпотентный приём (§8.4).
+
+Offline-хвост edge после восстановления связи — тысячи событий. Вставка идёт
+multi-row ``INSERT … ON CONFLICT DO NOTHING RETURNING event_id`` кусками по
+``INSERT_CHUNK_ROWS`` (а не по строке на событие); ``RETURNING`` отдаёт
+ровно вставленные ключи, всё остальное — дубль по ``(controller_id, event_id)``.
+Транзакция — на стороне вызывающего.
+"""
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from access_control.domain.events import ControllerSyncEvent
+
+# Строк в одном INSERT: 7 bind-параметров на строку, предел протокола — 65535.
+INSERT_CHUNK_ROWS = 1000
+
+
+def insert_batch(db: Session, controller_id: int, rows: list[dict]) -> set[str]:
+    """Вставить пачку событий контроллера; вернуть event_id реально вставленных.
+
+    ``rows`` — dict'ы с ключами ``event_id``/``payload``/``conflict``/
+    ``snapshot_expired``; ``event_id`` внутри пачки уникальны (дедуп — у сервиса).
+    """
+    table = ControllerSyncEvent.__table__
+    inserted: set[str] = set()
+    for start in range(0, len(rows), INSERT_CHUNK_ROWS):
+        chunk = rows[start : start + INSERT_CHUNK_ROWS]
+        stmt = (
+            pg_insert(table)
+            .values(
+                [
+                    {
+                        "controller_id": controller_id,
+                        "received_at": text("now()"),
+                        **row,
+                    }
+                    for row in chunk
+                ]
+            )
+            .on_conflict_do_nothing(
+                constraint="uq_controller_sync_events_controller_event"
+            )
+            .returning(table.c.event_id)
+        )
+        inserted.update(db.execute(stmt).scalars())
+    return inserted
+
+
+def advance_high_water(db: Session, controller_id: int, seq: int) -> int:
+    """Продвинуть HWM контроллера до ``seq`` (монотонно); вернуть итоговый HWM."""
+    return db.execute(
+        text(
+            "UPDATE edge_controllers "
+            "SET sync_high_water_seq = GREATEST(COALESCE(sync_high_water_seq, -1), :s) "
+            "WHERE id = :i RETURNING sync_high_water_seq"
+        ),
+        {"s": seq, "i": controller_id},
+    ).scalar_one()
+
+
+def high_water(db: Session, controller_id: int) -> int | None:
+    """Текущий HWM контроллера (``None`` — нумерованных событий ещё не было)."""
+    return db.execute(
+        text("SELECT sync_high_water_seq FROM edge_controllers WHERE id = :i"),
+        {"i": controller_id},
+    ).scalar()
@@ -0,0 +1,282 @@
+"""Пробуждение long-poll ожидающих ``/commands/next`` по контроллеру (§9.2).
+
+Раньше long-poll edge-агента был циклом ``UPDATE … SKIP LOCKED`` + ``time.sleep``
+в sync-endpoint: каждый ждущий шлюз держал поток threadpool'а и DB-сессию на всё
+ожидание, а задержка выдачи команды квантовалась интервалом опроса. Теперь
+ожидающий паркуется на асинхронном событии, ключом которого служит
+``controller_id``, и lease-UPDATE запускается только после того, как для ЭТОГО
+контроллера действительно зафиксирована новая команда.
+
+Транзакционность: сервис, создавший команду (ingestion/lifecycle/
+one_time_codes), лишь помечает сессию (``mark_command_created``), а сигнал
+уходит из ``after_commit`` этой сессии — ожидающий не проснётся на команду,
+которую ещё не видно (или которую откатили). Правок вокруг их ``db.commit()``
+не нужно; репозиторий о пробуждении не знает.
+
+Реализации (выбор — тем же флагом ``ACCESS_EVENT_BROKER``, что у WS-брокера):
+
+* ``InProcessCommandWakeup`` (по умолчанию) — asyncio-события в процессе;
+  ``notify`` потокобезопасен (вызывается из sync-ingestion в worker-потоке).
+* ``RedisCommandWakeup`` — публикует ``controller_id`` в канал
+  ``ACCESS_COMMAND_WAKEUP_CHANNEL``; один слушатель на процесс раздаёт сигнал
+  локальным ожидающим. Нужен при нескольких воркерах/контейнерах API.
+
+Потерянный сигнал (сбой Redis, in-process брокер при нескольких воркерах) не
+ломает доставку: endpoint всё равно перепроверяет очередь раз в
+``LONG_POLL_RECHECK_SECONDS`` (см. ``api/commands``) — это страховка, а не опрос.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Protocol
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Канал Redis pub/sub сигналов «для контроллера создана команда».
+ACCESS_COMMAND_WAKEUP_CHANNEL = "access:commands"
+
+# Ключ в ``Session.info``: controller_id, для которых в текущей транзакции
+# созданы команды. Сбрасывается на commit (сигнал) и rollback (без сигнала).
+_PENDING_INFO_KEY = "access_command_wakeups"
+
+
+# ───────────────────────── абстракция ────────────────────────────────────────
+
+
+class CommandWaiter(Protocol):
+    """Припаркованный long-poll одного запроса ``/commands/next``."""
+
+    async def wait(self, timeout: float) -> bool: ...
+
+    def close(self) -> None: ...
+
+
+class CommandWakeup(Protocol):
+    """Хаб пробуждений ожидающих по ``controller_id``."""
+
+    def notify(self, controller_id: int) -> None: ...
+
+    def register(self, controller_id: int) -> CommandWaiter: ...
+
+
+# ───────────────────────── in-process реализация ─────────────────────────────
+
+
+class _InProcessWaiter:
+    """Ожидающий, привязанный к event loop запроса.
+
+    Создаётся внутри async-endpoint'а → захватывает его running loop. ``_wake``
+    может вызываться из ЛЮБОГО потока, поэтому ставит событие через
+    ``call_soon_threadsafe``.
+    """
+
+    def __init__(self, hub: "InProcessCommandWakeup", controller_id: int) -> None:
+        self._hub = hub
+        self.controller_id = controller_id
+        self._event = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+
+    def _wake(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            # Loop закрыт — запрос уже завершён, тихо игнорируем.
+            logger.debug("drop command wakeup for closed waiter loop")
+
+    async def wait(self, timeout: float) -> bool:
+        """Ждать сигнала не дольше ``timeout`` c. True — был сигнал (событие взведено).
+
+        Событие сбрасывается после пробуждения: сигнал, пришедший пока запрос
+        лизил команду, не потеряется — он просто разбудит следующий ``wait`` сразу.
+        """
+        if not self._event.is_set():
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout=max(timeout, 0.0))
+            except asyncio.TimeoutError:
+                return False
+        self._event.clear()
+        return True
+
+    def close(self) -> None:
+        self._hub._remove(self)
+
+
+class InProcessCommandWakeup:
+    """In-process хаб пробуждений (дефолт пилота, один процесс ``uk-access-api``)."""
+
+    def __init__(self) -> None:
+        self._waiters: dict[int, set[_InProcessWaiter]] = {}
+        self._lock = threading.Lock()
+
+    def notify(self, controller_id: int) -> None:
+        self._deliver(controller_id)
+
+    def _deliver(self, controller_id: int) -> None:
+        with self._lock:
+            waiters = list(self._waiters.get(controller_id, ()))
+        for waiter in waiters:
+            waiter._wake()
+
+    def register(self, controller_id: int) -> _InProcessWaiter:
+        waiter = _InProcessWaiter(self, controller_id)
+        with self._lock:
+            self._waiters.setdefault(controller_id, set()).add(waiter)
+        return waiter
+
+    def _remove(self, waiter: _InProcessWaiter) -> None:
+        with self._lock:
+            bucket = self._waiters.get(waiter.controller_id)
+            if bucket is None:
+                return
+            bucket.discard(waiter)
+            if not bucket:
+                del self._waiters[waiter.controller_id]
+
+    def waiting(self, controller_id: int | None = None) -> int:
+        """Число припаркованных ожидающих (всего или по контроллеру)."""
+        with self._lock:
+            if controller_id is not None:
+                return len(self._waiters.get(controller_id, ()))
+            return sum(len(b) for b in self._waiters.values())
+
+
+# ───────────────────────── Redis pub/sub реализация ──────────────────────────
+
+
+class RedisCommandWakeup(InProcessCommandWakeup):
+    """Redis-хаб для many-worker прода (``ACCESS_EVENT_BROKER=redis``).
+
+    ``notify`` — СИНХРОННЫЙ publish (вызывается из ``after_commit`` sync-сессии).
+    Локальных ожидающих будит единственный на процесс слушатель канала,
+    стартующий лениво при первой регистрации на running loop.
+    """
+
+    def __init__(self, url: str, channel: str = ACCESS_COMMAND_WAKEUP_CHANNEL) -> None:
+        import redis
+
+        super().__init__()
+        self._url = url
+        self._channel = channel
+        self._sync_client = redis.Redis.from_url(url)
+        self._listener: asyncio.Task | None = None
+
+    def notify(self, controller_id: int) -> None:
+        try:
+            self._sync_client.publish(self._channel, str(controller_id))
+        except Exception:  # noqa: BLE001 — сигнал best-effort, страхует recheck
+            logger.exception("redis command wakeup publish failed (waiters will recheck)")
+            # Свой процесс будим напрямую: здесь ожидающий мог и быть.
+            self._deliver(controller_id)
+
+    def register(self, controller_id: int) -> _InProcessWaiter:
+        loop = asyncio.get_running_loop()
+        listener = self._listener
+        if listener is None or listener.done() or listener.get_loop() is not loop:
+            self._listener = loop.create_task(self._listen())
+        return super().register(controller_id)
+
+    async def _listen(self) -> None:
+        import redis.asyncio as aioredis
+
+        while True:
+            client = aioredis.from_url(self._url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self._channel)
+                while True:
+                    raw = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=None
+                    )
+                    if raw is None or raw.get("type") != "message":
+                        continue
+                    try:
+                        self._deliver(int(raw["data"]))
+                    except (TypeError, ValueError):
+                        logger.warning("malformed command wakeup message dropped")
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001 — переподключиться, recheck страхует
+                logger.exception("redis command wakeup listener failed, reconnecting")
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:  # noqa: BLE001
+                    pass
+
+
+# ───────────────────────── singleton/фабрика ─────────────────────────────────
+
+_wakeup: CommandWakeup | None = None
+_wakeup_lock = threading.Lock()
+
+
+def _build() -> CommandWakeup:
+    import os
+
+    kind = os.getenv("ACCESS_EVENT_BROKER", "memory").strip().lower()
+    if kind == "redis":
+        from uk_management_bot.config.settings import settings
+
+        url = settings.REDIS_PUBSUB_URL_RESOLVED
+        logger.info("command wakeup: redis (%s)", url)
+        return RedisCommandWakeup(url)
+    logger.info("command wakeup: in-process (single-worker pilot)")
+    return InProcessCommandWakeup()
+
+
+def get_command_wakeup() -> CommandWakeup:
+    """Процессный singleton хаба (double-checked locking), как у брокера событий."""
+    global _wakeup
+    if _wakeup is None:
+        with _wakeup_lock:
+            if _wakeup is None:
+                _wakeup = _build()
+    return _wakeup
+
+
+def set_command_wakeup(wakeup: CommandWakeup | None) -> None:
+    """Подменить singleton хаба (для тестов/DI)."""
+    global _wakeup
+    with _wakeup_lock:
+        _wakeup = wakeup
+
+
+def reset_command_wakeup() -> None:
+    """Чистый in-process хаб без ожидающих (тесты)."""
+    set_command_wakeup(InProcessCommandWakeup())
+
+
+# ───────────────────────── транзакционная доставка ───────────────────────────
+
+
+def mark_command_created(db: Session, controller_id: int) -> None:
+    """Отметить: в транзакции ``db`` создана команда для ``controller_id``.
+
+    Сигнал уйдёт только после commit этой сессии (см. ``_signal_after_commit``).
+    """
+    db.info.setdefault(_PENDING_INFO_KEY, set()).add(controller_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _signal_after_commit(session: Session) -> None:
+    controller_ids = session.info.pop(_PENDING_INFO_KEY, None)
+    if not controller_ids:
+        return
+    try:
+        wakeup = get_command_wakeup()
+        for controller_id in controller_ids:
+            wakeup.notify(controller_id)
+    except Exception:  # noqa: BLE001 — команда уже зафиксирована, recheck страхует
+        logger.exception("command wakeup failed (command committed, waiters will recheck)")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_INFO_KEY, None)
@@ -49,6 +49,7 @@ from access_control.repositories import (
     passes_repo,
     presence_repo,
 )
+from access_control.services.command_wakeup import mark_command_created
 from access_control.services.decision_engine import (
     DEFAULT_CONFIDENCE_THRESHOLD,
     AnprDecisionInput,
@@ -395,6 +396,8 @@ def _create_command(
         decision_id=decision_id,
         ttl_seconds=command_ttl_seconds,
     )
+    if row.created:
+        mark_command_created(db, data.controller_id)
     return CommandOut(
         command_id=row.command_id, barrier_id=row.barrier_id, expires_at=row.expires_at
     )
@@ -33,6 +33,7 @@ from access_control.repositories import (
     equipment_repo,
     manual_openings_repo,
 )
+from access_control.services.command_wakeup import mark_command_created
 from access_control.services.event_broadcaster import AccessEventMessage, get_broker
 from access_control.services.locks import (
     advisory_xact_lock,
@@ -212,6 +213,8 @@ def _create_command(
         decision_id=decision_id,
         ttl_seconds=ttl_seconds,
     )
+    if row.created:
+        mark_command_created(db, controller_id)
     return _CommandRef(row.command_id, row.barrier_id, row.expires_at)
 
 
@@ -41,6 +41,7 @@ from access_control.domain.passes import (
 )
 from access_control.domain.vehicles import Vehicle, VehicleApartment
 from access_control.services.hashchain import next_hash
+from access_control.services import plate_index
 from access_control.services.normalization import normalize_plate
 from access_control.services.resident_notify import (
     KIND_VEHICLE_REQUEST_RESOLVED,
@@ -367,6 +368,7 @@ def create_vehicle(
     )
     db.commit()
     db.refresh(vehicle)
+    plate_index.note_vehicle(vehicle)
     return vehicle
 
 
@@ -411,6 +413,7 @@ def set_vehicle_status(
     )
     db.commit()
     db.refresh(vehicle)
+    plate_index.note_vehicle(vehicle)
     return vehicle
 
 
@@ -552,6 +555,7 @@ def update_vehicle(
     )
     db.commit()
     db.refresh(vehicle)
+    plate_index.note_vehicle(vehicle)
     return vehicle
 
 
@@ -781,6 +785,8 @@ def review_request(
     )
     db.commit()
     final_status = req.status
+    if action == "approve":
+        plate_index.note_vehicle(vehicle)
 
     # Резидентское уведомление автору заявки (§16.2): ПОСЛЕ commit, best-effort —
     # сбой публикации не влияет на уже зафиксированное рассмотрение. PD-safe (§11):
@@ -5,7 +5,9 @@
 * ``ingestion`` — полный приём ANPR-события backend'ом (приём→решение→запись);
 * ``decision`` — чистый прогон Decision Engine (§7 шаги 4–8);
 * ``db``       — запись транзакции (commit round-trip к PostgreSQL);
-* ``relay``    — физическое открытие реле (edge-сторона, §9.2).
+* ``relay``    — физическое открытие реле (edge-сторона, §9.2);
+* ``command_pickup`` — от создания команды до её lease edge'ом (§9.2): вместе
+  с ``relay`` даёт задержку «решение → реле».
 
 Бюджеты §10.2 (локальная сеть пилота):
 
@@ -34,6 +36,7 @@ from dataclasses import dataclass
 from prometheus_client import CONTENT_TYPE_LATEST  # noqa: F401  (реэкспорт для роутера)
 from prometheus_client import (
     CollectorRegistry,
+    Counter,
     Gauge,
     Histogram,
     generate_latest,
@@ -51,7 +54,10 @@ PHASE_INGESTION = "ingestion"
 PHASE_DECISION = "decision"
 PHASE_DB = "db"
 PHASE_RELAY = "relay"
-_PHASES = (PHASE_INGESTION, PHASE_DECISION, PHASE_DB, PHASE_RELAY)
+PHASE_COMMAND_PICKUP = "command_pickup"
+_PHASES = (
+    PHASE_INGESTION, PHASE_DECISION, PHASE_DB, PHASE_RELAY, PHASE_COMMAND_PICKUP,
+)
 
 # Бакеты prometheus-гистограмм в СЕКУНДАХ (конвенция prometheus): покрывают
 # суб-миллисекунды… секунды, с границами на бюджетах 0.5/1.0/1.5 c.
@@ -95,6 +101,64 @@ _QUEUE_DEAD_GAUGE = Gauge(
     labelnames=("controller_id",),
     registry=REGISTRY,
 )
+# Припаркованные long-poll'ы /commands/next: ни поток, ни DB-сессию не держат —
+# раньше это число было «занятые потоки threadpool + соединения пула».
+_LONGPOLL_WAITERS_GAUGE = Gauge(
+    "access_command_longpoll_waiters",
+    "Число ожидающих long-poll /commands/next (§9.2).",
+    registry=REGISTRY,
+)
+# Review-expiry worker (§9.5): длительность тика, просроченный хвост на начало
+# тика и число переведённых в expired.
+_REVIEW_EXPIRY_TICK_HISTOGRAM = Histogram(
+    "access_review_expiry_tick_seconds",
+    "Длительность тика review-expiry (§9.5).",
+    buckets=_LATENCY_BUCKETS_SECONDS,
+    registry=REGISTRY,
+)
+_REVIEW_EXPIRY_BACKLOG_GAUGE = Gauge(
+    "access_review_expiry_backlog",
+    "Просроченные текущие pending_review на начало тика (§9.5).",
+    registry=REGISTRY,
+)
+_REVIEW_EXPIRED_COUNTER = Counter(
+    "access_review_expired_total",
+    "Решения, переведённые review-expiry в expired (§9.5).",
+    registry=REGISTRY,
+)
+# Retention фото (§11): пропускная способность (события/объекты за чанк),
+# сбои удаления и отставание от срока хранения.
+_PHOTO_RETENTION_CHUNK_HISTOGRAM = Histogram(
+    "access_photo_retention_chunk_seconds",
+    "Длительность чанка retention фото (§11).",
+    buckets=_LATENCY_BUCKETS_SECONDS,
+    registry=REGISTRY,
+)
+_PHOTO_RETENTION_EVENTS_COUNTER = Counter(
+    "access_photo_retention_events_total",
+    "События, у которых retention обнулил ссылки на фото (§11).",
+    registry=REGISTRY,
+)
+_PHOTO_RETENTION_OBJECTS_COUNTER = Counter(
+    "access_photo_retention_objects_deleted_total",
+    "Объекты фото, удалённые retention в storage (§11).",
+    registry=REGISTRY,
+)
+_PHOTO_RETENTION_FAILED_CHUNKS_COUNTER = Counter(
+    "access_photo_retention_failed_chunks_total",
+    "Чанки retention, остановленные сбоем удаления объекта (§11).",
+    registry=REGISTRY,
+)
+_PHOTO_RETENTION_PARKED_COUNTER = Counter(
+    "access_photo_retention_parked_events_total",
+    "События, пропущенные retention после исчерпания попыток удаления фото (§11).",
+    registry=REGISTRY,
+)
+_PHOTO_RETENTION_LAG_GAUGE = Gauge(
+    "access_photo_retention_lag_seconds",
+    "Насколько самое старое необработанное фото старше срока хранения (§11).",
+    registry=REGISTRY,
+)
 
 
 def _percentile(sorted_samples: list[float], q: float) -> float:
@@ -204,6 +268,50 @@ def observe_relay(duration_ms: float) -> None:
     observe(PHASE_RELAY, duration_ms)
 
 
+def observe_command_pickup(duration_ms: float) -> None:
+    observe(PHASE_COMMAND_PICKUP, duration_ms)
+
+
+@contextmanager
+def track_longpoll_waiter():
+    """Учесть припаркованный long-poll в gauge на время блока."""
+    _LONGPOLL_WAITERS_GAUGE.inc()
+    try:
+        yield
+    finally:
+        _LONGPOLL_WAITERS_GAUGE.dec()
+
+
+def observe_review_expiry_tick(*, duration_seconds: float, backlog: int, expired: int) -> None:
+    """Зафиксировать тик review-expiry: длительность, хвост, переведённые (§9.5)."""
+    _REVIEW_EXPIRY_TICK_HISTOGRAM.observe(duration_seconds)
+    _REVIEW_EXPIRY_BACKLOG_GAUGE.set(backlog)
+    if expired:
+        _REVIEW_EXPIRED_COUNTER.inc(expired)
+
+
+def observe_photo_retention_chunk(
+    *,
+    duration_seconds: float,
+    events: int,
+    objects_deleted: int,
+    failed: bool,
+    parked: int = 0,
+) -> None:
+    """Зафиксировать чанк retention фото: длительность, события, объекты, сбой (§11)."""
+    _PHOTO_RETENTION_CHUNK_HISTOGRAM.observe(duration_seconds)
+    _PHOTO_RETENTION_EVENTS_COUNTER.inc(events)
+    _PHOTO_RETENTION_OBJECTS_COUNTER.inc(objects_deleted)
+    _PHOTO_RETENTION_PARKED_COUNTER.inc(parked)
+    if failed:
+        _PHOTO_RETENTION_FAILED_CHUNKS_COUNTER.inc()
+
+
+def set_photo_retention_lag(seconds: float) -> None:
+    """Отставание retention фото от срока хранения, c (0 — догнали) (§11)."""
+    _PHOTO_RETENTION_LAG_GAUGE.set(max(0.0, seconds))
+
+
 @contextmanager
 def measure(phase: str):
     """Контекст-таймер: записывает длительность блока (мс) в указанную фазу.
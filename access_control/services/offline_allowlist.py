@@ -0,0 +1,139 @@
+"""Разрешающий список постоянных авто для grant-capable offline-snapshot (§8.1–8.2).
+
+В ``cached_permanent_only`` edge при потере связи пропускает ТОЛЬКО постоянные
+авто из подписанного zone-specific snapshot. В список попадает ровно то, что
+backend разрешил бы веткой ``permanent_vehicle_allowed`` (§7 шаг 6): активный
+vehicle + активное ``access_rule`` зоны (vehicle-scoped или через активную связь
+авто↔квартира) c направлениями правила. Зоно-типные ветки assigned/shared
+(занятость мест, лимиты на квартиру) offline не кэшируются — им нужен backend.
+
+Консервативность: правило и связь должны действовать на ВСЁ время жизни
+snapshot (``[now, now + SNAPSHOT_TTL_SECONDS]``) — истекающее в этом окне
+разрешение в список не попадает. Offline запрещено всё прочее (§8.2): пропуска,
+коды, лимиты, новые разрешения после snapshot.
+
+``AllowlistHistory`` держит несколько последних версий списка по зоне в памяти
+процесса, чтобы отдавать edge дельту от его версии. Версии нет в истории
+(рестарт, другой воркер, слишком старая) → edge получает полный список.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from access_control.domain.enums import Direction, VehicleApartmentStatus, VehicleStatus
+from access_control.services.snapshot_signing import (
+    SNAPSHOT_TTL_SECONDS,
+    allowlist_digest,
+    normalize_allowlist,
+    plate_hash,
+    plate_hash_key,
+)
+
+# Сколько последних версий allowlist хранить на зону для выдачи дельт.
+ALLOWLIST_HISTORY_VERSIONS = int(os.getenv("ACCESS_ALLOWLIST_HISTORY_VERSIONS", "4"))
+
+# Две ветки правила (§7 шаг 6), как в ``decision_engine._zone_rule_matches``:
+# vehicle-scoped правило действует и без связей; apartment-scoped — через
+# активную связь авто↔квартира. UNION ALL вместо OR в JOIN — каждая ветка идёт
+# по своему индексу (access_rules.vehicle_id / vehicle_apartments.apartment_id).
+_ALLOWLIST_SQL = text(
+    """
+    SELECT v.plate_number_normalized AS plate, r.allowed_directions AS directions
+    FROM access_rules r
+    JOIN vehicles v ON v.id = r.vehicle_id
+    WHERE r.zone_id = :zone_id AND r.is_active
+      AND (r.valid_from IS NULL OR r.valid_from <= :now)
+      AND (r.valid_until IS NULL OR r.valid_until >= :horizon)
+      AND v.status = :vehicle_active
+    UNION ALL
+    SELECT v.plate_number_normalized AS plate, r.allowed_directions AS directions
+    FROM access_rules r
+    JOIN vehicle_apartments va ON va.apartment_id = r.apartment_id
+    JOIN vehicles v ON v.id = va.vehicle_id
+    WHERE r.zone_id = :zone_id AND r.is_active AND r.apartment_id IS NOT NULL
+      AND (r.valid_from IS NULL OR r.valid_from <= :now)
+      AND (r.valid_until IS NULL OR r.valid_until >= :horizon)
+      AND va.status = :link_active
+      AND (va.valid_from IS NULL OR va.valid_from <= :now)
+      AND (va.valid_until IS NULL OR va.valid_until >= :horizon)
+      AND v.status = :vehicle_active
+    """
+)
+
+_ALL_DIRECTIONS = tuple(d.value for d in Direction)
+
+
+def _directions(raw) -> tuple[str, ...]:
+    """Направления правила: NULL/пусто — любые (как в decision_engine)."""
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+    if not raw:
+        return _ALL_DIRECTIONS
+    return tuple(d for d in raw if d in _ALL_DIRECTIONS)
+
+
+def load_zone_allowlist(
+    db: Session,
+    zone_id: int,
+    *,
+    now: dt.datetime,
+    horizon_seconds: int = SNAPSHOT_TTL_SECONDS,
+) -> dict[str, list[str]]:
+    """Allowlist зоны: направление → отсортированные хэши номеров (§8.2)."""
+    rows = db.execute(
+        _ALLOWLIST_SQL,
+        {
+            "zone_id": zone_id,
+            "now": now,
+            "horizon": now + dt.timedelta(seconds=horizon_seconds),
+            "vehicle_active": VehicleStatus.ACTIVE.value,
+            "link_active": VehicleApartmentStatus.ACTIVE.value,
+        },
+    ).all()
+    key = plate_hash_key()
+    allowlist: dict[str, set[str]] = {}
+    for plate, raw_directions in rows:
+        hashed = plate_hash(plate, key)
+        for direction in _directions(raw_directions):
+            allowlist.setdefault(direction, set()).add(hashed)
+    return normalize_allowlist(allowlist)
+
+
+class AllowlistHistory:
+    """Последние версии allowlist по зонам (in-process LRU) — база для дельт."""
+
+    def __init__(self, max_versions: int = ALLOWLIST_HISTORY_VERSIONS) -> None:
+        self._max = max(1, max_versions)
+        self._zones: dict[int, OrderedDict[str, dict[str, list[str]]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, zone_id: int, allowlist: dict[str, list[str]]) -> str:
+        """Запомнить версию allowlist зоны; вернуть её ``allowlist_version``."""
+        version = allowlist_digest(allowlist)
+        with self._lock:
+            versions = self._zones.setdefault(zone_id, OrderedDict())
+            versions[version] = allowlist
+            versions.move_to_end(version)
+            while len(versions) > self._max:
+                versions.popitem(last=False)
+        return version
+
+    def get(self, zone_id: int, version: str) -> dict[str, list[str]] | None:
+        """Allowlist зоны указанной версии или None (нет в истории → полный список)."""
+        with self._lock:
+            return self._zones.get(zone_id, {}).get(version)
+
+
+_history = AllowlistHistory()
+
+
+def allowlist_history() -> AllowlistHistory:
+    """Процессная история версий allowlist (одна на воркер API)."""
+    return _history
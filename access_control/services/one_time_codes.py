@@ -36,6 +36,7 @@ from access_control.repositories import (
     equipment_repo,
     manual_openings_repo,
 )
+from access_control.services.command_wakeup import mark_command_created
 from access_control.services.locks import barrier_advisory_lock
 # AUD6-P2-41: канон вместо локальной копии (15 идентичных def _utcnow по
 # репо — ровно тот класс дрейфа, что уже стрелял tz-багами, AUD5-CODE-3).
@@ -243,6 +244,7 @@ def redeem_code(
         decision_id=None,
         ttl_seconds=GUEST_CODE_COMMAND_TTL_SECONDS,
     )
+    mark_command_created(db, controller_id)
     # Append-only manual_opening: оператор + ссылка на команду; источник — guest_code.
     manual_openings_repo.insert(
         db,
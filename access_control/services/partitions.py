@@ -0,0 +1,257 @@
+"""Месячные партиции ``access_events`` и retention через DROP партиции (§9.7, §11).
+
+Журнал проезда — RANGE-партиции по ``occurred_at`` (миграция 018):
+``access_events_pYYYYMM`` (UTC-месяц), ``access_events_legacy`` (всё, что было до
+партиционирования) и ``access_events_default`` (страховка от INSERT вне
+созданных месяцев).
+
+* ``ensure_partitions`` — держит созданными текущий и ``months_ahead`` будущих
+  месяцев. Зовёт retention worker раз в сутки под runtime-ролью: сама DDL — в
+  SECURITY DEFINER-функции ``access_control_ensure_partitions`` (миграция 018),
+  прав на CREATE у ``access_app_rw`` нет.
+* ``drop_expired_partitions`` — retention 12 мес (§11): партиция, чья верхняя
+  граница старше срока, отсоединяется и удаляется целиком. DELETE по
+  append-only таблице запрещён триггером §9.7, а DROP партиции — операция
+  владельца таблицы, поэтому запускается только ops-CLI
+  ``scripts/access_partitions.py`` под owner-ролью, не из API.
+
+Удаление звеньев рвёт hash-chain: первая оставшаяся строка после удалённых
+ссылается ``prev_hash`` на строку, которой больше нет. Перед DROP такие
+``row_hash`` («якоря») записываются в append-only audit
+(``access.partition_dropped``), и ``hashchain.verify_chain`` принимает разрыв,
+только если ``prev_hash`` строки — записанный якорь.
+
+На не-postgres (sqlite CI/dev) партиций нет — функции no-op.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import os
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from access_control.repositories import audit_repo
+from uk_management_bot.utils.datetime_utils import utc_now as _utcnow
+
+logger = logging.getLogger(__name__)
+
+# Сколько будущих месяцев держать созданными заранее (дефолт миграции 018).
+PARTITION_MONTHS_AHEAD = int(os.getenv("ACCESS_PARTITION_MONTHS_AHEAD", "3"))
+
+# §11: журнал проезда хранится 12 месяцев.
+ACCESS_EVENTS_RETENTION_DAYS = 365
+
+PARTITION_DROPPED_ACTION = "access.partition_dropped"
+
+# Партиционированные таблицы домена. Имена интерполируются в DDL — только отсюда.
+_PARTITIONED = frozenset({"access_events"})
+
+_LIST_SQL = text(
+    """
+    SELECT c.relname AS name,
+           pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT' AS is_default,
+           substring(pg_get_expr(c.relpartbound, c.oid)
+                     FROM 'FROM \\(''([^'']+)''\\)')::timestamptz AS lower_bound,
+           substring(pg_get_expr(c.relpartbound, c.oid)
+                     FROM 'TO \\(''([^'']+)''\\)')::timestamptz AS upper_bound
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = to_regclass(:parent)
+    ORDER BY upper_bound NULLS LAST, c.relname
+    """
+)
+
+_ANCHORS_SQL = text(
+    """
+    SELECT details FROM access_audit_logs
+    WHERE action = :action
+    ORDER BY id
+    """
+)
+
+
+@dataclass(frozen=True)
+class Partition:
+    """Партиция: границы ``[lower, upper)``; ``lower=None`` — MINVALUE (legacy)."""
+
+    name: str
+    lower: dt.datetime | None
+    upper: dt.datetime | None
+    is_default: bool
+
+
+@dataclass(frozen=True)
+class DroppedPartition:
+    """Итог DROP одной партиции (то же уходит в ``details`` audit-строки)."""
+
+    name: str
+    upper: dt.datetime
+    rows: int
+    anchors: list[str]
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _check_table(table: str) -> None:
+    if table not in _PARTITIONED:
+        raise ValueError(f"таблица {table!r} не партиционирована")
+
+
+def ensure_partitions(db: Session, months_ahead: int = PARTITION_MONTHS_AHEAD) -> int:
+    """Создать недостающие месячные партиции до ``months_ahead`` вперёд; вернуть число новых.
+
+    Идемпотентно: существующие месяцы пропускаются. Коммитит сам (DDL).
+    """
+    if not _is_postgres(db):
+        return 0
+    created = db.execute(
+        text("SELECT access_control_ensure_partitions(:m)"), {"m": months_ahead}
+    ).scalar_one()
+    db.commit()
+    if created:
+        logger.info("access_events: создано месячных партиций: %d", created)
+    return int(created)
+
+
+def list_partitions(db: Session, table: str = "access_events") -> list[Partition]:
+    """Партиции таблицы по возрастанию верхней границы (default — последней)."""
+    _check_table(table)
+    if not _is_postgres(db):
+        return []
+    return [
+        Partition(
+            name=row.name,
+            lower=row.lower_bound,
+            upper=row.upper_bound,
+            is_default=row.is_default,
+        )
+        for row in db.execute(_LIST_SQL, {"parent": f"public.{table}"})
+    ]
+
+
+def expired_partitions(
+    db: Session,
+    table: str = "access_events",
+    *,
+    retention_days: int = ACCESS_EVENTS_RETENTION_DAYS,
+    now: dt.datetime | None = None,
+) -> list[Partition]:
+    """Партиции, целиком вышедшие за срок хранения (``upper <= now - retention``).
+
+    Default-партиция не удаляется никогда: её диапазон не ограничен.
+    """
+    cutoff = (now or _utcnow()) - dt.timedelta(days=retention_days)
+    return [
+        p
+        for p in list_partitions(db, table)
+        if not p.is_default and p.upper is not None and p.upper <= cutoff
+    ]
+
+
+def _chain_anchors(db: Session, table: str, partition: str) -> tuple[int, list[str]]:
+    """``(rows, anchors)`` партиции: число строк и ``row_hash`` её строк, на которые
+    ссылается ``prev_hash`` следующая по ``id`` строка ВНЕ партиции.
+
+    Цепочка идёт по ``id`` через все партиции (поздний edge_offline-проезд
+    ложится в старый месяц с новым ``id``), поэтому соседи ищутся окном по
+    диапазону ``id`` партиции, а не по её границам во времени.
+    """
+    bounds = db.execute(
+        text(f"SELECT count(*), min(id), max(id) FROM {partition}")  # noqa: S608
+    ).one()
+    rows, min_id, max_id = int(bounds[0]), bounds[1], bounds[2]
+    if not rows:
+        return 0, []
+    anchors = db.execute(
+        text(
+            f"""
+            WITH chain AS (
+                SELECT row_hash,
+                       tableoid = CAST(:part AS regclass) AS dropped,
+                       lead(tableoid = CAST(:part AS regclass)) OVER w AS next_dropped,
+                       lead(id) OVER w AS next_id
+                FROM {table}
+                WHERE id BETWEEN :lo AND COALESCE(
+                    (SELECT min(id) FROM {table} WHERE id > :hi), :hi)
+                WINDOW w AS (ORDER BY id)
+            )
+            SELECT row_hash FROM chain
+            WHERE dropped AND next_id IS NOT NULL AND NOT next_dropped
+              AND row_hash IS NOT NULL
+            """  # noqa: S608 — table/partition из _PARTITIONED/pg_inherits
+        ),
+        {"part": f"public.{partition}", "lo": min_id, "hi": max_id},
+    ).scalars().all()
+    return rows, list(anchors)
+
+
+def drop_expired_partitions(
+    db: Session,
+    table: str = "access_events",
+    *,
+    retention_days: int = ACCESS_EVENTS_RETENTION_DAYS,
+    now: dt.datetime | None = None,
+    dry_run: bool = False,
+) -> list[DroppedPartition]:
+    """Retention §11: DETACH + DROP партиций старше срока, по одной на транзакцию.
+
+    На каждую партицию — audit-строка ``access.partition_dropped`` с якорями
+    hash-chain в той же транзакции, что и DROP: либо удалено и записано, либо
+    ничего. ``dry_run`` — только посчитать (строки, якоря), ничего не меняя.
+    Требует прав владельца таблицы (ops-CLI, не runtime-роль).
+    """
+    _check_table(table)
+    dropped: list[DroppedPartition] = []
+    for partition in expired_partitions(
+        db, table, retention_days=retention_days, now=now
+    ):
+        db.execute(text(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE"))
+        rows, anchors = _chain_anchors(db, table, partition.name)
+        result = DroppedPartition(
+            name=partition.name, upper=partition.upper, rows=rows, anchors=anchors
+        )
+        if dry_run:
+            db.rollback()
+            dropped.append(result)
+            continue
+        audit_repo.insert(
+            db,
+            actor_user_id=None,
+            action=PARTITION_DROPPED_ACTION,
+            entity_type="partition",
+            entity_id=None,
+            barrier_id=None,
+            source="partition_retention",
+            reason=f"retention {retention_days}d",
+            extra_details={
+                "table": table,
+                "partition": partition.name,
+                "upper": partition.upper.isoformat(),
+                "rows": rows,
+                "anchors": anchors,
+            },
+        )
+        db.flush()
+        db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name}"))
+        db.execute(text(f"DROP TABLE {partition.name}"))
+        db.commit()
+        logger.info(
+            "%s: партиция %s удалена (строк %d, якорей %d)",
+            table, partition.name, rows, len(anchors),
+        )
+        dropped.append(result)
+    return dropped
+
+
+def partition_drop_anchors(db: Session, table: str = "access_events") -> frozenset[str]:
+    """Все якоря hash-chain ``table``, записанные при DROP партиций (для verify_chain)."""
+    anchors: set[str] = set()
+    for (details,) in db.execute(_ANCHORS_SQL, {"action": PARTITION_DROPPED_ACTION}):
+        if details and details.get("table") == table:
+            anchors.update(details.get("anchors") or ())
+    return frozenset(anchors)
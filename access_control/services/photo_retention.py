@@ -1,24 +1,161 @@
-"""Retention фото событий (§11): отбор и анонимизация ссылок старше срока.
+"""Retention фото событий (§11): удаление объектов и анонимизация ссылок старше срока.
 
 Базовая техническая политика §11: «Фото номера и автомобиля — 30 дней». Механизм
-обнуляет ``plate_photo_url``/``overview_photo_url`` у старых ``camera_events`` —
-ссылок на приватный storage. ``camera_events`` — сырой слой, НЕ append-only (§9.7
+удаляет сами объекты в storage и обнуляет ``plate_photo_url``/``overview_photo_url``
+у старых ``camera_events``. ``camera_events`` — сырой слой, НЕ append-only (§9.7
 hash-chain только на бизнес-журнале/аудите), поэтому UPDATE разрешён DB grants.
 
-ПРОД-ДОЛГ (инфра, вне модели): фактическое необратимое удаление байтов в приватном
-object-storage (S3/MinIO) по тем же кандидатам + регулярный запуск (cron/worker) +
-legal hold. Здесь — только обнуление ссылок (анонимизация записи события).
+Обход — keyset-чанками по ``(captured_at, id)`` (индекс
+``ix_camera_events_captured_at_id``) от watermark'а в ``access_retention_watermarks``.
+Чанк читается без блокировок, объекты чанка удаляются параллельно (не больше
+``PHOTO_DELETE_CONCURRENCY`` одновременно) ВНЕ транзакции — сетевые задержки
+storage не держат ни транзакцию, ни row-lock. Затем короткая транзакция берёт
+строку watermark'а ``FOR UPDATE``, одним UPDATE обнуляет ссылки и двигает
+watermark. Если за время удалений watermark сдвинул другой воркер API, чанк
+просто отдаётся ему (удаление идемпотентно). Прерванный прогон (рестарт, сбой
+storage) продолжается с места остановки.
+
+Сбой удаления объекта останавливает прогон на этом событии: ссылка не
+обнуляется, watermark не уходит дальше — следующий тик повторит удаление (уже
+удалённые объекты storage отдаёт как отсутствующие, это не ошибка). Попытки
+считаются на строке watermark'а (``blocked_event_id``/``blocked_attempts``);
+после ``PHOTO_DELETE_MAX_ATTEMPTS`` тиков подряд событие паркуется — ссылки
+остаются (их покажет ``select_expired_photo_event_ids``), а обход идёт дальше,
+иначе один вечно падающий объект остановил бы retention всей таблицы. Ссылки,
+не принадлежащие storage (не ``media://``), только обнуляются — как раньше.
+
+Watermark не возвращается назад: событие, дописанное задним числом с
+``captured_at`` ниже watermark'а (например, очень поздняя offline-синхронизация),
+этот обход не увидит — для разовой дочистки есть ``select_expired_photo_event_ids``.
 """
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
 
 from sqlalchemy import bindparam, text
 from sqlalchemy.orm import Session
 
+from access_control.services import metrics
+
+logger = logging.getLogger(__name__)
+
 # Срок хранения фото по умолчанию (§11), дней.
 PHOTO_RETENTION_DAYS = 30
 
+# Событий в одном чанке (= строк в одном UPDATE и одной транзакции).
+PHOTO_RETENTION_CHUNK_SIZE = int(os.getenv("ACCESS_PHOTO_RETENTION_CHUNK_SIZE", "500"))
+
+# Одновременных удалений объектов в storage.
+PHOTO_DELETE_CONCURRENCY = int(os.getenv("ACCESS_PHOTO_DELETE_CONCURRENCY", "8"))
+
+# Тиков подряд со сбоем удаления, после которых событие паркуется.
+PHOTO_DELETE_MAX_ATTEMPTS = int(os.getenv("ACCESS_PHOTO_DELETE_MAX_ATTEMPTS", "5"))
+
+# Ключ задачи в ``access_retention_watermarks``.
+PHOTO_RETENTION_JOB = "camera_event_photos"
+
+# Начальный watermark: раньше любого события.
+_EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+
+_MEDIA_PREFIX = "media://"
+_FILE_PREFIX = "file://"
+
+
+# ───────────────────────── storage ───────────────────────────────────────────
+
+
+class PhotoStorage(Protocol):
+    """Хранилище объектов фото, на которые ссылаются ``camera_events``."""
+
+    def owns(self, ref: str) -> bool:
+        """Ссылка указывает на объект этого storage (его надо удалять)."""
+        ...
+
+    async def delete(self, ref: str) -> None:
+        """Удалить объект. Отсутствующий объект — не ошибка (повтор после сбоя)."""
+        ...
+
+    async def aclose(self) -> None:
+        """Освободить ресурсы после пачки удалений."""
+        ...
+
+
+class MediaServicePhotoStorage:
+    """Объекты ``media://{media_id}`` в медиа-сервисе (прод, см. ``api/edge``)."""
+
+    def __init__(self, media) -> None:
+        self._media = media
+        self._http = None
+
+    def owns(self, ref: str) -> bool:
+        return ref.startswith(_MEDIA_PREFIX)
+
+    async def delete(self, ref: str) -> None:
+        # Один httpx-клиент на пачку: соединения переиспользуются между удалениями.
+        if self._http is None:
+            self._http = self._media.http_client()
+        await self._media.delete_file(ref[len(_MEDIA_PREFIX):], client=self._http)
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            http, self._http = self._http, None
+            await http.aclose()
+
+
+class LocalPhotoStorage:
+    """Объекты ``file://{путь}`` под корнем на локальной ФС (dev/тесты)."""
+
+    def __init__(self, root: str | os.PathLike) -> None:
+        self._root = Path(root).resolve()
+
+    def owns(self, ref: str) -> bool:
+        return ref.startswith(_FILE_PREFIX)
+
+    def path_for(self, ref: str) -> Path:
+        path = (self._root / ref[len(_FILE_PREFIX):]).resolve()
+        if not path.is_relative_to(self._root):
+            raise ValueError("ссылка на фото указывает вне корня storage")
+        return path
+
+    async def delete(self, ref: str) -> None:
+        await asyncio.to_thread(self.path_for(ref).unlink, missing_ok=True)
+
+    async def aclose(self) -> None:
+        return None
+
+
+_storage: PhotoStorage | None = None
+
+
+def get_photo_storage() -> PhotoStorage:
+    """Процессный storage фото: ``ACCESS_PHOTO_STORAGE_ROOT`` → локальная ФС, иначе медиа-сервис."""
+    global _storage
+    if _storage is None:
+        root = os.getenv("ACCESS_PHOTO_STORAGE_ROOT")
+        if root:
+            _storage = LocalPhotoStorage(root)
+        else:
+            from access_control.integrations.media import get_access_media_client
+
+            _storage = MediaServicePhotoStorage(get_access_media_client())
+    return _storage
+
+
+def set_photo_storage(storage: PhotoStorage | None) -> None:
+    """Подменить storage фото (тесты/DI); None — вернуть выбор по окружению."""
+    global _storage
+    _storage = storage
+
+
+# ───────────────────────── отбор ─────────────────────────────────────────────
+
 
 def _cutoff(older_than_days: int, now: dt.datetime | None) -> dt.datetime:
     base = now or dt.datetime.now(dt.timezone.utc)
@@ -34,7 +171,8 @@ def select_expired_photo_event_ids(
     """ID ``camera_events`` старше срока, у которых ещё есть ссылка(и) на фото (§11).
 
     Кандидаты ретеншна: ``captured_at < now - older_than_days`` И хотя бы одна из
-    ``*_photo_url`` непуста. Чистые/свежие события не возвращаются.
+    ``*_photo_url`` непуста. Чистые/свежие события не возвращаются. Полный скан
+    без watermark'а — для разовой проверки/дочистки, не для штатного прогона.
     """
     cutoff = _cutoff(older_than_days, now)
     rows = db.execute(
@@ -49,26 +187,226 @@ def select_expired_photo_event_ids(
     return list(rows)
 
 
+_ENSURE_WATERMARK_SQL = text(
+    "INSERT INTO access_retention_watermarks (job, captured_at, camera_event_id) "
+    "VALUES (:job, :epoch, 0) ON CONFLICT (job) DO NOTHING"
+)
+
+_READ_WATERMARK_SQL = text(
+    "SELECT captured_at, camera_event_id FROM access_retention_watermarks WHERE job = :job"
+)
+
+# Строка watermark'а под FOR UPDATE — продвижение разных воркеров идёт по очереди.
+_LOCK_WATERMARK_SQL = text(
+    "SELECT captured_at, camera_event_id, blocked_event_id, blocked_attempts "
+    "FROM access_retention_watermarks WHERE job = :job FOR UPDATE"
+)
+
+_CHUNK_SQL = text(
+    "SELECT id, captured_at, plate_photo_url, overview_photo_url "
+    "FROM camera_events "
+    "WHERE (captured_at, id) > (:wm_at, :wm_id) AND captured_at < :cutoff "
+    "  AND (plate_photo_url IS NOT NULL OR overview_photo_url IS NOT NULL) "
+    "ORDER BY captured_at, id "
+    "LIMIT :limit"
+)
+
+_NULL_LINKS_SQL = text(
+    "UPDATE camera_events SET plate_photo_url = NULL, overview_photo_url = NULL "
+    "WHERE id IN :ids"
+).bindparams(bindparam("ids", expanding=True))
+
+_ADVANCE_WATERMARK_SQL = text(
+    "UPDATE access_retention_watermarks "
+    "SET captured_at = :at, camera_event_id = :id, "
+    "    blocked_event_id = :blocked_id, blocked_attempts = :attempts, updated_at = now() "
+    "WHERE job = :job"
+)
+
+# Самое старое ещё не обработанное просроченное событие — для метрики отставания.
+_OLDEST_PENDING_SQL = text(
+    "SELECT ce.captured_at FROM camera_events ce, access_retention_watermarks w "
+    "WHERE w.job = :job AND (ce.captured_at, ce.id) > (w.captured_at, w.camera_event_id) "
+    "  AND ce.captured_at < :cutoff "
+    "  AND (ce.plate_photo_url IS NOT NULL OR ce.overview_photo_url IS NOT NULL) "
+    "ORDER BY ce.captured_at, ce.id LIMIT 1"
+)
+
+
+# ───────────────────────── прогон ────────────────────────────────────────────
+
+
+@dataclass
+class _ChunkOutcome:
+    events: int  # ссылки обнулены
+    objects_deleted: int
+    failed: bool
+    parked: int = 0
+    scanned: int = 0  # события, за которые ушёл watermark (обнулённые + паркованные)
+
+
+async def _delete_objects(
+    storage: PhotoStorage, refs: list[str], concurrency: int
+) -> list[BaseException | None]:
+    """Удалить объекты не больше ``concurrency`` одновременно; ошибка — на месте ref."""
+    gate = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(ref: str) -> None:
+        async with gate:
+            await storage.delete(ref)
+
+    try:
+        return await asyncio.gather(*(one(ref) for ref in refs), return_exceptions=True)
+    finally:
+        await storage.aclose()
+
+
+def _purge_chunk(
+    db: Session,
+    storage: PhotoStorage,
+    *,
+    cutoff: dt.datetime,
+    chunk_size: int,
+    concurrency: int,
+    max_attempts: int,
+) -> _ChunkOutcome | None:
+    """Один чанк: удаление объектов вне транзакции, затем короткая транзакция
+    продвижения watermark'а. None — обрабатывать больше нечего."""
+    wm_at, wm_id = db.execute(_READ_WATERMARK_SQL, {"job": PHOTO_RETENTION_JOB}).one()
+    rows = db.execute(
+        _CHUNK_SQL,
+        {"wm_at": wm_at, "wm_id": wm_id, "cutoff": cutoff, "limit": chunk_size},
+    ).all()
+    db.commit()  # удаления storage — без открытой транзакции
+    if not rows:
+        return None
+
+    owned = [
+        (index, ref)
+        for index, row in enumerate(rows)
+        for ref in (row.plate_photo_url, row.overview_photo_url)
+        if ref and storage.owns(ref)
+    ]
+    results = asyncio.run(_delete_objects(storage, [ref for _, ref in owned], concurrency))
+    errors: dict[int, BaseException] = {}
+    for (index, _), error in zip(owned, results):
+        if error is not None:
+            errors.setdefault(index, error)
+
+    wm = db.execute(_LOCK_WATERMARK_SQL, {"job": PHOTO_RETENTION_JOB}).one()
+    if (wm.captured_at, wm.camera_event_id) != (wm_at, wm_id):
+        # Другой воркер уже продвинул watermark — чанк его, наши удаления идемпотентны.
+        db.commit()
+        return _ChunkOutcome(events=0, objects_deleted=0, failed=False)
+
+    # Префикс чанка до первого события с неудалённым объектом; событие, которое
+    # не удаётся удалить ``max_attempts`` тиков подряд, паркуется и пропускается.
+    done = len(rows)
+    parked: set[int] = set()
+    blocked_id, attempts = None, 0
+    for index in sorted(errors):
+        row = rows[index]
+        tries = wm.blocked_attempts + 1 if row.id == wm.blocked_event_id else 1
+        if tries >= max_attempts:
+            logger.error(
+                "photo retention: объект события id=%s не удалён за %s попыток (%s), "
+                "событие пропущено, ссылки оставлены",
+                row.id,
+                tries,
+                type(errors[index]).__name__,
+            )
+            parked.add(index)
+            continue
+        logger.warning(
+            "photo retention: объект события id=%s не удалён (%s), попытка %s/%s",
+            row.id,
+            type(errors[index]).__name__,
+            tries,
+            max_attempts,
+        )
+        done, blocked_id, attempts = index, row.id, tries
+        break
+
+    processed = [row for index, row in enumerate(rows[:done]) if index not in parked]
+    if processed:
+        db.execute(_NULL_LINKS_SQL, {"ids": [row.id for row in processed]})
+    last = rows[done - 1] if done else None
+    db.execute(
+        _ADVANCE_WATERMARK_SQL,
+        {
+            "at": last.captured_at if last else wm_at,
+            "id": last.id if last else wm_id,
+            "blocked_id": blocked_id,
+            "attempts": attempts,
+            "job": PHOTO_RETENTION_JOB,
+        },
+    )
+    db.commit()
+    deleted = sum(
+        1 for (index, _), error in zip(owned, results) if index < done and error is None
+    )
+    return _ChunkOutcome(
+        events=len(processed),
+        objects_deleted=deleted,
+        failed=done < len(rows),
+        parked=len(parked),
+        scanned=done,
+    )
+
+
 def purge_expired_photos(
     db: Session,
     *,
     older_than_days: int = PHOTO_RETENTION_DAYS,
     now: dt.datetime | None = None,
+    storage: PhotoStorage | None = None,
+    chunk_size: int = PHOTO_RETENTION_CHUNK_SIZE,
+    concurrency: int = PHOTO_DELETE_CONCURRENCY,
+    max_attempts: int = PHOTO_DELETE_MAX_ATTEMPTS,
+    max_chunks: int | None = None,
 ) -> int:
-    """Анонимизировать (обнулить ссылки) фото событий старше срока (§11).
+    """Удалить объекты и обнулить ссылки на фото событий старше срока (§11).
 
-    Возвращает число затронутых строк. Коммит — на стороне вызывающего
-    (команда/worker). Реальное удаление файлов в storage — прод-долг (инфра).
+    Идёт чанками от watermark'а до ``cutoff`` (или ``max_chunks`` чанков), каждый
+    чанк коммитит сам. Возвращает число событий с обнулёнными ссылками за прогон
+    (паркованные не в счёт).
     """
-    ids = select_expired_photo_event_ids(db, older_than_days=older_than_days, now=now)
-    if not ids:
-        return 0
-    db.execute(
-        text(
-            "UPDATE camera_events "
-            "SET plate_photo_url = NULL, overview_photo_url = NULL "
-            "WHERE id IN :ids"
-        ).bindparams(bindparam("ids", expanding=True)),
-        {"ids": ids},
+    cutoff = _cutoff(older_than_days, now)
+    storage = storage or get_photo_storage()
+    db.execute(_ENSURE_WATERMARK_SQL, {"job": PHOTO_RETENTION_JOB, "epoch": _EPOCH})
+    db.commit()
+
+    total = 0
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        started = time.perf_counter()
+        outcome = _purge_chunk(
+            db,
+            storage,
+            cutoff=cutoff,
+            chunk_size=chunk_size,
+            concurrency=concurrency,
+            max_attempts=max_attempts,
+        )
+        if outcome is None:
+            break
+        chunks += 1
+        total += outcome.events
+        metrics.observe_photo_retention_chunk(
+            duration_seconds=time.perf_counter() - started,
+            events=outcome.events,
+            objects_deleted=outcome.objects_deleted,
+            failed=outcome.failed,
+            parked=outcome.parked,
+        )
+        if outcome.failed or outcome.scanned < chunk_size:
+            break
+
+    oldest = db.execute(
+        _OLDEST_PENDING_SQL, {"job": PHOTO_RETENTION_JOB, "cutoff": cutoff}
+    ).scalar()
+    db.commit()
+    metrics.set_photo_retention_lag(
+        (cutoff - oldest).total_seconds() if oldest is not None else 0.0
     )
-    return len(ids)
+    return total
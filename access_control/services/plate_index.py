@@ -0,0 +1,395 @@
+"""Индекс кандидатов номера для ошибочно распознанных ANPR-номеров (§12).
+
+``recognition_key`` сворачивает омоглифы (кириллица→латиница, ``O/0``, ``I/1``),
+но номер, отличающийся одной неверно прочитанной литерой (``8/B``, ``5/S``,
+пропущенный символ), точного совпадения не даёт — событие уходит оператору
+без подсказки, а нечёткий поиск по ``vehicles`` был бы seq-scan'ом.
+
+Индекс — в памяти процесса, deletion-neighbourhood (SymSpell): каждый ключ
+регистрируется под всеми своими вариантами с удалёнными ≤ ``max_distance``
+символами. Два ключа в пределах расстояния Левенштейна d обязательно делят
+такой вариант, поэтому поиск — это O(вариантов запроса) обращений к словарю
+и проверка немногих найденных ключей, без обхода базы авто.
+
+Ранжирование: расстояние, затем взвешенная стоимость правок (подмена из
+``_CONFUSABLE`` — типичных ошибок ANPR — дешевле произвольной), затем номер.
+
+Только ПОДСКАЗКА оператору (деталь события, ``/plate-candidates``): решение
+движка по кандидату не принимается — без авто-allow по fuzzy (§12, решение
+CTO #2).
+
+Индекс процесса строится и догоняется ВНЕ пути запроса: тик
+``refresh_plate_index`` раз в ``PLATE_INDEX_SYNC_SECONDS`` гоняет фоновый
+воркер (``services/retention_worker``). Первое построение идёт в свежий объект
+без общей блокировки и подменяет индекс целиком; догон читает двумя
+индексными диапазонами только авто с ``created_at``/``updated_at`` не раньше
+watermark'а (``ix_vehicles_created_at_id`` / ``ix_vehicles_updated_at_id``).
+Правки через ``services.management`` применяются сразу (``note_vehicle``).
+Пока индекс не построен, запрос подсказок получает пустой список и лишь
+будит фоновое построение — оператор не ждёт скан ``vehicles``.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from access_control.domain.enums import VehicleStatus
+
+logger = logging.getLogger(__name__)
+
+# Максимальное расстояние Левенштейна кандидата. Память индекса растёт с ним:
+# ≈37 вариантов на 8-символьный ключ при d=2 против 9 при d=1 — на 100k номеров
+# ~345 МиБ против ~110 МиБ на КАЖДЫЙ воркер (scripts/bench_plate_index.py).
+# Типичная ошибка ANPR — одна литера, поэтому по умолчанию d=1; d=2 — явно.
+PLATE_INDEX_MAX_DISTANCE = int(os.getenv("ACCESS_PLATE_INDEX_MAX_DISTANCE", "1"))
+# Как часто индекс процесса догоняет изменения vehicles из других процессов.
+PLATE_INDEX_SYNC_SECONDS = float(os.getenv("ACCESS_PLATE_INDEX_SYNC_SECONDS", "30"))
+# Сколько кандидатов отдавать оператору по умолчанию.
+PLATE_CANDIDATES_LIMIT = 5
+
+# Перекрытие окна догона: транзакция может закоммититься позже своего now().
+# Повторное применение строки идемпотентно.
+_SYNC_OVERLAP = dt.timedelta(minutes=2)
+
+# Частые ошибки ANPR сверх уже свёрнутых в recognition_key (O/0, I/1).
+_CONFUSABLE = frozenset(
+    frozenset(pair)
+    for pair in (
+        ("8", "B"), ("5", "S"), ("2", "Z"), ("6", "G"), ("0", "D"),
+        ("0", "Q"), ("4", "A"), ("7", "T"), ("1", "L"), ("3", "B"),
+    )
+)
+_CONFUSABLE_COST = 0.5
+
+_VEHICLES_SQL = (
+    "SELECT id, recognition_key, plate_number_normalized, status, created_at, "
+    "updated_at FROM vehicles"
+)
+# Догон — два диапазона по индексам вместо OR по неиндексированному updated_at:
+# новые авто (updated_at у них NULL) и изменённые.
+_CREATED_SINCE_SQL = f"{_VEHICLES_SQL} WHERE created_at >= :since ORDER BY created_at, id"
+_UPDATED_SINCE_SQL = f"{_VEHICLES_SQL} WHERE updated_at >= :since ORDER BY updated_at, id"
+
+
+@dataclass(frozen=True)
+class PlateCandidate:
+    """Кандидат: зарегистрированное авто рядом с распознанным ключом."""
+
+    vehicle_id: int
+    plate_number_normalized: str
+    recognition_key: str
+    status: str
+    distance: int
+    cost: float
+
+
+def _deletes(key: str, depth: int) -> set[str]:
+    """Сам ключ и все варианты с удалёнными ≤ ``depth`` символами."""
+    out = {key}
+    frontier = {key}
+    for _ in range(depth):
+        frontier = {s[:i] + s[i + 1:] for s in frontier for i in range(len(s))}
+        out |= frontier
+    return out
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Левенштейн с отсечкой: ``limit + 1``, если расстояние больше ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        best = i
+        for j, cb in enumerate(b, 1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            )
+            current.append(value)
+            best = min(best, value)
+        if best > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _weighted_cost(a: str, b: str) -> float:
+    """Стоимость правок, где подмена из ``_CONFUSABLE`` дешевле (для ранжирования)."""
+    previous = [float(j) for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        current = [float(i)]
+        for j, cb in enumerate(b, 1):
+            if ca == cb:
+                substitute = 0.0
+            elif frozenset((ca, cb)) in _CONFUSABLE:
+                substitute = _CONFUSABLE_COST
+            else:
+                substitute = 1.0
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + substitute)
+            )
+        previous = current
+    return previous[-1]
+
+
+class PlateCandidateIndex:
+    """Deletion-neighbourhood индекс ``recognition_key`` → авто (см. модуль).
+
+    Не потокобезопасен сам по себе: общий индекс процесса защищает
+    ``_lock`` модуля.
+    """
+
+    def __init__(self, max_distance: int = PLATE_INDEX_MAX_DISTANCE) -> None:
+        self.max_distance = max_distance
+        # recognition_key → {vehicle_id: (plate_number_normalized, status)}
+        self._keys: dict[str, dict[int, tuple[str, str]]] = {}
+        self._key_by_vehicle: dict[int, str] = {}
+        # вариант-удаление → ключ (одиночный, как правило) либо set ключей.
+        self._deletes: dict[str, str | set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._key_by_vehicle)
+
+    def _link(self, key: str) -> None:
+        for variant in _deletes(key, self.max_distance):
+            bucket = self._deletes.get(variant)
+            if bucket is None:
+                self._deletes[variant] = key
+            elif isinstance(bucket, str):
+                if bucket != key:
+                    self._deletes[variant] = {bucket, key}
+            else:
+                bucket.add(key)
+
+    def _unlink(self, key: str) -> None:
+        for variant in _deletes(key, self.max_distance):
+            bucket = self._deletes.get(variant)
+            if bucket == key:
+                del self._deletes[variant]
+            elif isinstance(bucket, set):
+                bucket.discard(key)
+                if len(bucket) == 1:
+                    self._deletes[variant] = next(iter(bucket))
+
+    def upsert(self, vehicle_id: int, key: str | None, plate: str, status: str) -> None:
+        """Зарегистрировать/обновить авто; архивное или без ключа — удалить."""
+        if not key or status == VehicleStatus.ARCHIVED.value:
+            self.remove(vehicle_id)
+            return
+        if self._key_by_vehicle.get(vehicle_id) == key:
+            self._keys[key][vehicle_id] = (plate, status)
+            return
+        self.remove(vehicle_id)
+        vehicles = self._keys.get(key)
+        if vehicles is None:
+            vehicles = self._keys[key] = {}
+            self._link(key)
+        vehicles[vehicle_id] = (plate, status)
+        self._key_by_vehicle[vehicle_id] = key
+
+    def remove(self, vehicle_id: int) -> None:
+        key = self._key_by_vehicle.pop(vehicle_id, None)
+        if key is None:
+            return
+        vehicles = self._keys[key]
+        vehicles.pop(vehicle_id, None)
+        if not vehicles:
+            del self._keys[key]
+            self._unlink(key)
+
+    def lookup(
+        self,
+        key: str,
+        *,
+        max_distance: int | None = None,
+        limit: int = PLATE_CANDIDATES_LIMIT,
+        exclude_exact: bool = False,
+    ) -> list[PlateCandidate]:
+        """Ранжированные кандидаты в пределах ``max_distance`` от ``key``."""
+        if not key:
+            return []
+        depth = self.max_distance if max_distance is None else min(
+            max_distance, self.max_distance
+        )
+        found: set[str] = set()
+        for variant in _deletes(key, depth):
+            bucket = self._deletes.get(variant)
+            if bucket is None:
+                continue
+            if isinstance(bucket, str):
+                found.add(bucket)
+            else:
+                found |= bucket
+        ranked: list[tuple[int, float, str]] = []
+        for candidate in found:
+            distance = _edit_distance(key, candidate, depth)
+            if distance > depth or (exclude_exact and distance == 0):
+                continue
+            ranked.append((distance, _weighted_cost(key, candidate), candidate))
+        ranked.sort()
+        out: list[PlateCandidate] = []
+        for distance, cost, candidate in ranked:
+            for vehicle_id, (plate, status) in sorted(self._keys[candidate].items()):
+                out.append(
+                    PlateCandidate(
+                        vehicle_id=vehicle_id,
+                        plate_number_normalized=plate,
+                        recognition_key=candidate,
+                        status=status,
+                        distance=distance,
+                        cost=cost,
+                    )
+                )
+                if len(out) >= limit:
+                    return out
+        return out
+
+
+# ------------------------- индекс процесса (синглтон) -------------------------
+
+_lock = threading.Lock()
+_index: PlateCandidateIndex | None = None
+_watermark: dt.datetime | None = None
+_synced_at: float = 0.0
+# Одно построение за раз: фоновый тик и пробуждение из запроса не дублируют скан.
+_build_lock = threading.Lock()
+
+
+def _aware(value: dt.datetime | None) -> dt.datetime | None:
+    # sqlite отдаёт naive — сравниваем как UTC.
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=dt.timezone.utc)
+    return value
+
+
+def _apply(index: PlateCandidateIndex, rows: Iterable) -> dt.datetime | None:
+    latest: dt.datetime | None = None
+    for row in rows:
+        index.upsert(row.id, row.recognition_key, row.plate_number_normalized, row.status)
+        for moment in (_aware(row.created_at), _aware(row.updated_at)):
+            if moment is not None and (latest is None or moment > latest):
+                latest = moment
+    return latest
+
+
+def _build(db: Session) -> PlateCandidateIndex | None:
+    """Полное построение в свежий объект без ``_lock``; None — строит другой поток."""
+    global _index, _watermark, _synced_at
+    if not _build_lock.acquire(blocking=False):
+        return None
+    try:
+        index = PlateCandidateIndex()
+        started = time.perf_counter()
+        latest = _apply(index, db.execute(text(_VEHICLES_SQL)))
+        with _lock:
+            # Пустая база — без watermark, следующий тик строит заново.
+            _index, _watermark = index, latest
+            _synced_at = time.monotonic()
+        logger.info(
+            "plate index: построен, авто %d за %.3f c",
+            len(index), time.perf_counter() - started,
+        )
+        return index
+    finally:
+        _build_lock.release()
+
+
+def refresh_plate_index(db: Session) -> PlateCandidateIndex | None:
+    """Фоновый тик: построить индекс (первый раз) или догнать изменения после watermark."""
+    global _watermark, _synced_at
+    with _lock:
+        index, watermark = _index, _watermark
+    if index is None or watermark is None:
+        return _build(db)
+    since = watermark - _SYNC_OVERLAP
+    rows = [
+        *db.execute(text(_CREATED_SINCE_SQL), {"since": since}),
+        *db.execute(text(_UPDATED_SINCE_SQL), {"since": since}),
+    ]
+    with _lock:
+        latest = _apply(index, rows)
+        if latest is not None and (_watermark is None or latest > _watermark):
+            _watermark = latest
+        _synced_at = time.monotonic()
+    return index
+
+
+def _build_in_background() -> None:
+    """Разбудить построение из пути запроса (воркеры выключены или ещё не дошли)."""
+    if _build_lock.locked():
+        return
+
+    def _run() -> None:
+        from uk_management_bot.database.session import SessionLocal
+
+        try:
+            with SessionLocal() as db:
+                _build(db)
+        except Exception:  # noqa: BLE001 — подсказки не критичны, повторит тик
+            logger.warning("plate index: фоновое построение упало", exc_info=True)
+
+    threading.Thread(target=_run, name="plate-index-build", daemon=True).start()
+
+
+def get_plate_index() -> PlateCandidateIndex | None:
+    """Текущий индекс процесса; None — ещё не построен (построение уже запущено)."""
+    with _lock:
+        index = _index
+    if index is None:
+        _build_in_background()
+    return index
+
+
+def find_plate_candidates(
+    plate_number: str,
+    *,
+    limit: int = PLATE_CANDIDATES_LIMIT,
+    exclude_exact: bool = False,
+) -> list[PlateCandidate]:
+    """Подсказки оператору по распознанному номеру (нормализация §12 внутри).
+
+    Не ходит в БД: до первого построения индекса — пустой список.
+    """
+    from access_control.services.normalization import normalize_plate
+
+    key = normalize_plate(plate_number).recognition_key
+    index = get_plate_index()
+    if index is None:
+        return []
+    with _lock:
+        return index.lookup(key, limit=limit, exclude_exact=exclude_exact)
+
+
+def note_vehicle(vehicle) -> None:
+    """Применить закоммиченную правку авто к индексу процесса сразу (без ожидания sync)."""
+    with _lock:
+        if _index is not None:
+            _index.upsert(
+                vehicle.id,
+                vehicle.recognition_key,
+                vehicle.plate_number_normalized,
+                vehicle.status,
+            )
+
+
+def reset_plate_index(index: PlateCandidateIndex | None = None) -> None:
+    """Сбросить/подменить индекс процесса (тесты изоляции).
+
+    Подменённый индекс живёт до следующего тика — без watermark он
+    перестраивается из ``vehicles``.
+    """
+    global _index, _watermark, _synced_at
+    with _lock:
+        _index = index
+        _watermark = None
+        _synced_at = time.monotonic() if index is not None else 0.0
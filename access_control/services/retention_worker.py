@@ -15,6 +15,9 @@ runtime-роль ``access_app_rw`` (UPDATE на ``camera_events`` и INSERT в
 тик уходит в ``asyncio.to_thread`` — блокирующий SQL не должен стоять в
 event loop API (класс проблемы AUD6-P2-01).
 
+Здесь же — фоновый тик индекса кандидатов номера (``services/plate_index``):
+построение и догон из ``vehicles`` не должны идти в пути запроса оператора.
+
 Ошибка одного тика логируется и НЕ убивает цикл: разовый сбой БД не повод
 навсегда остановить retention до рестарта контейнера.
 """
@@ -30,8 +33,11 @@ logger = logging.getLogger(__name__)
 # а не ручка конфигурации; менять их надо через код и ревью.
 REVIEW_TICK_SECONDS = 10.0
 # Ретеншн меряется днями — часовой тик даёт максимум час опоздания на
-# 30-дневном сроке и не создаёт заметной нагрузки (индексный SELECT + UPDATE).
+# 30-дневном сроке и не создаёт заметной нагрузки (keyset-чанки от watermark).
 PHOTO_TICK_SECONDS = 3600.0
+# Месячные партиции журнала создаются на 3 месяца вперёд — суточного тика с
+# запасом хватает; DROP просроченных — ops-CLI под owner-ролью, не здесь.
+PARTITION_TICK_SECONDS = 86400.0
 
 _ENV_FLAG = "ACCESS_WORKERS_ENABLED"
 
@@ -59,7 +65,7 @@ def _review_tick() -> int:
     from access_control.services.review_expiry import expire_due_reviews
 
     with SessionLocal() as db:
-        # expire_due_reviews коммитит сам, по решению за раз (advisory lock).
+        # expire_due_reviews коммитит сам, по группе lock-ключа за раз (advisory lock).
         return expire_due_reviews(db)
 
 
@@ -69,10 +75,27 @@ def _photo_tick() -> int:
     from access_control.services.photo_retention import purge_expired_photos
 
     with SessionLocal() as db:
-        # Контракт purge_expired_photos: «коммит — на стороне вызывающего».
-        count = purge_expired_photos(db)
-        db.commit()
-        return count
+        # purge_expired_photos коммитит сам, по чанку за раз (watermark).
+        return purge_expired_photos(db)
+
+
+def _plate_index_tick() -> int:
+    from uk_management_bot.database.session import SessionLocal
+
+    from access_control.services.plate_index import refresh_plate_index
+
+    with SessionLocal() as db:
+        refresh_plate_index(db)
+    return 0
+
+
+def _partition_tick() -> int:
+    from uk_management_bot.database.session import SessionLocal
+
+    from access_control.services.partitions import ensure_partitions
+
+    with SessionLocal() as db:
+        return ensure_partitions(db)
 
 
 async def run_loop(
@@ -101,8 +124,14 @@ async def run_loop(
             continue  # обычный путь: интервал истёк, следующий тик
 
 
+def _plate_index_interval() -> float:
+    from access_control.services.plate_index import PLATE_INDEX_SYNC_SECONDS
+
+    return PLATE_INDEX_SYNC_SECONDS
+
+
 def start_retention_workers() -> tuple[list[asyncio.Task], asyncio.Event]:
-    """Запустить оба цикла; вернуть (tasks, stop) для остановки на shutdown."""
+    """Запустить циклы; вернуть (tasks, stop) для остановки на shutdown."""
     stop = asyncio.Event()
     tasks = [
         asyncio.create_task(
@@ -113,11 +142,22 @@ def start_retention_workers() -> tuple[list[asyncio.Task], asyncio.Event]:
             run_loop("photo-retention", _photo_tick, PHOTO_TICK_SECONDS, stop),
             name="access-retention-photo",
         ),
+        asyncio.create_task(
+            run_loop("partitions", _partition_tick, PARTITION_TICK_SECONDS, stop),
+            name="access-retention-partitions",
+        ),
+        asyncio.create_task(
+            run_loop("plate-index", _plate_index_tick, _plate_index_interval(), stop),
+            name="access-plate-index",
+        ),
     ]
     logger.info(
-        "retention workers запущены: review-expiry каждые %ss, photo каждые %ss",
+        "retention workers запущены: review-expiry каждые %ss, photo каждые %ss, "
+        "партиции каждые %ss, индекс номеров каждые %ss",
         REVIEW_TICK_SECONDS,
         PHOTO_TICK_SECONDS,
+        PARTITION_TICK_SECONDS,
+        _plate_index_interval(),
     )
     return tasks, stop
 
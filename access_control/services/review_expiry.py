@@ -6,31 +6,73 @@ per-barrier advisory lock, добавляет append-строку status=expired
 Идемпотентно: повторный tick не создаёт второй переход (после первого решение
 уже не pending). Resolve/read-пути дополнительно делают lazy expiry, чтобы
 остановка worker не позволила обработать просроченное.
+
+Кандидаты берутся из проекции ``access_review_heads`` (строка на событие с
+текущим pending, ведёт триггер миграции 016) по индексу дедлайна — стоимость
+tick'а O(просроченных), а не O(истории access_decisions). Tick обрабатывает не
+больше ``REVIEW_EXPIRY_BATCH_SIZE`` голов; остаток заберёт следующий tick.
+Головы одного lock-ключа переводятся одной транзакцией: один advisory lock,
+одно чтение хвоста hash-chain на таблицу, одна пачка INSERT'ов.
 """
 from __future__ import annotations
 
 import datetime as dt
+import os
+import time
 
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from sqlalchemy.orm import Session
 
 from access_control.domain.enums import DecisionStatus, DecisionType
 from access_control.domain.events import AccessDecision
-from access_control.services.hashchain import next_hash
-from access_control.services.lifecycle import _write_audit
+from access_control.repositories import audit_repo
+from access_control.services import metrics
+from access_control.services.hashchain import next_hashes
 from access_control.services.locks import advisory_xact_lock
 # AUD6-P2-41: канон вместо локальной копии (15 идентичных def _utcnow по
 # репо — ровно тот класс дрейфа, что уже стрелял tz-багами, AUD5-CODE-3).
 from uk_management_bot.utils.datetime_utils import utc_now as _utcnow
 
+# Максимум голов за один tick (ограничивает длину транзакций и пачек INSERT).
+REVIEW_EXPIRY_BATCH_SIZE = int(os.getenv("ACCESS_REVIEW_EXPIRY_BATCH_SIZE", "500"))
 
+# H1/L3: канонический lock-ключ событием (активный barrier → gate → controller).
+# LATERAL берёт ОДИН активный barrier gate'а (без размножения строк); если
+# barrier деактивирован после приёма, просроченный pending всё равно найдётся и
+# истечёт (ключ падает на gate_id) — pending не «вечный» (M4). ``barrier_id``
+# (активный, может быть NULL) идёт в audit отдельно.
+_DUE_HEADS_SQL = text(
+    """
+    SELECT h.decision_id, b.id AS barrier_id,
+           COALESCE(b.id, ce.gate_id, ce.controller_id) AS lock_key
+    FROM access_review_heads h
+    JOIN camera_events ce ON ce.id = h.camera_event_id
+    LEFT JOIN LATERAL (
+        SELECT id FROM access_barriers
+        WHERE gate_id = ce.gate_id AND is_active = true
+        ORDER BY id LIMIT 1
+    ) b ON true
+    WHERE h.review_deadline_at < :now
+    ORDER BY h.review_deadline_at, h.decision_id
+    LIMIT :batch
+    """
+)
 
+_BACKLOG_SQL = text(
+    "SELECT count(*) FROM access_review_heads WHERE review_deadline_at < :now"
+)
 
-def _write_expired_transition(
-    db: Session, current: AccessDecision, now: dt.datetime
-) -> AccessDecision:
-    """Append-строка expired (supersedes current) с hash-chain (§9.5, §9.7)."""
-    payload = {
+# Повторная проверка под lock: голова на месте — решение всё ещё current и
+# pending (любая новая строка события снимает голову в том же INSERT).
+_STILL_DUE_SQL = text(
+    "SELECT decision_id FROM access_review_heads "
+    "WHERE decision_id IN :ids AND review_deadline_at < :now"
+).bindparams(bindparam("ids", expanding=True))
+
+
+def _expired_payload(current: AccessDecision) -> dict:
+    """Hash-payload append-строки expired, замещающей ``current`` (§9.7)."""
+    return {
         "camera_event_id": current.camera_event_id,
         "decision_group_id": str(current.decision_group_id),
         "supersedes_decision_id": current.id,
@@ -39,8 +81,15 @@ def _write_expired_transition(
         "reason": current.reason,
         "source": current.source,
     }
-    prev_hash, row_hash = next_hash(db, "access_decisions", payload)
-    row = AccessDecision(
+
+
+def _expired_row(
+    current: AccessDecision,
+    now: dt.datetime,
+    prev_hash: str | None,
+    row_hash: str,
+) -> AccessDecision:
+    return AccessDecision(
         camera_event_id=current.camera_event_id,
         decision_group_id=current.decision_group_id,
         supersedes_decision_id=current.id,
@@ -55,78 +104,79 @@ def _write_expired_transition(
         prev_hash=prev_hash,
         row_hash=row_hash,
     )
-    db.add(row)
-    db.flush()
-    return row
 
 
-def expire_due_reviews(db: Session, *, now: dt.datetime | None = None) -> int:
+def expire_due_reviews(
+    db: Session,
+    *,
+    now: dt.datetime | None = None,
+    batch_size: int = REVIEW_EXPIRY_BATCH_SIZE,
+) -> int:
     """Один tick worker: перевести просроченные current pending в expired.
 
-    Возвращает число переведённых решений. Каждый перевод — под per-barrier
-    advisory lock с повторной проверкой (current + всё ещё pending), атомарно.
+    Возвращает число переведённых решений. Кандидаты группируются по lock-ключу;
+    группа — одна транзакция под advisory lock с повторной проверкой по
+    ``access_review_heads`` (decision и audit — пачками, hash-chain в памяти).
     """
+    started = time.perf_counter()
     now = now or _utcnow()
-    # H1/L3: канонический lock-ключ событием (активный barrier → gate → controller).
-    # ``LEFT JOIN`` на активный barrier: если barrier деактивирован после приёма,
-    # просроченный pending всё равно найдётся и истечёт (ключ падает на gate_id) —
-    # pending не «вечный» (M4). ``barrier_id`` (активный, может быть NULL) идёт в
-    # audit отдельно.
-    due = db.execute(
-        text(
-            "SELECT ad.id, b.id AS barrier_id, "
-            "       COALESCE(b.id, ce.gate_id, ce.controller_id) AS lock_key "
-            "FROM access_decisions ad "
-            "JOIN camera_events ce ON ce.id = ad.camera_event_id "
-            "LEFT JOIN access_barriers b "
-            "  ON b.gate_id = ce.gate_id AND b.is_active = true "
-            "WHERE ad.status = 'pending_review' "
-            "  AND ad.review_deadline_at IS NOT NULL "
-            "  AND ad.review_deadline_at < :now "
-            "  AND ad.id = (SELECT max(id) FROM access_decisions "
-            "               WHERE camera_event_id = ad.camera_event_id) "
-            "ORDER BY ad.id"
-        ),
-        {"now": now},
-    ).fetchall()
+    backlog = db.execute(_BACKLOG_SQL, {"now": now}).scalar_one()
+    due = db.execute(_DUE_HEADS_SQL, {"now": now, "batch": batch_size}).fetchall()
+    # Читающая транзакция не должна держать snapshot до первого lock'а.
+    db.commit()
 
-    expired_count = 0
+    groups: dict[int, list[tuple[int, int | None]]] = {}
     for decision_id, barrier_id, lock_key in due:
+        groups.setdefault(lock_key, []).append((decision_id, barrier_id))
+
+    expired_count = 0
+    for lock_key, candidates in groups.items():
         advisory_xact_lock(db, lock_key)
-        # Повторная проверка под lock: решение всё ещё current и pending.
-        current = _current_decision_if_pending(db, decision_id)
-        if current is None:
+        barrier_by_decision = dict(candidates)
+        still_due = set(
+            db.execute(
+                _STILL_DUE_SQL, {"ids": list(barrier_by_decision), "now": now}
+            ).scalars()
+        )
+        currents = [
+            db.get(AccessDecision, decision_id)
+            for decision_id, _ in candidates
+            if decision_id in still_due
+        ]
+        if not currents:
             db.commit()
             continue
-        expired = _write_expired_transition(db, current, now)
+        links = next_hashes(
+            db, "access_decisions", [_expired_payload(c) for c in currents]
+        )
+        rows = [
+            _expired_row(current, now, prev_hash, row_hash)
+            for current, (prev_hash, row_hash) in zip(currents, links)
+        ]
+        db.add_all(rows)
+        db.flush()
         # L5: каждый переход в expired — append-строка audit (actor system).
-        _write_audit(
+        audit_repo.insert_many(
             db,
-            actor_user_id=None,
-            action="access.review_expired",
-            entity_type="access_decision",
-            entity_id=expired.id,
-            barrier_id=barrier_id,
-            source="review_expiry_worker",
-            reason=None,
+            [
+                {
+                    "actor_user_id": None,
+                    "action": "access.review_expired",
+                    "entity_type": "access_decision",
+                    "entity_id": row.id,
+                    "barrier_id": barrier_by_decision[current.id],
+                    "source": "review_expiry_worker",
+                    "reason": None,
+                }
+                for current, row in zip(currents, rows)
+            ],
         )
         db.commit()
-        expired_count += 1
-    return expired_count
-
+        expired_count += len(rows)
 
-def _current_decision_if_pending(
-    db: Session, decision_id: int
-) -> AccessDecision | None:
-    """Вернуть решение, если оно ещё pending_review и НЕ замещено (под lock)."""
-    current = db.get(AccessDecision, decision_id)
-    if current is None or current.status != DecisionStatus.PENDING_REVIEW.value:
-        return None
-    superseded = db.execute(
-        text(
-            "SELECT 1 FROM access_decisions "
-            "WHERE supersedes_decision_id = :id LIMIT 1"
-        ),
-        {"id": decision_id},
-    ).scalar()
-    return None if superseded is not None else current
+    metrics.observe_review_expiry_tick(
+        duration_seconds=time.perf_counter() - started,
+        backlog=backlog,
+        expired=expired_count,
+    )
+    return expired_count
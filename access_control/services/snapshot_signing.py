@@ -8,13 +8,33 @@ fail_closed (reject-only, проверка — ``edge/snapshot_verifier.py``).
 
 Канонизация перед подписью — детерминированный JSON (sorted keys, без пробелов):
 edge и backend обязаны сериализовать одинаково.
+
+Grant-capable snapshot ``cached_permanent_only`` (§8.1–8.2) дополнительно несёт
+компактный разрешающий список постоянных авто: по направлению — отсортированные
+усечённые HMAC-SHA256 нормализованных номеров. Ключ HMAC — секрет развёртывания
+(``plate_hash_key``), его получает только edge при провижининге: пространство
+номеров перечислимо, и без ключа обычный хэш снимка обращался бы перебором.
+``allowlist_key_id`` (отпечаток ключа) в снимке позволяет edge отличить чужой ключ.
+``allowlist_version`` — дайджест содержимого списка: edge, у которого уже есть
+версия, получает только дельту (``allowlist_delta``) и сверяет дайджест
+результата с подписанным ``allowlist_version``. Хелперы хэша/дайджеста/дельты —
+общие для backend и edge, как ``canonical_payload``.
+
+Подписи кэшируются по хэшу канонического payload (и отпечатку сида, не самому
+сиду): повторная выдача того же
+документа (retry edge, ``issued_at`` квантован ``issue_time``) не подписывается
+заново.
 """
 from __future__ import annotations
 
 import datetime as dt
 import hashlib
+import hmac
 import json
 import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
 
 from cryptography.hazmat.primitives import serialization
@@ -26,12 +46,24 @@ from cryptography.hazmat.primitives.asymmetric.ed25519 import (
 # Возраст snapshot для автоматического въезда (§8.2): 15 минут.
 SNAPSHOT_TTL_SECONDS = 15 * 60
 SNAPSHOT_VERSION = 1
+# Квант ``issued_at`` (с): snapshot, выданный в пределах кванта, побайтно совпадает
+# и берёт подпись из кэша. Срок жизни на edge сокращается максимум на квант.
+SNAPSHOT_ISSUE_BUCKET_SECONDS = int(os.getenv("ACCESS_SNAPSHOT_ISSUE_BUCKET_SECONDS", "30"))
+# Размер LRU-кэша подписей (число документов).
+SIGNATURE_CACHE_SIZE = int(os.getenv("ACCESS_SNAPSHOT_SIGNATURE_CACHE_SIZE", "256"))
+# Длина усечённого HMAC номера в allowlist (hex-символов, 64 бита).
+PLATE_HASH_HEX_LEN = 16
 
 # Сид приватного ключа берётся ТОЛЬКО из окружения (§8.2, §11). Хардкод-дефолта в
 # коде нет (H2/M1): отсутствие env → RuntimeError при использовании (не на импорте,
 # чтобы сборка/collection не падали). 32 байта seed Ed25519, hex. Тесты задают
 # синтетический сид через окружение (см. access_control/tests/conftest.py).
 _SIGNING_SEED_ENV = "ACCESS_SNAPSHOT_SIGNING_SEED"
+# Ключ HMAC номеров allowlist (32 байта, hex). Edge провижинится им вместе с
+# pinned public key. Не задан — выводится из сида подписи (необратимо: сид на
+# edge не уходит), так что у каждого развёртывания свой ключ без доп. настройки.
+_PLATE_KEY_ENV = "ACCESS_SNAPSHOT_PLATE_KEY"
+_PLATE_KEY_CONTEXT = b"access-snapshot/plate-hash/v1"
 
 
 def _signing_seed_hex() -> str:
@@ -93,6 +125,86 @@ class SignedSnapshot:
     signature_hex: str
 
 
+# ───────────────────── компактный allowlist (§8.1–8.2) ───────────────────────
+
+
+def plate_hash_key() -> bytes:
+    """Ключ HMAC номеров allowlist этого развёртывания (для backend и провижининга edge)."""
+    override = os.getenv(_PLATE_KEY_ENV)
+    if override:
+        return bytes.fromhex(override)
+    return hmac.new(
+        bytes.fromhex(_signing_seed_hex()), _PLATE_KEY_CONTEXT, hashlib.sha256
+    ).digest()
+
+
+def plate_key_id(key: bytes) -> str:
+    """Отпечаток ключа номеров — ``allowlist_key_id`` snapshot (сам ключ не раскрывает)."""
+    return hashlib.sha256(b"plate-key:" + key).hexdigest()[:16]
+
+
+def plate_hash(plate_normalized: str, key: bytes) -> str:
+    """Усечённый HMAC-SHA256 нормализованного номера (§12) — элемент allowlist."""
+    digest = hmac.new(key, plate_normalized.encode("utf-8"), hashlib.sha256).hexdigest()
+    return digest[:PLATE_HASH_HEX_LEN]
+
+
+def normalize_allowlist(allowlist: Mapping[str, Iterable[str]]) -> dict[str, list[str]]:
+    """Каноническая форма allowlist: направление → отсортированные уникальные хэши."""
+    return {
+        direction: sorted(set(hashes))
+        for direction, hashes in sorted(allowlist.items())
+        if hashes
+    }
+
+
+def allowlist_digest(allowlist: Mapping[str, Iterable[str]]) -> str:
+    """Версия allowlist = дайджест канонической формы (одинаков на backend и edge)."""
+    blob = json.dumps(
+        normalize_allowlist(allowlist), sort_keys=True, separators=(",", ":")
+    ).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:32]
+
+
+def diff_allowlists(
+    base: Mapping[str, Iterable[str]], current: Mapping[str, Iterable[str]]
+) -> dict:
+    """Дельта ``base`` → ``current``: добавленные/удалённые хэши по направлениям."""
+    added: dict[str, list[str]] = {}
+    removed: dict[str, list[str]] = {}
+    for direction in set(base) | set(current):
+        old = set(base.get(direction, ()))
+        new = set(current.get(direction, ()))
+        if new - old:
+            added[direction] = sorted(new - old)
+        if old - new:
+            removed[direction] = sorted(old - new)
+    return {"base_version": allowlist_digest(base), "added": added, "removed": removed}
+
+
+def apply_allowlist_delta(
+    base: Mapping[str, Iterable[str]], delta: Mapping
+) -> dict[str, list[str]]:
+    """Применить дельту к базовому allowlist (edge). Результат — каноническая форма."""
+    result = {direction: set(hashes) for direction, hashes in base.items()}
+    for direction, hashes in (delta.get("removed") or {}).items():
+        result.get(direction, set()).difference_update(hashes)
+    for direction, hashes in (delta.get("added") or {}).items():
+        result.setdefault(direction, set()).update(hashes)
+    return normalize_allowlist(result)
+
+
+def issue_time(
+    now: dt.datetime | None = None, *, bucket_seconds: int = SNAPSHOT_ISSUE_BUCKET_SECONDS
+) -> dt.datetime:
+    """``issued_at``, округлённый вниз до кванта (для попаданий в кэш подписей)."""
+    moment = now or dt.datetime.now(dt.timezone.utc)
+    if bucket_seconds <= 1:
+        return moment.replace(microsecond=0)
+    epoch = int(moment.timestamp())
+    return dt.datetime.fromtimestamp(epoch - epoch % bucket_seconds, tz=dt.timezone.utc)
+
+
 def build_snapshot(
     *,
     controller_uid: str,
@@ -100,15 +212,21 @@ def build_snapshot(
     offline_mode: str = "fail_closed",
     now: dt.datetime | None = None,
     ttl_seconds: int = SNAPSHOT_TTL_SECONDS,
+    allowlist: Mapping[str, Iterable[str]] | None = None,
+    base_allowlist: Mapping[str, Iterable[str]] | None = None,
 ) -> dict:
-    """Собрать НЕподписанный fail_closed-snapshot (§8.2) для конкретного контроллера.
+    """Собрать НЕподписанный snapshot (§8.2) для конкретного контроллера.
 
     Содержит controller/zone scope, offline_mode, version, issued_at, expires_at,
-    key_id. БЕЗ разрешающего списка номеров (fail_closed пилот, §8.2).
+    key_id. Без ``allowlist`` — fail_closed-snapshot БЕЗ разрешающего списка
+    (пилот, §8.2). С ``allowlist`` — grant-capable snapshot: полный список, либо,
+    если передан ``base_allowlist`` (версия, которая уже есть на edge), только
+    дельта от неё; в обоих случаях — ``allowlist_version`` итогового списка и
+    ``allowlist_key_id`` ключа, которым захэшированы номера.
     """
     issued = now or dt.datetime.now(dt.timezone.utc)
     expires = issued + dt.timedelta(seconds=ttl_seconds)
-    return {
+    snapshot = {
         "controller_uid": controller_uid,
         "zone_id": zone_id,
         "offline_mode": offline_mode,
@@ -117,12 +235,42 @@ def build_snapshot(
         "expires_at": expires.isoformat(),
         "key_id": current_key_id(),
     }
+    if allowlist is not None:
+        snapshot["allowlist_version"] = allowlist_digest(allowlist)
+        snapshot["allowlist_key_id"] = plate_key_id(plate_hash_key())
+        if base_allowlist is not None:
+            snapshot["allowlist_delta"] = diff_allowlists(base_allowlist, allowlist)
+        else:
+            snapshot["allowlist"] = normalize_allowlist(allowlist)
+    return snapshot
+
+
+# Кэш подписей: (отпечаток сида, sha256 канонического payload) → подпись hex.
+# Отпечаток в ключе — смена ключа (ротация/тесты) не отдаёт подпись старым
+# ключом; сам сид в памяти кэша не лежит.
+_signature_cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+_signature_cache_lock = threading.Lock()
+
+
+def _seed_fingerprint() -> str:
+    return hashlib.sha256(b"seed:" + _signing_seed_hex().encode("ascii")).hexdigest()[:32]
 
 
 def sign_snapshot(snapshot: dict) -> SignedSnapshot:
-    """Подписать snapshot приватным Ed25519-ключом backend (§8.2)."""
-    signature = _private_key().sign(canonical_payload(snapshot))
-    return SignedSnapshot(data={**snapshot, "signature": signature.hex()}, signature_hex=signature.hex())
+    """Подписать snapshot приватным Ed25519-ключом backend (§8.2), с кэшем подписей."""
+    payload = canonical_payload(snapshot)
+    cache_key = (_seed_fingerprint(), hashlib.sha256(payload).hexdigest())
+    with _signature_cache_lock:
+        signature_hex = _signature_cache.get(cache_key)
+        if signature_hex is not None:
+            _signature_cache.move_to_end(cache_key)
+    if signature_hex is None:
+        signature_hex = _private_key().sign(payload).hex()
+        with _signature_cache_lock:
+            _signature_cache[cache_key] = signature_hex
+            while len(_signature_cache) > SIGNATURE_CACHE_SIZE:
+                _signature_cache.popitem(last=False)
+    return SignedSnapshot(data={**snapshot, "signature": signature_hex}, signature_hex=signature_hex)
 
 
 def verify_signature(snapshot: dict, public_key: bytes) -> bool:
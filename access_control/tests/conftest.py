@@ -67,6 +67,8 @@ _ACCESS_TABLES = (
     "access_audit_logs",
     "access_entry_confirmations",
     "access_events",
+    "access_review_heads",
+    "access_retention_watermarks",
     "access_decisions",
     "camera_events",
     "controller_sync_events",
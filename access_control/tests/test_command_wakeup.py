@@ -0,0 +1,124 @@
+"""Хаб пробуждений long-poll ``/commands/next`` (§9.2). Без PostgreSQL.
+
+Покрывает: сигнал из чужого потока будит ожидающего своего контроллера (и только
+его), таймаут без сигнала, сигнал до парковки не теряется, и транзакционную
+доставку — сигнал уходит после commit сессии и отбрасывается на rollback.
+"""
+from __future__ import annotations
+
+import ast
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from access_control.services.command_wakeup import (
+    InProcessCommandWakeup,
+    get_command_wakeup,
+    mark_command_created,
+    set_command_wakeup,
+)
+
+
+@pytest.fixture()
+def hub():
+    fresh = InProcessCommandWakeup()
+    set_command_wakeup(fresh)
+    yield fresh
+    set_command_wakeup(None)
+
+
+async def test_notify_from_other_thread_wakes_waiter(hub) -> None:
+    waiter = hub.register(7)
+    try:
+        threading.Timer(0.05, hub.notify, args=(7,)).start()
+        assert await waiter.wait(2.0) is True
+    finally:
+        waiter.close()
+    assert hub.waiting() == 0
+
+
+async def test_other_controller_signal_does_not_wake(hub) -> None:
+    waiter = hub.register(7)
+    try:
+        hub.notify(8)
+        assert await waiter.wait(0.05) is False
+    finally:
+        waiter.close()
+
+
+async def test_signal_before_wait_is_not_lost(hub) -> None:
+    """Команда закоммичена между пустым lease и парковкой — сигнал уже взведён."""
+    waiter = hub.register(7)
+    try:
+        hub.notify(7)
+        await asyncio.sleep(0)  # call_soon_threadsafe доставляет на следующем тике
+        assert await waiter.wait(0.0) is True
+        # Событие сброшено: следующий wait без нового сигнала ждёт до таймаута.
+        assert await waiter.wait(0.01) is False
+    finally:
+        waiter.close()
+
+
+async def test_waiting_counts_per_controller(hub) -> None:
+    a1, a2, b = hub.register(1), hub.register(1), hub.register(2)
+    assert hub.waiting(1) == 2
+    assert hub.waiting() == 3
+    for w in (a1, a2, b):
+        w.close()
+    assert hub.waiting() == 0
+
+
+def _session() -> Session:
+    return Session(create_engine("sqlite://"))
+
+
+async def test_signal_is_sent_after_commit(hub) -> None:
+    waiter = hub.register(5)
+    db = _session()
+    try:
+        mark_command_created(db, 5)
+        assert await waiter.wait(0.01) is False  # до commit сигнала нет
+        db.commit()
+        assert await waiter.wait(1.0) is True
+    finally:
+        waiter.close()
+        db.close()
+
+
+async def test_rollback_discards_pending_signal(hub) -> None:
+    waiter = hub.register(5)
+    db = _session()
+    try:
+        db.connection()  # открыть транзакцию, чтобы rollback был настоящим
+        mark_command_created(db, 5)
+        db.rollback()
+        db.commit()
+        assert await waiter.wait(0.05) is False
+    finally:
+        waiter.close()
+        db.close()
+
+
+def test_default_hub_is_in_process(monkeypatch) -> None:
+    monkeypatch.delenv("ACCESS_EVENT_BROKER", raising=False)
+    set_command_wakeup(None)
+    try:
+        assert isinstance(get_command_wakeup(), InProcessCommandWakeup)
+    finally:
+        set_command_wakeup(None)
+
+
+def test_repository_layer_does_not_import_wakeup() -> None:
+    """Пробуждение помечают сервисы; репозиторий от слоя services не зависит."""
+    import access_control.repositories.barrier_commands_repo as repo
+
+    tree = ast.parse(Path(repo.__file__).read_text(encoding="utf-8"))
+    imported = {
+        node.module for node in ast.walk(tree)
+        if isinstance(node, ast.ImportFrom) and node.module
+    }
+    assert not {m for m in imported if m.startswith("access_control.services")}
@@ -6,16 +6,31 @@ DATABASE_URL), как test_camera_events_api.
 """
 from __future__ import annotations
 
+import threading
+import time
+
 from fastapi.testclient import TestClient
 from sqlalchemy import text
 
+from access_control.api.commands import LONG_POLL_RECHECK_SECONDS
 from access_control.app.main import create_app
+from access_control.edge.anpr_simulator import AnprSimulator
 from access_control.edge.command_consumer import EdgeCommandConsumer
 from access_control.integrations.relay import MockRelay
+from access_control.services.command_wakeup import (
+    InProcessCommandWakeup,
+    set_command_wakeup,
+)
+from access_control.services.metrics import (
+    PHASE_COMMAND_PICKUP,
+    get_latency_registry,
+    reset_latency_registry,
+)
 from access_control.tests.conftest import (
     PilotFixture,
     SigningClient,
     seed_barrier_command,
+    seed_permanent_vehicle,
 )
 
 
@@ -152,3 +167,62 @@ def test_ack_foreign_controller_409(pg_db, pilot: PilotFixture, pilot_b) -> None
         json={"lease_token": body["lease_token"], "result": {"opened": True}},
     )
     assert resp.status_code == 409
+
+
+def test_long_poll_wakes_on_decision_and_opens_relay(
+    pg_db, pilot: PilotFixture
+) -> None:
+    """§9.2/§10.2: припаркованный long-poll просыпается по allow-решению ANPR.
+
+    Edge ждёт ``/commands/next?wait=…`` ДО события; симулятор шлёт номер жителя →
+    решение allow → команда. Long-poll обязан отдать её сразу по сигналу, а не по
+    страховочной перепроверке. Задержка выдачи — фаза ``command_pickup``.
+    """
+    seed_permanent_vehicle(pg_db, pilot, normalized="01A001AA")
+    hub = InProcessCommandWakeup()
+    set_command_wakeup(hub)
+    reset_latency_registry()
+    relay = MockRelay()
+    try:
+        with TestClient(create_app()) as tc:
+            consumer = EdgeCommandConsumer(
+                SigningClient(tc, pilot.controller_uid), pilot.controller_uid, relay
+            )
+            sim = AnprSimulator(
+                tc,
+                controller_uid=pilot.controller_uid,
+                zone_id=pilot.zone_id,
+                gate_id=pilot.gate_id,
+                camera_id=pilot.camera_id,
+                barrier_id=pilot.barrier_id,
+                api_key=pilot.api_key,
+            )
+            outcome: dict = {}
+            poller = threading.Thread(
+                target=lambda: outcome.update(
+                    result=consumer.pull_once(wait=LONG_POLL_RECHECK_SECONDS * 2)
+                )
+            )
+            poller.start()
+            deadline = time.monotonic() + 5.0
+            while hub.waiting(pilot.controller_id) == 0:
+                assert time.monotonic() < deadline, "long-poll не припарковался"
+                time.sleep(0.01)
+
+            started = time.monotonic()
+            resp = sim.send(plate="01A001AA", event_id="lp-1")
+            poller.join(timeout=LONG_POLL_RECHECK_SECONDS * 2)
+            elapsed = time.monotonic() - started
+    finally:
+        set_command_wakeup(None)
+
+    assert resp.status_code == 200
+    assert resp.json()["decision"] == "allow"
+    result = outcome["result"]
+    assert result is not None
+    assert result.command_id == resp.json()["command"]["command_id"]
+    assert result.relay_opened is True and result.acked is True
+    assert relay.open_count(result.command_id) == 1
+    # Выдача по сигналу, а не по страховочной перепроверке.
+    assert elapsed < LONG_POLL_RECHECK_SECONDS
+    assert get_latency_registry().stats(PHASE_COMMAND_PICKUP).count == 1
@@ -12,9 +12,17 @@ from fastapi.testclient import TestClient
 from sqlalchemy import text
 
 from access_control.app.main import create_app
-from access_control.edge.snapshot_verifier import verify_snapshot
-from access_control.services.snapshot_signing import current_key_id, public_key_bytes
-from access_control.tests.conftest import PilotFixture, SigningClient
+from access_control.edge.snapshot_verifier import (
+    CACHED_PERMANENT_ONLY,
+    SnapshotVerifier,
+    verify_snapshot,
+)
+from access_control.services.snapshot_signing import (
+    current_key_id,
+    plate_hash_key,
+    public_key_bytes,
+)
+from access_control.tests.conftest import PilotFixture, SigningClient, seed_permanent_vehicle
 
 
 def _client(uid: str) -> SigningClient:
@@ -101,3 +109,38 @@ def test_access_snapshot_only_own_controller(pg_db, pilot: PilotFixture, pilot_b
         f"/api/v1/access/edge/{pilot_b.controller_uid}/access-snapshot"
     )
     assert resp_foreign.status_code == 403
+
+
+def test_access_snapshot_cached_permanent_only_allowlist_and_delta(
+    pg_db, pilot: PilotFixture
+) -> None:
+    """cached_permanent_only: allowlist постоянных авто зоны + дельта по since_version."""
+    pg_db.execute(
+        text("UPDATE edge_controllers SET offline_mode = 'cached_permanent_only' WHERE id = :id"),
+        {"id": pilot.controller_id},
+    )
+    pg_db.commit()
+    seed_permanent_vehicle(pg_db, pilot, normalized="01A111AA")
+    seed_permanent_vehicle(pg_db, pilot, normalized="01A222BB", with_rule=False)
+    client = _client(pilot.controller_uid)
+    url = f"/api/v1/access/edge/{pilot.controller_uid}/access-snapshot"
+
+    full = client.get(url).json()
+    assert full["offline_mode"] == CACHED_PERMANENT_ONLY
+    verifier = SnapshotVerifier(
+        current_key_id(),
+        public_key_bytes(),
+        expected_controller_uid=pilot.controller_uid,
+        offline_mode=CACHED_PERMANENT_ONLY,
+        plate_hash_key=plate_hash_key(),
+    )
+    assert verifier.accept(full).accepted is True
+    assert verifier.allows("01A111AA", "entry") is True
+    assert verifier.allows("01A222BB", "entry") is False  # без access_rule
+
+    seed_permanent_vehicle(pg_db, pilot, normalized="01A333CC")
+    delta = client.get(url, params={"since_version": verifier.allowlist_version}).json()
+    assert "allowlist" not in delta
+    assert verifier.accept(delta).accepted is True
+    assert verifier.allows("01A333CC", "entry") is True
+    assert verifier.allows("01A111AA", "entry") is True
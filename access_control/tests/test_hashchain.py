@@ -11,6 +11,7 @@
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
 
 import pytest
 from sqlalchemy import text
@@ -75,3 +76,24 @@ def test_table_lock_key_is_deterministic_and_positive() -> None:
     assert k1 == k2
     assert 0 <= k1 <= 0x7FFFFFFF
     assert _table_lock_key("access_events") != k1
+
+
+def test_next_hashes_links_batch_in_memory() -> None:
+    """Пачка связывается так же, как последовательные ``next_hash``: prev = row предыдущей."""
+    from unittest.mock import MagicMock
+
+    from access_control.services.hashchain import _canonical_json, next_hashes
+
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "sqlite"
+    db.execute.return_value.scalar.return_value = "tail"
+    payloads = [{"n": 1}, {"n": 2}, {"n": 3}]
+
+    links = next_hashes(db, "access_decisions", payloads)
+
+    assert db.execute.call_count == 1  # одно чтение хвоста на пачку
+    assert links[0][0] == "tail"
+    for (_, prior_row), (prev, row), payload in zip(links, links[1:], payloads[1:]):
+        assert prev == prior_row
+        assert row == hashlib.sha256((prev + _canonical_json(payload)).encode()).hexdigest()
+    assert next_hashes(db, "access_decisions", []) == []
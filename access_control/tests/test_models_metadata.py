@@ -64,14 +64,18 @@ def test_camera_events_idempotency_unique() -> None:
 
 
 def test_access_events_idempotency_unique() -> None:
-    """access_events несёт UNIQUE(controller_id, event_id) — один проезд на event §10.1."""
+    """access_events несёт UNIQUE(controller_id, event_id, occurred_at) — один проезд на event §10.1.
+
+    ``occurred_at`` — ключ партиционирования (миграция 018): PostgreSQL требует его
+    в каждом UNIQUE partitioned-таблицы. У повтора event_id он тот же (captured_at).
+    """
     table = Base.metadata.tables["access_events"]
     unique_cols = {
         tuple(c.name for c in uc.columns)
         for uc in table.constraints
         if uc.__class__.__name__ == "UniqueConstraint"
     }
-    assert ("controller_id", "event_id") in unique_cols
+    assert ("controller_id", "event_id", "occurred_at") in unique_cols
 
 
 def test_controller_sync_events_idempotency_unique() -> None:
@@ -330,7 +330,9 @@ def test_envelope_shape(pg_db, pilot) -> None:
     uid = seed_user(pg_db, roles="manager")
     client = _client(uid, "manager")
     body = client.get("/api/v1/access/events").json()
-    assert set(body.keys()) == {"items", "total", "limit", "offset"}
+    assert set(body.keys()) == {
+        "items", "total", "limit", "offset", "next_cursor", "total_estimated",
+    }
     assert isinstance(body["items"], list)
     assert body["limit"] == 50
     assert body["offset"] == 0
@@ -488,6 +490,64 @@ def test_events_pagination(pg_db, pilot) -> None:
     assert len(body2["items"]) == 1
 
 
+def test_events_keyset_cursor_walks_all_pages(pg_db, pilot) -> None:
+    """Курсор next_cursor обходит журнал без пропусков/дублей; на последней — None."""
+    uid = seed_user(pg_db, roles="manager")
+    base = utcnow()
+    for i in range(5):
+        _seed_camera_event(
+            pg_db,
+            pilot,
+            event_id=f"ev-ks-{i}",
+            plate=f"01K00{i}K",
+            # Две пары с одинаковым captured_at — порядок добивается id.
+            captured_at=base - dt.timedelta(minutes=i // 2),
+        )
+    pg_db.commit()
+    client = _client(uid, "manager")
+    seen: list[str] = []
+    url = "/api/v1/access/events?limit=2"
+    body = client.get(url).json()
+    assert body["total"] == 5 and body["total_estimated"] is False
+    while True:
+        seen.extend(item["event_id"] for item in body["items"])
+        if body["next_cursor"] is None:
+            break
+        body = client.get(url, params={"cursor": body["next_cursor"]}).json()
+    assert len(seen) == 5 and len(set(seen)) == 5
+    # captured_at DESC, затем id DESC внутри одинакового времени.
+    assert seen == ["ev-ks-1", "ev-ks-0", "ev-ks-3", "ev-ks-2", "ev-ks-4"]
+
+
+def test_events_invalid_cursor_400(pg_db, pilot) -> None:
+    uid = seed_user(pg_db, roles="manager")
+    client = _client(uid, "manager")
+    resp = client.get("/api/v1/access/events", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+def test_vehicles_keyset_cursor(pg_db, pilot) -> None:
+    uid = seed_user(pg_db, roles="manager")
+    for i in range(3):
+        pg_db.execute(
+            text(
+                "INSERT INTO vehicles (plate_number_original, plate_number_normalized, "
+                "status) VALUES (:p, :p, 'active')"
+            ),
+            {"p": f"01KV{i}00"},
+        )
+    pg_db.commit()
+    client = _client(uid, "manager")
+    first = client.get("/api/v1/access/vehicles?limit=2").json()
+    assert len(first["items"]) == 2 and first["next_cursor"]
+    second = client.get(
+        "/api/v1/access/vehicles", params={"limit": 2, "cursor": first["next_cursor"]}
+    ).json()
+    assert len(second["items"]) == 1 and second["next_cursor"] is None
+    ids = [v["id"] for v in first["items"] + second["items"]]
+    assert len(set(ids)) == 3
+
+
 def test_events_sorted_desc_by_captured_at(pg_db, pilot) -> None:
     uid = seed_user(pg_db, roles="manager")
     base = utcnow()
@@ -0,0 +1,130 @@
+"""Партиции журнала проезда (миграция 018): маршрутизация, retention DROP, hash-chain.
+
+``access_events`` — RANGE по ``occurred_at``: месячные ``access_events_pYYYYMM``,
+``_legacy`` (всё до партиционирования) и ``_default``. Retention (§11) удаляет
+партицию целиком и записывает в audit «якоря» — ``row_hash`` удалённых строк,
+на которые ссылаются оставшиеся; ``verify_chain`` принимает разрыв только по
+записанному якорю. Тесты DROP не исполняют (схема тестовой БД общая) —
+проверяется ``dry_run`` и приём якорей верификатором.
+"""
+from __future__ import annotations
+
+import datetime as dt
+
+import pytest
+from sqlalchemy import text
+
+from access_control.repositories import audit_repo
+from access_control.services import partitions
+from access_control.services.hashchain import next_hash, verify_chain
+from access_control.tests.conftest import utcnow
+
+
+def _insert_event(db, pilot, event_id: str, occurred_at: dt.datetime, *, prev=None):
+    """Строка журнала со звеном hash-chain; ``prev`` — подменить ``prev_hash``."""
+    payload = {"controller_id": pilot.controller_id, "event_id": event_id}
+    prev_hash, row_hash = next_hash(db, "access_events", payload)
+    return db.execute(
+        text(
+            "INSERT INTO access_events "
+            "(controller_id, event_id, direction, occurred_at, prev_hash, row_hash) "
+            "VALUES (:c, :e, 'entry', :occ, :prev, :row) "
+            "RETURNING id, tableoid::regclass::text AS part, row_hash"
+        ),
+        {
+            "c": pilot.controller_id,
+            "e": event_id,
+            "occ": occurred_at,
+            "prev": prev_hash if prev is None else prev,
+            "row": row_hash,
+        },
+    ).mappings().one()
+
+
+def test_ensure_partitions_idempotent_and_inserts_routed(pg_db, pilot) -> None:
+    partitions.ensure_partitions(pg_db, 2)
+    assert partitions.ensure_partitions(pg_db, 2) == 0
+
+    names = {p.name for p in partitions.list_partitions(pg_db)}
+    now = utcnow()
+    assert f"access_events_p{now:%Y%m}" in names or "access_events_legacy" in names
+    assert "access_events_default" in names
+
+    old = _insert_event(
+        pg_db, pilot, "ev-old", dt.datetime(2001, 5, 1, tzinfo=dt.timezone.utc)
+    )
+    far = _insert_event(pg_db, pilot, "ev-far", now + dt.timedelta(days=3650))
+    assert old["part"] == "access_events_legacy"
+    assert far["part"] == "access_events_default"
+
+
+def test_drop_expired_dry_run_reports_anchor_and_changes_nothing(pg_db, pilot) -> None:
+    legacy_rows = [
+        _insert_event(
+            pg_db, pilot, f"ev-l{i}", dt.datetime(2001, 5, 1 + i, tzinfo=dt.timezone.utc)
+        )
+        for i in range(2)
+    ]
+    # Заведомо позже legacy-диапазона (месячная партиция или default).
+    _insert_event(pg_db, pilot, "ev-later", utcnow() + dt.timedelta(days=100))
+    pg_db.commit()
+
+    # Через 400 дней legacy (верхняя граница ≤ месяц после миграции) просрочена.
+    report = partitions.drop_expired_partitions(
+        pg_db, now=utcnow() + dt.timedelta(days=400), dry_run=True
+    )
+    legacy = next(d for d in report if d.name == "access_events_legacy")
+    assert legacy.rows == 2
+    # Следующее звено после последней legacy-строки лежит в месячной партиции.
+    assert legacy.anchors == [legacy_rows[-1]["row_hash"]]
+
+    names = {p.name for p in partitions.list_partitions(pg_db)}
+    assert "access_events_legacy" in names
+    assert pg_db.execute(
+        text("SELECT count(*) FROM access_audit_logs WHERE action = :a"),
+        {"a": partitions.PARTITION_DROPPED_ACTION},
+    ).scalar_one() == 0
+
+
+def test_verify_chain_accepts_only_recorded_anchors(pg_db, pilot) -> None:
+    now = utcnow()
+    _insert_event(pg_db, pilot, "ev-1", now)
+    _insert_event(pg_db, pilot, "ev-2", now)
+    # Строка, чей предшественник «удалён вместе с партицией».
+    orphan = _insert_event(pg_db, pilot, "ev-3", now, prev="f" * 64)
+    _insert_event(pg_db, pilot, "ev-4", now)
+
+    report = verify_chain(pg_db, "access_events", batch_size=2)
+    assert report.checked == 4
+    assert report.breaks == [orphan["id"]]
+
+    audit_repo.insert(
+        pg_db,
+        actor_user_id=None,
+        action=partitions.PARTITION_DROPPED_ACTION,
+        entity_type="partition",
+        entity_id=None,
+        barrier_id=None,
+        source="partition_retention",
+        reason="retention 365d",
+        extra_details={
+            "table": "access_events",
+            "partition": "access_events_p200105",
+            "anchors": ["f" * 64],
+        },
+    )
+    pg_db.flush()
+    anchors = partitions.partition_drop_anchors(pg_db)
+    report = verify_chain(pg_db, "access_events", anchors=anchors)
+    assert report.ok
+    assert report.anchored == [orphan["id"]]
+
+
+def test_verify_chain_rejects_unknown_table(pg_db) -> None:
+    with pytest.raises(ValueError):
+        verify_chain(pg_db, "users")
+
+
+def test_partition_helpers_reject_unpartitioned_table(pg_db) -> None:
+    with pytest.raises(ValueError):
+        partitions.list_partitions(pg_db, "camera_events")
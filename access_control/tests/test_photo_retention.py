@@ -1,17 +1,19 @@
-"""Retention фото (§11): отбор и анонимизация фото старше 30 дней.
+"""Retention фото (§11): отбор, удаление объектов и анонимизация фото старше 30 дней.
 
 Базовая техническая политика §11: «Фото номера и автомобиля — 30 дней».
-Пилот синтетический и реального object-storage нет: механизм обнуляет
-``*_photo_url`` у старых ``camera_events`` (ссылки на фото) — реальное удаление
-байтов в приватном storage остаётся инфра-задачей (прод-долг, S3/MinIO).
+Объекты удаляются через подменяемый storage (здесь — ``LocalPhotoStorage`` на
+``tmp_path`` вместо медиа-сервиса), ссылки ``*_photo_url`` обнуляются чанками
+от watermark'а.
 
 ``camera_events`` — НЕ append-only (сырой слой, §9.7 hash-chain только на
 бизнес-журнале/аудите), поэтому UPDATE разрешён DB grants.
 """
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
 
+import pytest
 from sqlalchemy import text
 
 from access_control.services import photo_retention as pr
@@ -77,3 +79,169 @@ def test_purge_nulls_old_photo_urls_only(pg_db, pilot) -> None:
 
 def test_purge_default_retention_days_constant() -> None:
     assert pr.PHOTO_RETENTION_DAYS == 30
+
+
+def _seed_file_photos(db, pilot, root, n: int, *, now) -> list[int]:
+    """n старых событий с фото ``file://`` под ``root`` (файлы создаются)."""
+    ids = []
+    for i in range(n):
+        (root / f"p{i}.jpg").write_bytes(b"jpeg")
+        ids.append(
+            _seed_camera_event(
+                db, pilot, event_id=f"ev-f{i}", plate=f"01F{i:03d}AA",
+                captured_at=now - dt.timedelta(days=40, minutes=n - i),
+                plate_photo_url=f"file://p{i}.jpg",
+            )
+        )
+    db.commit()
+    return ids
+
+
+def _watermark(db):
+    return db.execute(
+        text(
+            "SELECT camera_event_id FROM access_retention_watermarks WHERE job = :j"
+        ),
+        {"j": pr.PHOTO_RETENTION_JOB},
+    ).scalar()
+
+
+def test_purge_walks_chunks_deletes_objects_and_persists_watermark(
+    pg_db, pilot, tmp_path
+) -> None:
+    now = utcnow()
+    ids = _seed_file_photos(pg_db, pilot, tmp_path, 5, now=now)
+    storage = pr.LocalPhotoStorage(tmp_path)
+
+    # max_chunks=2 по 2 события — прогон прерван посередине.
+    assert pr.purge_expired_photos(
+        pg_db, now=now, storage=storage, chunk_size=2, max_chunks=2
+    ) == 4
+    assert _watermark(pg_db) == ids[3]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["p4.jpg"]
+    assert _has_photos(pg_db, ids[4]) is True
+
+    # Следующий прогон продолжает с watermark'а.
+    assert pr.purge_expired_photos(pg_db, now=now, storage=storage, chunk_size=2) == 1
+    assert list(tmp_path.iterdir()) == []
+    assert not any(_has_photos(pg_db, i) for i in ids)
+    assert pr.purge_expired_photos(pg_db, now=now, storage=storage, chunk_size=2) == 0
+
+
+class _FlakyStorage(pr.LocalPhotoStorage):
+    """Падает на удалении заданного объекта."""
+
+    def __init__(self, root, broken: str) -> None:
+        super().__init__(root)
+        self.broken = broken
+
+    async def delete(self, ref: str) -> None:
+        if ref == self.broken:
+            raise OSError("storage unavailable")
+        await super().delete(ref)
+
+
+def test_purge_stops_at_failed_object_and_resumes(pg_db, pilot, tmp_path) -> None:
+    now = utcnow()
+    ids = _seed_file_photos(pg_db, pilot, tmp_path, 3, now=now)
+
+    flaky = _FlakyStorage(tmp_path, broken="file://p1.jpg")
+    assert pr.purge_expired_photos(pg_db, now=now, storage=flaky) == 1
+    assert _watermark(pg_db) == ids[0]
+    assert _has_photos(pg_db, ids[1]) is True
+    assert _has_photos(pg_db, ids[2]) is True
+
+    # Storage починили: p2 уже удалён прошлой попыткой — это не ошибка.
+    assert pr.purge_expired_photos(
+        pg_db, now=now, storage=pr.LocalPhotoStorage(tmp_path)
+    ) == 2
+    assert list(tmp_path.iterdir()) == []
+    assert _watermark(pg_db) == ids[2]
+
+
+def _blocked(db):
+    return db.execute(
+        text(
+            "SELECT blocked_event_id, blocked_attempts FROM access_retention_watermarks "
+            "WHERE job = :j"
+        ),
+        {"j": pr.PHOTO_RETENTION_JOB},
+    ).one()
+
+
+def test_purge_parks_object_that_never_deletes(pg_db, pilot, tmp_path) -> None:
+    """Вечно падающий объект не держит watermark: после лимита попыток событие паркуется."""
+    now = utcnow()
+    ids = _seed_file_photos(pg_db, pilot, tmp_path, 3, now=now)
+    broken = _FlakyStorage(tmp_path, broken="file://p1.jpg")
+
+    assert pr.purge_expired_photos(pg_db, now=now, storage=broken, max_attempts=3) == 1
+    assert tuple(_blocked(pg_db)) == (ids[1], 1)
+    assert pr.purge_expired_photos(pg_db, now=now, storage=broken, max_attempts=3) == 0
+    assert tuple(_blocked(pg_db)) == (ids[1], 2)
+    assert _watermark(pg_db) == ids[0]
+
+    # Третья попытка: событие паркуется, обход уходит дальше.
+    assert pr.purge_expired_photos(pg_db, now=now, storage=broken, max_attempts=3) == 1
+    assert _watermark(pg_db) == ids[2]
+    assert tuple(_blocked(pg_db)) == (None, 0)
+    assert _has_photos(pg_db, ids[1]) is True  # ссылка оставлена — объект ещё в storage
+    assert _has_photos(pg_db, ids[2]) is False
+    assert [p.name for p in tmp_path.iterdir()] == ["p1.jpg"]
+    assert ids[1] in pr.select_expired_photo_event_ids(pg_db, now=now)
+
+
+class _TxProbeStorage(pr.LocalPhotoStorage):
+    """Запоминает, была ли открыта транзакция сессии во время удаления."""
+
+    def __init__(self, root, db) -> None:
+        super().__init__(root)
+        self.db = db
+        self.in_tx: list[bool] = []
+
+    async def delete(self, ref: str) -> None:
+        self.in_tx.append(self.db.in_transaction())
+        await super().delete(ref)
+
+
+def test_purge_deletes_objects_outside_transaction(pg_db, pilot, tmp_path) -> None:
+    now = utcnow()
+    _seed_file_photos(pg_db, pilot, tmp_path, 2, now=now)
+    probe = _TxProbeStorage(tmp_path, pg_db)
+
+    assert pr.purge_expired_photos(pg_db, now=now, storage=probe) == 2
+    assert probe.in_tx == [False, False]
+
+
+def test_local_storage_rejects_refs_outside_root(tmp_path) -> None:
+    storage = pr.LocalPhotoStorage(tmp_path / "photos")
+    assert storage.owns("file://a.jpg") is True
+    assert storage.owns("media://12") is False
+    with pytest.raises(ValueError):
+        storage.path_for("file://../secret.jpg")
+
+
+def test_delete_objects_respects_concurrency_bound() -> None:
+    active = 0
+    peak = 0
+    closed = []
+
+    class _Probe:
+        async def delete(self, ref: str) -> None:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if ref == "bad":
+                raise OSError(ref)
+
+        async def aclose(self) -> None:
+            closed.append(True)
+
+    refs = [f"r{i}" for i in range(10)] + ["bad"]
+    results = asyncio.run(pr._delete_objects(_Probe(), refs, concurrency=3))
+    assert peak == 3
+    assert [type(r) for r in results[-1:]] == [OSError]
+    assert all(r is None for r in results[:-1])
+    assert closed == [True]
@@ -0,0 +1,156 @@
+"""Индекс кандидатов номера (§12): deletion-neighbourhood поиск и синк процесса.
+
+Чистые тесты индекса идут без БД; синк из ``vehicles`` — на PostgreSQL
+(``pg_db``). Кандидаты — только подсказка оператору, решение по ним движок
+не принимает (§12, решение CTO #2).
+"""
+from __future__ import annotations
+
+import os
+
+import pytest
+from sqlalchemy import text
+
+from access_control.services import plate_index
+from access_control.services.plate_index import (
+    PlateCandidateIndex,
+    _edit_distance,
+    find_plate_candidates,
+    refresh_plate_index,
+    reset_plate_index,
+)
+
+
+@pytest.fixture
+def index() -> PlateCandidateIndex:
+    idx = PlateCandidateIndex(max_distance=2)
+    idx.upsert(1, "01A777AA", "01A777AA", "active")
+    idx.upsert(2, "01A777AB", "01A777AB", "active")
+    idx.upsert(3, "01A777A8", "01A777A8", "active")
+    idx.upsert(4, "40X123YZ", "40X123YZ", "active")
+    return idx
+
+
+def test_edit_distance_bounded() -> None:
+    assert _edit_distance("01A777AA", "01A777AA", 2) == 0
+    assert _edit_distance("01A777AA", "01A77AA", 2) == 1
+    assert _edit_distance("01A777AA", "01B777AB", 2) == 2
+    assert _edit_distance("01A777AA", "99Z000ZZ", 2) == 3
+    assert _edit_distance("01A777AA", "01A", 2) == 3
+
+
+def test_lookup_finds_substitution_and_deletion(index) -> None:
+    found = index.lookup("01A77AA")
+    assert [c.vehicle_id for c in found][:1] == [1]
+    assert found[0].distance == 1
+
+    found = index.lookup("40X128YZ")
+    assert [c.vehicle_id for c in found] == [4]
+
+
+def test_confusable_substitution_ranked_first(index) -> None:
+    # «B» → «8» — типичная ошибка ANPR: 01A777A8 дешевле, чем 01A777AA
+    # при том же расстоянии 1.
+    found = index.lookup("01A777AB", exclude_exact=True)
+    assert [c.vehicle_id for c in found[:2]] == [3, 1]
+    assert found[0].cost < found[1].cost
+
+
+def test_exclude_exact_and_limit(index) -> None:
+    assert index.lookup("01A777AA")[0].vehicle_id == 1
+    assert 1 not in {c.vehicle_id for c in index.lookup("01A777AA", exclude_exact=True)}
+    assert len(index.lookup("01A777AA", limit=2)) == 2
+
+
+def test_max_distance_capped_by_index(index) -> None:
+    assert index.lookup("01B777BB", max_distance=1) == []
+    assert [c.vehicle_id for c in index.lookup("01B777BB")][:1] == [2]
+    shallow = PlateCandidateIndex(max_distance=1)
+    shallow.upsert(1, "01A777AA", "01A777AA", "active")
+    assert shallow.lookup("01B777AB", max_distance=2) == []
+
+
+def test_upsert_rekey_archive_and_remove(index) -> None:
+    index.upsert(4, "40X123YY", "40X123YY", "blocked")
+    assert index.lookup("40X123YY")[0].status == "blocked"
+    assert index.lookup("40X123YZ", max_distance=0) == []
+
+    index.upsert(4, "40X123YY", "40X123YY", "archived")
+    assert index.lookup("40X123YY") == []
+    assert len(index) == 3
+
+    index.remove(1)
+    index.remove(1)
+    assert 1 not in {c.vehicle_id for c in index.lookup("01A777AA")}
+    # Вариант-удаление, общий с оставшимися ключами, не потерян.
+    assert {c.vehicle_id for c in index.lookup("01A777A")} == {2, 3}
+
+
+def test_same_key_shared_by_several_vehicles() -> None:
+    idx = PlateCandidateIndex(max_distance=1)
+    idx.upsert(10, "01A777AA", "01A777AA", "active")
+    idx.upsert(11, "01A777AA", "01А777АА", "active")
+    assert [c.vehicle_id for c in idx.lookup("01A777AB")] == [10, 11]
+    idx.remove(10)
+    assert [c.vehicle_id for c in idx.lookup("01A777AB")] == [11]
+
+
+def _insert_vehicle(db, plate: str, status: str = "active") -> int:
+    vid = db.execute(
+        text(
+            "INSERT INTO vehicles "
+            "(plate_number_original, plate_number_normalized, recognition_key, "
+            " plate_country, vehicle_class, status) "
+            "VALUES (:p, :p, :p, 'UZ', 'car', :st) RETURNING id"
+        ),
+        {"p": plate, "st": status},
+    ).scalar_one()
+    db.commit()
+    return vid
+
+
+def test_process_index_builds_and_catches_up(pg_db) -> None:
+    reset_plate_index()
+    try:
+        first = _insert_vehicle(pg_db, "01A777AA")
+        _insert_vehicle(pg_db, "01A555AA", status="archived")
+        refresh_plate_index(pg_db)
+        found = find_plate_candidates("01A777A8")
+        assert [c.vehicle_id for c in found] == [first]
+
+        # Авто из другого процесса появляется после очередного фонового тика.
+        second = _insert_vehicle(pg_db, "01A777AB")
+        assert {c.vehicle_id for c in find_plate_candidates("01A777A8")} == {first}
+        refresh_plate_index(pg_db)
+        found = find_plate_candidates("01A777A8", exclude_exact=True)
+        assert {c.vehicle_id for c in found} == {first, second}
+
+        # Изменение существующего авто догоняется по updated_at.
+        pg_db.execute(
+            text("UPDATE vehicles SET status = 'archived', updated_at = now() WHERE id = :id"),
+            {"id": second},
+        )
+        pg_db.commit()
+        refresh_plate_index(pg_db)
+        found = find_plate_candidates("01A777A8", exclude_exact=True)
+        assert {c.vehicle_id for c in found} == {first}
+    finally:
+        reset_plate_index()
+
+
+def test_lookup_before_build_does_not_block(monkeypatch) -> None:
+    """Пока индекса нет, запрос не строит его сам — пустой ответ и фоновое построение."""
+    woken = []
+    monkeypatch.setattr(plate_index, "_build_in_background", lambda: woken.append(True))
+    reset_plate_index()
+    try:
+        assert find_plate_candidates("01A777A8") == []
+        assert woken == [True]
+    finally:
+        reset_plate_index()
+
+
+def test_default_max_distance_is_one() -> None:
+    assert PlateCandidateIndex().max_distance == plate_index.PLATE_INDEX_MAX_DISTANCE
+    if "ACCESS_PLATE_INDEX_MAX_DISTANCE" not in os.environ:
+        assert plate_index.PLATE_INDEX_MAX_DISTANCE == 1
@@ -0,0 +1,142 @@
+"""Append-only журнал edge-дедупа ``FileProcessedStore`` (§9.2). Без PostgreSQL.
+
+Покрывает: восстановление индекса после рестарта, отрезание оборванного хвоста
+(torn write) и битой по crc32 записи, TTL-отсев, компакцию (по дублям и по
+времени — протухшие уникальные id без рестарта) и конвертацию старого
+JSON-формата.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from access_control.edge import command_consumer
+from access_control.edge.command_consumer import FileProcessedStore
+from access_control.integrations.relay import RelayResult
+
+
+def _result(command_id: str, *, opened: bool = True) -> RelayResult:
+    return RelayResult(command_id=command_id, opened=opened, deduplicated=False)
+
+
+def test_put_appends_and_restart_restores_index(tmp_path) -> None:
+    path = str(tmp_path / "processed.log")
+    store = FileProcessedStore(path)
+    store.put("cmd-1", _result("cmd-1"))
+    size_one = os.path.getsize(path)
+    store.put("cmd-2", _result("cmd-2", opened=False))
+    # Append-only: второй put дописал одну запись, а не переписал файл.
+    assert os.path.getsize(path) < 2 * size_one + 16
+    store.close()
+
+    reopened = FileProcessedStore(path)
+    assert reopened.get("cmd-1").opened is True
+    assert reopened.get("cmd-2").opened is False
+    assert reopened.get("cmd-3") is None
+
+
+def test_torn_tail_is_truncated_and_store_keeps_working(tmp_path) -> None:
+    """Потеря питания посреди записи: целые записи живы, обрывок отрезан."""
+    path = str(tmp_path / "processed.log")
+    store = FileProcessedStore(path)
+    store.put("cmd-1", _result("cmd-1"))
+    store.put("cmd-2", _result("cmd-2"))
+    store.close()
+    intact = os.path.getsize(path)
+    with open(path, "ab") as fh:
+        fh.write(b"\x00\x00\x00\x40\x12\x34")  # заголовок без payload
+
+    recovered = FileProcessedStore(path)
+    assert recovered.get("cmd-1") is not None
+    assert recovered.get("cmd-2") is not None
+    assert os.path.getsize(path) == intact
+    recovered.put("cmd-3", _result("cmd-3"))
+    recovered.close()
+    assert FileProcessedStore(path).get("cmd-3") is not None
+
+
+def test_corrupted_record_stops_replay_at_last_good(tmp_path) -> None:
+    path = str(tmp_path / "processed.log")
+    store = FileProcessedStore(path)
+    store.put("cmd-1", _result("cmd-1"))
+    boundary = os.path.getsize(path)
+    store.put("cmd-2", _result("cmd-2"))
+    store.close()
+    with open(path, "r+b") as fh:
+        fh.seek(boundary + 12)
+        fh.write(b"X")  # порча payload второй записи → crc32 не сойдётся
+
+    recovered = FileProcessedStore(path)
+    assert recovered.get("cmd-1") is not None
+    assert recovered.get("cmd-2") is None
+    assert os.path.getsize(path) == boundary
+
+
+def test_expired_records_are_pruned_on_startup(tmp_path) -> None:
+    path = str(tmp_path / "processed.log")
+    store = FileProcessedStore(path, ttl_seconds=60)
+    store.put("old", _result("old"))
+    store.close()
+
+    later = FileProcessedStore(path, ttl_seconds=-1)  # всё уже «старше» TTL
+    assert later.get("old") is None
+
+
+def test_compaction_keeps_only_live_records(tmp_path) -> None:
+    path = str(tmp_path / "processed.log")
+    store = FileProcessedStore(path, compact_min_records=4, fsync=False)
+    for _ in range(10):
+        store.put("cmd-hot", _result("cmd-hot"))  # дубли — мёртвые записи
+    store.put("cmd-other", _result("cmd-other"))
+    store.close()
+
+    reopened = FileProcessedStore(path)
+    assert reopened.get("cmd-hot") is not None
+    assert reopened.get("cmd-other") is not None
+    assert reopened._records <= 4
+
+
+def test_expired_unique_ids_are_compacted_without_restart(tmp_path, monkeypatch) -> None:
+    """Уникальные command_id дублей не дают: протухшие уходят по времени."""
+    clock = [1_000.0]
+    monkeypatch.setattr(command_consumer.time, "time", lambda: clock[0])
+    path = str(tmp_path / "processed.log")
+    store = FileProcessedStore(path, ttl_seconds=60, compact_min_records=4, fsync=False)
+    for i in range(6):
+        store.put(f"cmd-{i}", _result(f"cmd-{i}"))
+    grown = os.path.getsize(path)
+    assert len(store._data) == 6
+
+    clock[0] += 61
+    store.put("cmd-fresh", _result("cmd-fresh"))
+
+    assert set(store._data) == {"cmd-fresh"}
+    assert os.path.getsize(path) < grown
+    assert store.get("cmd-0") is None
+    store.close()
+    assert FileProcessedStore(path, ttl_seconds=60).get("cmd-fresh") is not None
+
+
+def test_legacy_json_file_is_converted(tmp_path) -> None:
+    path = str(tmp_path / "processed.json")
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"cmd-X": {"opened": True, "detail": None}}, fh)
+
+    store = FileProcessedStore(path)
+    assert store.get("cmd-X").opened is True
+    store.close()
+    with open(path, "rb") as fh:
+        assert fh.read(1) != b"{"  # уже журнал
+    assert FileProcessedStore(path).get("cmd-X") is not None
+
+
+def test_repeated_put_latest_wins(tmp_path) -> None:
+    """Повторный put обновляет запись: индекс отдаёт последнюю версию."""
+    path = str(tmp_path / "processed.log")
+    store = FileProcessedStore(path)
+    store.put("cmd-1", _result("cmd-1", opened=False))
+    time.sleep(0.001)
+    store.put("cmd-1", _result("cmd-1", opened=True))
+    store.close()
+    assert FileProcessedStore(path).get("cmd-1").opened is True
@@ -60,18 +60,22 @@ async def test_stop_event_ends_loop_promptly():
     # Дошли сюда без таймаута — цикл не заснул на весь interval после stop.
 
 
-# ── start/stop: пара задач и кооперативное завершение ───────────────────────
+# ── start/stop: задачи циклов и кооперативное завершение ───────────────────────
 
 
 @pytest.mark.asyncio
-async def test_start_creates_both_workers_and_stop_joins_them(monkeypatch):
+async def test_start_creates_all_workers_and_stop_joins_them(monkeypatch):
     monkeypatch.setattr(rw, "_review_tick", lambda: 0)
     monkeypatch.setattr(rw, "_photo_tick", lambda: 0)
+    monkeypatch.setattr(rw, "_partition_tick", lambda: 0)
+    monkeypatch.setattr(rw, "_plate_index_tick", lambda: 0)
+    monkeypatch.setattr(rw, "_plate_index_interval", lambda: 0.01)
     monkeypatch.setattr(rw, "REVIEW_TICK_SECONDS", 0.01)
     monkeypatch.setattr(rw, "PHOTO_TICK_SECONDS", 0.01)
+    monkeypatch.setattr(rw, "PARTITION_TICK_SECONDS", 0.01)
 
     tasks, stop = rw.start_retention_workers()
-    assert len(tasks) == 2
+    assert len(tasks) == 4
     await asyncio.sleep(0.05)  # дать циклам поработать
     await asyncio.wait_for(rw.stop_retention_workers(tasks, stop), timeout=5)
     assert all(t.done() for t in tasks)
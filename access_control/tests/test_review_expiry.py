@@ -187,3 +187,66 @@ def test_lazy_expiry_audit_actor_is_system(pg_db, pilot: PilotFixture) -> None:
     assert row is not None
     assert row[0] is None  # actor = system, не оператор
     assert row[1]["triggered_by_user_id"] == op
+
+
+def _heads(db) -> list[int]:
+    return db.execute(
+        text("SELECT decision_id FROM access_review_heads ORDER BY decision_id")
+    ).scalars().all()
+
+
+def test_review_heads_track_current_pending(pg_db, pilot: PilotFixture) -> None:
+    """§9.5: голова ставится на pending и снимается любым следующим решением."""
+    op = seed_user(pg_db, roles="security_operator")
+    pending = seed_pending_review(
+        pg_db, pilot, deadline_at=utcnow() + dt.timedelta(seconds=120)
+    )
+    assert _heads(pg_db) == [pending.decision_id]
+
+    resolve_event(
+        pg_db,
+        event_id=pending.camera_event_id,
+        action="deny",
+        operator_user_id=op,
+        reason="чужой",
+        barrier_id=pilot.barrier_id,
+        decision_id=pending.decision_id,
+        source="operator_resolve",
+    )
+    assert _heads(pg_db) == []
+
+
+def test_worker_expires_due_batch_and_leaves_rest(pg_db, pilot: PilotFixture) -> None:
+    """Tick берёт не больше ``batch_size`` просроченных; остаток — следующий tick."""
+    past = utcnow() - dt.timedelta(seconds=1)
+    pendings = [seed_pending_review(pg_db, pilot, deadline_at=past) for _ in range(5)]
+    fresh = seed_pending_review(
+        pg_db, pilot, deadline_at=utcnow() + dt.timedelta(seconds=120)
+    )
+
+    assert expire_due_reviews(pg_db, batch_size=3) == 3
+    assert expire_due_reviews(pg_db, batch_size=3) == 2
+    assert expire_due_reviews(pg_db, batch_size=3) == 0
+    for p in pendings:
+        assert _tip_status(pg_db, p.camera_event_id) == "expired"
+    assert _heads(pg_db) == [fresh.decision_id]
+    assert _audit_count(pg_db, "access.review_expired") == 5
+
+
+def test_worker_batch_keeps_hash_chains_linked(pg_db, pilot: PilotFixture) -> None:
+    """§9.7: пачка expired/audit связана в цепочку так же, как поштучные вставки."""
+    past = utcnow() - dt.timedelta(seconds=1)
+    for _ in range(3):
+        seed_pending_review(pg_db, pilot, deadline_at=past)
+    assert expire_due_reviews(pg_db) == 3
+
+    for table, where in (
+        ("access_decisions", "status = 'expired'"),
+        ("access_audit_logs", "action = 'access.review_expired'"),
+    ):
+        rows = pg_db.execute(
+            text(f"SELECT prev_hash, row_hash FROM {table} WHERE {where} ORDER BY id")
+        ).all()
+        assert len(rows) == 3
+        for prior, row in zip(rows, rows[1:]):
+            assert row.prev_hash == prior.row_hash
@@ -10,15 +10,23 @@ Edge отклоняет snapshot с неизвестным ``key_id`` / неве
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
+import time
+
+import pytest
 
 from access_control.edge.snapshot_verifier import (
+    CACHED_PERMANENT_ONLY,
     MAX_CLOCK_DRIFT_SECONDS,
     SnapshotVerifier,
     verify_snapshot,
 )
+from access_control.services import snapshot_signing
 from access_control.services.snapshot_signing import (
     build_snapshot,
     current_key_id,
+    plate_hash,
+    plate_hash_key,
     public_key_bytes,
     sign_snapshot,
 )
@@ -153,3 +161,160 @@ def test_snapshot_issued_in_future_rejected() -> None:
     result = verify_snapshot(snap, pinned_key_id=key_id, pinned_public_key=pub)
     assert result.accepted is False
     assert result.reason == "issued_in_future"
+
+
+# --- cached_permanent_only: компактный allowlist + дельты (§8.1–8.2) ---
+
+
+def _grant_snapshot(plates: dict[str, list[str]], base: dict | None = None) -> dict:
+    allowlist = {d: [plate_hash(p, plate_hash_key()) for p in ps] for d, ps in plates.items()}
+    base_allowlist = (
+        {d: [plate_hash(p, plate_hash_key()) for p in ps] for d, ps in base.items()} if base is not None else None
+    )
+    snap = build_snapshot(
+        controller_uid="ctrl-1",
+        zone_id=1,
+        offline_mode=CACHED_PERMANENT_ONLY,
+        allowlist=allowlist,
+        base_allowlist=base_allowlist,
+    )
+    return sign_snapshot(snap).data
+
+
+def _cached_verifier() -> SnapshotVerifier:
+    key_id, pub = _pinned()
+    return SnapshotVerifier(
+        key_id, pub, offline_mode=CACHED_PERMANENT_ONLY, plate_hash_key=plate_hash_key()
+    )
+
+
+def test_cached_snapshot_allows_only_listed_plate_and_direction() -> None:
+    snap = _grant_snapshot({"entry": ["01A111AA", "01A222BB"]})
+    assert "01A111AA" not in str(snap)  # на edge только хэши
+    verifier = _cached_verifier()
+    result = verifier.accept(snap)
+    assert result.accepted is True
+    assert result.state == CACHED_PERMANENT_ONLY
+    assert verifier.allows("01A111AA", "entry") is True
+    assert verifier.allows("01A111AA", "exit") is False
+    assert verifier.allows("01A999ZZ", "entry") is False
+
+
+def test_fail_closed_verifier_rejects_allowlist_snapshot() -> None:
+    """fail_closed-edge не принимает grant-capable snapshot (§8.2)."""
+    snap = _grant_snapshot({"entry": ["01A111AA"]})
+    key_id, pub = _pinned()
+    result = verify_snapshot(snap, pinned_key_id=key_id, pinned_public_key=pub)
+    assert result.accepted is False
+    assert result.reason == "offline_mode_forbidden"
+
+
+def test_cached_snapshot_delta_applied_to_own_version() -> None:
+    verifier = _cached_verifier()
+    base = {"entry": ["01A111AA", "01A222BB"]}
+    assert verifier.accept(_grant_snapshot(base)).accepted is True
+    delta = _grant_snapshot({"entry": ["01A222BB", "01A333CC"]}, base=base)
+    assert "allowlist" not in delta
+    assert delta["allowlist_delta"]["added"] == {"entry": [plate_hash("01A333CC", plate_hash_key())]}
+    assert verifier.accept(delta).accepted is True
+    assert verifier.allowlist_version == delta["allowlist_version"]
+    assert verifier.allows("01A333CC", "entry") is True
+    assert verifier.allows("01A111AA", "entry") is False
+
+
+def test_cached_snapshot_delta_wrong_base_drops_allowlist() -> None:
+    verifier = _cached_verifier()
+    assert verifier.accept(_grant_snapshot({"entry": ["01A111AA"]})).accepted is True
+    delta = _grant_snapshot({"entry": ["01A333CC"]}, base={"entry": ["01A222BB"]})
+    result = verifier.accept(delta)
+    assert result.accepted is False
+    assert result.reason == "allowlist_base_mismatch"
+    assert verifier.allows("01A111AA", "entry") is False
+
+
+def test_cached_snapshot_allowlist_digest_mismatch_rejected() -> None:
+    snap = build_snapshot(
+        controller_uid="ctrl-1",
+        zone_id=1,
+        offline_mode=CACHED_PERMANENT_ONLY,
+        allowlist={"entry": [plate_hash("01A111AA", plate_hash_key())]},
+    )
+    snap["allowlist"]["entry"].append(plate_hash("01A666XX", plate_hash_key()))  # до подписи
+    result = _cached_verifier().accept(sign_snapshot(snap).data)
+    assert result.accepted is False
+    assert result.reason == "allowlist_digest_mismatch"
+
+
+def test_cached_snapshot_passes_still_forbidden() -> None:
+    """Пропуска offline запрещены и в cached_permanent_only (§8.2)."""
+    snap = build_snapshot(
+        controller_uid="ctrl-1",
+        zone_id=1,
+        offline_mode=CACHED_PERMANENT_ONLY,
+        allowlist={"entry": [plate_hash("01A111AA", plate_hash_key())]},
+    )
+    snap["passes"] = ["taxi-1"]
+    result = _cached_verifier().accept(sign_snapshot(snap).data)
+    assert result.accepted is False
+    assert result.reason == "grant_fields_forbidden"
+
+
+def test_cached_snapshot_expired_denies_offline_entry() -> None:
+    verifier = _cached_verifier()
+    assert verifier.accept(_grant_snapshot({"entry": ["01A111AA"]})).accepted is True
+    far_future_mono = time.monotonic() + 100000
+    assert verifier.allows("01A111AA", "entry", now_monotonic=far_future_mono) is False
+
+
+def test_signature_cached_by_content(monkeypatch) -> None:
+    """Повторная подпись того же документа не вызывает Ed25519 заново."""
+    calls = []
+    real = snapshot_signing._private_key
+
+    def counting_key():
+        calls.append(1)
+        return real()
+
+    snap = build_snapshot(
+        controller_uid="ctrl-cache",
+        zone_id=1,
+        now=dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc),
+    )
+    monkeypatch.setattr(snapshot_signing, "_private_key", counting_key)
+    first = sign_snapshot(snap)
+    second = sign_snapshot(dict(snap))
+    assert first.signature_hex == second.signature_hex
+    assert len(calls) == 1
+
+
+def test_plate_hash_is_keyed_per_deployment(monkeypatch) -> None:
+    """Хэш номера — HMAC ключом развёртывания: без ключа перебор номеров не сработает."""
+    default = plate_hash("01A111AA", plate_hash_key())
+    assert default != hashlib.sha256(b"plate:01A111AA").hexdigest()[:16]
+    monkeypatch.setenv("ACCESS_SNAPSHOT_PLATE_KEY", "11" * 32)
+    assert plate_hash_key() == bytes.fromhex("11" * 32)
+    assert plate_hash("01A111AA", plate_hash_key()) != default
+
+
+def test_cached_snapshot_with_other_plate_key_rejected() -> None:
+    snap = _grant_snapshot({"entry": ["01A111AA"]})
+    key_id, pub = _pinned()
+    verifier = SnapshotVerifier(
+        key_id, pub, offline_mode=CACHED_PERMANENT_ONLY, plate_hash_key=b"\x22" * 32
+    )
+    result = verifier.accept(snap)
+    assert result.accepted is False
+    assert result.reason == "allowlist_key_mismatch"
+    assert verifier.allows("01A111AA", "entry") is False
+
+
+def test_cached_verifier_requires_plate_key() -> None:
+    key_id, pub = _pinned()
+    with pytest.raises(ValueError):
+        SnapshotVerifier(key_id, pub, offline_mode=CACHED_PERMANENT_ONLY)
+
+
+def test_signature_cache_not_keyed_by_raw_seed() -> None:
+    sign_snapshot(build_snapshot(controller_uid="ctrl-seed", zone_id=1))
+    seed = snapshot_signing._signing_seed_hex()
+    assert all(seed not in key for key in snapshot_signing._signature_cache)
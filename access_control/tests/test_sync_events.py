@@ -124,3 +124,65 @@ def test_sync_events_conflict_flagged(pg_db, pilot: PilotFixture) -> None:
     ).first()
     assert row[0] is True
     assert row[1] is True
+
+
+def test_sync_events_batch_reports_per_item_results(pg_db, pilot: PilotFixture) -> None:
+    """Пачка: исход по каждому событию в порядке запроса; повтор внутри пачки — дубль."""
+    client = _client(pilot.controller_uid)
+    url = f"/api/v1/access/edge/{pilot.controller_uid}/sync-events"
+    client.post(url, json={"events": [_event("b-old")]})
+
+    resp = client.post(
+        url,
+        json={"events": [_event("b-old"), _event("b-1"), _event("b-1"), _event("b-2")]},
+    )
+    body = resp.json()
+    assert [(i["event_id"], i["status"]) for i in body["items"]] == [
+        ("b-old", "duplicate"),
+        ("b-1", "accepted"),
+        ("b-1", "duplicate"),
+        ("b-2", "accepted"),
+    ]
+    assert body["accepted"] == 2
+    assert body["duplicates"] == 2
+
+
+def test_sync_events_large_batch_single_request(pg_db, pilot: PilotFixture) -> None:
+    """Суточный хвост кусками по несколько тысяч событий принимается за один запрос."""
+    client = _client(pilot.controller_uid)
+    events = [dict(_event(f"day-{i}"), seq=i) for i in range(2_500)]
+    resp = client.post(
+        f"/api/v1/access/edge/{pilot.controller_uid}/sync-events",
+        json={"events": events},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["accepted"] == 2_500
+    assert resp.json()["high_water_mark"] == 2_499
+
+
+def test_sync_events_high_water_mark_resume(pg_db, pilot: PilotFixture) -> None:
+    """HWM монотонен и переживает обрыв: edge докачивает с seq > HWM."""
+    client = _client(pilot.controller_uid)
+    base = f"/api/v1/access/edge/{pilot.controller_uid}/sync-events"
+    assert client.get(f"{base}/high-water").json()["high_water_mark"] is None
+
+    first = [dict(_event(f"r-{i}"), seq=i) for i in range(10)]
+    client.post(base, json={"events": first})
+    assert client.get(f"{base}/high-water").json()["high_water_mark"] == 9
+
+    # Повтор старого куска не откатывает HWM назад.
+    again = client.post(base, json={"events": first[:3]})
+    assert again.json()["high_water_mark"] == 9
+    assert again.json()["accepted"] == 0
+
+
+def test_sync_events_batch_size_capped(pg_db, pilot: PilotFixture) -> None:
+    from access_control.api.edge import MAX_SYNC_BATCH_EVENTS
+
+    client = _client(pilot.controller_uid)
+    events = [_event(f"cap-{i}") for i in range(MAX_SYNC_BATCH_EVENTS + 1)]
+    resp = client.post(
+        f"/api/v1/access/edge/{pilot.controller_uid}/sync-events",
+        json={"events": events},
+    )
+    assert resp.status_code == 422
@@ -0,0 +1,32 @@
+"""Edge offline-sync: server-side high-water mark для докачки очереди.
+
+``edge_controllers.sync_high_water_seq`` — максимальный ``seq`` offline-события,
+закоммиченный backend'ом для контроллера (§8.4). Пачечный приём
+``/sync-events`` продвигает его в той же транзакции, что и вставку событий;
+edge после обрыва спрашивает HWM и докачивает очередь с ``seq`` > HWM вместо
+повторной отправки всего суточного хвоста. NULL — контроллер ещё не слал
+нумерованных событий (старые edge без ``seq`` продолжают работать как раньше).
+
+Revision ID: 014
+Revises: 013
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "edge_controllers",
+        sa.Column("sync_high_water_seq", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("edge_controllers", "sync_high_water_seq")
@@ -0,0 +1,62 @@
+"""Keyset-индексы журналов реестра access_control (events/vehicles/passes/requests).
+
+Журналы ``/api/v1/access/*`` листаются курсором по ``(время, id)`` DESC вместо
+OFFSET; составной индекс даёт страницу за один короткий index scan (backward) на
+любой глубине. ``camera_events`` дополнительно индексируется с ведущим
+``zone_id`` — основной фильтр экрана охраны.
+
+Индексы строятся ``CONCURRENTLY`` (в autocommit-блоке): на проде
+``camera_events`` — миллионы строк, блокировать запись ANPR-приёма нельзя.
+``IF NOT EXISTS`` — повторный запуск после прерванной сборки безопасен.
+
+Revision ID: 015
+Revises: 014
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEXES = (
+    ("ix_camera_events_captured_at_id", "camera_events", ["captured_at", "id"]),
+    (
+        "ix_camera_events_zone_captured_at_id",
+        "camera_events",
+        ["zone_id", "captured_at", "id"],
+    ),
+    ("ix_vehicles_created_at_id", "vehicles", ["created_at", "id"]),
+    ("ix_access_passes_created_at_id", "access_passes", ["created_at", "id"]),
+    (
+        "ix_resident_access_requests_created_at_id",
+        "resident_access_requests",
+        ["created_at", "id"],
+    ),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in _INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns in reversed(_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,124 @@
+"""access_review_heads: проекция текущих pending_review для review-expiry (§9.5).
+
+Tick review-expiry (раз в 10 c) искал просроченные pending по всей истории
+``access_decisions`` с коррелированным ``max(id)`` на кандидата: append-only
+таблица хранит исходные pending-строки навсегда, и запрос дорожал с ростом
+истории. Теперь текущие pending лежат в маленькой таблице-проекции (строка на
+событие), и tick читает только просроченные — по индексу дедлайна, O(due).
+
+Проекцию ведёт AFTER INSERT-триггер на ``access_decisions`` — в той же
+транзакции, что и вставка решения, поэтому её видят все пути (ingestion,
+resolve, lazy expiry, worker) без правок сервисного кода:
+
+* любая новая строка решения события снимает его голову («текущее» —
+  последняя строка события, как ``max(id)`` раньше);
+* новая ``pending_review`` с ``review_deadline_at`` ставит голову.
+
+Backfill — текущие (последние по событию) pending с дедлайном.
+
+ACL: таблица access-domain, поэтому гранты ``access_app_rw`` (массив ``other``,
+тот же паттерн, что в 0001/0007) + её имя в ``acl_reconcile.ACCESS_DOMAIN_TABLES``
+и ``excluded_tables`` dba_ownership_transfer.sql / ci.yml (SSOT-гейт
+``test_access_domain_acl_ssot``). Sequence у таблицы нет (PK = camera_event_id).
+
+Revision ID: 016
+Revises: 015
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "access_review_heads",
+        sa.Column("camera_event_id", sa.BigInteger(), nullable=False),
+        sa.Column("decision_id", sa.BigInteger(), nullable=False),
+        sa.Column("review_deadline_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["camera_event_id"], ["camera_events.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["decision_id"], ["access_decisions.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("camera_event_id"),
+        sa.UniqueConstraint("decision_id"),
+    )
+    op.create_index(
+        op.f("ix_access_review_heads_review_deadline_at"),
+        "access_review_heads",
+        ["review_deadline_at"],
+        unique=False,
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION access_control_review_head_sync() RETURNS trigger AS $$
+        BEGIN
+            -- Новая строка решения делает прежнюю голову события не-текущей (§9.5).
+            DELETE FROM access_review_heads WHERE camera_event_id = NEW.camera_event_id;
+            IF NEW.status = 'pending_review' AND NEW.review_deadline_at IS NOT NULL THEN
+                INSERT INTO access_review_heads (camera_event_id, decision_id, review_deadline_at)
+                VALUES (NEW.camera_event_id, NEW.id, NEW.review_deadline_at);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER trg_access_review_head_sync AFTER INSERT ON public.access_decisions "
+        "FOR EACH ROW EXECUTE FUNCTION public.access_control_review_head_sync()"
+    )
+
+    op.execute(
+        """
+        INSERT INTO access_review_heads (camera_event_id, decision_id, review_deadline_at)
+        SELECT ad.camera_event_id, ad.id, ad.review_deadline_at
+        FROM access_decisions ad
+        WHERE ad.status = 'pending_review'
+          AND ad.review_deadline_at IS NOT NULL
+          AND ad.id = (SELECT max(id) FROM access_decisions
+                       WHERE camera_event_id = ad.camera_event_id)
+        """
+    )
+
+    op.execute(
+        """
+    DO $$
+    DECLARE
+        -- SSOT: см. 0001 (immut/other), acl_reconcile.py, dba_ownership_transfer.sql.
+        other text[] := ARRAY['access_review_heads'];
+        t text;
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'access_app_rw') THEN
+            RAISE NOTICE 'access_app_rw absent — review heads ACL grants skipped';
+            RETURN;
+        END IF;
+        FOREACH t IN ARRAY other LOOP
+            IF to_regclass('public.' || t) IS NOT NULL THEN
+                EXECUTE format('GRANT SELECT, INSERT, UPDATE, DELETE ON %I TO access_app_rw', t);
+            END IF;
+        END LOOP;
+    END
+    $$;
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TRIGGER IF EXISTS trg_access_review_head_sync ON public.access_decisions"
+    )
+    op.execute("DROP FUNCTION IF EXISTS public.access_control_review_head_sync()")
+    op.drop_index(
+        op.f("ix_access_review_heads_review_deadline_at"),
+        table_name="access_review_heads",
+    )
+    op.drop_table("access_review_heads")
@@ -0,0 +1,70 @@
+"""access_retention_watermarks: курсор chunked-retention фото (§11).
+
+Retention фото выбирал ВСЕ просроченные ``camera_events`` в список и обнулял
+ссылки одним ``UPDATE … WHERE id IN (…)``: после простоя или на первом запуске
+площадки с месяцами истории — один огромный statement с row-lock'ами на сотни
+тысяч строк. Теперь обход идёт keyset-чанками по ``(captured_at, id)`` (индекс
+``ix_camera_events_captured_at_id``, миграция 015), каждый чанк — своя короткая
+транзакция, а позиция обхода хранится здесь и двигается вместе с чанком:
+прерванный прогон продолжается с места остановки.
+
+ACL: таблица access-domain, поэтому гранты ``access_app_rw`` (массив ``other``,
+тот же паттерн, что в 0001/0007/0016) + её имя в
+``acl_reconcile.ACCESS_DOMAIN_TABLES`` и ``excluded_tables``
+dba_ownership_transfer.sql / ci.yml (SSOT-гейт ``test_access_domain_acl_ssot``).
+Sequence у таблицы нет (PK = имя задачи).
+
+Revision ID: 017
+Revises: 016
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "access_retention_watermarks",
+        sa.Column("job", sa.String(length=64), nullable=False),
+        sa.Column("captured_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("camera_event_id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("job"),
+    )
+
+    op.execute(
+        """
+    DO $$
+    DECLARE
+        -- SSOT: см. 0001 (immut/other), acl_reconcile.py, dba_ownership_transfer.sql.
+        other text[] := ARRAY['access_retention_watermarks'];
+        t text;
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'access_app_rw') THEN
+            RAISE NOTICE 'access_app_rw absent — retention watermarks ACL grants skipped';
+            RETURN;
+        END IF;
+        FOREACH t IN ARRAY other LOOP
+            IF to_regclass('public.' || t) IS NOT NULL THEN
+                EXECUTE format('GRANT SELECT, INSERT, UPDATE, DELETE ON %I TO access_app_rw', t);
+            END IF;
+        END LOOP;
+    END
+    $$;
+    """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("access_retention_watermarks")
@@ -0,0 +1,284 @@
+"""access_events: помесячное RANGE-партиционирование по occurred_at (§9.7, retention 12 мес).
+
+Журнал проездов растёт на каждую машину на каждом шлагбауме, а retention
+(12 мес) для append-only таблицы иначе как DELETE не выразить — а DELETE
+запрещён триггером §9.7. Партиция на месяц превращает retention в DETACH + DROP
+целой партиции (``access_control.services.partitions``), а запросы с условием на
+``occurred_at`` читают только свои месяцы.
+
+Путь миграции без переписывания данных:
+
+* существующая таблица переименовывается в ``access_events_legacy`` и
+  подключается партицией ``[MINVALUE, начало следующего месяца)`` — её строки
+  не копируются (ATTACH проверяет диапазон по заранее заведённому CHECK);
+  legacy уйдёт целиком, когда её верхняя граница выйдет за срок хранения;
+* новые строки идут в месячные партиции ``access_events_pYYYYMM`` (UTC),
+  которые заранее создаёт ``access_control_ensure_partitions(months_ahead)``
+  (SECURITY DEFINER, EXECUTE у ``access_app_rw`` — зовёт retention worker);
+* ``access_events_default`` ловит строки вне созданных месяцев, чтобы INSERT
+  не падал никогда.
+
+Ограничения partitioned-таблицы PostgreSQL:
+
+* PK и UNIQUE обязаны включать ключ партиционирования: PK = ``(id, occurred_at)``,
+  идемпотентный ключ = ``(controller_id, event_id, occurred_at)``. ``occurred_at``
+  журнала — ``captured_at`` события, у повтора того же event_id он тот же, так
+  что ключ «один проезд на event» сохраняется;
+* identity-колонки на partitioned-таблицах есть только с PG 17 — ``id`` берёт
+  ``nextval`` из отдельной ``access_events_id_seq`` (продолжает нумерацию legacy).
+  Serial-default ⇒ ``access_app_rw`` нужен USAGE на sequence (как в 0007);
+* BEFORE-триггер append-only (§9.7) ставится на родителя и клонируется на
+  каждую партицию, включая будущие.
+
+``camera_events`` и ``access_decisions`` НЕ партиционируются: на них ссылаются
+FK семи таблиц, а FK на partitioned-таблицу требует ключ партиционирования в
+ссылке; их ``UNIQUE(controller_id, event_id)`` / единственное начальное
+решение на событие — глобальные инварианты, которые партиционированная
+таблица обеспечить не может.
+
+Revision ID: 018
+Revises: 017
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "018"
+down_revision: Union[str, None] = "017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Сколько будущих месяцев держать созданными заранее.
+MONTHS_AHEAD = 3
+
+_LEGACY_INDEXES = ("camera_event_id", "controller_id", "decision_id")
+
+_ENSURE_PARTITIONS_FN = """
+CREATE OR REPLACE FUNCTION access_control_ensure_partitions(months_ahead integer DEFAULT 3)
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    base timestamp := date_trunc('month', now() AT TIME ZONE 'UTC');
+    month_start timestamptz;
+    month_end timestamptz;
+    part text;
+    created integer := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        month_start := (base + make_interval(months => i)) AT TIME ZONE 'UTC';
+        month_end := (base + make_interval(months => i + 1)) AT TIME ZONE 'UTC';
+        part := 'access_events_p' || to_char(base + make_interval(months => i), 'YYYYMM');
+        CONTINUE WHEN to_regclass('public.' || part) IS NOT NULL;
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE public.%I PARTITION OF public.access_events '
+                'FOR VALUES FROM (%L) TO (%L)',
+                part, month_start, month_end
+            );
+        EXCEPTION
+            -- Месяц уже покрыт legacy-партицией (42P17) или строки этого месяца
+            -- уже лежат в default (23514) — пропускаем, не валим тик.
+            WHEN invalid_object_definition OR check_violation THEN
+                RAISE NOTICE 'access_events partition % skipped: %', part, SQLERRM;
+                CONTINUE;
+        END;
+        -- Default privileges владельца раздали бы партиции uk_app_rw; доступ к
+        -- журналу — только через родителя и только у access_app_rw.
+        IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uk_app_rw') THEN
+            EXECUTE format('REVOKE ALL ON public.%I FROM uk_app_rw', part);
+        END IF;
+        created := created + 1;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.execute("LOCK TABLE public.access_events IN ACCESS EXCLUSIVE MODE")
+
+    # 1. Старая таблица → legacy: identity снимаем (PG < 17 не умеет identity на
+    #    partitioned), PK расширяем ключом партиционирования, имена индексов и
+    #    триггер освобождаем для родителя.
+    op.execute("ALTER TABLE public.access_events ALTER COLUMN id DROP IDENTITY IF EXISTS")
+    op.execute("ALTER TABLE public.access_events RENAME TO access_events_legacy")
+    op.execute(
+        "DROP TRIGGER IF EXISTS trg_append_only_access_events ON public.access_events_legacy"
+    )
+    op.execute(
+        "ALTER TABLE public.access_events_legacy "
+        "DROP CONSTRAINT access_events_pkey, "
+        "DROP CONSTRAINT uq_access_events_controller_event, "
+        "ADD CONSTRAINT access_events_legacy_pkey PRIMARY KEY (id, occurred_at)"
+    )
+    for column in _LEGACY_INDEXES:
+        op.execute(
+            f"ALTER INDEX public.ix_access_events_{column} "
+            f"RENAME TO ix_access_events_legacy_{column}"
+        )
+
+    # 2. Партиционированный родитель с той же формой строк.
+    op.execute("CREATE SEQUENCE public.access_events_id_seq AS bigint")
+    op.execute(
+        "SELECT setval('public.access_events_id_seq', "
+        "COALESCE((SELECT max(id) FROM public.access_events_legacy), 0) + 1, false)"
+    )
+    op.execute(
+        """
+        CREATE TABLE public.access_events (
+            id bigint NOT NULL DEFAULT nextval('public.access_events_id_seq'),
+            controller_id bigint NOT NULL
+                REFERENCES edge_controllers (id) ON DELETE CASCADE,
+            event_id varchar(128) NOT NULL,
+            camera_event_id bigint REFERENCES camera_events (id) ON DELETE SET NULL,
+            decision_id bigint REFERENCES access_decisions (id) ON DELETE SET NULL,
+            vehicle_id bigint REFERENCES vehicles (id) ON DELETE SET NULL,
+            pass_id bigint REFERENCES access_passes (id) ON DELETE SET NULL,
+            apartment_id integer REFERENCES apartments (id) ON DELETE SET NULL,
+            gate_id bigint REFERENCES access_gates (id) ON DELETE SET NULL,
+            zone_id bigint REFERENCES parking_zones (id) ON DELETE SET NULL,
+            direction varchar(16) NOT NULL,
+            plate_number_normalized varchar(32),
+            decision varchar(16),
+            reason varchar(64),
+            occurred_at timestamptz NOT NULL,
+            source varchar(16) NOT NULL DEFAULT 'connected',
+            created_at timestamptz NOT NULL DEFAULT now(),
+            prev_hash varchar(64),
+            row_hash varchar(64),
+            CONSTRAINT access_events_pkey PRIMARY KEY (id, occurred_at),
+            CONSTRAINT uq_access_events_controller_event
+                UNIQUE (controller_id, event_id, occurred_at),
+            CONSTRAINT ck_access_events_direction CHECK (direction IN ('entry', 'exit')),
+            CONSTRAINT ck_access_events_source CHECK (source IN ('connected', 'edge_offline'))
+        ) PARTITION BY RANGE (occurred_at)
+        """
+    )
+    op.execute("ALTER SEQUENCE public.access_events_id_seq OWNED BY public.access_events.id")
+    for column in _LEGACY_INDEXES:
+        op.execute(
+            f"CREATE INDEX ix_access_events_{column} ON public.access_events ({column})"
+        )
+
+    # 3. Legacy — партиция [MINVALUE, начало месяца после самой поздней строки
+    #    и не раньше следующего). CHECK заранее избавляет ATTACH от скана под
+    #    эксклюзивной блокировкой родителя.
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            upper_bound timestamptz;
+        BEGIN
+            SELECT (date_trunc('month', greatest(
+                        now() AT TIME ZONE 'UTC',
+                        COALESCE(max(occurred_at) AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC')
+                    )) + interval '1 month') AT TIME ZONE 'UTC'
+              INTO upper_bound
+              FROM public.access_events_legacy;
+            EXECUTE format(
+                'ALTER TABLE public.access_events_legacy '
+                'ADD CONSTRAINT access_events_legacy_range CHECK (occurred_at < %L)',
+                upper_bound
+            );
+            EXECUTE format(
+                'ALTER TABLE public.access_events ATTACH PARTITION public.access_events_legacy '
+                'FOR VALUES FROM (MINVALUE) TO (%L)',
+                upper_bound
+            );
+            ALTER TABLE public.access_events_legacy DROP CONSTRAINT access_events_legacy_range;
+        END
+        $$;
+        """
+    )
+    op.execute("CREATE TABLE public.access_events_default PARTITION OF public.access_events DEFAULT")
+
+    # 4. Append-only (§9.7) — на родителе, клонируется на все партиции.
+    op.execute(
+        "CREATE TRIGGER trg_append_only_access_events BEFORE DELETE OR UPDATE "
+        "ON public.access_events "
+        "FOR EACH ROW EXECUTE FUNCTION public.access_control_append_only_guard()"
+    )
+
+    # 5. Будущие партиции.
+    op.execute(_ENSURE_PARTITIONS_FN)
+    op.execute(
+        "REVOKE ALL ON FUNCTION public.access_control_ensure_partitions(integer) FROM PUBLIC"
+    )
+    op.execute(f"SELECT public.access_control_ensure_partitions({MONTHS_AHEAD})")
+
+    # 6. ACL родителя — как у baseline (immut: SELECT+INSERT), плюс USAGE на
+    #    serial-default sequence и EXECUTE на создание партиций.
+    op.execute(
+        """
+    DO $$
+    DECLARE
+        -- SSOT: см. 0001 (immut/other), acl_reconcile.py, dba_ownership_transfer.sql.
+        immut text[] := ARRAY['access_events'];
+        t text;
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uk_app_rw') THEN
+            EXECUTE 'REVOKE ALL ON public.access_events FROM uk_app_rw';
+            EXECUTE 'REVOKE ALL ON public.access_events_default FROM uk_app_rw';
+            EXECUTE 'REVOKE ALL ON SEQUENCE public.access_events_id_seq FROM uk_app_rw';
+        END IF;
+        IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'access_app_rw') THEN
+            RAISE NOTICE 'access_app_rw absent — access_events partitioning ACL grants skipped';
+            RETURN;
+        END IF;
+        FOREACH t IN ARRAY immut LOOP
+            EXECUTE format('REVOKE ALL ON %I FROM access_app_rw', t);
+            EXECUTE format('GRANT SELECT, INSERT ON %I TO access_app_rw', t);
+        END LOOP;
+        EXECUTE 'GRANT USAGE, SELECT ON SEQUENCE public.access_events_id_seq TO access_app_rw';
+        EXECUTE 'GRANT EXECUTE ON FUNCTION public.access_control_ensure_partitions(integer) '
+                'TO access_app_rw';
+    END
+    $$;
+    """
+    )
+
+
+def downgrade() -> None:
+    # Обратно — одна обычная таблица: legacy отсоединяется и принимает строки
+    # месячных партиций (INSERT … SELECT; клон триггера append-only с legacy
+    # снят), затем снова становится ``access_events`` с identity.
+    op.execute("LOCK TABLE public.access_events IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE public.access_events DETACH PARTITION public.access_events_legacy")
+    op.execute(
+        "DROP TRIGGER IF EXISTS trg_append_only_access_events ON public.access_events_legacy"
+    )
+    op.execute(
+        "INSERT INTO public.access_events_legacy SELECT * FROM public.access_events"
+    )
+    op.execute("DROP TABLE public.access_events CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS public.access_control_ensure_partitions(integer)")
+    op.execute("ALTER TABLE public.access_events_legacy RENAME TO access_events")
+    op.execute(
+        "ALTER TABLE public.access_events "
+        "DROP CONSTRAINT access_events_legacy_pkey, "
+        "ADD CONSTRAINT access_events_pkey PRIMARY KEY (id)"
+    )
+    for column in _LEGACY_INDEXES:
+        op.execute(
+            f"ALTER INDEX public.ix_access_events_legacy_{column} "
+            f"RENAME TO ix_access_events_{column}"
+        )
+    op.execute(
+        "DO $$ DECLARE next_id bigint; BEGIN "
+        "SELECT COALESCE(max(id), 0) + 1 INTO next_id FROM public.access_events; "
+        "EXECUTE format('ALTER TABLE public.access_events ALTER COLUMN id "
+        "ADD GENERATED BY DEFAULT AS IDENTITY (START WITH %s)', next_id); END $$"
+    )
+    op.execute(
+        "ALTER TABLE public.access_events ADD CONSTRAINT uq_access_events_controller_event "
+        "UNIQUE (controller_id, event_id)"
+    )
+    op.execute(
+        "CREATE TRIGGER trg_append_only_access_events BEFORE DELETE OR UPDATE "
+        "ON public.access_events "
+        "FOR EACH ROW EXECUTE FUNCTION public.access_control_append_only_guard()"
+    )
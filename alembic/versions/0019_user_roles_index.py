@@ -0,0 +1,72 @@
+"""user_roles: индекс ролей пользователя вместо LIKE по JSON ``users.roles``.
+
+Фильтры «пользователи с ролью X» (уведомления менеджерам, подбор исполнителей,
+списки сотрудников) были ``users.roles LIKE '%"X"%'`` — seq scan по users на
+каждый вызов. Таблица ``user_roles (user_id, role)`` с индексом
+``(role, user_id)`` превращает их в index scan; ``User.roles`` остаётся
+источником истины, синхронизация — ORM-хук ``models/user_role.py``.
+
+Бэкфилл разбирает ``users.roles`` тем же правилом, что
+``auth_helpers.parse_roles_safe`` (JSON-массив, иначе legacy CSV). Правило
+скопировано сюда ЛИТЕРАЛОМ (как канон в 010): миграция обязана давать один и
+тот же результат независимо от того, как с тех пор изменился код.
+
+Таблица UK-домена: ``access_app_rw`` грантов не получает (access_control ролей
+пользователей не читает), ``uk_app_rw`` — через ALTER DEFAULT PRIVILEGES
+(scripts/dba_ownership_transfer.sql).
+
+Revision ID: 019
+Revises: 018
+"""
+import json
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "019"
+down_revision: Union[str, None] = "018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH = 1000
+
+
+def _roles(raw) -> list[str]:
+    if not raw:
+        return []
+    try:
+        parsed = json.loads(raw)
+        if isinstance(parsed, list):
+            return [str(r) for r in parsed if isinstance(r, str)]
+    except (json.JSONDecodeError, ValueError, TypeError):
+        if isinstance(raw, str):
+            return [r.strip() for r in raw.split(",") if r.strip()]
+    return []
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_roles",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("role", sa.String(length=50), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "role"),
+    )
+    op.create_index("ix_user_roles_role_user_id", "user_roles", ["role", "user_id"])
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, roles FROM users WHERE roles IS NOT NULL")).fetchall()
+    pending: list[dict] = []
+    for user_id, raw in rows:
+        pending.extend({"user_id": user_id, "role": role} for role in sorted(set(_roles(raw))))
+        if len(pending) >= _BATCH:
+            bind.execute(sa.text("INSERT INTO user_roles (user_id, role) VALUES (:user_id, :role)"), pending)
+            pending = []
+    if pending:
+        bind.execute(sa.text("INSERT INTO user_roles (user_id, role) VALUES (:user_id, :role)"), pending)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_roles_role_user_id", table_name="user_roles")
+    op.drop_table("user_roles")
@@ -0,0 +1,40 @@
+"""scheduler_job_leases: владение задачами планировщика между репликами.
+
+Планировщик вынесен из процесса бота в отдельный воркер
+(``uk_management_bot/scheduler_main.py``), и воркеров может быть больше
+одного. Чтобы тик каждой задачи исполнялся одной репликой, job перед запуском
+берёт lease — условный UPDATE строки ``job_id`` (свободна, протухла, и с
+последнего завершения прошло не меньше ``min_gap``). Строки создаются лениво
+при первом захвате, бэкфилл не нужен.
+
+Таблица UK-домена: ``uk_app_rw`` — через ALTER DEFAULT PRIVILEGES
+(scripts/dba_ownership_transfer.sql), ``access_app_rw`` грантов не получает.
+
+Revision ID: 020
+Revises: 019
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "020"
+down_revision: Union[str, None] = "019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduler_job_leases",
+        sa.Column("job_id", sa.String(length=64), nullable=False),
+        sa.Column("owner", sa.String(length=128), nullable=True),
+        sa.Column("acquired_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("job_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scheduler_job_leases")
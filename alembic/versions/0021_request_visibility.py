@@ -0,0 +1,112 @@
+"""request_visibility: проекция «какие заявки видит исполнитель».
+
+Список заявок исполнителя собирал скоуп на каждом вызове: активная смена,
+разбор JSON ``users.specialization`` и ``OR`` из двух ``IN (подзапрос)`` по
+``request_assignments`` с фолбэком ``requests.executor_id`` — планировщик не
+покрывает такой ``OR`` одним индексом. Таблица ``request_visibility
+(executor_id, request_number, reason)`` хранит тот же ответ построчно; список
+становится semi-join'ом по PK. Поддержка — ORM-хук
+``models/request_visibility.py`` и workflow-раннер.
+
+Бэкфилл: ``assignment``/``executor`` — INSERT … SELECT; ``group`` — в Python,
+правило разбора специализаций скопировано сюда ЛИТЕРАЛОМ (как в 019):
+миграция обязана давать один и тот же результат независимо от того, как с тех
+пор изменился код.
+
+Таблица UK-домена: ``access_app_rw`` грантов не получает, ``uk_app_rw`` —
+через ALTER DEFAULT PRIVILEGES (scripts/dba_ownership_transfer.sql).
+
+Revision ID: 021
+Revises: 020
+"""
+import json
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "021"
+down_revision: Union[str, None] = "020"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH = 1000
+
+
+def _specs(raw) -> list[str]:
+    if not raw:
+        return []
+    if isinstance(raw, str) and raw.startswith("["):
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            return [raw]
+        if isinstance(parsed, list):
+            return [spec for spec in parsed if isinstance(spec, str)]
+    return [raw]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "request_visibility",
+        sa.Column("executor_id", sa.Integer(), nullable=False),
+        sa.Column("request_number", sa.String(length=15), nullable=False),
+        sa.Column("reason", sa.String(length=16), nullable=False),
+        sa.ForeignKeyConstraint(["executor_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["request_number"], ["requests.request_number"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("executor_id", "request_number", "reason"),
+    )
+    op.create_index(
+        "ix_request_visibility_request_number", "request_visibility", ["request_number"]
+    )
+
+    bind = op.get_bind()
+    bind.execute(sa.text(
+        "INSERT INTO request_visibility (executor_id, request_number, reason) "
+        "SELECT DISTINCT executor_id, request_number, 'assignment' FROM request_assignments "
+        "WHERE status = 'active' AND executor_id IS NOT NULL"
+    ))
+    bind.execute(sa.text(
+        "INSERT INTO request_visibility (executor_id, request_number, reason) "
+        "SELECT executor_id, request_number, 'executor' FROM requests "
+        "WHERE executor_id IS NOT NULL"
+    ))
+
+    on_shift = {}
+    for user_id, raw in bind.execute(sa.text(
+        "SELECT id, specialization FROM users "
+        "WHERE id IN (SELECT user_id FROM shifts WHERE status = 'active')"
+    )):
+        specs = set(_specs(raw))
+        if specs:
+            on_shift[user_id] = specs
+    if not on_shift:
+        return
+    groups = bind.execute(sa.text(
+        "SELECT DISTINCT request_number, group_specialization FROM request_assignments "
+        "WHERE status = 'active' AND assignment_type = 'group' "
+        "AND group_specialization IS NOT NULL"
+    )).fetchall()
+    pending: list[dict] = []
+    for number, spec in groups:
+        for user_id, specs in on_shift.items():
+            if spec in specs:
+                pending.append({"executor_id": user_id, "request_number": number})
+        if len(pending) >= _BATCH:
+            bind.execute(sa.text(
+                "INSERT INTO request_visibility (executor_id, request_number, reason) "
+                "VALUES (:executor_id, :request_number, 'group')"
+            ), pending)
+            pending = []
+    if pending:
+        bind.execute(sa.text(
+            "INSERT INTO request_visibility (executor_id, request_number, reason) "
+            "VALUES (:executor_id, :request_number, 'group')"
+        ), pending)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_request_visibility_request_number", table_name="request_visibility")
+    op.drop_table("request_visibility")
@@ -0,0 +1,36 @@
+"""material_receipts: покрывающий partial-индекс под остатки.
+
+Остатки (``GET /materials/stock``, «на закуп», клавиатура материалов бота)
+на каждый вызов суммируют ``qty_remaining`` и ``qty_remaining × unit_price``
+по партиям материала. Индекс ``(material_id) INCLUDE (qty_remaining,
+unit_price) WHERE qty_remaining > 0`` сводит агрегат к index-only скану
+партий с остатком, не трогая таблицу. Сводную таблицу остатков не заводим:
+её строка на материал стала бы общей точкой — приход ждал бы на её row-lock'е
+встречный расход; по партиям они встречаются, только когда списывают именно их.
+
+Revision ID: 022
+Revises: 021
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "022"
+down_revision: Union[str, None] = "021"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_material_receipts_open_stock",
+        "material_receipts",
+        ["material_id"],
+        postgresql_include=["qty_remaining", "unit_price"],
+        postgresql_where=sa.text("qty_remaining > 0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_material_receipts_open_stock", table_name="material_receipts")
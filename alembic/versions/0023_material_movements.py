@@ -0,0 +1,89 @@
+"""material_movements: единый журнал движений склада.
+
+Журнал операций (``GET /materials/operations``) собирал ``UNION ALL``
+приходов и расходов, считал ``count(*)`` всего объединения и листал
+OFFSET'ом — каждая страница сканировала всю историю склада. Таблица
+``material_movements`` — то же объединение построчно (append-only) с
+индексами под keyset ``(created_at, id)``: в целом, по типу, по материалу.
+Пишет её ORM-хук ``database/models/material.py`` при вставке партии/расхода.
+
+Бэкфилл — одним INSERT … SELECT в порядке ``created_at``, чтобы id истории
+шли по времени (как у новых строк).
+
+Таблица UK-домена: ``access_app_rw`` грантов не получает, ``uk_app_rw`` —
+через ALTER DEFAULT PRIVILEGES (scripts/dba_ownership_transfer.sql).
+
+Revision ID: 023
+Revises: 022
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "023"
+down_revision: Union[str, None] = "022"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = (
+    "op_type, op_id, material_id, material_name, unit, doc_type, qty, amount, "
+    "request_number, supplier, reason, created_by, created_at"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "material_movements",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("op_type", sa.String(length=10), nullable=False),
+        sa.Column("op_id", sa.Integer(), nullable=False),
+        sa.Column("material_id", sa.Integer(), nullable=False),
+        sa.Column("material_name", sa.String(length=200), nullable=False),
+        sa.Column("unit", sa.String(length=20), nullable=False),
+        sa.Column("doc_type", sa.String(length=20), nullable=False),
+        sa.Column("qty", sa.Numeric(12, 3), nullable=False),
+        sa.Column("amount", sa.Numeric(14, 2), nullable=False),
+        sa.Column("request_number", sa.String(length=15), nullable=True),
+        sa.Column("supplier", sa.String(length=200), nullable=True),
+        sa.Column("reason", sa.Text(), nullable=True),
+        sa.Column("created_by", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["material_id"], ["materials.id"]),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("op_type", "op_id", name="uq_material_movements_op"),
+    )
+    op.create_index("ix_material_movements_created", "material_movements", ["created_at", "id"])
+    op.create_index(
+        "ix_material_movements_type_created", "material_movements",
+        ["op_type", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_material_movements_material_created", "material_movements",
+        ["material_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_material_movements_request_number", "material_movements", ["request_number"]
+    )
+
+    op.execute(
+        f"INSERT INTO material_movements ({_COLUMNS}) "
+        f"SELECT {_COLUMNS} FROM ("
+        " SELECT 'receipt' AS op_type, id AS op_id, material_id, material_name, unit,"
+        " doc_type, qty, total_amount AS amount, CAST(NULL AS VARCHAR(15)) AS request_number,"
+        " supplier, note AS reason, created_by, created_at FROM material_receipts"
+        " UNION ALL"
+        " SELECT 'issue', id, material_id, material_name, unit,"
+        " doc_type, qty, total_cost, request_number,"
+        " CAST(NULL AS VARCHAR(200)), reason, created_by, created_at FROM material_issues"
+        ") AS ops ORDER BY created_at, op_type, op_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_material_movements_request_number", table_name="material_movements")
+    op.drop_index("ix_material_movements_material_created", table_name="material_movements")
+    op.drop_index("ix_material_movements_type_created", table_name="material_movements")
+    op.drop_index("ix_material_movements_created", table_name="material_movements")
+    op.drop_table("material_movements")
@@ -0,0 +1,57 @@
+"""work_reports: lease и прогресс конвейера автопубликации.
+
+Автопубликация брала пакет черновиков без лока, перезапрашивала медиа у
+каждого и публиковала по одному в пределах бюджета времени; всё, что не
+влезло, следующий тик начинал с нуля. Три колонки держат состояние конвейера
+(``services/work_reports/autopublish.py``):
+
+* ``autopublish_claimed_until`` — lease захвата (FOR UPDATE SKIP LOCKED при
+  взятии): /sync менеджера и тик бота не берут одни и те же черновики; после
+  ошибки — время, раньше которого черновик не берётся повторно (backoff);
+* ``autopublish_ready_at`` — медиа подобраны и готовы к публикации:
+  следующий тик продолжает с публикации, не перезапрашивая media-service;
+* ``autopublish_attempts`` — подряд неудачных попыток (шаг backoff).
+
+Индекс ``(status, created_at)`` — под выборку захвата и возраст очереди
+(метрика ``uk_work_reports_autopublish_backlog_age_seconds``).
+
+Таблица UK-домена: ``access_app_rw`` грантов не получает, ``uk_app_rw`` —
+через ALTER DEFAULT PRIVILEGES (scripts/dba_ownership_transfer.sql).
+
+Revision ID: 024
+Revises: 023
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "024"
+down_revision: Union[str, None] = "023"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "work_reports",
+        sa.Column("autopublish_claimed_until", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "work_reports",
+        sa.Column("autopublish_ready_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "work_reports",
+        sa.Column("autopublish_attempts", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+    op.create_index(
+        "ix_work_reports_status_created_at", "work_reports", ["status", "created_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_work_reports_status_created_at", table_name="work_reports")
+    op.drop_column("work_reports", "autopublish_attempts")
+    op.drop_column("work_reports", "autopublish_ready_at")
+    op.drop_column("work_reports", "autopublish_claimed_until")
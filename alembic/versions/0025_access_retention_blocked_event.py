@@ -0,0 +1,44 @@
+"""access_retention_watermarks: счётчик сбоев удаления на событии-блокере.
+
+Retention фото (``services/photo_retention.py``) останавливает обход на первом
+событии, объект которого storage не удалил, и не двигает watermark дальше.
+Объект, который не удаляется никогда (403/409 на одном ключе), так навсегда
+останавливал retention всей таблицы. Две колонки на строке watermark'а:
+
+* ``blocked_event_id`` — событие, на котором обход остановился в прошлый раз;
+* ``blocked_attempts`` — сколько тиков подряд удаление его объектов падало.
+
+После ``ACCESS_PHOTO_DELETE_MAX_ATTEMPTS`` попыток событие паркуется: ссылки на
+фото остаются (объект ещё в storage, ``select_expired_photo_event_ids`` его
+покажет для ручной дочистки), watermark уходит дальше.
+
+Гранты не меняются: колонки в уже выданной ``access_app_rw`` таблице (0017).
+
+Revision ID: 025
+Revises: 024
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "025"
+down_revision: Union[str, None] = "024"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "access_retention_watermarks",
+        sa.Column("blocked_event_id", sa.BigInteger(), nullable=True),
+    )
+    op.add_column(
+        "access_retention_watermarks",
+        sa.Column("blocked_attempts", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("access_retention_watermarks", "blocked_attempts")
+    op.drop_column("access_retention_watermarks", "blocked_event_id")
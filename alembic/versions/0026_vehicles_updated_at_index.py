@@ -0,0 +1,29 @@
+"""vehicles: индекс ``(updated_at, id)`` под догон индекса кандидатов номера.
+
+Индекс подсказок номера (``services/plate_index.py``) догонялся раз в 30 c
+запросом ``created_at > :since OR updated_at > :since`` — по неиндексированному
+``updated_at`` это полный скан ``vehicles`` в каждом процессе API. Догон теперь
+читает два диапазона: ``created_at`` (``ix_vehicles_created_at_id``, 015) и
+``updated_at`` — по этому индексу.
+
+Гранты не меняются: индекс на уже выданной таблице.
+
+Revision ID: 026
+Revises: 025
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "026"
+down_revision: Union[str, None] = "025"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_vehicles_updated_at_id", "vehicles", ["updated_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vehicles_updated_at_id", table_name="vehicles")
@@ -8,6 +8,14 @@ export type ShiftStatus = 'active' | 'completed' | 'cancelled' | 'planned' | 'pa
 export type ShiftType = 'regular' | 'emergency' | 'overtime' | 'maintenance'
 export type AnalyticsPeriod = '7d' | '30d' | '90d'
 
+export interface EmployeeStats {
+  total_shifts: number
+  completed_shifts: number
+  active_shifts: number
+  active_requests: number
+  rating: number | null
+}
+
 export interface EmployeeBrief {
   id: number
   first_name: string | null
@@ -18,6 +26,8 @@ export interface EmployeeBrief {
   verification_status: VerificationStatus
   status: string
   roles: string[]
+  /** Только при `?with_stats=true`. */
+  stats?: EmployeeStats | null
 }
 
 export interface ShiftBrief {
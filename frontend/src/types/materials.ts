@@ -112,8 +112,12 @@ export interface OperationRow {
 }
 
 export interface OperationsPage {
+  /** Считается не дальше потолка сервера; total_capped — «не меньше». */
   total: number
+  total_capped: boolean
   items: OperationRow[]
+  /** Keyset-курсор следующей страницы; null — страница последняя. */
+  next_cursor: string | null
 }
 
 export interface OperationsFilters {
@@ -124,6 +128,8 @@ export interface OperationsFilters {
   date_to?: string
   limit?: number
   offset?: number
+  cursor?: string
+  exact_total?: boolean
 }
 
 export interface IssueCard {
@@ -23,6 +23,7 @@ from app.schemas import (
 )
 from app.core.config import settings, TelegramChannels, FileCategories
 from app.services.media_storage import ChannelNotConfiguredError, PublicationReservationError
+from app.services.media_search import InvalidCursorError
 from aiogram.exceptions import TelegramAPIError
 
 logger = logging.getLogger(__name__)
@@ -307,11 +308,15 @@ async def search_media(
     uploaded_by: Optional[int] = Query(None, description="ID загрузившего пользователя"),
     status: MediaStatusEnum = Query(default=MediaStatusEnum.ACTIVE, description="Статус файлов"),
     limit: int = Query(default=50, ge=1, le=200, description="Лимит результатов"),
-    offset: int = Query(default=0, ge=0, description="Смещение"),
+    offset: int = Query(default=0, ge=0, description="Смещение (устарело, см. cursor)"),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
     search_service: MediaSearchService = Depends(get_search_service)
 ):
     """
     Поиск медиа-файлов с фильтрами
+
+    Постранично — по ``cursor=next_cursor``: keyset без OFFSET и без
+    повторного подсчёта (``total_count`` есть только у первой страницы).
     """
     try:
         # Обработка параметров
@@ -344,7 +349,8 @@ async def search_media(
             uploaded_by=uploaded_by,
             status=status.value,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
 
         # Преобразуем результаты в схемы
@@ -356,9 +362,12 @@ async def search_media(
             limit=result["limit"],
             offset=result["offset"],
             has_more=result["has_more"],
+            next_cursor=result["next_cursor"],
             filters_applied=result["filters_applied"]
         )
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Search failed: {e}")
         raise HTTPException(status_code=500, detail="Ошибка поиска")
@@ -80,6 +80,12 @@ class Settings(BaseSettings):
     # очередь из них выедает пул соединений и воркеры.
     telegram_download_concurrency: int = 4
 
+    # === SEARCH ===
+    # Поиск/статистика — синхронные запросы SQLAlchemy, исполняются в потоках
+    # (asyncio.to_thread), чтобы не блокировать event loop. Лимит держит их
+    # ниже пула соединений (pool_size=5): остальным эндпоинтам остаётся запас.
+    search_concurrency: int = 4
+
     # extra="ignore" обязателен с удалением полей (AUD6-P2-46): на прод-хостах
     # media_service/.env всё ещё содержит LOG_LEVEL и прочие снятые ключи —
     # без ignore pydantic-settings роняет старт на extra_forbidden.
@@ -3,7 +3,7 @@
 Основано на спецификации photo.md
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, BigInteger, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, BigInteger, JSON, Index, PrimaryKeyConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from typing import List
@@ -170,3 +170,27 @@ class MediaChannel(Base):
         """Возвращает максимальный размер файла в MB"""
         return self.max_file_size / (1024 * 1024)
 
+
+class MediaStat(Base):
+    """Агрегаты активных медиа-файлов для статистики и облака тегов.
+
+    Строка — срез ``(dimension, key)``: ``total`` (key ``""``), ``file_type``,
+    ``category``, ``request``, ``tag``, ``day`` (UTC-дата загрузки, ISO).
+    Ведётся дельтами в том же коммите, что и изменение ``media_files``
+    (app/services/media_stats.py), пересобирается ``rebuild_media_stats.py``.
+    Для существующих БД таблицу создаёт migrations/0003_media_stats.sql.
+    """
+
+    __tablename__ = "media_stats"
+    __table_args__ = (
+        PrimaryKeyConstraint("dimension", "key"),
+        Index("ix_media_stats_dimension_files", "dimension", "files"),
+    )
+
+    dimension = Column(String(20), nullable=False)
+    key = Column(String(100), nullable=False)
+    files = Column(Integer, nullable=False, default=0, server_default="0")
+    bytes = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<MediaStat({self.dimension}:{self.key} files={self.files})>"
@@ -152,10 +152,13 @@ class MediaFileResponse(BaseModel):
 
 class MediaSearchResponse(BaseModel):
     results: List[MediaFileResponse]
-    total_count: int
+    # None на страницах по курсору: count() платит только первая страница.
+    total_count: Optional[int] = None
     limit: int
     offset: int
     has_more: bool
+    # Передать как cursor= за следующей страницей; None — страниц больше нет.
+    next_cursor: Optional[str] = None
     filters_applied: Dict[str, Any]
 
 
@@ -1,24 +1,129 @@
 """
 Сервис для поиска и фильтрации медиа-файлов
 Реализация на основе спецификации photo.md
+
+Запросы синхронные (SQLAlchemy ``Session``), поэтому публичные async-методы
+исполняют их в потоке (``asyncio.to_thread``) под семафором
+``settings.search_concurrency`` — event loop не блокируется, а поиск не
+выбирает весь пул соединений.
+
+Поиск опирается на индексы migrations/0002_search_indexes.sql: pg_trgm по
+текстовым полям, GIN по ``tags::jsonb`` и ``(status, uploaded_at, id)`` для
+keyset-пагинации. На sqlite (тесты) те же запросы идут без индексов.
+Статистика и популярные теги читаются из агрегатов media_stats
+(app/services/media_stats.py), а не проходом по media_files.
 """
 
+import asyncio
+import base64
+import json
 import logging
-from datetime import datetime
-from typing import List, Optional, Dict, Any
-from sqlalchemy import or_, func
-
-from app.models.media import MediaFile, MediaTag
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import cast, exists, func, literal, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services import media_stats
+from app.models.media import MediaFile, MediaStat, MediaTag
 from app.db.database import get_db_context
 
 logger = logging.getLogger(__name__)
 
+# Один семафор на процесс (uvicorn запущен без --workers, см. Dockerfile).
+_search_semaphore: Optional[asyncio.Semaphore] = None
+
+
+class InvalidCursorError(ValueError):
+    """Курсор пагинации не разбирается (подделан или от другой версии API)."""
+
+
+def search_semaphore() -> asyncio.Semaphore:
+    """Ленивая инициализация: `asyncio.Semaphore` привязывается к текущему
+    event loop, а на импорте модуля цикла ещё нет."""
+    global _search_semaphore
+    if _search_semaphore is None:
+        _search_semaphore = asyncio.Semaphore(settings.search_concurrency)
+    return _search_semaphore
+
+
+async def _run_db(fn, *args, **kwargs):
+    """Синхронная работа с БД в потоке, не более ``search_concurrency`` сразу."""
+    async with search_semaphore():
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
 
 def _escape_like(value: str) -> str:
     """Escape special LIKE/ILIKE characters to prevent wildcard injection."""
     return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
+def encode_cursor(uploaded_at: datetime, media_id: int) -> str:
+    """Позиция последней строки страницы: ``(uploaded_at, id)`` в base64url."""
+    raw = json.dumps([uploaded_at.isoformat(), media_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Обратное к ``encode_cursor``; мусор → ``InvalidCursorError``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        stamp, media_id = json.loads(raw)
+        return datetime.fromisoformat(stamp), int(media_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Некорректный курсор пагинации") from e
+
+
+def _text_fields():
+    """Поля текстового поиска — выражения совпадают с trgm-индексами 0002."""
+    return (
+        MediaFile.description,
+        MediaFile.caption,
+        MediaFile.title,
+        MediaFile.original_filename,
+    )
+
+
+def _tags_jsonb():
+    # Выражение GIN-индекса ix_media_files_tags_jsonb (колонка объявлена JSON).
+    return cast(MediaFile.tags, JSONB)
+
+
+def _tag_filter(db: Session, tag: str):
+    """Файл помечен тегом ``tag`` (точное совпадение элемента массива)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return _tags_jsonb().contains([tag])
+    # sqlite (тесты): тот же смысл через json_each, без индекса.
+    items = func.json_each(MediaFile.tags).table_valued("value")
+    return exists(select(1).select_from(items).where(items.c.value == tag))
+
+
+def _media_to_dict(media_file: MediaFile) -> Dict[str, Any]:
+    return {
+        "id": media_file.id,
+        "telegram_channel_id": media_file.telegram_channel_id,
+        "telegram_message_id": media_file.telegram_message_id,
+        "telegram_file_id": media_file.telegram_file_id,
+        "file_type": media_file.file_type,
+        "original_filename": media_file.original_filename,
+        "file_size": media_file.file_size,
+        "mime_type": media_file.mime_type,
+        "description": media_file.description,
+        "caption": media_file.caption,
+        "request_number": media_file.request_number,
+        "uploaded_by_user_id": media_file.uploaded_by_user_id,
+        "category": media_file.category,
+        "tags": media_file.tags,
+        "upload_source": media_file.upload_source,
+        "status": media_file.status,
+        "uploaded_at": media_file.uploaded_at,
+        "archived_at": media_file.archived_at,
+        "created_at": media_file.uploaded_at,  # Пока используем uploaded_at
+        "updated_at": media_file.updated_at or media_file.uploaded_at,
+    }
+
+
 class MediaSearchService:
     """Сервис для поиска и фильтрации медиа-файлов"""
 
@@ -35,11 +140,53 @@ class MediaSearchService:
         uploaded_by: Optional[int] = None,
         status: str = "active",
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Универсальный поиск медиа-файлов с фильтрами
+
+        Порядок — ``uploaded_at DESC, id DESC``. Следующая страница —
+        ``cursor=next_cursor`` предыдущей: keyset по индексу, без OFFSET и без
+        повторного ``count()`` (``total_count`` считается только на первой
+        странице, на продолжениях — ``None``). ``offset`` оставлен для
+        старых клиентов и с ``cursor`` не сочетается.
         """
+        after = decode_cursor(cursor) if cursor else None
+        return await _run_db(
+            self._search_media_sync,
+            query=query,
+            request_numbers=request_numbers,
+            tags=tags,
+            date_from=date_from,
+            date_to=date_to,
+            file_types=file_types,
+            categories=categories,
+            telegram_file_id=telegram_file_id,
+            uploaded_by=uploaded_by,
+            status=status,
+            limit=limit,
+            offset=0 if after else offset,
+            after=after,
+        )
+
+    def _search_media_sync(
+        self,
+        *,
+        query: Optional[str],
+        request_numbers: Optional[List[str]],
+        tags: Optional[List[str]],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        file_types: Optional[List[str]],
+        categories: Optional[List[str]],
+        telegram_file_id: Optional[str],
+        uploaded_by: Optional[int],
+        status: str,
+        limit: int,
+        offset: int,
+        after: Optional[Tuple[datetime, int]],
+    ) -> Dict[str, Any]:
         logger.info(f"Searching media with query: {query}, filters: tags={tags}, categories={categories}")
 
         with get_db_context() as db:
@@ -48,14 +195,9 @@ class MediaSearchService:
 
             # Фильтр по текстовому запросу (escape LIKE wildcards)
             if query:
-                escaped = _escape_like(query)
+                pattern = f"%{_escape_like(query)}%"
                 query_obj = query_obj.filter(
-                    or_(
-                        MediaFile.description.ilike(f"%{escaped}%"),
-                        MediaFile.caption.ilike(f"%{escaped}%"),
-                        MediaFile.title.ilike(f"%{escaped}%"),
-                        MediaFile.original_filename.ilike(f"%{escaped}%")
-                    )
+                    or_(*(field.ilike(pattern, escape="\\") for field in _text_fields()))
                 )
 
             # Фильтр по номерам заявок
@@ -65,7 +207,7 @@ class MediaSearchService:
             # Фильтр по тегам
             if tags:
                 for tag in tags:
-                    query_obj = query_obj.filter(MediaFile.tags.contains([tag]))
+                    query_obj = query_obj.filter(_tag_filter(db, tag))
 
             # Фильтр по дате
             if date_from:
@@ -90,38 +232,32 @@ class MediaSearchService:
             if uploaded_by:
                 query_obj = query_obj.filter(MediaFile.uploaded_by_user_id == uploaded_by)
 
-            # Подсчет общего количества
-            total_count = query_obj.count()
+            # Общее количество — только для первой страницы
+            total_count = None if after else query_obj.count()
 
-            # Получение результатов с пагинацией
-            results_orm = query_obj.order_by(MediaFile.uploaded_at.desc()).offset(offset).limit(limit).all()
+            if after:
+                uploaded_at, media_id = after
+                query_obj = query_obj.filter(
+                    tuple_(MediaFile.uploaded_at, MediaFile.id)
+                    < tuple_(literal(uploaded_at, MediaFile.uploaded_at.type), literal(media_id))
+                )
+
+            # limit + 1: лишняя строка говорит, есть ли следующая страница
+            rows = (
+                query_obj.order_by(MediaFile.uploaded_at.desc(), MediaFile.id.desc())
+                .offset(offset)
+                .limit(limit + 1)
+                .all()
+            )
+            has_more = len(rows) > limit
+            rows = rows[:limit]
 
             # Преобразуем в словари, пока сессия активна
-            results = []
-            for media_file in results_orm:
-                result_dict = {
-                    "id": media_file.id,
-                    "telegram_channel_id": media_file.telegram_channel_id,
-                    "telegram_message_id": media_file.telegram_message_id,
-                    "telegram_file_id": media_file.telegram_file_id,
-                    "file_type": media_file.file_type,
-                    "original_filename": media_file.original_filename,
-                    "file_size": media_file.file_size,
-                    "mime_type": media_file.mime_type,
-                    "description": media_file.description,
-                    "caption": media_file.caption,
-                    "request_number": media_file.request_number,
-                    "uploaded_by_user_id": media_file.uploaded_by_user_id,
-                    "category": media_file.category,
-                    "tags": media_file.tags,
-                    "upload_source": media_file.upload_source,
-                    "status": media_file.status,
-                    "uploaded_at": media_file.uploaded_at,
-                    "archived_at": media_file.archived_at,
-                    "created_at": media_file.uploaded_at,  # Пока используем uploaded_at
-                    "updated_at": media_file.updated_at or media_file.uploaded_at,
-                }
-                results.append(result_dict)
+            results = [_media_to_dict(media_file) for media_file in rows]
+
+            next_cursor = None
+            if has_more and rows and rows[-1].uploaded_at is not None:
+                next_cursor = encode_cursor(rows[-1].uploaded_at, rows[-1].id)
 
             logger.info(f"Found {len(results)} media files (total: {total_count})")
 
@@ -130,7 +266,8 @@ class MediaSearchService:
                 "total_count": total_count,
                 "limit": limit,
                 "offset": offset,
-                "has_more": (offset + limit) < total_count,
+                "has_more": has_more,
+                "next_cursor": next_cursor,
                 "filters_applied": {
                     "query": query,
                     "request_numbers": request_numbers,
@@ -147,17 +284,29 @@ class MediaSearchService:
         """
         Возвращает популярные теги
         """
+        return await _run_db(self._popular_tags_sync, limit=limit)
+
+    def _popular_tags_sync(self, limit: int = 20) -> List[Dict[str, Any]]:
+        # Срез tag из media_stats: число активных файлов с тегом; оформление
+        # (категория/цвет/системный) — из справочника media_tags, если тег там есть.
         with get_db_context() as db:
-            popular_tags = db.query(MediaTag).order_by(MediaTag.usage_count.desc()).limit(limit).all()
+            popular_tags = (
+                db.query(MediaStat, MediaTag)
+                .outerjoin(MediaTag, MediaTag.tag_name == MediaStat.key)
+                .filter(MediaStat.dimension == media_stats.TAG, MediaStat.files > 0)
+                .order_by(MediaStat.files.desc(), MediaStat.key)
+                .limit(limit)
+                .all()
+            )
 
             result = []
-            for tag in popular_tags:
+            for stat, tag in popular_tags:
                 result.append({
-                    "tag": tag.tag_name,
-                    "count": tag.usage_count,
-                    "category": tag.tag_category,
-                    "color": tag.color,
-                    "is_system": tag.is_system
+                    "tag": stat.key,
+                    "count": stat.files,
+                    "category": tag.tag_category if tag else None,
+                    "color": tag.color if tag else None,
+                    "is_system": bool(tag and tag.is_system)
                 })
 
             logger.info(f"Retrieved {len(result)} popular tags")
@@ -167,38 +316,35 @@ class MediaSearchService:
         """
         Возвращает статистику медиа-файлов
         """
+        return await _run_db(self._media_statistics_sync)
+
+    def _media_statistics_sync(self) -> Dict[str, Any]:
+        # Всё — индексные чтения media_stats, стоимость не зависит от размера
+        # библиотеки (ведение агрегатов — app/services/media_stats.py).
         with get_db_context() as db:
-            # Общая статистика
-            total_files = db.query(MediaFile).filter(MediaFile.status == "active").count()
-            total_size = db.query(func.sum(MediaFile.file_size)).filter(MediaFile.status == "active").scalar() or 0
+            def dimension(name: str):
+                return db.query(MediaStat).filter(
+                    MediaStat.dimension == name, MediaStat.files > 0
+                )
+
+            total = dimension(media_stats.TOTAL).first()
+            total_files = total.files if total else 0
+            total_size = total.bytes if total else 0
 
             # Статистика по типам файлов
-            file_types_stats = db.query(
-                MediaFile.file_type,
-                func.count(MediaFile.id).label('count'),
-                func.sum(MediaFile.file_size).label('total_size')
-            ).filter(MediaFile.status == "active").group_by(MediaFile.file_type).all()
+            file_types_stats = dimension(media_stats.FILE_TYPE).order_by(MediaStat.key).all()
 
             # Статистика по категориям
-            categories_stats = db.query(
-                MediaFile.category,
-                func.count(MediaFile.id).label('count')
-            ).filter(MediaFile.status == "active").group_by(MediaFile.category).all()
-
-            # Статистика загрузок по дням (последние 30 дней)
-            from datetime import timedelta
-            date_30_days_ago = datetime.now() - timedelta(days=30)
-
-            daily_uploads = db.query(
-                func.date(MediaFile.uploaded_at).label('date'),
-                func.count(MediaFile.id).label('count')
-            ).filter(
-                MediaFile.uploaded_at >= date_30_days_ago,
-                MediaFile.status == "active"
-            ).group_by(func.date(MediaFile.uploaded_at)).order_by(func.date(MediaFile.uploaded_at)).all()
+            categories_stats = dimension(media_stats.CATEGORY).order_by(MediaStat.key).all()
+
+            # Статистика загрузок по дням (последние 30 дней, UTC)
+            since = (datetime.now(timezone.utc) - timedelta(days=30)).date().isoformat()
+            daily_uploads = (
+                dimension(media_stats.DAY).filter(MediaStat.key >= since).order_by(MediaStat.key).all()
+            )
 
             # Топ тегов
-            top_tags = await self.get_popular_tags(limit=10)
+            top_tags = self._popular_tags_sync(limit=10)
 
             result = {
                 "total_files": total_files,
@@ -206,19 +352,19 @@ class MediaSearchService:
                 "total_size_mb": round(total_size / (1024 * 1024), 2),
                 "file_types": [
                     {
-                        "type": stat.file_type,
-                        "count": stat.count,
-                        "size_bytes": int(stat.total_size or 0),
-                        "size_mb": round((stat.total_size or 0) / (1024 * 1024), 2)
+                        "type": stat.key,
+                        "count": stat.files,
+                        "size_bytes": int(stat.bytes),
+                        "size_mb": round(stat.bytes / (1024 * 1024), 2)
                     }
                     for stat in file_types_stats
                 ],
                 "categories": [
-                    {"category": stat.category, "count": stat.count}
+                    {"category": stat.key, "count": stat.files}
                     for stat in categories_stats
                 ],
                 "daily_uploads": [
-                    {"date": stat.date.isoformat(), "count": stat.count}
+                    {"date": stat.key, "count": stat.files}
                     for stat in daily_uploads
                 ],
                 "top_tags": top_tags
@@ -236,6 +382,14 @@ class MediaSearchService:
         """
         Поиск похожих медиа-файлов на основе тегов и метаданных
         """
+        return await _run_db(self._find_similar_media_sync, media_file_id, similarity_threshold, limit)
+
+    def _find_similar_media_sync(
+        self,
+        media_file_id: int,
+        similarity_threshold: float = 0.7,
+        limit: int = 10
+    ) -> List[MediaFile]:
         with get_db_context() as db:
             # Получаем исходный файл
             source_file = db.query(MediaFile).filter(MediaFile.id == media_file_id).first()
@@ -288,6 +442,9 @@ class MediaSearchService:
         """
         Возвращает временную линию медиа-файлов для заявки
         """
+        return await _run_db(self._request_media_timeline_sync, request_number)
+
+    def _request_media_timeline_sync(self, request_number: str) -> List[Dict[str, Any]]:
         with get_db_context() as db:
             media_files = db.query(MediaFile).filter(
                 MediaFile.request_number == request_number,
@@ -314,6 +471,9 @@ class MediaSearchService:
         """
         Возвращает неиспользуемые или малоиспользуемые теги
         """
+        return await _run_db(self._unused_tags_sync, min_usage)
+
+    def _unused_tags_sync(self, min_usage: int = 1) -> List[Dict[str, Any]]:
         with get_db_context() as db:
             unused_tags = db.query(MediaTag).filter(
                 MediaTag.usage_count < min_usage
@@ -0,0 +1,152 @@
+"""
+Агрегаты медиа-библиотеки (таблица media_stats)
+
+Статистика и облако тегов читаются из небольшой таблицы срезов вместо
+прохода по всей media_files на каждый запрос. Учитываются только файлы в
+статусе "active" — ровно то, что раньше считал get_media_statistics.
+
+Каждый переход файла в "active" и из него (загрузка, резервирование и
+компенсация саги archive/delete, resolve_stale_transitions) и смена тегов
+активного файла пишут дельту ``apply_file``/``apply_tags_change`` в ТОЙ ЖЕ
+сессии, что и само изменение: агрегат коммитится или откатывается вместе с
+ним. Ключи сортируются перед upsert — одинаковый порядок блокировок строк
+у параллельных транзакций, без взаимоблокировок.
+
+``rebuild`` пересчитывает всё с нуля (после миграции 0003 и после ручного
+SQL по media_files мимо сервиса) — rebuild_media_stats.py.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.media import MediaFile, MediaStat
+
+logger = logging.getLogger(__name__)
+
+TOTAL = "total"
+FILE_TYPE = "file_type"
+CATEGORY = "category"
+REQUEST = "request"
+TAG = "tag"
+DAY = "day"
+
+_UPSERT_SQL = text(
+    "INSERT INTO media_stats (dimension, key, files, bytes) "
+    "VALUES (:dimension, :key, :files, :bytes) "
+    "ON CONFLICT (dimension, key) DO UPDATE SET "
+    "files = media_stats.files + excluded.files, "
+    "bytes = media_stats.bytes + excluded.bytes"
+)
+
+StatKey = Tuple[str, str]
+
+
+def _day_key(uploaded_at: Optional[datetime]) -> str:
+    """UTC-дата загрузки; sqlite отдаёт naive — считаем его UTC."""
+    moment = uploaded_at or datetime.now(timezone.utc)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date().isoformat()
+
+
+def _file_keys(
+    file_type: str,
+    category: str,
+    request_number: Optional[str],
+    tags: Optional[List[str]],
+    uploaded_at: Optional[datetime],
+) -> List[StatKey]:
+    keys = [(TOTAL, ""), (FILE_TYPE, file_type), (CATEGORY, category), (DAY, _day_key(uploaded_at))]
+    if request_number:
+        keys.append((REQUEST, request_number))
+    keys.extend((TAG, tag) for tag in set(tags or []))
+    return keys
+
+
+def _upsert(db: Session, deltas: Dict[StatKey, Tuple[int, int]]) -> None:
+    rows = [
+        {"dimension": dimension, "key": key, "files": files, "bytes": size}
+        for (dimension, key), (files, size) in sorted(deltas.items())
+        if files or size
+    ]
+    if rows:
+        db.execute(_UPSERT_SQL, rows)
+
+
+def apply_file(db: Session, media_file, sign: int) -> None:
+    """Файл вошёл в "active" (``sign=+1``) или вышел из него (``-1``).
+
+    ``media_file`` — ORM-объект или строка с теми же атрибутами.
+    """
+    size = (media_file.file_size or 0) * sign
+    keys = _file_keys(
+        media_file.file_type,
+        media_file.category,
+        media_file.request_number,
+        media_file.tags,
+        media_file.uploaded_at,
+    )
+    _upsert(db, {key: (sign, size) for key in keys})
+
+
+def apply_tags_change(
+    db: Session, media_file, old_tags: Optional[Iterable[str]], new_tags: Optional[Iterable[str]]
+) -> None:
+    """Смена тегов активного файла: срез ``tag`` по разнице множеств."""
+    if media_file.status != "active":
+        return
+    old, new = set(old_tags or []), set(new_tags or [])
+    size = media_file.file_size or 0
+    deltas = {(TAG, tag): (1, size) for tag in new - old}
+    deltas.update({(TAG, tag): (-1, -size) for tag in old - new})
+    _upsert(db, deltas)
+
+
+def rebuild(db: Session, batch_size: int = 5000) -> int:
+    """Пересчитать media_stats из media_files; возвращает число активных файлов.
+
+    На PostgreSQL таблица агрегатов блокируется (EXCLUSIVE) до коммита:
+    транзакции с дельтами ждут, и ни одна дельта не теряется и не
+    учитывается дважды — пересчёт видит всё, что закоммичено до блокировки,
+    а дельты после неё ложатся поверх.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE media_stats IN EXCLUSIVE MODE"))
+
+    totals: Counter = Counter()
+    sizes: Counter = Counter()
+    active = 0
+    rows = db.execute(
+        MediaFile.__table__.select()
+        .with_only_columns(
+            MediaFile.file_type,
+            MediaFile.category,
+            MediaFile.request_number,
+            MediaFile.tags,
+            MediaFile.uploaded_at,
+            MediaFile.file_size,
+        )
+        .where(MediaFile.status == "active")
+        .execution_options(yield_per=batch_size)
+    )
+    for row in rows:
+        active += 1
+        for key in _file_keys(row.file_type, row.category, row.request_number, row.tags, row.uploaded_at):
+            totals[key] += 1
+            sizes[key] += row.file_size or 0
+
+    db.query(MediaStat).delete()
+    db.bulk_insert_mappings(
+        MediaStat,
+        [
+            {"dimension": dimension, "key": key, "files": files, "bytes": sizes[(dimension, key)]}
+            for (dimension, key), files in sorted(totals.items())
+        ],
+    )
+    logger.info(f"Rebuilt media_stats: {active} active files, {len(totals)} rows")
+    return active
@@ -12,6 +12,7 @@ from aiogram.types import BufferedInputFile, Message
 
 from app.models.media import MediaFile, MediaChannel, MediaTag
 from app.utils.display_tz import display_instant_str, display_now_str
+from app.services import media_stats
 from app.services.telegram_client import TelegramClientService
 from app.core.config import settings, FileCategories, TelegramChannels, ErrorMessages
 from app.db.database import get_db_context
@@ -256,6 +257,7 @@ class MediaStorageService:
                 logger.warning(f"Media file {media_file_id} not found")
                 return None
 
+            old_tags = list(media_file.tags or [])
             if replace:
                 media_file.tags = tags
             else:
@@ -269,6 +271,7 @@ class MediaStorageService:
 
             # Обновляем статистику тегов
             await self._update_tags_usage(db, tags)
+            media_stats.apply_tags_change(db, media_file, old_tags, media_file.tags)
 
             logger.info(f"Updated tags for media file {media_file_id}")
             return media_file
@@ -328,7 +331,7 @@ class MediaStorageService:
             raise ValueError(f"Unknown reserving_status: {reserving_status}")
 
         # === Фаза 1: резервирование, своя короткая транзакция ===
-        reserved = False
+        reserved = None
         with get_db_context() as db:
             exists = db.query(MediaFile.id).filter(MediaFile.id == media_file_id).first()
             if exists is None:
@@ -343,10 +346,16 @@ class MediaStorageService:
                     MediaFile.publication_locked.is_(False),
                 )
                 .values(status=reserving_status)
-                .returning(MediaFile.id)
-            ).first() is not None
+                .returning(
+                    MediaFile.file_type, MediaFile.category, MediaFile.request_number,
+                    MediaFile.tags, MediaFile.uploaded_at, MediaFile.file_size,
+                )
+            ).first()
+            if reserved is not None:
+                # Файл вышел из "active" — в том же коммите, что и резерв.
+                media_stats.apply_file(db, reserved, -1)
 
-        if not reserved:
+        if reserved is None:
             raise PublicationReservationError(
                 f"media file {media_file_id} not archivable: not active or publication-locked"
             )
@@ -381,6 +390,7 @@ class MediaStorageService:
                 # Компенсация: I/O не удался, байты никуда не делись —
                 # возвращаем резервирование.
                 media_file.status = "active"
+                media_stats.apply_file(db, media_file, +1)
                 return False
 
     async def acquire_publication_lock(self, media_file_id: int) -> bool:
@@ -434,11 +444,18 @@ class MediaStorageService:
         """
         cutoff = datetime.now(timezone.utc) - timedelta(minutes=older_than_minutes)
         with get_db_context() as db:
-            reverted = db.execute(
+            revived = db.execute(
                 update(MediaFile)
                 .where(MediaFile.status == "archiving", MediaFile.updated_at < cutoff)
                 .values(status="active")
-            ).rowcount
+                .returning(
+                    MediaFile.file_type, MediaFile.category, MediaFile.request_number,
+                    MediaFile.tags, MediaFile.uploaded_at, MediaFile.file_size,
+                )
+            ).all()
+            for row in revived:
+                media_stats.apply_file(db, row, +1)
+            reverted = len(revived)
             finalized = db.execute(
                 update(MediaFile)
                 .where(MediaFile.status == "deleting", MediaFile.updated_at < cutoff)
@@ -720,6 +737,7 @@ class MediaStorageService:
 
         db.add(media_file)
         db.flush()  # Получаем ID
+        media_stats.apply_file(db, media_file, +1)
 
         return media_file
 
@@ -303,7 +303,8 @@ class MediaServiceClient:
         uploaded_by: Optional[int] = None,
         status: str = "active",
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Поиск медиа-файлов с фильтрами
@@ -320,7 +321,8 @@ class MediaServiceClient:
             uploaded_by: ID пользователя
             status: Статус файлов
             limit: Лимит результатов
-            offset: Смещение
+            offset: Смещение (устарело, см. cursor)
+            cursor: next_cursor предыдущей страницы
 
         Returns:
             Результаты поиска с пагинацией
@@ -359,6 +361,9 @@ class MediaServiceClient:
             if uploaded_by is not None:
                 params["uploaded_by"] = uploaded_by
 
+            if cursor:
+                params["cursor"] = cursor
+
             response = await self.client.get("/media/search", params=params)
             response.raise_for_status()
 
@@ -32,7 +32,7 @@ import pytest
 @pytest.fixture(autouse=True)
 def _db_isolation():
     """Создаёт таблицы и чистит данные между тестами (изоляция)."""
-    from app.models.media import Base, MediaFile, MediaChannel, MediaTag
+    from app.models.media import Base, MediaFile, MediaChannel, MediaStat, MediaTag
     from app.db.database import engine, SessionLocal
 
     Base.metadata.create_all(bind=engine)
@@ -42,6 +42,7 @@ def _db_isolation():
         s.query(MediaFile).delete()
         s.query(MediaChannel).delete()
         s.query(MediaTag).delete()
+        s.query(MediaStat).delete()
         s.commit()
     finally:
         s.close()
@@ -0,0 +1,39 @@
+-- 0002_search_indexes.sql
+--
+-- Индексы поиска медиа (MediaSearchService.search_media):
+--   * pg_trgm GIN по каждому полю текстового поиска — `col ILIKE '%q%'` по
+--     OR из четырёх полей планировщик собирает в BitmapOr, вместо seq scan.
+--     Теги в текстовый поиск не входят (только точный фильтр ниже); trgm-индекс
+--     по tags::text из ранней версии файла удаляется;
+--   * GIN (tags::jsonb) jsonb_path_ops — фильтр по тегам `@>`; колонка tags
+--     объявлена JSON, поэтому индекс — по выражению, и запрос обязан
+--     приводить её так же: CAST(tags AS JSONB);
+--   * btree (status, uploaded_at DESC, id DESC) — keyset-пагинация: страница
+--     читается с позиции курсора без OFFSET.
+--
+-- Выражения индексов совпадают с app/services/media_search.py (_text_fields,
+-- _tags_jsonb) — держать оба места в синхроне, иначе индекс молча перестанет
+-- использоваться.
+--
+-- Идемпотентно — безопасно перезапускать. CREATE EXTENSION требует права
+-- владельца БД (или pg_trgm в списке trusted-расширений, PG 13+).
+-- Без CONCURRENTLY: run_migrations.py исполняет файлы в одной транзакции;
+-- на текущих объёмах media_files (десятки тысяч строк) блокировка — секунды.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_media_files_description_trgm
+    ON media_files USING gin (description gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_media_files_caption_trgm
+    ON media_files USING gin (caption gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_media_files_title_trgm
+    ON media_files USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_media_files_original_filename_trgm
+    ON media_files USING gin (original_filename gin_trgm_ops);
+DROP INDEX IF EXISTS ix_media_files_tags_text_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_media_files_tags_jsonb
+    ON media_files USING gin ((tags::jsonb) jsonb_path_ops);
+
+CREATE INDEX IF NOT EXISTS ix_media_files_status_uploaded_keyset
+    ON media_files (status, uploaded_at DESC, id DESC);
@@ -0,0 +1,27 @@
+-- 0003_media_stats.sql
+--
+-- Таблица агрегатов media_stats: число и объём АКТИВНЫХ файлов по срезам
+-- (total / file_type / category / request / tag / day). Из неё читают
+-- /media/statistics и /media/tags/popular вместо полного прохода по
+-- media_files. Дельты пишет app/services/media_stats.py в той же транзакции,
+-- что и изменение файла.
+--
+-- Только схема: после первого применения (и после любого ручного SQL по
+-- media_files мимо сервиса) агрегаты пересобрать:
+--   python rebuild_media_stats.py
+--
+-- Модель app/models/media.py:MediaStat описывает ту же итоговую форму —
+-- держать оба места в синхроне. Идемпотентно — безопасно перезапускать.
+
+CREATE TABLE IF NOT EXISTS media_stats (
+    dimension VARCHAR(20) NOT NULL,
+    key VARCHAR(100) NOT NULL,
+    files INTEGER NOT NULL DEFAULT 0,
+    bytes BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, key)
+);
+
+-- Облако тегов и топ срезов: ORDER BY files DESC внутри dimension
+-- (обратный проход по индексу).
+CREATE INDEX IF NOT EXISTS ix_media_stats_dimension_files
+    ON media_stats (dimension, files);
@@ -0,0 +1,32 @@
+"""One-shot rebuild of the media_stats aggregates from media_files.
+
+Run after migrations/0003_media_stats.sql is first applied (the table starts
+empty) and after any manual SQL against media_files that bypassed the
+service. Runtime paths keep the aggregates current on their own; a rebuild
+is a single transaction and safe to run while the service is live — on
+PostgreSQL it locks media_stats so concurrent deltas queue behind it.
+
+    python rebuild_media_stats.py
+"""
+import logging
+import sys
+
+from app.db.database import get_db_context
+from app.services import media_stats
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("media_stats_rebuild")
+
+
+def main() -> None:
+    with get_db_context() as db:
+        active = media_stats.rebuild(db)
+    logger.info("media_stats rebuilt from %d active file(s)", active)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception:
+        logger.exception("media_stats rebuild failed")
+        sys.exit(1)
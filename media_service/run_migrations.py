@@ -3,8 +3,8 @@
 Applies each file in filename-sorted order via a single connection. Each
 migration file is itself idempotent (IF NOT EXISTS guards) — safe to re-run
 on an already-migrated database, which is what makes this safe to invoke on
-every deploy rather than needing a migrations-tracking table (only one
-migration file exists today; if this grows into a real sequence, revisit
+every deploy rather than needing a migrations-tracking table (a handful
+of migration files exist today; if this grows into a real sequence, revisit
 whether a tracking table becomes worth the complexity).
 """
 import logging
@@ -0,0 +1,157 @@
+"""Тесты поиска медиа (MediaSearchService.search_media).
+
+Покрытие:
+  - keyset-пагинация по ``(uploaded_at, id)``: страницы по ``next_cursor``
+    без дублей и пропусков, в том числе при одинаковом ``uploaded_at``;
+    ``total_count`` — только у первой страницы;
+  - фильтр по тегам — точное совпадение элемента массива (раньше это был
+    LIKE по сериализованному JSON);
+  - текстовый поиск: теги входят в поля поиска, ``%``/``_`` экранируются;
+  - битый курсор → 400 на уровне endpoint.
+
+Индексы (migrations/0002_search_indexes.sql) — PostgreSQL-only; здесь sqlite
+из conftest.py, проверяется смысл запросов, не план.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+BASE_TIME = datetime(2026, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _create_media_file(**overrides) -> int:
+    """Вставляет строку MediaFile напрямую (минуя upload-флоу) для тестов."""
+    from app.db.database import SessionLocal
+    from app.models.media import MediaFile
+
+    defaults = dict(
+        telegram_channel_id=-1001111111111,
+        telegram_message_id=100,
+        telegram_file_id=f"TGFILE-{uuid.uuid4().hex[:12]}",
+        file_type="photo",
+        original_filename="test.jpg",
+        file_size=123,
+        mime_type="image/jpeg",
+        request_number="250101-001",
+        uploaded_by_user_id=1,
+        category="request_photo",
+        status="active",
+        uploaded_at=BASE_TIME,
+    )
+    defaults.update(overrides)
+    s = SessionLocal()
+    try:
+        mf = MediaFile(**defaults)
+        s.add(mf)
+        s.commit()
+        s.refresh(mf)
+        return mf.id
+    finally:
+        s.close()
+
+
+async def _search(**kwargs):
+    from app.services.media_search import MediaSearchService
+
+    return await MediaSearchService().search_media(**kwargs)
+
+
+async def test_cursor_pages_cover_all_rows_once():
+    # Три строки делят один uploaded_at — порядок внутри решает id.
+    ids = [
+        _create_media_file(uploaded_at=BASE_TIME + timedelta(minutes=i // 3))
+        for i in range(7)
+    ]
+
+    first = await _search(limit=3)
+    assert first["total_count"] == 7
+    assert first["has_more"] is True
+
+    seen = [r["id"] for r in first["results"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = await _search(limit=3, cursor=cursor)
+        assert page["total_count"] is None
+        seen.extend(r["id"] for r in page["results"])
+        cursor = page["next_cursor"]
+
+    expected = sorted(ids, key=lambda i: (ids.index(i) // 3, i), reverse=True)
+    assert seen == expected
+    assert page["has_more"] is False
+
+
+async def test_cursor_keeps_filters():
+    for i in range(4):
+        _create_media_file(
+            category="report_photo" if i % 2 else "request_photo",
+            uploaded_at=BASE_TIME + timedelta(minutes=i),
+        )
+
+    first = await _search(categories=["report_photo"], limit=1)
+    second = await _search(categories=["report_photo"], limit=1, cursor=first["next_cursor"])
+    assert first["total_count"] == 2
+    assert second["has_more"] is False
+    assert second["next_cursor"] is None
+    assert {r["category"] for r in first["results"] + second["results"]} == {"report_photo"}
+
+
+async def test_tag_filter_matches_whole_elements():
+    exact = _create_media_file(tags=["pipe", "urgent"])
+    _create_media_file(tags=["pipeline"])
+    _create_media_file(tags=["pipe"])
+    _create_media_file(tags=None)
+
+    result = await _search(tags=["pipe", "urgent"])
+    assert [r["id"] for r in result["results"]] == [exact]
+
+    result = await _search(tags=["pipe"])
+    assert result["total_count"] == 2
+
+
+async def test_text_search_skips_tags_and_escapes_wildcards():
+    # Теги ищутся только точным фильтром ``tags``, не подстрокой в тексте.
+    _create_media_file(tags=["leak"], description="подвал")
+    percent = _create_media_file(description="скидка 50% на трубы")
+    _create_media_file(description="скидка 500 на трубы")
+
+    result = await _search(query="leak")
+    assert result["results"] == []
+
+    result = await _search(query="50%")
+    assert [r["id"] for r in result["results"]] == [percent]
+
+
+async def test_invalid_cursor_raises():
+    from app.services.media_search import InvalidCursorError
+
+    with pytest.raises(InvalidCursorError):
+        await _search(cursor="not-a-cursor")
+
+
+def test_search_endpoint_returns_next_cursor_and_rejects_bad_cursor():
+    from app.main import app
+
+    for i in range(3):
+        _create_media_file(uploaded_at=BASE_TIME + timedelta(minutes=i))
+
+    with TestClient(app) as client:
+        headers = {"X-API-Key": "testkey"}
+        first = client.get("/api/v1/media/search", params={"limit": 2}, headers=headers)
+        assert first.status_code == 200
+        body = first.json()
+        assert body["total_count"] == 3
+        assert body["next_cursor"]
+
+        second = client.get(
+            "/api/v1/media/search",
+            params={"limit": 2, "cursor": body["next_cursor"]},
+            headers=headers,
+        )
+        assert second.status_code == 200
+        assert second.json()["total_count"] is None
+        assert len(second.json()["results"]) == 1
+
+        bad = client.get("/api/v1/media/search", params={"cursor": "%%%"}, headers=headers)
+        assert bad.status_code == 400
@@ -0,0 +1,161 @@
+"""Тесты агрегатов media_stats (app/services/media_stats.py).
+
+Покрытие:
+  - загрузка (_save_media_metadata) добавляет файл во все срезы; повторный
+    telegram_file_id (MEDIA-02, переиспользование строки) не считается дважды;
+  - сага delete: резерв вычитает, компенсация при сбое I/O возвращает;
+  - resolve_stale_transitions: archiving → active возвращает файл в агрегаты;
+  - смена тегов активного файла двигает срез tag;
+  - rebuild даёт ту же таблицу, что и накопленные дельты;
+  - get_media_statistics / get_popular_tags читают агрегаты.
+
+Telegram мокается (access_test_utils.FakeTelegram), БД — sqlite из conftest.py.
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from access_test_utils import FakeTelegram, make_fake_message
+
+
+def _make_service(fail_on=None):
+    from app.services.media_storage import MediaStorageService
+
+    svc = MediaStorageService.__new__(MediaStorageService)
+    svc.telegram = FakeTelegram(fail_on=fail_on)
+    svc.channels_cache = {}
+    return svc
+
+
+async def _save(svc, *, tags, request_number="250101-001", size=1000, message=None):
+    from app.db.database import get_db_context
+
+    with get_db_context() as db:
+        media_file = await svc._save_media_metadata(
+            db, message or make_fake_message(), request_number, "request_photo",
+            "desc", tags, 1, "a.jpg", "image/jpeg", size,
+        )
+        return media_file.id
+
+
+def _stats():
+    from app.db.database import SessionLocal
+    from app.models.media import MediaStat
+
+    s = SessionLocal()
+    try:
+        return {
+            (row.dimension, row.key): (row.files, row.bytes)
+            for row in s.query(MediaStat).all()
+            if row.files or row.bytes
+        }
+    finally:
+        s.close()
+
+
+def _rebuild():
+    from app.db.database import get_db_context
+    from app.services import media_stats
+
+    with get_db_context() as db:
+        return media_stats.rebuild(db)
+
+
+async def test_upload_adds_file_to_every_slice_once():
+    svc = _make_service()
+    message = make_fake_message()
+    await _save(svc, tags=["urgent", "pipe", "urgent"], message=message)
+    await _save(svc, tags=["urgent"], message=message)  # тот же file_id — переиспользование
+    await _save(svc, tags=None, request_number="250101-002", size=500)
+
+    stats = _stats()
+    assert stats[("total", "")] == (2, 1500)
+    assert stats[("file_type", "photo")] == (2, 1500)
+    assert stats[("category", "request_photo")] == (2, 1500)
+    assert stats[("request", "250101-001")] == (1, 1000)
+    assert stats[("tag", "urgent")] == (1, 1000)
+    assert stats[("tag", "pipe")] == (1, 1000)
+
+
+async def test_delete_saga_subtracts_and_compensation_restores():
+    media_id = await _save(_make_service(), tags=["pipe"])
+    before = _stats()
+
+    assert await _make_service(fail_on={"delete_message"}).delete_media(media_id) is False
+    assert _stats() == before
+
+    assert await _make_service().delete_media(media_id) is True
+    assert _stats() == {}
+
+
+async def test_resolve_stale_archiving_returns_file_to_stats():
+    from app.db.database import get_db_context
+    from app.models.media import MediaFile
+
+    svc = _make_service()
+    media_id = await _save(svc, tags=["pipe"])
+    before = _stats()
+    with get_db_context() as db:
+        db.execute(update(MediaFile).where(MediaFile.id == media_id).values(
+            status="archiving", updated_at=datetime.now(timezone.utc) - timedelta(hours=1)
+        ))
+    _rebuild()
+    assert _stats() == {}
+
+    result = await svc.resolve_stale_transitions(older_than_minutes=15)
+    assert result["archiving_reverted"] == 1
+    assert _stats() == before
+
+
+async def test_tag_change_moves_tag_slice():
+    svc = _make_service()
+    media_id = await _save(svc, tags=["pipe", "urgent"])
+
+    await svc.update_media_tags(media_id, ["leak"], replace=True)
+    stats = _stats()
+    assert ("tag", "pipe") not in stats
+    assert ("tag", "urgent") not in stats
+    assert stats[("tag", "leak")] == (1, 1000)
+
+    await svc.update_media_tags(media_id, ["pipe"])
+    assert _stats()[("tag", "pipe")] == (1, 1000)
+
+
+async def test_rebuild_matches_incremental_deltas():
+    svc = _make_service()
+    for i in range(5):
+        await _save(svc, tags=["pipe"] if i % 2 else ["urgent", "leak"], size=100 * (i + 1))
+    incremental = _stats()
+
+    assert _rebuild() == 5
+    assert _stats() == incremental
+
+
+async def test_statistics_and_popular_tags_read_aggregates():
+    from app.db.database import get_db_context
+    from app.models.media import MediaFile
+    from app.services.media_search import MediaSearchService
+
+    svc = _make_service()
+    recent = [await _save(svc, tags=tags) for tags in (["pipe"], ["pipe", "urgent"], ["leak"])]
+    await _save(svc, tags=None)
+    # Прямой SQL мимо сервиса агрегаты не видит — для этого и есть rebuild.
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    with get_db_context() as db:
+        db.execute(update(MediaFile).values(uploaded_at=yesterday - timedelta(days=40)))
+        db.execute(update(MediaFile).where(MediaFile.id.in_(recent)).values(uploaded_at=yesterday))
+    _rebuild()
+
+    search = MediaSearchService()
+    stats = await search.get_media_statistics()
+    assert stats["total_files"] == 4
+    assert stats["total_size_bytes"] == 4000
+    assert stats["file_types"] == [
+        {"type": "photo", "count": 4, "size_bytes": 4000, "size_mb": 0.0}
+    ]
+    assert stats["categories"] == [{"category": "request_photo", "count": 4}]
+    # Загрузка 40-дневной давности в окно 30 дней не попадает.
+    assert stats["daily_uploads"] == [{"date": yesterday.date().isoformat(), "count": 3}]
+
+    popular = await search.get_popular_tags(limit=2)
+    assert [(t["tag"], t["count"]) for t in popular] == [("pipe", 2), ("leak", 1)]
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Ops-CLI партиций журнала проезда ``access_events`` (миграция 018, §9.7/§11).
+
+Retention журнала (12 мес, §11) — DETACH + DROP партиции целиком; это DDL
+владельца таблицы, у runtime-роли ``access_app_rw`` таких прав нет, поэтому
+retention запускается отсюда (cron/ручной прогон тем же credential'ом, что и
+Alembic), а не фоновым воркером API. Создание будущих месяцев делает и воркер
+(``retention_worker``, раз в сутки) — ``ensure`` здесь для ручного догона.
+
+Как ``acl_reconcile``, при наличии ``uk_migration_owner`` скрипт переключается
+на неё через ``SET SESSION ROLE`` (``uk_migrator`` — NOINHERIT).
+
+Запуск:
+    python3 scripts/access_partitions.py list
+    python3 scripts/access_partitions.py ensure --months-ahead 3
+    python3 scripts/access_partitions.py drop-expired --dry-run
+    python3 scripts/access_partitions.py drop-expired --retention-days 365
+    python3 scripts/access_partitions.py verify            # связность hash-chain
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, pool, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from access_control.services import partitions  # noqa: E402
+from access_control.services.hashchain import verify_chain  # noqa: E402
+
+
+def _as_owner(db: Session) -> None:
+    owner = db.execute(
+        text("SELECT 1 FROM pg_roles WHERE rolname = 'uk_migration_owner'")
+    ).scalar()
+    if owner:
+        db.execute(text("SET SESSION ROLE uk_migration_owner"))
+        # Commit: rollback транзакции откатил бы и SET (dry-run откатывает каждую).
+        db.commit()
+
+
+def _cmd_list(db: Session, args: argparse.Namespace) -> int:
+    for p in partitions.list_partitions(db, args.table):
+        if p.is_default:
+            bounds = "DEFAULT"
+        else:
+            lower = p.lower.isoformat() if p.lower else "MINVALUE"
+            bounds = f"[{lower}, {p.upper.isoformat()})"
+        rows = db.execute(text(f"SELECT count(*) FROM {p.name}")).scalar_one()  # noqa: S608
+        print(f"{p.name:32} {bounds:60} rows={rows}")
+    return 0
+
+
+def _cmd_ensure(db: Session, args: argparse.Namespace) -> int:
+    _as_owner(db)
+    created = partitions.ensure_partitions(db, args.months_ahead)
+    print(f"создано партиций: {created}")
+    return 0
+
+
+def _cmd_drop_expired(db: Session, args: argparse.Namespace) -> int:
+    _as_owner(db)
+    dropped = partitions.drop_expired_partitions(
+        db, args.table, retention_days=args.retention_days, dry_run=args.dry_run
+    )
+    verb = "к удалению" if args.dry_run else "удалено"
+    for d in dropped:
+        print(f"{verb}: {d.name} (до {d.upper.isoformat()}, строк {d.rows}, "
+              f"якорей hash-chain {len(d.anchors)})")
+    if not dropped:
+        print("просроченных партиций нет")
+    return 0
+
+
+def _cmd_verify(db: Session, args: argparse.Namespace) -> int:
+    anchors = partitions.partition_drop_anchors(db, args.table)
+    report = verify_chain(db, args.table, anchors=anchors, batch_size=args.batch_size)
+    print(
+        f"{args.table}: проверено {report.checked}, разрывов {len(report.breaks)}, "
+        f"по якорям удалённых партиций {len(report.anchored)}"
+    )
+    for row_id in report.breaks[:20]:
+        print(f"  разрыв перед id={row_id}")
+    return 0 if report.ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--table", default="access_events")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="партиции и число строк")
+    ensure = sub.add_parser("ensure", help="создать будущие месяцы")
+    ensure.add_argument(
+        "--months-ahead", type=int, default=partitions.PARTITION_MONTHS_AHEAD
+    )
+    drop = sub.add_parser("drop-expired", help="retention: DETACH + DROP")
+    drop.add_argument(
+        "--retention-days", type=int, default=partitions.ACCESS_EVENTS_RETENTION_DAYS
+    )
+    drop.add_argument("--dry-run", action="store_true")
+    verify = sub.add_parser("verify", help="проверить связность hash-chain")
+    verify.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("access_partitions: DATABASE_URL is not set", file=sys.stderr)
+        return 1
+    handlers = {
+        "list": _cmd_list,
+        "ensure": _cmd_ensure,
+        "drop-expired": _cmd_drop_expired,
+        "verify": _cmd_verify,
+    }
+    # NullPool — SET SESSION ROLE не должен вернуться в пул (как acl_reconcile).
+    engine = create_engine(database_url, poolclass=pool.NullPool)
+    try:
+        with Session(engine) as db:
+            return handlers[args.command](db, args)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Бенчмарк журнала проезда: одна heap-таблица против помесячных партиций (миграция 018).
+
+НЕ входит в CI. Нужен PostgreSQL, на котором не жалко десятков ГБ и десятков
+минут: данные генерируются ``generate_series`` прямо в БД, в отдельной схеме
+(``--schema``, по умолчанию ``bench_access_partitions``), рабочие таблицы
+приложения не трогаются. Схема удаляется в конце, если не задан ``--keep``.
+
+Обе таблицы получают одинаковые строки (форма ``access_events``: ``id``
+по возрастанию вместе со временем, ~3% поздних edge_offline-проездов в
+прошлые месяцы) и одинаковые индексы. Замеряются ``EXPLAIN ANALYZE``
+(медиана ``--repeat`` прогонов) запросы, которые делает приложение:
+
+* lateral журнала по событию (registry ``/events``) — c нижней границей
+  ``occurred_at`` и без неё;
+* счётчик проездов за последний месяц (occupancy/отчёты по периоду);
+* хвост hash-chain (``ORDER BY id DESC LIMIT 1`` перед каждой вставкой);
+* retention самого старого месяца: ``DELETE`` из heap против
+  ``DETACH`` + ``DROP`` партиции (реальное время, не EXPLAIN).
+
+Запуск:
+    DATABASE_URL=postgresql://... python3 scripts/bench_access_partitions.py
+    python3 scripts/bench_access_partitions.py --rows 50000000 --months 24 --keep
+    python3 scripts/bench_access_partitions.py --rows 200000   # быстрый smoke
+"""
+import argparse
+import datetime as dt
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+_COLUMNS = """
+    id bigint NOT NULL,
+    controller_id bigint NOT NULL,
+    event_id varchar(128) NOT NULL,
+    camera_event_id bigint,
+    zone_id bigint,
+    direction varchar(16) NOT NULL,
+    decision varchar(16),
+    occurred_at timestamptz NOT NULL,
+    prev_hash varchar(64),
+    row_hash varchar(64)
+"""
+
+# Строка i: время растёт с id (кроме ~3% поздних офлайн-проездов, уехавших
+# на 1..60 дней назад), 8 контроллеров, 4 зоны, 90% allow.
+_FILL_SQL = """
+INSERT INTO {table}
+SELECT i,
+       1 + i % 8,
+       'ev-' || i,
+       i,
+       1 + i % 4,
+       CASE WHEN i % 2 = 0 THEN 'entry' ELSE 'exit' END,
+       CASE WHEN i % 10 = 0 THEN 'deny' ELSE 'allow' END,
+       :start + (i * :step) * interval '1 second'
+         - CASE WHEN i % 33 = 0 THEN (1 + i % 60) * interval '1 day'
+                ELSE interval '0' END,
+       md5((i - 1)::text) || md5((i - 1)::text),
+       md5(i::text) || md5(i::text)
+FROM generate_series(:lo, :hi) AS i
+"""
+
+_INDEXES = ("camera_event_id", "controller_id", "occurred_at")
+
+
+def _month_start(value: dt.datetime) -> dt.datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(value: dt.datetime, months: int) -> dt.datetime:
+    total = value.year * 12 + value.month - 1 + months
+    return value.replace(year=total // 12, month=total % 12 + 1)
+
+
+def _timeline(rows: int, months: int) -> tuple[dt.datetime, float]:
+    """``(start, step)``: строка i снята в ``start + i*step`` секунд (текущий месяц — последний)."""
+    end = _month_start(dt.datetime.now(dt.timezone.utc))
+    start = _add_months(end, -months + 1)
+    return start, (_add_months(end, 1) - start).total_seconds() / rows
+
+
+def _setup(
+    conn, schema: str, rows: int, months: int, batch: int, start: dt.datetime, step: float
+) -> None:
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {schema}"))
+    conn.execute(text(f"CREATE TABLE {schema}.ae_heap ({_COLUMNS}, PRIMARY KEY (id))"))
+    conn.execute(
+        text(
+            f"CREATE TABLE {schema}.ae_part ({_COLUMNS}, PRIMARY KEY (id, occurred_at)) "
+            "PARTITION BY RANGE (occurred_at)"
+        )
+    )
+    # Как после миграции 018: legacy [MINVALUE, start) + месяцы + default.
+    conn.execute(
+        text(
+            f"CREATE TABLE {schema}.ae_part_legacy PARTITION OF {schema}.ae_part "
+            f"FOR VALUES FROM (MINVALUE) TO ('{start.isoformat()}')"
+        )
+    )
+    for m in range(months + 1):
+        lo, hi = _add_months(start, m), _add_months(start, m + 1)
+        conn.execute(
+            text(
+                f"CREATE TABLE {schema}.ae_part_p{lo:%Y%m} PARTITION OF {schema}.ae_part "
+                f"FOR VALUES FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')"
+            )
+        )
+    conn.execute(
+        text(f"CREATE TABLE {schema}.ae_part_default PARTITION OF {schema}.ae_part DEFAULT")
+    )
+    conn.commit()
+
+    started = time.perf_counter()
+    for lo in range(1, rows + 1, batch):
+        hi = min(lo + batch - 1, rows)
+        for table in ("ae_heap", "ae_part"):
+            conn.execute(
+                text(_FILL_SQL.format(table=f"{schema}.{table}")),
+                {"start": start, "step": step, "lo": lo, "hi": hi},
+            )
+        conn.commit()
+        print(f"  сгенерировано {hi}/{rows} строк", end="\r", flush=True)
+    for table in ("ae_heap", "ae_part"):
+        for column in _INDEXES:
+            conn.execute(
+                text(f"CREATE INDEX ON {schema}.{table} ({column})")
+            )
+        conn.execute(text(f"ANALYZE {schema}.{table}"))
+    conn.commit()
+    print(f"\nданные и индексы: {time.perf_counter() - started:.0f} c")
+
+
+def _explain_ms(conn, sql: str, params: dict, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        plan = conn.execute(
+            text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"), params
+        ).scalar_one()
+        timings.append(plan[0]["Execution Time"])
+    conn.rollback()
+    return statistics.median(timings)
+
+
+def _queries(rows: int, start: dt.datetime, step: float) -> list[tuple[str, str, dict]]:
+    # 200 самых свежих событий — типичная первая страница журнала; captured_at
+    # события восстанавливается той же формулой, что и при генерации.
+    recent = {"hi": rows, "start": start, "step": step}
+    month_ago = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=30)
+    return [
+        (
+            "lateral по событию, без границы",
+            "SELECT ce.i, ae.occurred_at "
+            "FROM generate_series(:hi - 199, :hi) AS ce(i) "
+            "LEFT JOIN LATERAL (SELECT occurred_at FROM {t} ae "
+            "  WHERE ae.camera_event_id = ce.i ORDER BY ae.id DESC LIMIT 1) ae ON true",
+            recent,
+        ),
+        (
+            "lateral по событию, occurred_at >= captured_at",
+            "SELECT ce.i, ae.occurred_at "
+            "FROM (SELECT i, :start + (i * :step) * interval '1 second' AS captured_at "
+            "      FROM generate_series(:hi - 199, :hi) AS i) ce "
+            "LEFT JOIN LATERAL (SELECT occurred_at FROM {t} ae "
+            "  WHERE ae.camera_event_id = ce.i AND ae.occurred_at >= ce.captured_at "
+            "  ORDER BY ae.id DESC LIMIT 1) ae ON true",
+            recent,
+        ),
+        (
+            "count за последние 30 дней",
+            "SELECT count(*) FROM {t} WHERE occurred_at >= :since "
+            "AND zone_id = 1 AND decision = 'allow'",
+            {"since": month_ago},
+        ),
+        (
+            "хвост hash-chain",
+            "SELECT row_hash FROM {t} ORDER BY id DESC LIMIT 1",
+            {},
+        ),
+    ]
+
+
+def _retention(conn, schema: str, start: dt.datetime) -> tuple[float, float, int]:
+    lo, hi = start, _add_months(start, 1)
+    started = time.perf_counter()
+    deleted = conn.execute(
+        text(
+            f"DELETE FROM {schema}.ae_heap WHERE occurred_at >= :lo AND occurred_at < :hi"
+        ),
+        {"lo": lo, "hi": hi},
+    ).rowcount
+    conn.commit()
+    delete_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    conn.execute(
+        text(f"ALTER TABLE {schema}.ae_part DETACH PARTITION {schema}.ae_part_p{lo:%Y%m}")
+    )
+    conn.execute(text(f"DROP TABLE {schema}.ae_part_p{lo:%Y%m}"))
+    conn.commit()
+    drop_s = time.perf_counter() - started
+    return delete_s, drop_s, deleted
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000_000, help="строк журнала")
+    parser.add_argument("--months", type=int, default=24, help="месяцев истории")
+    parser.add_argument("--batch", type=int, default=1_000_000, help="строк на INSERT")
+    parser.add_argument("--repeat", type=int, default=5, help="прогонов на запрос")
+    parser.add_argument("--schema", default="bench_access_partitions")
+    parser.add_argument("--keep", action="store_true", help="не удалять схему")
+    parser.add_argument(
+        "--reuse", action="store_true", help="не генерировать: данные от --keep"
+    )
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url or not database_url.startswith("postgresql"):
+        print("bench_access_partitions: нужен DATABASE_URL на PostgreSQL", file=sys.stderr)
+        return 1
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            start, step = _timeline(args.rows, args.months)
+            if not args.reuse:
+                _setup(
+                    conn, args.schema, args.rows, args.months, args.batch, start, step
+                )
+
+            print(f"строк: {args.rows}  месяцев: {args.months}  (мс, медиана {args.repeat})")
+            print(f"{'запрос':48} {'heap':>10} {'partitioned':>12} {'x':>6}")
+            for title, sql, params in _queries(args.rows, start, step):
+                heap = _explain_ms(
+                    conn, sql.format(t=f"{args.schema}.ae_heap"), params, args.repeat
+                )
+                part = _explain_ms(
+                    conn, sql.format(t=f"{args.schema}.ae_part"), params, args.repeat
+                )
+                print(f"{title:48} {heap:10.2f} {part:12.2f} {heap / part:6.1f}")
+
+            delete_s, drop_s, deleted = _retention(conn, args.schema, start)
+            print(
+                f"retention {start:%Y-%m} ({deleted} строк): DELETE {delete_s:.2f} c, "
+                f"DETACH+DROP {drop_s:.3f} c"
+            )
+            if not args.keep:
+                conn.execute(text(f"DROP SCHEMA {args.schema} CASCADE"))
+                conn.commit()
+    finally:
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
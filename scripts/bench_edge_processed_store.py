@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Бенчмарк edge-дедупа: append-only журнал против переписывания JSON на put.
+
+НЕ входит в CI. Гонять на целевом носителе edge (SD-карта), а не на SSD
+разработчика: выигрыш журнала — именно в объёме записи на команду.
+
+Базовая линия — прежний ``FileProcessedStore`` (весь словарь пишется в tmp и
+``os.replace`` на КАЖДЫЙ put), воспроизведён здесь дословно. Обе реализации
+делают put с одинаковой гарантией долговечности (``--fsync``).
+
+Запуск:
+    python3 scripts/bench_edge_processed_store.py            # 2000 put
+    python3 scripts/bench_edge_processed_store.py -n 20000 --fsync --dir /mnt/sd
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class _JsonRewriteStore:
+    """Прежняя реализация: O(n) запись на каждый put."""
+
+    def __init__(self, path: str, fsync: bool) -> None:
+        self._path = path
+        self._fsync = fsync
+        self._data: dict[str, dict] = {}
+
+    def put(self, command_id: str, result) -> None:
+        self._data[command_id] = {"opened": result.opened, "detail": result.detail}
+        directory = os.path.dirname(self._path) or "."
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(self._data, fh)
+            if self._fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
+        os.replace(tmp, self._path)
+
+
+def _bench(store, n: int) -> tuple[float, float]:
+    from access_control.integrations.relay import RelayResult
+
+    started = time.perf_counter()
+    for i in range(n):
+        cid = f"cmd-{i:08d}"
+        store.put(cid, RelayResult(command_id=cid, opened=True, deduplicated=False))
+    elapsed = time.perf_counter() - started
+    return n / elapsed, elapsed
+
+
+def main() -> int:
+    from access_control.edge.command_consumer import FileProcessedStore
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=2000, help="число put")
+    parser.add_argument("--fsync", action="store_true", help="fsync на каждый put")
+    parser.add_argument("--dir", default=None, help="каталог на целевом носителе")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as workdir:
+        legacy = _JsonRewriteStore(os.path.join(workdir, "legacy.json"), args.fsync)
+        journal = FileProcessedStore(
+            os.path.join(workdir, "journal.log"), fsync=args.fsync
+        )
+        legacy_rate, legacy_s = _bench(legacy, args.n)
+        journal_rate, journal_s = _bench(journal, args.n)
+        journal.close()
+
+    print(f"puts: {args.n}  fsync: {args.fsync}")
+    print(f"json rewrite   : {legacy_rate:10.0f} put/s  ({legacy_s:.2f} s)")
+    print(f"append journal : {journal_rate:10.0f} put/s  ({journal_s:.2f} s)")
+    print(f"speedup        : {journal_rate / legacy_rate:10.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Бенчмарк: латентность посторонних запросов во время шторма логинов.
+
+НЕ входит в CI и БД не требует: мини-приложение FastAPI в одном event loop
+(как воркер uvicorn) с двумя эндпоинтами — ``/login`` проверяет bcrypt-пароль,
+``/ping`` ничего не делает. Пока идёт пачка логинов, отдельный клиент
+непрерывно дёргает ``/ping``; печатаются p50/p99 ``/ping`` и пропускная
+способность логинов для двух режимов:
+
+* ``inline`` — ``bcrypt.checkpw`` прямо в async-хендлере (как было);
+* ``pool``   — ``PasswordHasher`` из ``api/auth/passwords.py`` (пул процессов
+  с границей очереди; отказы сверх неё считаются отдельно — это 503).
+
+Запуск:
+    python3 scripts/bench_password_hashing.py                 # 200 логинов, cost 12
+    python3 scripts/bench_password_hashing.py -n 500 --rounds 10 --workers 4
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def _build_app(mode: str, hasher, stored: str):
+    import bcrypt
+    from fastapi import FastAPI, HTTPException
+
+    from uk_management_bot.api.auth.passwords import PasswordHasherBusy
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/login")
+    async def login(password: str):
+        if mode == "inline":
+            valid = bcrypt.checkpw(password.encode(), stored.encode())
+        else:
+            try:
+                valid = await hasher.verify(password, stored)
+            except PasswordHasherBusy:
+                raise HTTPException(status_code=503)
+        return {"ok": valid}
+
+    return app
+
+
+async def _run(mode: str, args) -> None:
+    from httpx import ASGITransport, AsyncClient
+
+    from uk_management_bot.api.auth.passwords import PasswordHasher, hash_password
+
+    stored = hash_password("bench-password", rounds=args.rounds)
+    hasher = PasswordHasher(workers=args.workers, max_pending=args.max_pending)
+    if mode == "pool":
+        await hasher.verify("warm-up", stored)  # старт процессов — не в замер
+    app = _build_app(mode, hasher, stored)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        done = asyncio.Event()
+        pings: list[float] = []
+
+        async def pinger():
+            # Латентность считается от ЗАПЛАНИРОВАННОГО момента отправки (раз в
+            # 5 мс), а не от фактического: иначе заблокированный loop просто
+            # реже отправляет ping и «хорошо» их обслуживает (coordinated omission).
+            # Последний ping записывается и после конца шторма: при inline он
+            # как раз тот, что простоял весь шторм в очереди loop'а.
+            scheduled = time.perf_counter()
+            while True:
+                await client.get("/ping")
+                pings.append((time.perf_counter() - scheduled) * 1000)
+                if done.is_set():
+                    break
+                scheduled += 0.005
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+
+        async def one_login():
+            resp = await client.post("/login", params={"password": "bench-password"})
+            return resp.status_code
+
+        ping_task = asyncio.create_task(pinger())
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        sem = asyncio.Semaphore(args.concurrency)
+
+        async def limited():
+            async with sem:
+                return await one_login()
+
+        codes = await asyncio.gather(*(limited() for _ in range(args.n)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await ping_task
+    hasher.shutdown()
+
+    ok = codes.count(200)
+    print(
+        f"{mode:>6}: /ping p50 {statistics.median(pings):.1f} мс, "
+        f"p99 {_percentile(pings, 0.99):.1f} мс, max {max(pings):.0f} мс ({len(pings)} запросов); "
+        f"логины {ok / elapsed:.1f}/с, 503: {codes.count(503)}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=200, help="логинов в шторме")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="одновременных логинов")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost")
+    parser.add_argument("--workers", type=int, default=2, help="процессов пула")
+    parser.add_argument("--max-pending", type=int, default=16, help="граница очереди пула")
+    args = parser.parse_args()
+
+    print(f"логинов: {args.n}, одновременно {args.concurrency}, cost {args.rounds}")
+    for mode in ("inline", "pool"):
+        asyncio.run(_run(mode, args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Бенчмарк индекса кандидатов номера (§12): deletion-neighbourhood против перебора.
+
+НЕ входит в CI и БД не требует: индекс строится из синтетических UZ-номеров
+(``01A777AA``-формат) в памяти. Запросы — зарегистрированные номера с одной
+или двумя «ошибками распознавания» (подмена похожего символа, произвольная
+подмена, пропуск символа). Базовая линия — прямой перебор всех ключей с
+Левенштейном с отсечкой, то, во что превратился бы нечёткий поиск без индекса.
+
+Печатает время построения, память индекса (``--memory``, tracemalloc — сильно
+замедляет построение), медиану и p99 поиска и долю запросов, где исходный номер
+оказался первым кандидатом.
+
+Запуск:
+    python3 scripts/bench_plate_index.py                      # 100k номеров, d=1 и d=2
+    python3 scripts/bench_plate_index.py -n 20000 --memory
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_LETTERS = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+_MISREAD = {"8": "B", "B": "8", "5": "S", "S": "5", "2": "Z", "Z": "2", "6": "G", "G": "6"}
+
+
+def _plates(n: int, rng: random.Random) -> list[str]:
+    out: set[str] = set()
+    while len(out) < n:
+        out.add(
+            f"{rng.randint(1, 95):02d}{rng.choice(_LETTERS)}{rng.randint(0, 999):03d}"
+            f"{rng.choice(_LETTERS)}{rng.choice(_LETTERS)}"
+        )
+    return sorted(out)
+
+
+def _misread(plate: str, edits: int, rng: random.Random) -> str:
+    chars = list(plate)
+    for _ in range(edits):
+        i = rng.randrange(len(chars))
+        kind = rng.random()
+        if kind < 0.5 and chars[i] in _MISREAD:
+            chars[i] = _MISREAD[chars[i]]
+        elif kind < 0.85:
+            chars[i] = rng.choice(_LETTERS + "0123456789")
+        elif len(chars) > 4:
+            del chars[i]
+    return "".join(chars)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def main() -> int:
+    from access_control.services.normalization import normalize_plate
+    from access_control.services.plate_index import PlateCandidateIndex, _edit_distance
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=100_000, help="зарегистрированных номеров")
+    parser.add_argument("-q", type=int, default=2000, help="запросов на прогон")
+    parser.add_argument("--scan", type=int, default=50, help="запросов для перебора")
+    parser.add_argument("--memory", action="store_true", help="мерить память индекса")
+    parser.add_argument("--seed", type=int, default=20260101)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    plates = _plates(args.n, rng)
+    keys = [normalize_plate(p).recognition_key for p in plates]
+    print(f"номеров: {len(plates)}  запросов: {args.q}")
+
+    for max_distance in (1, 2):
+        if args.memory:
+            tracemalloc.start()
+        index = PlateCandidateIndex(max_distance=max_distance)
+        started = time.perf_counter()
+        for vehicle_id, (plate, key) in enumerate(zip(plates, keys), 1):
+            index.upsert(vehicle_id, key, plate, "active")
+        build_s = time.perf_counter() - started
+        memory = ""
+        if args.memory:
+            memory = f"  память {tracemalloc.get_traced_memory()[0] / 2**20:.0f} МиБ"
+            tracemalloc.stop()
+
+        queries = []
+        for _ in range(args.q):
+            source = rng.randrange(len(keys))
+            queries.append((source + 1, _misread(keys[source], max_distance, rng)))
+        timings = []
+        hits = 0
+        for vehicle_id, query in queries:
+            started = time.perf_counter()
+            found = index.lookup(query)
+            timings.append((time.perf_counter() - started) * 1e6)
+            hits += bool(found) and found[0].vehicle_id == vehicle_id
+
+        scan = []
+        for _, query in queries[: args.scan]:
+            started = time.perf_counter()
+            sum(1 for k in keys if _edit_distance(query, k, max_distance) <= max_distance)
+            scan.append((time.perf_counter() - started) * 1e6)
+
+        print(
+            f"d={max_distance}: построение {build_s:.1f} c{memory}; "
+            f"поиск p50 {statistics.median(timings):.0f} мкс, "
+            f"p99 {_percentile(timings, 0.99):.0f} мкс; "
+            f"перебор p50 {statistics.median(scan) / 1000:.0f} мс; "
+            f"исходный номер первым: {hits / len(queries):.0%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
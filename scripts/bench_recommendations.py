@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Бенчмарк рекомендаций смен: прежние запросы правил против снимка анализа.
+
+НЕ входит в CI. Генерирует синтетический год (``--days``) заявок и смен и
+меряет для окон ``--periods``:
+
+* «по правилам» — запросы, которые движок делал до снимка: каждое правило
+  перечитывало свои смены целиком, тренд — ``count`` на каждый день окна;
+* «снимок» — ``RecommendationEngine.get_analysis_snapshot`` без кэша (три
+  агрегатных запроса);
+* «кэш» — повторный вызов того же окна.
+
+Печатается время и число SQL-запросов. По умолчанию — временный файл SQLite;
+с ``DATABASE_URL=postgresql://...`` таблицы создаются в отдельной схеме
+(``--schema``, по умолчанию ``bench_recommendations``), которая удаляется в
+конце; рабочие таблицы приложения не трогаются.
+
+Запуск:
+    python3 scripts/bench_recommendations.py
+    DATABASE_URL=postgresql://... python3 scripts/bench_recommendations.py --requests-per-day 300
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, event, insert, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import uk_management_bot.database.models  # noqa: E402,F401 — регистрация моделей
+from uk_management_bot.database.models.request import Request  # noqa: E402
+from uk_management_bot.database.models.shift import Shift  # noqa: E402
+from uk_management_bot.database.models.user import User  # noqa: E402
+from uk_management_bot.database.session import Base  # noqa: E402
+from uk_management_bot.services import recommendation_engine  # noqa: E402
+from uk_management_bot.services.recommendation_engine import RecommendationEngine  # noqa: E402
+from uk_management_bot.utils.business_time import business_day_window, business_today  # noqa: E402
+from uk_management_bot.utils.datetime_utils import utc_now  # noqa: E402
+
+
+def _seed(engine, days: int, requests_per_day: int, executors: int) -> None:
+    rnd = random.Random(42)
+    now = utc_now()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "telegram_id": 10_000 + i, "status": "approved"}
+            for i in range(1, executors + 1)
+        ])
+        rows = []
+        for day in range(days):
+            base = now - timedelta(days=day)
+            for n in range(requests_per_day):
+                rows.append({
+                    "request_number": f"{day:04d}-{n:06d}",
+                    "user_id": rnd.randint(1, executors),
+                    "category": "plumbing",
+                    "description": "bench",
+                    "created_at": base - timedelta(minutes=rnd.randint(0, 1439)),
+                })
+            if len(rows) >= 5000:
+                conn.execute(insert(Request), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Request), rows)
+        conn.execute(insert(Shift), [
+            {
+                "user_id": user_id,
+                "status": "completed",
+                "start_time": now - timedelta(days=day, hours=rnd.randint(0, 12)),
+                "current_request_count": rnd.randint(0, 12),
+                "efficiency_score": rnd.uniform(30, 100),
+                "average_response_time": rnd.uniform(10, 300),
+                "quality_rating": rnd.uniform(2, 5),
+            }
+            for day in range(days)
+            for user_id in range(1, executors + 1)
+        ])
+
+
+def _per_rule_queries(db: Session, period_days: int) -> None:
+    """Запросы движка до снимка — в том же порядке и объёме."""
+    start = utc_now() - timedelta(days=period_days)
+    db.query(Shift).filter(Shift.start_time >= start, Shift.efficiency_score < 60).all()
+    db.query(Shift).filter(Shift.start_time >= start).all()
+    db.query(Shift).filter(Shift.start_time >= start, Shift.efficiency_score.isnot(None)).all()
+    today = business_today()
+    for i in range(period_days):
+        day_start, day_end = business_day_window(today - timedelta(days=i))
+        db.query(Request).filter(Request.created_at >= day_start, Request.created_at < day_end).count()
+    db.query(Shift.quality_rating).filter(
+        Shift.start_time >= start, Shift.quality_rating.isnot(None)
+    ).all()
+    db.query(Shift).filter(Shift.start_time >= start, Shift.average_response_time > 180).count()
+    db.query(Shift).filter(Shift.start_time >= start).count()
+
+
+def _measure(engine, fn) -> tuple[float, int]:
+    statements = []
+
+    def _count(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        with Session(engine) as db:
+            started = time.perf_counter()
+            fn(db)
+            elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+    return elapsed * 1000, len(statements)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schema", default="bench_recommendations")
+    parser.add_argument("--days", type=int, default=365, help="дней синтетической истории")
+    parser.add_argument("--requests-per-day", type=int, default=120)
+    parser.add_argument("--executors", type=int, default=25)
+    parser.add_argument("--periods", type=int, nargs="+", default=[30, 90, 365],
+                        help="окна анализа, дней")
+    args = parser.parse_args()
+
+    url = os.getenv("DATABASE_URL", "")
+    tmp = None
+    if url.startswith("postgresql"):
+        # search_path, а не schema_translate_map: запрос тренда — текстовый SQL
+        engine = create_engine(url, connect_args={"options": f"-csearch_path={args.schema}"})
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE'))
+            conn.execute(text(f'CREATE SCHEMA "{args.schema}"'))
+    else:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        engine = create_engine(f"sqlite:///{tmp.name}")
+
+    try:
+        Base.metadata.create_all(engine)
+        started = time.perf_counter()
+        _seed(engine, args.days, args.requests_per_day, args.executors)
+        print(
+            f"{engine.dialect.name}: {args.days} дней × {args.requests_per_day} заявок, "
+            f"{args.executors} исполнителей — сгенерировано за {time.perf_counter() - started:.1f} с"
+        )
+        for period in args.periods:
+            recommendation_engine.reset_analysis_cache()
+            legacy_ms, legacy_q = _measure(engine, lambda db: _per_rule_queries(db, period))
+            cold_ms, cold_q = _measure(
+                engine, lambda db: RecommendationEngine(db).get_analysis_snapshot(period)
+            )
+            warm_ms, warm_q = _measure(
+                engine,
+                lambda db: asyncio.run(
+                    RecommendationEngine(db).generate_comprehensive_recommendations(period)
+                ),
+            )
+            print(
+                f"  окно {period:>3} дн: по правилам {legacy_ms:8.1f} мс ({legacy_q} запросов), "
+                f"снимок {cold_ms:7.1f} мс ({cold_q}), кэш {warm_ms:6.1f} мс ({warm_q})"
+            )
+    finally:
+        if url.startswith("postgresql"):
+            with engine.begin() as conn:
+                conn.execute(text(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE'))
+        engine.dispose()
+        if tmp is not None:
+            os.unlink(tmp.name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
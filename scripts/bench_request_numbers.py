@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Бенчмарк выдачи номеров заявок: инкремент в транзакции создания против блоков.
+
+НЕ входит в CI. Нужен PostgreSQL (``DATABASE_URL``): на SQLite писатель один
+на всю БД, и блоки там не включаются. Таблицы ``requests`` (урезанная до
+номера) и ``request_number_counters`` создаются в отдельной схеме
+(``--schema``, по умолчанию ``bench_request_numbers``) через ``search_path``;
+рабочие таблицы приложения не трогаются, схема удаляется в конце.
+
+``--workers`` корутин в одном процессе создают заявки как TWA API: BEGIN →
+``RequestNumberService.next_number_async`` → INSERT заявки → «остаток
+транзакции» (``--hold`` мс: назначения, аудит, outbox) → COMMIT. Прогон на
+каждый размер блока из ``--sizes``; размер 1 — прежнее поведение (row-lock
+строки дня держится до COMMIT, создания идут строго по одному). Печатается
+заявок/с и число дыр в нумерации дня.
+
+Запуск:
+    DATABASE_URL=postgresql://... python3 scripts/bench_request_numbers.py
+    python3 scripts/bench_request_numbers.py --workers 32 --hold 20 --sizes 1 10 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from uk_management_bot.services import request_number_service  # noqa: E402
+from uk_management_bot.services.request_number_service import (  # noqa: E402
+    RequestNumberService,
+    reset_number_blocks,
+)
+
+
+def _async_url(url: str) -> str:
+    if url.startswith("postgresql+asyncpg://"):
+        return url
+    return "postgresql+asyncpg://" + url.split("://", 1)[1]
+
+
+async def _setup(engine, schema: str) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        await conn.execute(text(
+            f"CREATE TABLE {schema}.requests ("
+            " request_number VARCHAR(15) PRIMARY KEY,"
+            " created_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        ))
+        await conn.execute(text(
+            f"CREATE TABLE {schema}.request_number_counters ("
+            " day_prefix VARCHAR(6) PRIMARY KEY,"
+            " last_seq INTEGER NOT NULL)"
+        ))
+
+
+async def _run(engine, size: int, workers: int, per_worker: int, hold: float) -> tuple[float, int, int]:
+    async with engine.begin() as conn:
+        await conn.execute(text("TRUNCATE requests, request_number_counters"))
+    request_number_service.REQUEST_NUMBER_BLOCK_SIZE = size
+    reset_number_blocks()
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def creator() -> None:
+        for _ in range(per_worker):
+            async with Session() as db, db.begin():
+                number = await RequestNumberService.next_number_async(db)
+                await db.execute(text("INSERT INTO requests (request_number) VALUES (:n)"),
+                                 {"n": number})
+                await asyncio.sleep(hold)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(creator() for _ in range(workers)))
+    elapsed = time.perf_counter() - started
+
+    async with engine.connect() as conn:
+        suffixes = [
+            int(n.split("-")[1])
+            for n in (await conn.execute(text("SELECT request_number FROM requests"))).scalars()
+        ]
+    gaps = max(suffixes) - len(suffixes)
+    return len(suffixes) / elapsed, len(suffixes), gaps
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schema", default="bench_request_numbers")
+    parser.add_argument("--workers", type=int, default=16, help="одновременных создателей")
+    parser.add_argument("--requests", type=int, default=50, help="заявок на создателя")
+    parser.add_argument("--hold", type=float, default=10.0,
+                        help="мс работы транзакции после INSERT заявки")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50],
+                        help="размеры блока (1 — без блоков)")
+    args = parser.parse_args()
+
+    url = os.getenv("DATABASE_URL", "")
+    if not url.startswith("postgresql"):
+        print("DATABASE_URL должен указывать на PostgreSQL", file=sys.stderr)
+        return 2
+
+    engine = create_async_engine(
+        _async_url(url),
+        pool_size=args.workers + 4,
+        connect_args={"server_settings": {"search_path": args.schema}},
+    )
+    try:
+        await _setup(engine, args.schema)
+        print(f"{args.workers} создателей × {args.requests} заявок, hold {args.hold} мс")
+        for size in args.sizes:
+            rate, created, gaps = await _run(
+                engine, size, args.workers, args.requests, args.hold / 1000
+            )
+            print(f"  блок {size:>4}: {rate:8.1f} заявок/с  ({created} заявок, дыр {gaps})")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+        await engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Сверка проекции ``request_visibility`` с правилом видимости (миграция 021).
+
+Проекцию обновляют ORM-хук и workflow-раннер; запись мимо них (ручной SQL,
+массовый UPDATE назначений или смен) оставляет её устаревшей, и исполнитель
+не видит своих заявок в списке (или видит чужие). Скрипт показывает
+расхождение и с ``--repair`` исправляет его (источник истины — назначения,
+смены и ``requests.executor_id``). Код возврата 1 — расхождение найдено и не
+исправлено.
+
+Запуск:
+    python3 scripts/check_request_visibility.py
+    python3 scripts/check_request_visibility.py --repair
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import uk_management_bot.database.models  # noqa: E402,F401 — регистрация моделей
+from uk_management_bot.services import request_visibility  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repair", action="store_true", help="исправить расхождение")
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("check_request_visibility: DATABASE_URL is not set", file=sys.stderr)
+        return 1
+    engine = create_engine(database_url)
+    try:
+        with Session(engine) as db:
+            drift = request_visibility.find_drift(db)
+            for executor_id, number, reason in drift.missing[:20]:
+                print(f"  нет строки: executor_id={executor_id} request={number} reason={reason}")
+            for executor_id, number, reason in drift.extra[:20]:
+                print(f"  лишняя строка: executor_id={executor_id} request={number} reason={reason}")
+            print(f"request_visibility: нет {len(drift.missing)}, лишних {len(drift.extra)}")
+            if drift.ok:
+                return 0
+            if not args.repair:
+                return 1
+            fixed = request_visibility.repair(db, drift)
+            db.commit()
+            print(f"исправлено строк: {fixed}")
+            return 0
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Сверка индекса ролей ``user_roles`` с ``users.roles`` (миграция 019).
+
+Индекс обновляет ORM-хук; запись мимо ORM (ручной SQL, массовый UPDATE)
+оставляет его устаревшим, и фильтры по ролям теряют пользователей. Скрипт
+показывает расхождение и с ``--repair`` исправляет его (источник истины —
+``users.roles``). Код возврата 1 — расхождение найдено и не исправлено.
+
+Запуск:
+    python3 scripts/check_user_roles.py
+    python3 scripts/check_user_roles.py --repair
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from uk_management_bot.services import user_role_index  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repair", action="store_true", help="исправить расхождение")
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("check_user_roles: DATABASE_URL is not set", file=sys.stderr)
+        return 1
+    engine = create_engine(database_url)
+    try:
+        with Session(engine) as db:
+            drift = user_role_index.find_drift(db)
+            for user_id, role in drift.missing[:20]:
+                print(f"  нет строки: user_id={user_id} role={role}")
+            for user_id, role in drift.extra[:20]:
+                print(f"  лишняя строка: user_id={user_id} role={role}")
+            print(f"user_roles: нет {len(drift.missing)}, лишних {len(drift.extra)}")
+            if drift.ok:
+                return 0
+            if not args.repair:
+                return 1
+            fixed = user_role_index.repair(db, drift)
+            db.commit()
+            print(f"исправлено строк: {fixed}")
+            return 0
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
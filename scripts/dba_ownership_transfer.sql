@@ -99,7 +99,11 @@ DECLARE
     'barrier_commands','access_entry_confirmations','vehicle_presence_sessions',
     -- добавлены 2026-07-26 (миграция 0007): были пропущены при PRC-05, из-за чего
     -- access-api получал `permission denied for table parking_spot_assignments`
-    'parking_spots','parking_spot_assignments'
+    'parking_spots','parking_spot_assignments',
+    -- миграция 0016: проекция текущих pending_review (review-expiry §9.5)
+    'access_review_heads',
+    -- миграция 0017: watermark'и chunked-retention (фото §11)
+    'access_retention_watermarks'
   ];
   excluded_relnames text[];
   r RECORD;
@@ -132,6 +136,15 @@ BEGIN
     JOIN pg_depend d ON d.refobjid = t.oid AND d.deptype IN ('a', 'i')
     JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
     WHERE t.relname = ANY(excluded_tables)
+    UNION
+    -- Партиции access-domain таблиц (миграция 018: access_events_pYYYYMM,
+    -- _legacy, _default) — relkind 'r', их имён нет в списке выше, а доступ к
+    -- ним — только через родителя и ACL access_app_rw.
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class p ON p.oid = i.inhparent
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE p.relname = ANY(excluded_tables)
   ) sub;
 
   FOR r IN
@@ -130,16 +130,27 @@ async def client(db_session_factory, manager_user):
     app.dependency_overrides.clear()
 
 
-# ── Reset the public-board TTL cache between tests ──────────────────
-# /api/v2/public/board memoizes its payload in a module-level variable;
-# without this reset a cached result leaks across tests.
+# ── Reset the response caches between tests ─────────────────────────
+# Public endpoints (board, board-config, announcements, work-reports feed)
+# memoize payloads in module-level ResponseCache instances; without this reset
+# a cached result leaks across tests. The Redis L2 tier is switched off too: a
+# CI Redis would otherwise carry the payload over.
 
 @pytest.fixture(autouse=True)
 def _reset_public_board_cache():
-    import uk_management_bot.api.public.router as public_router
-    public_router._board_cache = None
+    # No monkeypatch here: requesting it from a conftest autouse fixture sets
+    # it up before module fixtures, so env rollback (see
+    # test_rate_limit_trusted_proxies) would run after their teardown.
+    from uk_management_bot.api import response_cache
+    caches = list(response_cache._caches.values())
+    shared = [cache.shared for cache in caches]
+    for cache in caches:
+        cache.clear()
+        cache.shared = False
     yield
-    public_router._board_cache = None
+    for cache, was_shared in zip(caches, shared):
+        cache.clear()
+        cache.shared = was_shared
 
 
 # ── Reset the slowapi rate-limiter between tests ────────────────────
@@ -149,6 +160,16 @@ def _reset_public_board_cache():
 # test asserting a first-request 200 flakes into 429 once an earlier test
 # has spent the quota. Reset both before and after to isolate every test.
 
+@pytest.fixture(autouse=True)
+def _reset_http_clients():
+    # Shared upstream clients are created lazily from httpx.AsyncClient; tests
+    # that stub it must not get a real client cached by an earlier test.
+    from uk_management_bot.integrations.http_clients import reset_http_clients
+    reset_http_clients()
+    yield
+    reset_http_clients()
+
+
 @pytest.fixture(autouse=True)
 def _reset_rate_limiter():
     from uk_management_bot.api.rate_limit import limiter
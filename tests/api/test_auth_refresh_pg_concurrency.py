@@ -20,6 +20,7 @@ from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from uk_management_bot.database.models.user import User
+from uk_management_bot.database.models.user_role import UserRole
 from uk_management_bot.database.models.refresh_token import RefreshToken
 from uk_management_bot.database.session import Base
 from uk_management_bot.api.auth.service import (
@@ -28,7 +29,7 @@ from uk_management_bot.api.auth.service import (
 from uk_management_bot.api.auth.service import hash_token, create_refresh_token_value
 
 SCHEMA = "auth_refresh_race_test"
-_TABLES = [User.__table__, RefreshToken.__table__]
+_TABLES = [User.__table__, UserRole.__table__, RefreshToken.__table__]
 
 
 def _pg_url() -> str | None:
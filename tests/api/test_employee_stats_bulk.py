@@ -0,0 +1,138 @@
+"""Статистика карточек сотрудников одним сгруппированным запросом на страницу.
+
+Карточка раньше считала смены/завершённые/рейтинг отдельными count'ами, а
+страница «Сотрудники» звала такие хелперы построчно. `get_employee_stats`
+отдаёт счётчики для списка id одним SQL-выражением (GROUP BY + FILTER),
+`GET /employees?with_stats=true` кладёт их в `stats` каждой строки.
+"""
+import datetime
+
+import pytest
+from sqlalchemy import event
+
+from uk_management_bot.api.shifts import service
+from uk_management_bot.database.models.rating import Rating
+from uk_management_bot.database.models.request import Request as RequestModel
+from uk_management_bot.database.models.shift import Shift
+from uk_management_bot.database.models.user import User
+
+EP = "/api/v2/shifts/employees"
+T0 = datetime.datetime(2026, 10, 1, 8, 0, tzinfo=datetime.timezone.utc)
+
+
+async def _executor(db, tg):
+    u = User(telegram_id=tg, username=f"e{tg}", first_name="E", last_name=str(tg),
+             roles='["executor"]', active_role="executor", status="approved",
+             verification_status="verified")
+    db.add(u)
+    await db.commit()
+    await db.refresh(u)
+    return u
+
+
+async def _shifts(db, user_id, *statuses):
+    for i, status in enumerate(statuses):
+        db.add(Shift(user_id=user_id, status=status,
+                     start_time=T0 + datetime.timedelta(days=i)))
+    await db.commit()
+
+
+async def _request(db, number, *, owner_id, executor_id, status, rating=None):
+    db.add(RequestModel(request_number=number, user_id=owner_id,
+                        category="Сантехника", description="d",
+                        status=status, executor_id=executor_id))
+    if rating is not None:
+        db.add(Rating(request_number=number, user_id=owner_id, rating=rating))
+    await db.commit()
+
+
+async def _seed(db, manager_user):
+    busy = await _executor(db, 5001)
+    idle = await _executor(db, 5002)
+    await _shifts(db, busy.id, "completed", "completed", "active", "planned")
+    await _request(db, "261001-001", owner_id=manager_user.id, executor_id=busy.id,
+                   status="В работе")
+    await _request(db, "261001-002", owner_id=manager_user.id, executor_id=busy.id,
+                   status="Уточнение")
+    await _request(db, "261001-003", owner_id=manager_user.id, executor_id=busy.id,
+                   status="Принято", rating=5)
+    await _request(db, "261001-004", owner_id=manager_user.id, executor_id=busy.id,
+                   status="Принято", rating=2)
+    return busy, idle
+
+
+@pytest.mark.asyncio
+async def test_stats_per_user(db_session, manager_user):
+    busy, idle = await _seed(db_session, manager_user)
+
+    stats = await service.get_employee_stats(db_session, [busy.id, idle.id, 999_999])
+
+    assert set(stats) == {busy.id, idle.id}
+    assert stats[busy.id] == service.EmployeeStats(
+        total_shifts=4, completed_shifts=2, active_shifts=1,
+        active_requests=2, rating=pytest.approx(3.5),
+    )
+    assert stats[idle.id] == service.EmployeeStats()
+
+
+@pytest.mark.asyncio
+async def test_stats_is_one_statement_for_any_page(db_session, manager_user):
+    users = [await _executor(db_session, 5100 + i) for i in range(8)]
+    for u in users:
+        await _shifts(db_session, u.id, "completed", "active")
+
+    engine = db_session.bind.sync_engine
+    statements = []
+
+    def _count(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        one = await service.get_employee_stats(db_session, [users[0].id])
+        issued_for_one = len(statements)
+        page = await service.get_employee_stats(db_session, [u.id for u in users])
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert issued_for_one == 1
+    assert len(statements) == 2
+    assert one[users[0].id].total_shifts == 2
+    assert all(s.completed_shifts == 1 and s.active_shifts == 1 for s in page.values())
+
+
+@pytest.mark.asyncio
+async def test_empty_ids_skip_the_query(db_session):
+    assert await service.get_employee_stats(db_session, []) == {}
+
+
+@pytest.mark.asyncio
+async def test_card_counters_come_from_bulk_stats(db_session, manager_user):
+    busy, _ = await _seed(db_session, manager_user)
+
+    emp, active_shift, total, completed, rating = await service.get_employee_with_stats(
+        db_session, busy.id
+    )
+
+    assert emp.id == busy.id
+    assert active_shift is not None and active_shift.status == "active"
+    assert (total, completed) == (4, 2)
+    assert rating == pytest.approx(3.5)
+
+
+@pytest.mark.asyncio
+async def test_list_endpoint_with_stats(client, db_session, manager_user):
+    busy, idle = await _seed(db_session, manager_user)
+
+    resp = await client.get(EP, params={"with_stats": "true"})
+    assert resp.status_code == 200
+    rows = {row["id"]: row for row in resp.json()}
+    assert rows[busy.id]["stats"] == {
+        "total_shifts": 4, "completed_shifts": 2, "active_shifts": 1,
+        "active_requests": 2, "rating": 3.5,
+    }
+    assert rows[idle.id]["stats"]["total_shifts"] == 0
+    assert rows[idle.id]["stats"]["rating"] is None
+
+    resp = await client.get(EP)
+    assert all(row["stats"] is None for row in resp.json())
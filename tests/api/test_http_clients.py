@@ -0,0 +1,104 @@
+"""Общие HTTP-клиенты апстримов (integrations/http_clients.py).
+
+Покрытие:
+  - keep-alive: последовательные запросы к апстриму идут по одному TCP-
+    соединению, и это видно в счётчиках (new_connections / requests);
+  - клиент один на апстрим в пределах event loop'а и свой у другого loop'а;
+  - close_http_clients закрывает клиенты текущего loop'а;
+  - медиа-прокси не создаёт клиент на каждый вызов.
+
+Апстрим — минимальный HTTP/1.1-сервер на 127.0.0.1 (asyncio.start_server):
+MockTransport не открывает сокетов, а предмет проверки — именно сокеты.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from uk_management_bot.integrations import http_clients
+
+
+async def _keepalive_server():
+    connections = {"n": 0}
+
+    async def handle(reader, writer):
+        connections["n"] += 1
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: 2\r\nConnection: keep-alive\r\n\r\n{}"
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}", connections
+
+
+@pytest.mark.asyncio
+async def test_sequential_requests_reuse_one_connection():
+    server, url, connections = await _keepalive_server()
+    upstream = "test_keepalive"
+    try:
+        client = http_clients.get_http_client(upstream)
+        for _ in range(5):
+            assert (await client.get(f"{url}/ping")).status_code == 200
+            assert http_clients.get_http_client(upstream) is client
+    finally:
+        await http_clients.close_http_clients()
+        server.close()
+        await server.wait_closed()
+
+    stats = http_clients.stats()[upstream]
+    assert connections["n"] == 1
+    assert stats["requests"] == 5
+    assert stats["new_connections"] == 1
+    assert stats["latency_seconds_max"] > 0
+
+
+def test_each_event_loop_gets_its_own_client():
+    async def grab():
+        client = http_clients.get_http_client(http_clients.UPSTREAM_MEDIA)
+        await http_clients.close_http_clients()
+        return client
+
+    first = asyncio.run(grab())
+    second = asyncio.run(grab())
+
+    assert first is not second
+    assert first.is_closed and second.is_closed
+
+
+@pytest.mark.asyncio
+async def test_media_proxy_list_reuses_shared_client(monkeypatch):
+    from uk_management_bot.api.routes import media_proxy
+
+    built = []
+    real_client = httpx.AsyncClient
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=[{"id": 1}]))
+
+    def _factory(*args, **kwargs):
+        built.append(kwargs)
+        return real_client(*args, **{**kwargs, "transport": transport})
+
+    monkeypatch.setattr(http_clients.httpx, "AsyncClient", _factory)
+    monkeypatch.setattr(media_proxy, "check_request_access", AsyncMock())
+    monkeypatch.setattr(
+        type(media_proxy.settings), "MEDIA_SERVICE_URL",
+        property(lambda self: "http://media.test"), raising=False,
+    )
+
+    for _ in range(3):
+        listed = await media_proxy.proxy_media_list("260601-001", user=MagicMock(), db=MagicMock())
+        assert listed == [{"id": 1}]
+
+    assert len(built) == 1
+    assert built[0]["limits"].max_keepalive_connections == http_clients.HTTP_POOL_MAX_KEEPALIVE
+    await http_clients.close_http_clients()
@@ -4,15 +4,17 @@
 FIFO-списание по нескольким партиям, запрет отрицательного остатка,
 инвентаризационные корректировки и сторно (полное однократное сторно расхода
 по исходным аллокациям; адресное сторно прихода мимо FIFO), snapshot имени,
-живучесть журнала при удалении заявки, остатки, журнал операций, CSV,
-by-request, procurement, RBAC.
+живучесть журнала при удалении заявки, остатки (агрегат партий с остатком,
+в том числе после записи мимо ORM), bulk-расход на заявку (всё или ничего), журнал операций
+(material_movements: keyset-курсор, total с потолком), CSV, by-request,
+procurement, RBAC.
 """
 from contextlib import contextmanager
 from decimal import Decimal
 
 import pytest
 from httpx import AsyncClient
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from uk_management_bot.api.dependencies import get_current_user
@@ -20,10 +22,12 @@ from uk_management_bot.api.main import app
 from uk_management_bot.database.models.material import (
     MaterialIssue,
     MaterialIssueAllocation,
+    MaterialMovement,
     MaterialReceipt,
 )
 from uk_management_bot.database.models.request import Request
 from uk_management_bot.database.models.user import User
+from uk_management_bot.services.material_service import reads
 
 BASE = "/api/v2/materials"
 
@@ -438,6 +442,75 @@ async def test_issue_journal_survives_request_delete(client: AsyncClient,
     assert alive.request_number == "260705-001"  # «висячий» номер допустим
 
 
+@pytest.mark.asyncio
+async def test_fifo_walk_spans_lock_chunks_and_stock_follows_batches(
+        client: AsyncClient, db_session: AsyncSession):
+    """Партий больше, чем в одном куске FIFO-обхода: списание идёт дальше по
+    (created_at, id); остаток считается из партий и видит запись мимо ORM."""
+    m = await _mk_material(client)
+    for price in ("1.00", "2.00", "3.00", "4.00", "5.00", "6.00"):
+        await _mk_receipt(client, m["id"], "1", price)
+
+    resp = await client.post(f"{BASE}/issues", json={
+        "material_id": m["id"], "qty": "5", "doc_type": "household", "reason": "х/н",
+    })
+    assert resp.status_code == 201, resp.text
+    assert _d(resp.json()["total_cost"]) == _d("15.00")
+    resp = await client.post(f"{BASE}/issues", json={
+        "material_id": m["id"], "qty": "2", "doc_type": "household", "reason": "х/н",
+    })
+    assert resp.status_code == 409
+    row = (await reads.get_stock(db_session, q=m["name"]))[0]
+    assert (row["stock"], row["stock_value"]) == (_d("1"), _d("6.00"))
+
+    await db_session.execute(
+        update(MaterialReceipt).values(qty_remaining=0)
+        .execution_options(synchronize_session=False)
+    )
+    row = (await reads.get_stock(db_session, q=m["name"]))[0]
+    assert (row["stock"], row["stock_value"]) == (_d("0"), _d("0.00"))
+
+
+@pytest.mark.asyncio
+async def test_bulk_issue_all_or_nothing(client: AsyncClient,
+                                         db_session: AsyncSession,
+                                         manager_user: User):
+    await _mk_request(db_session, manager_user)
+    cable = await _mk_material(client, name="Кабель")
+    tape = await _mk_material(client, name="Изолента", unit="pcs")
+    await _mk_receipt(client, cable["id"], "10", "15.00")
+    await _mk_receipt(client, tape["id"], "2", "30.00")
+
+    resp = await client.post(f"{BASE}/issues/bulk", json={
+        "request_number": "260705-001",
+        "items": [{"material_id": tape["id"], "qty": "1"},
+                  {"material_id": cable["id"], "qty": "3"}],
+    })
+    assert resp.status_code == 201, resp.text
+    issues = resp.json()
+    assert [i["material_id"] for i in issues] == [tape["id"], cable["id"]]
+    assert [_d(i["total_cost"]) for i in issues] == [_d("30.00"), _d("45.00")]
+
+    # Вторая строка не проходит — первая тоже не списана.
+    resp = await client.post(f"{BASE}/issues/bulk", json={
+        "request_number": "260705-001",
+        "items": [{"material_id": cable["id"], "qty": "2"},
+                  {"material_id": tape["id"], "qty": "5"}],
+    })
+    assert resp.status_code == 409
+    assert f"материала {tape['id']}" in resp.json()["detail"]
+    rows = {r["name"]: r for r in (await client.get(f"{BASE}/stock")).json()}
+    assert _d(rows["Кабель"]["stock"]) == _d("7")
+    assert _d(rows["Изолента"]["stock"]) == _d("1")
+
+    resp = await client.post(f"{BASE}/issues/bulk", json={
+        "request_number": "260705-001",
+        "items": [{"material_id": cable["id"], "qty": "1"},
+                  {"material_id": cable["id"], "qty": "1"}],
+    })
+    assert resp.status_code == 422
+
+
 # ── Остатки / журнал / отчёты ───────────────────────────────────────
 
 @pytest.mark.asyncio
@@ -491,6 +564,55 @@ async def test_operations_filters_and_pagination(client: AsyncClient,
     assert page["total"] == 4 and len(page["items"]) == 2
 
 
+@pytest.mark.asyncio
+async def test_operations_keyset_pages_and_capped_total(client: AsyncClient,
+                                                        db_session: AsyncSession,
+                                                        monkeypatch):
+    """Журнал из material_movements: курсор проходит всё без дублей (строки
+    одной секунды — тай-брейк по id), сторно попадает в журнал, total — с
+    потолком."""
+    m = await _mk_material(client)
+    for _ in range(3):
+        await _mk_receipt(client, m["id"], "2", "10.00")
+    issue = (await client.post(f"{BASE}/issues", json={
+        "material_id": m["id"], "qty": "3", "doc_type": "household", "reason": "х/н",
+    })).json()
+    await client.post(f"{BASE}/adjustments", json={
+        "material_id": m["id"], "direction": "surplus",
+        "reason": "сторно", "reversal_of_issue_id": issue["id"],
+    })
+
+    ledger = (await db_session.execute(
+        select(MaterialMovement.op_type, MaterialMovement.op_id)
+    )).all()
+    receipts = (await db_session.execute(select(MaterialReceipt.id))).scalars().all()
+    issues = (await db_session.execute(select(MaterialIssue.id))).scalars().all()
+    assert sorted(ledger) == sorted(
+        [("issue", i) for i in issues] + [("receipt", r) for r in receipts]
+    )
+
+    full = (await client.get(f"{BASE}/operations")).json()
+    assert full["total"] == 5 and full["next_cursor"] is None
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        page = (await client.get(f"{BASE}/operations", params=params)).json()
+        seen.extend((op["op_type"], op["id"]) for op in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [(op["op_type"], op["id"]) for op in full["items"]]
+
+    monkeypatch.setattr(reads, "OPERATIONS_TOTAL_CAP", 3)
+    capped = (await client.get(f"{BASE}/operations")).json()
+    assert (capped["total"], capped["total_capped"]) == (3, True)
+    exact = (await client.get(f"{BASE}/operations", params={"exact_total": True})).json()
+    assert (exact["total"], exact["total_capped"]) == (5, False)
+
+    resp = await client.get(f"{BASE}/operations", params={"cursor": "@@"})
+    assert resp.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_operations_csv_export(client: AsyncClient):
     m = await _mk_material(client)
@@ -673,3 +795,8 @@ async def test_qty_remaining_invariant_after_series(client: AsyncClient,
             Decimal("0"),
         )
         assert _d(r.qty_remaining) == _d(r.qty) - allocated, f"receipt {r.id}"
+
+    # Остаток API — сумма qty_remaining партий.
+    remaining = sum((_d(r.qty_remaining) for r in receipts), Decimal("0"))
+    row = (await reads.get_stock(db_session, q=m["name"]))[0]
+    assert row["stock"] == remaining
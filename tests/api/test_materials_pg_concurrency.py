@@ -10,7 +10,11 @@ SQLite не имеет row-locking (FOR UPDATE молча выбрасывает
       issue FOR UPDATE сериализует проверку «уже сторнирован»);
   (в) BUG-143: два конкурентных create_material одного имени — дубль-проверка
       select-then-insert проходит у обоих, второй INSERT бьётся об UNIQUE(name)
-      и обязан отдать MaterialConflictError (409), а не сырой IntegrityError.
+      и обязан отдать MaterialConflictError (409), а не сырой IntegrityError;
+  (г) списание лочит только старейшие партии, покрывающие qty: партия из
+      хвоста склада свободна для чужого FOR UPDATE NOWAIT; приход материала
+      не ждёт незакоммиченного расхода того же материала, а остаток после
+      смеси конкурентных приходов и расходов равен сумме партий.
 
 Изоляция: собственная temp-схема в той же БД (schema_translate_map).
 Скип, если DATABASE_URL не Postgres (см. POSTGRES_TEST_URL в conftest).
@@ -28,9 +32,11 @@ from uk_management_bot.database.models.material import (
     Material,
     MaterialIssue,
     MaterialIssueAllocation,
+    MaterialMovement,
     MaterialReceipt,
 )
 from uk_management_bot.database.models.user import User
+from uk_management_bot.database.models.user_role import UserRole
 from uk_management_bot.database.session import Base
 from uk_management_bot.services import material_service
 from uk_management_bot.services.material_service import (
@@ -42,10 +48,12 @@ SCHEMA = "materials_race_test"
 
 _TABLES = [
     User.__table__,
+    UserRole.__table__,
     Material.__table__,
     MaterialReceipt.__table__,
     MaterialIssue.__table__,
     MaterialIssueAllocation.__table__,
+    MaterialMovement.__table__,
 ]
 
 
@@ -224,3 +232,95 @@ async def test_concurrent_issue_reversals_single_shot(pg_factory):
             (Decimal("3"), Decimal("100.00")),
             (Decimal("2"), Decimal("150.00")),
         ]
+
+
+@pytest.mark.asyncio
+async def test_issue_locks_only_covering_batches(pg_factory):
+    user_id, material_id = await _seed(pg_factory)
+    async with pg_factory() as db:
+        for _ in range(8):
+            await material_service.create_receipt(
+                db, material_id=material_id, qty="1", unit_price="10.00",
+                created_by=user_id,
+            )
+        await db.commit()
+        newest_id = (await db.execute(
+            select(func.max(MaterialReceipt.id))
+        )).scalar_one()
+
+    async with pg_factory() as holder, pg_factory() as other:
+        await material_service.issue_material(
+            holder, material_id=material_id, qty="1", created_by=user_id,
+            doc_type="household", reason="держит лок",
+        )
+        # Хвостовая партия не залочена незакоммиченным списанием.
+        row = (await other.execute(
+            select(MaterialReceipt.id)
+            .where(MaterialReceipt.id == newest_id)
+            .with_for_update(nowait=True)
+        )).scalar_one()
+        assert row == newest_id
+        await other.rollback()
+        await holder.commit()
+
+
+@pytest.mark.asyncio
+async def test_receipt_does_not_wait_for_open_issue(pg_factory):
+    """Нет общей строки-сводки: приход коммитится, пока расход держит свои партии."""
+    user_id, material_id = await _seed(pg_factory)
+    async with pg_factory() as db:
+        await material_service.create_receipt(
+            db, material_id=material_id, qty="5", unit_price="10.00",
+            created_by=user_id,
+        )
+        await db.commit()
+
+    async with pg_factory() as holder, pg_factory() as other:
+        await material_service.issue_material(
+            holder, material_id=material_id, qty="1", created_by=user_id,
+            doc_type="household", reason="держит лок",
+        )
+        await other.execute(text("SET LOCAL lock_timeout = '2s'"))
+        await material_service.create_receipt(
+            other, material_id=material_id, qty="3", unit_price="12.00",
+            created_by=user_id,
+        )
+        await other.commit()
+        await holder.commit()
+
+    async with pg_factory() as db:
+        row = next(r for r in await material_service.get_stock(db) if r["material_id"] == material_id)
+    assert row["stock"] == Decimal("7")
+
+
+@pytest.mark.asyncio
+async def test_stock_consistent_under_concurrency(pg_factory):
+    user_id, material_id = await _seed(pg_factory)
+    async with pg_factory() as db:
+        await material_service.create_receipt(
+            db, material_id=material_id, qty="5", unit_price="10.00",
+            created_by=user_id,
+        )
+        await db.commit()
+
+    async def _receive(price: str):
+        async with pg_factory() as db:
+            await material_service.create_receipt(
+                db, material_id=material_id, qty="2", unit_price=price,
+                created_by=user_id,
+            )
+            await db.commit()
+
+    await asyncio.gather(
+        *(_issue(pg_factory, material_id, user_id, "1") for _ in range(6)),
+        *(_receive(f"{20 + i}.00") for i in range(4)),
+    )
+
+    async with pg_factory() as db:
+        remaining = (await db.execute(
+            select(func.sum(MaterialReceipt.qty_remaining))
+            .where(MaterialReceipt.material_id == material_id)
+        )).scalar_one()
+        row = next(r for r in await material_service.get_stock(db) if r["material_id"] == material_id)
+    assert row["stock"] == Decimal(str(remaining))
+    assert row["stock"] == Decimal("7")
@@ -0,0 +1,134 @@
+"""bcrypt вне event loop (api/auth/passwords.py).
+
+Покрытие:
+  - пул процессов реально считает хэш/проверку;
+  - граница очереди: сверх max_pending операция сразу получает
+    PasswordHasherBusy, а /auth/login — 503 + Retry-After;
+  - rehash-on-login: хэш со старым cost переписывается при входе.
+
+Each login carries a unique TEST-NET-3 X-Real-IP so the 10/min bucket never
+collides across tests (same trick as test_auth_set_password_current.py).
+"""
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+
+from uk_management_bot.api.auth import passwords
+from uk_management_bot.api.auth import router as auth_router
+from uk_management_bot.api.auth.passwords import (
+    PasswordHasher, PasswordHasherBusy, hash_cost, hash_password, needs_rehash,
+)
+from uk_management_bot.api.dependencies import get_db
+from uk_management_bot.api.main import app
+from uk_management_bot.database.models.user import User
+
+PASSWORD = "CorrectHorse42"
+
+
+def _h() -> dict:
+    return {"X-Real-IP": f"203.0.113.{(time.monotonic_ns() >> 4) % 250 + 2}"}
+
+
+@pytest.fixture
+def hasher():
+    pool = PasswordHasher(workers=1, max_pending=4)
+    passwords.set_password_hasher(pool)
+    yield pool
+    passwords.reset_password_hasher()
+
+
+@pytest_asyncio.fixture
+async def anon_client(db_session_factory, monkeypatch):
+    async def override_get_db():
+        async with db_session_factory() as session:
+            yield session
+
+    async def _store_otp(user_id, code):
+        return None
+
+    async def _send_otp(telegram_id, code):
+        return True
+
+    monkeypatch.setattr(auth_router, "store_otp", _store_otp)
+    monkeypatch.setattr(auth_router, "send_otp_via_bot", _send_otp)
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+
+
+async def _user(db_session, password_hash: str) -> User:
+    user = User(
+        telegram_id=555001, username="pw", first_name="Pw", email="pw@example.com",
+        roles='["manager"]', active_role="manager", status="approved",
+        password_hash=password_hash,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+def test_needs_rehash_compares_cost(monkeypatch):
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 5)
+    old = hash_password(PASSWORD, rounds=4)
+
+    assert hash_cost(old) == 4
+    assert needs_rehash(old)
+    assert not needs_rehash(hash_password(PASSWORD, rounds=5))
+    assert not needs_rehash("not-a-bcrypt-hash")
+
+
+@pytest.mark.asyncio
+async def test_pool_hashes_and_verifies(hasher):
+    hashed = await hasher.hash(PASSWORD)
+
+    assert await hasher.verify(PASSWORD, hashed) is True
+    assert await hasher.verify("wrong", hashed) is False
+    assert await hasher.verify(PASSWORD, "garbage") is False
+    assert hasher.stats() == {"pending": 0, "hash": 1, "verify": 3}
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_immediately(hasher):
+    hasher.max_pending = 1
+    slow = asyncio.create_task(hasher.verify(PASSWORD, hash_password(PASSWORD, rounds=10)))
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.verify(PASSWORD, "anything")
+    assert await slow is True
+    assert hasher.counters["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_login_returns_503_when_pool_saturated(hasher, anon_client, db_session):
+    await _user(db_session, hash_password(PASSWORD, rounds=4))
+    hasher.pending = hasher.max_pending
+
+    resp = await anon_client.post(
+        "/api/v2/auth/login", json={"email": "pw@example.com", "password": PASSWORD}, headers=_h(),
+    )
+
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_cost(hasher, anon_client, db_session, db_session_factory, monkeypatch):
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 5)
+    user = await _user(db_session, hash_password(PASSWORD, rounds=4))
+
+    resp = await anon_client.post(
+        "/api/v2/auth/login", json={"email": "pw@example.com", "password": PASSWORD}, headers=_h(),
+    )
+    assert resp.status_code == 200
+    assert resp.json()["mfa_required"] is True
+
+    async with db_session_factory() as session:
+        stored = (await session.execute(select(User.password_hash).where(User.id == user.id))).scalar_one()
+    assert hash_cost(stored) == 5
+    assert passwords.verify_password(PASSWORD, stored)
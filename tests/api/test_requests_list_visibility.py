@@ -0,0 +1,94 @@
+"""GET /api/v2/requests: скоуп исполнителя по проекции request_visibility + keyset.
+
+Покрытие:
+  - исполнитель видит заявки по индивидуальному назначению, по группе своей
+    специализации (только пока смена активна) и по ``executor_id``; чужие —
+    нет;
+  - закрытие смены убирает групповые заявки из списка (ORM-хук);
+  - keyset-страницы по ``X-Next-Cursor`` проходят весь список без дублей и
+    пропусков; битый курсор → 400.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from uk_management_bot.api.dependencies import get_current_user
+from uk_management_bot.api.main import app
+from uk_management_bot.database.models.request import Request
+from uk_management_bot.database.models.request_assignment import RequestAssignment
+from uk_management_bot.database.models.shift import Shift
+from uk_management_bot.database.models.user import User
+
+URL = "/api/v2/requests"
+T0 = datetime(2026, 6, 1, 9, 0, tzinfo=timezone.utc)
+
+
+async def _executor(db):
+    user = User(telegram_id=777001, first_name="Exec", roles='["executor"]',
+                active_role="executor", status="approved", specialization='["plumber"]')
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+async def _request(db, number, *, owner_id, minutes, executor_id=None):
+    db.add(Request(request_number=number, user_id=owner_id, category="c",
+                   description="d", status="В работе", urgency="low",
+                   executor_id=executor_id, created_at=T0 + timedelta(minutes=minutes)))
+
+
+def _numbers(response):
+    assert response.status_code == 200, response.text
+    return [card["request_number"] for card in response.json()]
+
+
+@pytest.mark.asyncio
+async def test_executor_scope_follows_assignments_and_shift(client, db_session, manager_user):
+    executor = await _executor(db_session)
+    owner = manager_user.id
+    await _request(db_session, "260601-001", owner_id=owner, minutes=1)
+    await _request(db_session, "260601-002", owner_id=owner, minutes=2)
+    await _request(db_session, "260601-003", owner_id=owner, minutes=3, executor_id=executor.id)
+    await _request(db_session, "260601-004", owner_id=owner, minutes=4)
+    await _request(db_session, "260601-005", owner_id=owner, minutes=5)
+    db_session.add_all([
+        RequestAssignment(request_number="260601-001", assignment_type="individual",
+                          executor_id=executor.id, created_by=owner, status="active"),
+        RequestAssignment(request_number="260601-002", assignment_type="group",
+                          group_specialization="plumber", created_by=owner, status="active"),
+        RequestAssignment(request_number="260601-004", assignment_type="group",
+                          group_specialization="electric", created_by=owner, status="active"),
+    ])
+    shift = Shift(user_id=executor.id, status="active", start_time=T0)
+    db_session.add(shift)
+    await db_session.commit()
+
+    app.dependency_overrides[get_current_user] = lambda: executor
+    assert _numbers(await client.get(URL)) == ["260601-003", "260601-002", "260601-001"]
+
+    shift.status = "completed"
+    await db_session.commit()
+    assert _numbers(await client.get(URL)) == ["260601-003", "260601-001"]
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_the_list(client, db_session, manager_user):
+    # Две заявки в одну и ту же секунду — порядок решает request_number.
+    for i, minutes in enumerate([1, 2, 2, 3, 4], start=1):
+        await _request(db_session, f"260601-{i:03d}", owner_id=manager_user.id, minutes=minutes)
+    await db_session.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        response = await client.get(URL, params=params)
+        seen.extend(_numbers(response))
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == ["260601-005", "260601-004", "260601-003", "260601-002", "260601-001"]
+
+    response = await client.get(URL, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
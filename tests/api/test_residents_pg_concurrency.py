@@ -35,6 +35,7 @@ from uk_management_bot.database.models.apartment import Apartment
 from uk_management_bot.database.models.audit import AuditLog
 from uk_management_bot.database.models.building import Building
 from uk_management_bot.database.models.user import User
+from uk_management_bot.database.models.user_role import UserRole
 from uk_management_bot.database.models.user_apartment import UserApartment
 from uk_management_bot.database.models.yard import Yard
 from uk_management_bot.database.session import Base
@@ -45,6 +46,7 @@ SCHEMA = "residents_race_test"
 
 _TABLES = [
     User.__table__,
+    UserRole.__table__,
     Yard.__table__,
     Building.__table__,
     Apartment.__table__,
@@ -0,0 +1,171 @@
+"""Единый кэш ответов публичных эндпоинтов (api/response_cache.py).
+
+Покрытие:
+  - single-flight: одновременные промахи одного ключа → один загрузчик;
+  - stale-while-revalidate: пока один запрос пересчитывает, остальные сразу
+    получают устаревшую запись;
+  - эпоха: invalidate() одного «воркера» сбрасывает запись другого;
+  - L2: ответ, посчитанный одним воркером, второй берёт из Redis;
+  - LRU-граница и некэширование ошибок загрузчика;
+  - ETag/304 на табло и сброс кэша витрины сохранением board_config.
+
+Redis — FakeRedis (как в test_work_reports_coordination.py).
+"""
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from uk_management_bot.api import response_cache
+from uk_management_bot.api.response_cache import ResponseCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store: dict = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def incr(self, key):
+        self.store[key] = int(self.store.get(key, 0)) + 1
+        return self.store[key]
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+        return True
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    r = FakeRedis()
+
+    async def _get():
+        return r
+
+    monkeypatch.setattr(response_cache, "get_pubsub_redis", _get)
+    return r
+
+
+class Payload(BaseModel):
+    n: int
+
+
+def _counting_loader(delay: float = 0):
+    calls = {"n": 0}
+
+    async def load():
+        calls["n"] += 1
+        await asyncio.sleep(delay)
+        return {"n": calls["n"]}
+
+    return calls, load
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = ResponseCache("test_single_flight", ttl=60)
+    calls, load = _counting_loader(delay=0.05)
+
+    entries = await asyncio.gather(*(cache.get("k", load) for _ in range(10)))
+
+    assert calls["n"] == 1
+    assert {e.value["n"] for e in entries} == {1}
+    assert cache.counters["miss"] == 1
+    assert cache.counters["coalesced"] == 9
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_while_one_request_revalidates():
+    cache = ResponseCache("test_swr", ttl=0, stale_ttl=60)
+    calls, load = _counting_loader(delay=0.05)
+    await cache.get("k", load)
+
+    leader = asyncio.create_task(cache.get("k", load))
+    await asyncio.sleep(0.01)
+    follower = await cache.get("k", load)
+
+    assert follower.value == {"n": 1}  # устаревшая, без ожидания
+    assert (await leader).value == {"n": 2}
+    assert calls["n"] == 2
+    assert cache.counters["stale"] == 1
+
+
+@pytest.mark.asyncio
+async def test_epoch_bump_invalidates_other_workers(fake_redis):
+    worker_a = ResponseCache("test_epoch_a", ttl=60, epoch_key="test:epoch")
+    worker_b = ResponseCache("test_epoch_b", ttl=60, epoch_key="test:epoch")
+    calls, load = _counting_loader()
+
+    await worker_a.get("k", load)
+    await worker_a.get("k", load)
+    assert calls["n"] == 1
+
+    assert await worker_b.invalidate() == 1
+    assert (await worker_a.get("k", load)).value == {"n": 2}
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_serves_other_worker(fake_redis):
+    worker_a = ResponseCache("test_l2", ttl=60, shared=True, model=Payload)
+    worker_b = ResponseCache("test_l2", ttl=60, shared=True, model=Payload)
+
+    async def load_a():
+        return Payload(n=7)
+
+    async def load_b():
+        raise AssertionError("второй воркер не должен идти в БД")
+
+    first = await worker_a.get("k", load_a)
+    second = await worker_b.get("k", load_b)
+
+    assert second.value == Payload(n=7)
+    assert second.etag == first.etag
+    assert worker_b.counters["shared_hit"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_bound_and_failed_loads_not_cached():
+    cache = ResponseCache("test_lru", ttl=60, max_entries=2)
+    _, load = _counting_loader()
+    for key in ("a", "b", "c"):
+        await cache.get(key, load)
+    assert "a" not in cache
+    assert len(cache) == 2
+
+    async def broken():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get("d", broken)
+    assert "d" not in cache
+    assert cache.counters["error"] == 1
+
+
+@pytest.mark.asyncio
+async def test_public_board_etag_returns_304(client):
+    first = await client.get("/api/v2/public/board")
+    etag = first.headers["etag"]
+
+    again = await client.get("/api/v2/public/board", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+
+    other = await client.get("/api/v2/public/board", headers={"If-None-Match": '"stale"'})
+    assert other.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_saving_board_config_invalidates_announcements(client):
+    from uk_management_bot.api.board_config.defaults import DEFAULT_BOARD_CONFIG
+
+    before = (await client.get("/api/v2/announcements")).json()
+    assert before["emergency_phones"] == ["+998 71 123-45-67"]
+
+    body = {**DEFAULT_BOARD_CONFIG, "contacts": {
+        **DEFAULT_BOARD_CONFIG["contacts"], "dispatch_phone": "+998 90 000-00-00",
+    }}
+    assert (await client.put("/api/v2/board-config", json=body)).status_code == 200
+
+    after = (await client.get("/api/v2/announcements")).json()
+    assert after["emergency_phones"] == ["+998 90 000-00-00"]
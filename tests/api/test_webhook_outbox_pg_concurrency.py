@@ -29,12 +29,14 @@ from uk_management_bot.services import webhook_sender
 # ARCH-010 (доменная фикстура pg_domain_factory ниже):
 from uk_management_bot.database.session import Base
 from uk_management_bot.database.models.user import User
+from uk_management_bot.database.models.user_role import UserRole
 from uk_management_bot.database.models.yard import Yard
 from uk_management_bot.database.models.building import Building
 from uk_management_bot.database.models.apartment import Apartment
 from uk_management_bot.database.models.user_apartment import UserApartment
 from uk_management_bot.database.models.request import Request
 from uk_management_bot.database.models.request_assignment import RequestAssignment
+from uk_management_bot.database.models.request_visibility import RequestVisibility
 from uk_management_bot.database.models.audit import AuditLog
 from uk_management_bot.database.models.shift import Shift
 from uk_management_bot.database.models.shift_template import ShiftTemplate
@@ -224,9 +226,9 @@ async def test_reclaim_after_lease_under_postgres(pg_factory, monkeypatch):
 # ===========================================================================
 
 _DOMAIN_TABLES = [
-    User.__table__, Yard.__table__, Building.__table__, Apartment.__table__,
+    User.__table__, UserRole.__table__, Yard.__table__, Building.__table__, Apartment.__table__,
     UserApartment.__table__, Request.__table__, RequestAssignment.__table__,
-    AuditLog.__table__, ShiftTemplate.__table__, Shift.__table__,
+    RequestVisibility.__table__, AuditLog.__table__, ShiftTemplate.__table__, Shift.__table__,
     Rating.__table__, WebhookOutbox.__table__,
 ]
 
@@ -41,6 +41,7 @@ from uk_management_bot.database.models.board_config import BoardConfig
 from uk_management_bot.database.models.building import Building
 from uk_management_bot.database.models.request import Request
 from uk_management_bot.database.models.user import User
+from uk_management_bot.database.models.user_role import UserRole
 from uk_management_bot.database.models.work_report import WorkReport
 from uk_management_bot.database.models.yard import Yard
 from uk_management_bot.database.session import Base
@@ -55,6 +56,7 @@ SCHEMA = "work_reports_race_test"
 
 _TABLES = [
     User.__table__,
+    UserRole.__table__,
     Yard.__table__,
     Building.__table__,
     Apartment.__table__,
@@ -431,3 +433,63 @@ async def test_autopublish_stuck_in_network_does_not_block_publish(pg_factory):
         )).scalar_one()
     assert row.status == "published"
     assert row.locked_media_ids == [1, 10], "батч не должен трогать опубликованный состав"
+
+
+# ===========================================================================
+# (д) два конкурентных пакета автопубликации — дизъюнктные захваты
+# ===========================================================================
+
+
+@pytest.mark.asyncio
+async def test_concurrent_autopublish_batches_claim_disjoint_drafts(pg_factory):
+    """/sync менеджера и тик бота одновременно: FOR UPDATE SKIP LOCKED + lease
+    делят очередь между пакетами. Каждый черновик опубликован ровно одним из
+    них — второй не получает 409 на чужом отчёте и не подбирает ему медиа
+    повторно. Публикации внутри пакета идут параллельно в своих сессиях."""
+    await _seed_request(pg_factory)
+    numbers = [REQUEST_NUMBER] + [f"260725-8{i:02d}" for i in range(1, 6)]
+    async with pg_factory() as db:
+        template = (await db.execute(
+            select(Request).where(Request.request_number == REQUEST_NUMBER)
+        )).scalar_one()
+        for number in numbers[1:]:
+            db.add(Request(
+                request_number=number, user_id=template.user_id, category="plumbing",
+                status="Исполнено", description="гонка", urgency="low",
+                is_returned=False, address_type="building",
+                building_id=template.building_id, updated_at=datetime.now(timezone.utc),
+            ))
+        for number in numbers:
+            db.add(WorkReport(
+                request_number=number, category_key="plumbing",
+                address_public="ул. Гоночная, 7 (Двор гонки)",
+                performed_at=datetime.now(timezone.utc),
+                before_media_ids=[], after_media_ids=[], media_meta=[],
+                locked_media_ids=[], status="pending", source="auto",
+            ))
+        data = dict(DEFAULT_BOARD_CONFIG)
+        data["work_reports"] = {**data["work_reports"], "autopublish": True}
+        db.add(BoardConfig(id=1, data=data, updated_by=None))
+        await db.commit()
+
+    media = FakeMediaClient(acquire_delay=0.01)
+
+    async def _batch():
+        async with pg_factory() as db:
+            return await autopublish_ready_drafts(db, media, triggered_by=None)
+
+    results = await asyncio.gather(_batch(), _batch())
+
+    assert sum(r["published"] for r in results) == len(numbers), results
+    assert sum(r["failed"] for r in results) == 0, results
+    async with pg_factory() as db:
+        audits = (await db.execute(
+            select(func.count()).select_from(AuditLog)
+            .where(AuditLog.action == "work_report.autopublish")
+        )).scalar_one()
+        leased = (await db.execute(
+            select(func.count()).select_from(WorkReport)
+            .where(WorkReport.autopublish_claimed_until.is_not(None))
+        )).scalar_one()
+    assert audits == len(numbers)
+    assert leased == 0
@@ -115,7 +115,7 @@ class _FakeAsyncClient:
         # апстрима, и проверять это можно лишь здесь.
         self.requests: list[str] = []
 
-    def build_request(self, method, url, headers=None):
+    def build_request(self, method, url, headers=None, **kwargs):
         self.requests.append(url)
         return {"method": method, "url": url, "headers": headers}
 
@@ -129,7 +129,7 @@ class _FakeAsyncClient:
 
 
 def _patch_httpx_client(monkeypatch, fake_client: _FakeAsyncClient) -> None:
-    monkeypatch.setattr(public_router.httpx, "AsyncClient", lambda timeout=None: fake_client)
+    monkeypatch.setattr(public_router, "get_http_client", lambda upstream: fake_client)
     monkeypatch.setattr(public_router.settings, "MEDIA_SERVICE_URL", "http://stub-media")
 
 
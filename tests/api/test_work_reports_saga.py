@@ -1066,6 +1066,136 @@ async def test_autopublish_batch_window_not_starved_by_filtered_out_drafts(db_se
     assert (await _reload(db_session, stale.id)).status == "pending"
 
 
+# ── конвейер: lease, backoff, возобновление, очередь ─────────────────
+
+
+@pytest.mark.asyncio
+async def test_autopublish_skips_draft_under_live_lease(db_session):
+    """Черновик, захваченный параллельным пакетом (/sync против тика), второй
+    пакет не трогает: ни подбора медиа, ни публикации."""
+    await _seed_autopublish(db_session, enabled=True)
+    db_session.add(_mk_request("260725-520"))
+    report = _mk_report("260725-520")
+    report.autopublish_claimed_until = datetime.now(timezone.utc) + timedelta(minutes=5)
+    db_session.add(report)
+    await db_session.commit()
+
+    client = FakeMediaClient(by_category={
+        "request_photo": [_photo(1)], "completion_photo": [_photo(2)],
+    })
+    result = await autopublish_ready_drafts(db_session, client)
+
+    assert result["published"] == 0
+    reloaded = await _reload(db_session, report.id)
+    assert reloaded.status == "pending"
+    assert reloaded.media_synced_at is None
+
+
+@pytest.mark.asyncio
+async def test_autopublish_failure_backs_off_instead_of_heading_every_batch(db_session):
+    """Сбойный черновик уходит в backoff: следующий пакет сразу после него
+    media-service не дёргает и берёт остальную очередь."""
+    await _seed_autopublish(db_session, enabled=True)
+    db_session.add(_mk_request("260725-521"))
+    report = _mk_report("260725-521")
+    db_session.add(report)
+    await db_session.commit()
+
+    class BrokenClient(FakeMediaClient):
+        calls = 0
+
+        async def get_request_media(self, request_number, category, limit=50):
+            BrokenClient.calls += 1
+            raise RuntimeError("media-service 503")
+
+    result = await autopublish_ready_drafts(db_session, BrokenClient())
+    assert result["failed"] == 1
+    calls_after_first = BrokenClient.calls
+
+    reloaded = await _reload(db_session, report.id)
+    assert reloaded.autopublish_attempts == 1
+    assert reloaded.autopublish_claimed_until is not None
+
+    result = await autopublish_ready_drafts(db_session, BrokenClient())
+    assert result["failed"] == 0
+    assert BrokenClient.calls == calls_after_first
+
+
+@pytest.mark.asyncio
+async def test_autopublish_resumes_ready_draft_without_refetching(db_session, monkeypatch):
+    """Пакет, упёршийся в бюджет на публикации, оставляет отметку готовности:
+    следующий продолжает сразу с публикации, а не с подбора медиа."""
+    import uk_management_bot.services.work_report_service as svc
+
+    await _seed_autopublish(db_session, enabled=True)
+    db_session.add(_mk_request("260725-522"))
+    report = _mk_report("260725-522", before_media_ids=[1], after_media_ids=[2])
+    report.autopublish_ready_at = datetime.now(timezone.utc)
+    db_session.add(report)
+    await db_session.commit()
+
+    async def no_fetch(media_client, request_number):
+        raise AssertionError("медиа отчёта с отметкой готовности не перезапрашиваются")
+
+    monkeypatch.setattr(svc, "fetch_media_selection", no_fetch)
+    client = FakeMediaClient(by_category={
+        "request_photo": [_photo(1)], "completion_photo": [_photo(2)],
+    })
+
+    monkeypatch.setattr(svc, "_AUTOPUBLISH_TIME_BUDGET_SECONDS", -1.0)
+    result = await autopublish_ready_drafts(db_session, client)
+    assert result["published"] == 0
+    assert result["deferred"] == 1
+    reloaded = await _reload(db_session, report.id)
+    assert reloaded.autopublish_ready_at is not None
+    assert reloaded.autopublish_claimed_until is None
+
+    monkeypatch.setattr(svc, "_AUTOPUBLISH_TIME_BUDGET_SECONDS", 60.0)
+    result = await autopublish_ready_drafts(db_session, client)
+    assert result["published"] == 1
+    reloaded = await _reload(db_session, report.id)
+    assert reloaded.status == "published"
+    assert reloaded.autopublish_ready_at is None
+
+
+@pytest.mark.asyncio
+async def test_autopublish_reports_backlog_age(db_session):
+    from uk_management_bot.services.work_report_service import autopublish_backlog
+
+    await _seed_autopublish(db_session, enabled=True, categories=["cleaning"])
+    db_session.add_all([_mk_request("260725-523"), _mk_request("260725-524")])
+    outside = _mk_report("260725-523")  # plumbing — в очередь не входит
+    waiting = _mk_report("260725-524")
+    waiting.category_key = "cleaning"
+    waiting.autopublish_claimed_until = datetime.now(timezone.utc) + timedelta(minutes=5)
+    db_session.add_all([outside, waiting])
+    await db_session.commit()
+
+    result = await autopublish_ready_drafts(db_session, FakeMediaClient())
+    assert result["backlog"] == 1
+    assert result["backlog_age_seconds"] >= 0
+
+    backlog = await autopublish_backlog(db_session)
+    assert backlog["enabled"] is True
+    assert backlog["backlog"] == 1
+
+
+@pytest.mark.asyncio
+async def test_media_rate_limiter_spaces_publications():
+    """Потолок медиа/с: каждая публикация резервирует время по числу своих
+    фото (прогрев превью — скачивание из Telegram)."""
+    import time
+
+    from uk_management_bot.services.work_reports.autopublish import _MediaRateLimiter
+
+    limiter = _MediaRateLimiter(per_second=200)
+    started = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire(10)
+    # Первая публикация — сразу, каждая следующая ждёт 10 / 200 = 0.05 с.
+    assert time.monotonic() - started >= 0.09
+
+
 # ── прогрев превью ───────────────────────────────────────────────────
 
 
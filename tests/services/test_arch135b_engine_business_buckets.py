@@ -228,10 +228,9 @@ class TestRebalanceDailyAssignments:
 
 
 class TestDailyLoadTrend:
-    """recommendation_engine._get_daily_load_trend: бакет дня — бизнес-окно."""
+    """recommendation_engine._daily_request_counts: бакет дня — бизнес-окно."""
 
-    @pytest.mark.asyncio
-    async def test_evening_utc_request_counts_in_its_business_day(self, db, monkeypatch):
+    def test_evening_utc_request_counts_in_its_business_day(self, db, monkeypatch):
         user = _user(db)
         _request(db, datetime(2026, 7, 29, 20, 30, tzinfo=timezone.utc),
                  number="260729-001", user_id=user.id)  # 01:30 местного 30.07
@@ -239,7 +238,7 @@ class TestDailyLoadTrend:
         # приходить из семантики бакета, а не из AttributeError монкипатча
         monkeypatch.setattr(rec_mod, "business_today", lambda: BUSINESS_DATE,
                             raising=False)
-        trend = await rec_mod.RecommendationEngine(db)._get_daily_load_trend(1)
+        trend = rec_mod.RecommendationEngine(db)._daily_request_counts(1)
         assert trend == [1], (
             "func.date отнёс бы заявку к 29.07 и тренд за 30.07 был бы пустым")
 
@@ -44,6 +44,8 @@ EXPECTED = {
     # Секреты фичи опциональны на уровне compose (:-) — «флаг включён без
     # токена/ключа» ловит eager-валидация settings.py; сам сервис без флага
     # сознательно не стартует.
+    # Воркер планировщика — тот же settings.py; media-ключ нужен тику отчётов.
+    "scheduler": CORE_REQUIRED + ("MEDIA_API_KEY",),
     "group-intake-bot": CORE_REQUIRED + (
         "GROUP_INTAKE_BOT_TOKEN",
         "ANTHROPIC_API_KEY",
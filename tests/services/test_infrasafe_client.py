@@ -2,11 +2,12 @@
 
 Dormant contract: the header is sent only when INFRASAFE_INVENTORY_TOKEN is set;
 empty token → no header (endpoint stays public, current behaviour). Verified by
-stubbing the outbound httpx client and capturing the GET headers.
+stubbing the shared InfraSafe httpx client and capturing the GET headers.
 """
 import pytest
 
 import uk_management_bot.clients.infrasafe_client as ic
+from uk_management_bot.integrations import http_clients
 
 
 class _Resp:
@@ -36,7 +37,7 @@ class _StubClient:
     async def __aexit__(self, *a):
         return False
 
-    async def get(self, url, headers=None):
+    async def get(self, url, headers=None, **kwargs):
         _StubClient.captured = {"url": url, "headers": headers or {}}
         return _Resp(_StubClient.payload)
 
@@ -44,12 +45,14 @@ class _StubClient:
 @pytest.fixture(autouse=True)
 def _stub(monkeypatch):
     _StubClient.captured = {}
-    monkeypatch.setattr(ic.httpx, "AsyncClient", _StubClient)
+    monkeypatch.setattr(http_clients.httpx, "AsyncClient", _StubClient)
+    http_clients.reset_http_clients()
     monkeypatch.setattr(
         ic.settings, "INFRASAFE_REQUESTS_INVENTORY_URL",
         "https://infrasafe.example/api/uk-requests-metrics",
     )
     yield
+    http_clients.reset_http_clients()
 
 
 async def test_sends_service_token_header_when_set(monkeypatch):
@@ -43,6 +43,8 @@ _EXPECTED_TABLES = frozenset({
     "access_events",
     "access_gates",
     "access_passes",
+    "access_retention_watermarks",
+    "access_review_heads",
     "access_rights",
     "access_rules",
     "apartments",
@@ -59,6 +61,7 @@ _EXPECTED_TABLES = frozenset({
     "manual_openings",
     "material_issue_allocations",
     "material_issues",
+    "material_movements",
     "material_receipts",
     "materials",
     "monitored_groups",
@@ -72,8 +75,10 @@ _EXPECTED_TABLES = frozenset({
     "request_assignments",
     "request_comments",
     "request_number_counters",
+    "request_visibility",
     "requests",
     "resident_access_requests",
+    "scheduler_job_leases",
     "shift_assignments",
     "shift_schedules",
     "shift_templates",
@@ -81,6 +86,7 @@ _EXPECTED_TABLES = frozenset({
     "shifts",
     "user_apartments",
     "user_documents",
+    "user_roles",
     "user_verifications",
     "user_yards",
     "users",
@@ -169,3 +175,18 @@ def test_functional_index_allowlist_excludes_exactly_date_prefix():
     assert include_object(None, "ix_requests_status", "index", True, None) is True
     # Таблица с таким именем (гипотетически) не трогается фильтром индексов.
     assert include_object(None, "idx_requests_date_prefix", "table", True, None) is True
+
+
+def test_partition_filter_hides_only_access_events_partitions():
+    """Партиции access_events (миграция 018) не дрейф; остальные таблицы видны."""
+    for name in (
+        "access_events_p202611",
+        "access_events_default",
+        "access_events_legacy",
+    ):
+        assert include_object(None, name, "table", True, None) is False
+    # Родитель, чужие «похожие» имена и нереflected-объекты не скрываются.
+    assert include_object(None, "access_events", "table", True, None) is True
+    assert include_object(None, "access_events_archive", "table", True, None) is True
+    assert include_object(None, "camera_events_p202611", "table", True, None) is True
+    assert include_object(None, "access_events_p202611", "table", False, None) is True
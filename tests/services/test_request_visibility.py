@@ -0,0 +1,135 @@
+"""Проекция request_visibility (миграция 021) — скоуп списка заявок исполнителя.
+
+Покрытие:
+  - ORM-хук держит проекцию на назначениях, ``executor_id``, сменах и
+    специализации;
+  - массовые UPDATE назначений workflow-раннера (claim) пересчитывают заявку;
+  - сверка находит и чинит расхождение от записи мимо ORM.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from uk_management_bot.database.models.request import Request
+from uk_management_bot.database.models.request_assignment import RequestAssignment
+from uk_management_bot.database.models.request_visibility import RequestVisibility
+from uk_management_bot.database.models.shift import Shift
+from uk_management_bot.database.models.user import User
+from uk_management_bot.database.session import Base
+from uk_management_bot.services import request_visibility
+from uk_management_bot.services.workflow_runner import run_command_sync
+from uk_management_bot.utils.request_workflow import Action, ActionCommand, PrincipalRef
+
+START = datetime(2026, 6, 10, 8, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def factory():
+    eng = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=eng)
+    yield sessionmaker(bind=eng)
+    eng.dispose()
+
+
+def _seed(db):
+    db.add_all([
+        User(id=3, telegram_id=3, roles='["manager"]', active_role="manager", status="approved"),
+        User(id=4, telegram_id=4, roles='["executor"]', active_role="executor",
+             status="approved", specialization='["plumber"]'),
+        User(id=5, telegram_id=5, roles='["executor"]', active_role="executor",
+             status="approved", specialization="electric"),
+    ])
+    for n in (1, 2, 3):
+        db.add(Request(request_number=f"260610-00{n}", user_id=3, category="c",
+                       description="d", urgency="low", status="В работе"))
+    db.commit()
+
+
+def _rows(db) -> set[tuple[int, str, str]]:
+    return set(db.execute(select(
+        RequestVisibility.executor_id, RequestVisibility.request_number, RequestVisibility.reason
+    )).tuples())
+
+
+def test_hook_follows_assignments_shifts_and_specializations(factory):
+    db = factory()
+    _seed(db)
+    db.add_all([
+        RequestAssignment(request_number="260610-001", assignment_type="individual",
+                          executor_id=4, created_by=3, status="active"),
+        RequestAssignment(request_number="260610-002", assignment_type="group",
+                          group_specialization="plumber", created_by=3, status="active"),
+    ])
+    db.get(Request, "260610-003").executor_id = 5
+    db.commit()
+    # Группа видна только исполнителю на смене.
+    assert _rows(db) == {(4, "260610-001", "assignment"), (5, "260610-003", "executor")}
+
+    shift = Shift(user_id=4, status="active", start_time=START)
+    db.add(shift)
+    db.commit()
+    assert (4, "260610-002", "group") in _rows(db)
+
+    db.get(User, 4).specialization = '["electric"]'
+    db.commit()
+    assert (4, "260610-002", "group") not in _rows(db)
+
+    db.get(User, 4).specialization = "plumber"
+    db.commit()
+    assert (4, "260610-002", "group") in _rows(db)
+
+    shift.status = "completed"
+    assigned = db.scalars(select(RequestAssignment).filter_by(request_number="260610-001")).one()
+    assigned.status = "cancelled"
+    db.commit()
+    assert _rows(db) == {(5, "260610-003", "executor")}
+    db.close()
+
+
+def test_runner_claim_refreshes_request(factory):
+    db = factory()
+    _seed(db)
+    db.add_all([
+        RequestAssignment(request_number="260610-002", assignment_type="group",
+                          group_specialization="plumber", created_by=3, status="active"),
+        Shift(user_id=4, status="active", start_time=START),
+    ])
+    db.commit()
+    db.close()
+
+    run_command_sync(factory, "260610-002",
+                     PrincipalRef(kind="user", user_id=4, source="telegram"),
+                     ActionCommand("c", Action.EXECUTOR_CLAIM, {}))
+
+    db = factory()
+    assert _rows(db) == {(4, "260610-002", "assignment"), (4, "260610-002", "executor")}
+    assert request_visibility.find_drift(db).ok
+    db.close()
+
+
+def test_drift_from_bypassing_writes_is_repaired(factory):
+    db = factory()
+    _seed(db)
+    db.add(RequestAssignment(request_number="260610-001", assignment_type="individual",
+                             executor_id=4, created_by=3, status="active"))
+    db.commit()
+
+    db.execute(update(RequestAssignment).values(executor_id=5).execution_options(
+        synchronize_session=False))
+    db.commit()
+
+    drift = request_visibility.find_drift(db)
+    assert drift.missing == [(5, "260610-001", "assignment")]
+    assert drift.extra == [(4, "260610-001", "assignment")]
+
+    assert request_visibility.repair(db, drift) == 2
+    db.commit()
+    assert request_visibility.find_drift(db).ok
+    db.close()
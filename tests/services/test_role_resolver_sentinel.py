@@ -19,8 +19,9 @@ PKG_ROOT = pathlib.Path(__file__).resolve().parents[2] / "uk_management_bot"
 # PR-31: legacy-колонка удалена — ни одному файлу больше нельзя ссылаться на .role.
 ALLOWED: set[str] = set()
 
-# Владельцы ``.role``, не являющиеся колонкой User (Pydantic-боди запроса и т.п.).
-NON_USER_OWNERS = {"body"}
+# Владельцы ``.role``, не являющиеся колонкой User (Pydantic-боди запроса,
+# строка индекса ролей user_roles и т.п.).
+NON_USER_OWNERS = {"body", "UserRole"}
 
 _SKIP_PARTS = {"tests", "venv", ".venv", "__pycache__", "site-packages"}
 
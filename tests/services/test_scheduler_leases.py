@@ -0,0 +1,155 @@
+"""Lease'ы задач планировщика (миграция 020) и обёртка тика ``_run_job``.
+
+Покрытие:
+  - lease достаётся одному владельцу; после release другой ждёт min_gap,
+    отсчитанный от начала прошлого прогона, а не от его завершения;
+  - протухший lease забирает другая реплика, продление старого владельца
+    это видит;
+  - две реплики ShiftScheduler на одной БД: тик исполняет одна, вторая
+    считает skipped_lease; длительность попадает в гистограмму /metrics;
+  - потеря lease посреди прогона отменяет job и считается в lost_lease.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from uk_management_bot.database.models.scheduler_job_lease import SchedulerJobLease
+from uk_management_bot.database.session import Base
+from uk_management_bot.services import scheduler_leases
+from uk_management_bot.utils.datetime_utils import utc_now
+
+TTL = timedelta(minutes=5)
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'leases.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=eng, tables=[SchedulerJobLease.__table__])
+    yield sessionmaker(bind=eng)
+    eng.dispose()
+
+
+def test_lease_has_single_owner_and_respects_min_gap(session_factory):
+    db = session_factory()
+    gap = timedelta(minutes=1)
+
+    assert scheduler_leases.try_acquire_lease(db, "tick", "a", TTL, gap) is True
+    assert scheduler_leases.try_acquire_lease(db, "tick", "b", TTL, gap) is False
+
+    scheduler_leases.release_lease(db, "tick", "a")
+    # Свободен, но период только что отработан — вторая реплика его не повторяет.
+    assert scheduler_leases.try_acquire_lease(db, "tick", "b", TTL, gap) is False
+    assert scheduler_leases.try_acquire_lease(db, "tick", "b", TTL, timedelta(0)) is True
+    db.close()
+
+
+def test_min_gap_counts_from_previous_start(session_factory):
+    db = session_factory()
+    gap = timedelta(minutes=5)
+    assert scheduler_leases.try_acquire_lease(db, "tick", "a", TTL, gap)
+    # Прогон начался 6 минут назад и только что закончился (job дольше
+    # interval - min_gap): следующий тик не должен пропускаться.
+    db.execute(update(SchedulerJobLease).values(acquired_at=utc_now() - timedelta(minutes=6)))
+    db.commit()
+    scheduler_leases.release_lease(db, "tick", "a")
+
+    assert scheduler_leases.try_acquire_lease(db, "tick", "b", TTL, gap) is True
+    db.close()
+
+
+def test_expired_lease_is_taken_over(session_factory):
+    db = session_factory()
+    assert scheduler_leases.try_acquire_lease(db, "tick", "a", TTL, timedelta(0))
+    db.execute(update(SchedulerJobLease).values(expires_at=utc_now() - timedelta(seconds=1)))
+    db.commit()
+
+    assert scheduler_leases.try_acquire_lease(db, "tick", "b", TTL, timedelta(0)) is True
+    assert scheduler_leases.renew_lease(db, "tick", "a", TTL) is False
+    assert scheduler_leases.renew_lease(db, "tick", "b", TTL) is True
+    db.close()
+
+
+def _replica():
+    from uk_management_bot.utils.shift_scheduler import ShiftScheduler
+
+    with patch("uk_management_bot.utils.shift_scheduler.AsyncIOScheduler"):
+        return ShiftScheduler()
+
+
+@pytest.mark.asyncio
+async def test_two_replicas_run_the_tick_once(session_factory):
+    from prometheus_client import CollectorRegistry, generate_latest
+    from uk_management_bot.utils import shift_scheduler
+    from uk_management_bot.utils.health_server import _SchedulerJobCollector
+
+    runs = []
+
+    async def tick():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+
+    replicas = [_replica(), _replica()]
+    for replica in replicas:
+        replica._add_job(tick, shift_scheduler.IntervalTrigger(minutes=10), id="tick", name="tick")
+
+    replicas[0].worker_id, replicas[1].worker_id = "a", "b"
+    with patch.object(shift_scheduler, "SessionLocal", session_factory):
+        await asyncio.gather(*(
+            replica._run_job("tick", tick, timedelta(minutes=10), timedelta(minutes=5))
+            for replica in replicas
+        ))
+
+    assert len(runs) == 1
+    metrics = [replica.job_metrics["tick"] for replica in replicas]
+    assert sorted(m["runs"] for m in metrics) == [0, 1]
+    assert sorted(m["skipped_lease"] for m in metrics) == [0, 1]
+
+    ran = next(r for r in replicas if r.job_metrics["tick"]["runs"])
+    registry = CollectorRegistry()
+    registry.register(_SchedulerJobCollector())
+    with patch.object(shift_scheduler, "_scheduler_instance", ran):
+        exposition = generate_latest(registry).decode()
+    assert 'uk_scheduler_job_duration_seconds_count{job="tick"} 1.0' in exposition
+    assert 'uk_scheduler_job_duration_seconds_bucket{job="tick",le="0.5"} 1.0' in exposition
+    assert 'uk_scheduler_job_skipped{job="tick",reason="lease"} 0.0' in exposition
+
+    for replica in replicas:
+        replica._lease_executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_cancels_the_run(session_factory):
+    from uk_management_bot.utils import shift_scheduler
+
+    steps = []
+
+    async def tick():
+        # Пока job идёт, lease забирает другая реплика.
+        db = session_factory()
+        db.execute(update(SchedulerJobLease).values(owner="b"))
+        db.commit()
+        db.close()
+        for _ in range(50):
+            steps.append(1)
+            await asyncio.sleep(0.02)
+
+    replica = _replica()
+    replica._add_job(tick, shift_scheduler.IntervalTrigger(minutes=10), id="tick", name="tick")
+    replica.worker_id = "a"
+    with patch.object(shift_scheduler, "SessionLocal", session_factory), \
+            patch.object(shift_scheduler, "SCHEDULER_LEASE_TTL", timedelta(seconds=0.15)):
+        await replica._run_job("tick", tick, timedelta(minutes=10), timedelta(minutes=5))
+
+    assert 0 < len(steps) < 50
+    assert replica.job_metrics["tick"]["lost_lease"] == 1
+    assert replica.job_metrics["tick"]["runs"] == 1
+    db = session_factory()
+    assert db.get(SchedulerJobLease, "tick").owner == "b"
+    db.close()
+    replica._lease_executor.shutdown()
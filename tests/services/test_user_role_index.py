@@ -0,0 +1,101 @@
+"""Индекс ролей user_roles (миграция 019) вместо LIKE по JSON ``users.roles``.
+
+Покрытие:
+  - ORM-хук держит user_roles в синхроне с ``User.roles`` на создании,
+    смене ролей и удалении пользователя (JSON и legacy CSV);
+  - ``legacy_role_filter`` — точное совпадение роли, не подстрока;
+  - ``list_approved_users(*roles)`` фильтрует в SQL;
+  - сверка находит и чинит расхождение от записи мимо ORM.
+"""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, select, text, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from uk_management_bot.database.models.user import User
+from uk_management_bot.database.models.user_role import UserRole
+from uk_management_bot.database.session import Base
+from uk_management_bot.services import user_role_index
+from uk_management_bot.services.admin_handler_service import AdminHandlerService
+from uk_management_bot.utils.auth_helpers import legacy_role_filter
+
+
+@pytest.fixture()
+def db():
+    eng = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=eng)
+    session = sessionmaker(bind=eng)()
+    yield session
+    session.close()
+    eng.dispose()
+
+
+def _user(db, telegram_id: int, roles: str, status: str = "approved") -> User:
+    user = User(telegram_id=telegram_id, roles=roles, status=status)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _index(db) -> set[tuple[int, str]]:
+    return set(db.execute(select(UserRole.user_id, UserRole.role)).tuples())
+
+
+def test_index_follows_create_update_delete(db):
+    manager = _user(db, 1, '["applicant", "manager"]')
+    executor = _user(db, 2, "applicant,executor")
+    assert _index(db) == {
+        (manager.id, "applicant"), (manager.id, "manager"),
+        (executor.id, "applicant"), (executor.id, "executor"),
+    }
+
+    manager.roles = '["applicant"]'
+    db.commit()
+    db.delete(executor)
+    db.commit()
+
+    assert _index(db) == {(manager.id, "applicant")}
+
+
+def test_filter_matches_whole_role_only(db):
+    exact = _user(db, 1, '["manager"]')
+    _user(db, 2, '["super_manager"]')  # подстрока «manager» — не роль manager
+
+    found = db.query(User).filter(legacy_role_filter("manager")).all()
+
+    assert [u.id for u in found] == [exact.id]
+
+
+def test_list_approved_users_filters_roles_in_sql(db):
+    first = _user(db, 1, '["executor"]')
+    _user(db, 2, '["executor"]', status="pending")
+    _user(db, 3, '["manager"]')
+    last = _user(db, 4, '["applicant","executor"]')
+
+    svc = AdminHandlerService(db)
+
+    assert [u.id for u in svc.list_approved_users("executor")] == [first.id, last.id]
+    assert [u.id for u in svc.list_approved_executors()] == [first.id, last.id]
+    assert len(svc.list_approved_users()) == 3
+
+
+def test_drift_from_bulk_update_is_found_and_repaired(db):
+    user = _user(db, 1, '["applicant"]')
+    # Массовый UPDATE и сырой SQL ORM-хук не видят.
+    db.execute(update(User).where(User.id == user.id).values(roles='["executor"]'))
+    db.execute(text("INSERT INTO user_roles (user_id, role) VALUES (:u, 'admin')"), {"u": user.id})
+    db.commit()
+
+    drift = user_role_index.find_drift(db)
+    assert drift.missing == [(user.id, "executor")]
+    assert sorted(drift.extra) == [(user.id, "admin"), (user.id, "applicant")]
+
+    assert user_role_index.repair(db, drift) == 3
+    db.commit()
+
+    assert _index(db) == {(user.id, "executor")}
+    assert user_role_index.find_drift(db).ok
@@ -0,0 +1,236 @@
+"""run_commands_bulk: пачка команд ≡ те же команды поштучно через run_command_sync.
+
+Property-тест: случайный мир (статусы, исполнители, назначения, оценки,
+смены) засевается в две одинаковые БД; случайная пачка команд (включая
+отказы guard'ов, неизвестного пользователя и несуществующую заявку)
+прогоняется поштучно в первой и одним ``run_commands_bulk`` во второй.
+Совпасть обязаны исходы каждого элемента (CommandOutcome / тип и текст
+WorkflowError) и итоговые строки requests, request_assignments, ratings,
+audit_logs и webhook_outbox.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import uk_management_bot.utils.constants as C
+from uk_management_bot.config.settings import settings
+from uk_management_bot.database.models.audit import AuditLog
+from uk_management_bot.database.models.rating import Rating
+from uk_management_bot.database.models.request import Request
+from uk_management_bot.database.models.request_assignment import RequestAssignment
+from uk_management_bot.database.models.shift import Shift
+from uk_management_bot.database.models.user import User
+from uk_management_bot.database.models.webhook_outbox import WebhookOutbox
+from uk_management_bot.database.session import Base
+from uk_management_bot.services.workflow_runner import (
+    BulkCommand,
+    run_command_sync,
+    run_commands_bulk,
+)
+from uk_management_bot.utils.request_workflow import (
+    Action,
+    ActionCommand,
+    LegacyStatusIntent,
+    PrincipalRef,
+    WorkflowError,
+)
+
+NOW = datetime(2026, 6, 10, 12, 0, tzinfo=timezone.utc)
+
+STATUSES = [
+    C.REQUEST_STATUS_NEW, C.REQUEST_STATUS_IN_PROGRESS, C.REQUEST_STATUS_PURCHASE,
+    C.REQUEST_STATUS_CLARIFICATION, C.REQUEST_STATUS_EXECUTED,
+    C.REQUEST_STATUS_COMPLETED, C.REQUEST_STATUS_RETURNED, C.REQUEST_STATUS_CANCELLED,
+]
+
+
+def _user(uid):
+    return PrincipalRef(kind="user", user_id=uid, source="telegram")
+
+
+def _system(actor):
+    return PrincipalRef(kind="system", user_id=None, source=actor, system_actor=actor)
+
+
+COMMANDS = [
+    (_user(3), Action.MANAGER_CONFIRM, {}),
+    (_user(3), Action.MANAGER_COMPLETE, {}),
+    (_user(3), Action.MANAGER_PURCHASE, {}),
+    (_user(3), Action.MANAGER_RETURN_TO_WORK, {"reason": "Переделать"}),
+    (_user(3), Action.CLARIFY_REQUEST, {"question": "?", "notes": "\n\nвопрос"}),
+    (_user(3), Action.CANCEL, {}),
+    (_user(3), Action.ASSIGN_GROUP, {"group": "plumber"}),
+    (_user(2), Action.APPLICANT_ACCEPT, {"rating": 5}),
+    (_user(2), Action.APPLICANT_RETURN, {"return_reason": "не доделано"}),
+    (_user(4), Action.EXECUTOR_CLAIM, {}),
+    (_user(5), Action.EXECUTOR_CLAIM, {}),
+    (_user(4), Action.EXECUTOR_COMPLETE, {"completion_report": "готово"}),
+    (_user(4), Action.EXECUTOR_RESUME, {}),
+    (_user(99), Action.MANAGER_CONFIRM, {}),
+    (_system("dispatcher"), Action.SYSTEM_DISPATCH_ASSIGN, {"executor_id": 4}),
+    (_system("auto_manager"), Action.SYSTEM_AUTO_PROMOTE, {"executor_id": 5}),
+]
+
+
+def _engine_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+def _world(rng):
+    """Случайный мир: смены исполнителей и 6 заявок со случайным состоянием."""
+    shifts = [uid for uid in (4, 5) if rng.random() < 0.6]
+    requests = []
+    for i in range(1, 7):
+        status = rng.choice(STATUSES)
+        executor_id = rng.choice([None, 4, 5])
+        assignment = rng.choice([None, "group", "individual"])
+        requests.append(dict(
+            number=f"260610-{i:03d}", status=status, executor_id=executor_id,
+            manager_confirmed=rng.random() < 0.3, assignment=assignment,
+            rated=rng.random() < 0.2,
+        ))
+    return shifts, requests
+
+
+def _seed(SF, shifts, requests):
+    s = SF()
+    s.add(User(id=1, telegram_id=settings.INFRASAFE_SYSTEM_USER_TELEGRAM_ID,
+               first_name="System", roles='["manager"]', active_role="manager",
+               status="approved", language="ru"))
+    s.add(User(id=2, telegram_id=2, first_name="Owner", roles='["applicant"]',
+               active_role="applicant", status="approved", language="ru"))
+    s.add(User(id=3, telegram_id=3, first_name="Mgr", roles='["manager"]',
+               active_role="manager", status="approved", language="ru"))
+    s.add(User(id=4, telegram_id=4, first_name="Exec", roles='["executor"]',
+               active_role="executor", status="approved", language="ru",
+               specialization="plumber"))
+    s.add(User(id=5, telegram_id=5, first_name="Exec2", roles='["executor"]',
+               active_role="executor", status="approved", language="ru",
+               specialization="plumber"))
+    for uid in shifts:
+        s.add(Shift(user_id=uid, status="active",
+                    start_time=datetime(2026, 6, 10, 8, 0, tzinfo=timezone.utc)))
+    for r in requests:
+        s.add(Request(
+            request_number=r["number"], user_id=2, category="c", description="d",
+            urgency="low", status=r["status"], executor_id=r["executor_id"],
+            manager_confirmed=r["manager_confirmed"],
+            is_returned=r["status"] == C.REQUEST_STATUS_RETURNED,
+        ))
+        if r["assignment"] == "group":
+            s.add(RequestAssignment(
+                request_number=r["number"], assignment_type="group",
+                group_specialization="plumber", executor_id=None,
+                created_by=3, status="active"))
+        elif r["assignment"] == "individual" and r["executor_id"]:
+            s.add(RequestAssignment(
+                request_number=r["number"], assignment_type="individual",
+                executor_id=r["executor_id"], created_by=3, status="active"))
+        if r["rated"]:
+            s.add(Rating(request_number=r["number"], user_id=2, rating=4))
+    s.commit()
+    s.close()
+
+
+def _batch(rng, requests):
+    numbers = [r["number"] for r in requests] + ["260610-404"]
+    rng.shuffle(numbers)
+    items = []
+    for i, number in enumerate(numbers[:rng.randint(1, len(numbers))]):
+        if rng.random() < 0.15:
+            principal = _user(3)
+            command = LegacyStatusIntent(f"l{i}", rng.choice(STATUSES))
+        else:
+            principal, action, payload = rng.choice(COMMANDS)
+            command = ActionCommand(f"c{i}", action, dict(payload))
+        items.append(BulkCommand(number, principal, command))
+    return items
+
+
+_SKIP = {"created_at", "updated_at"}
+
+
+def _rows(SF, model, order_by):
+    s = SF()
+    try:
+        cols = [c.name for c in model.__table__.columns if c.name not in _SKIP]
+        return [{c: getattr(row, c) for c in cols}
+                for row in s.query(model).order_by(order_by)]
+    finally:
+        s.close()
+
+
+def _outbox(SF):
+    rows = _rows(SF, WebhookOutbox, WebhookOutbox.id)
+    for row in rows:
+        row.pop("event_id")
+        row["payload"] = {k: v for k, v in row["payload"].items()
+                          if k not in ("event_id", "timestamp")}
+    return rows
+
+
+def _state(SF):
+    return (
+        _rows(SF, Request, Request.request_number),
+        _rows(SF, RequestAssignment, RequestAssignment.id),
+        _rows(SF, Rating, Rating.id),
+        _rows(SF, AuditLog, AuditLog.id),
+        _outbox(SF),
+    )
+
+
+def _error_key(error):
+    return (type(error), str(error))
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_bulk_matches_single_command_path(seed, monkeypatch):
+    monkeypatch.setattr(settings, "INFRASAFE_WEBHOOK_ENABLED", True)
+    rng = random.Random(seed)
+    shifts, requests = _world(rng)
+    items = _batch(rng, requests)
+
+    single_engine, single_sf = _engine_factory()
+    bulk_engine, bulk_sf = _engine_factory()
+    try:
+        _seed(single_sf, shifts, requests)
+        _seed(bulk_sf, shifts, requests)
+
+        expected = []
+        for it in items:
+            try:
+                expected.append(run_command_sync(
+                    single_sf, it.request_number, it.principal, it.command, now=NOW))
+            except WorkflowError as e:
+                expected.append(_error_key(e))
+
+        got = run_commands_bulk(bulk_sf, items, now=NOW)
+
+        assert [g.request_number for g in got] == [it.request_number for it in items]
+        assert [g.outcome if g.ok else _error_key(g.error) for g in got] == expected
+        assert _state(bulk_sf) == _state(single_sf)
+    finally:
+        single_engine.dispose()
+        bulk_engine.dispose()
+
+
+def test_duplicate_request_numbers_rejected():
+    engine, SF = _engine_factory()
+    try:
+        item = BulkCommand("260610-001", _user(3),
+                           ActionCommand("c", Action.MANAGER_CONFIRM, {}))
+        with pytest.raises(ValueError):
+            run_commands_bulk(SF, [item, item])
+        assert run_commands_bulk(SF, []) == []
+    finally:
+        engine.dispose()
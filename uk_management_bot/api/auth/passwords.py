@@ -0,0 +1,163 @@
+"""Хэширование паролей вне event loop: ограниченный пул процессов.
+
+bcrypt — намеренно дорогая операция (десятки–сотни мс CPU на cost 12).
+Вызванная прямо из async-хендлера, она останавливает ВЕСЬ воркер: очередь
+логинов (или перебор паролей) задерживает любые другие запросы, включая
+WebSocket. Здесь хэш/проверка уходят в ``ProcessPoolExecutor``:
+
+* **пул процессов**, а не потоков — CPU-работа не делит GIL с loop'ом
+  воркера, и число ядер, занятых bcrypt, ограничено ``PASSWORD_HASH_WORKERS``;
+* **граница очереди** ``PASSWORD_HASH_MAX_PENDING`` — сверх неё операция не
+  ждёт, а сразу получает ``PasswordHasherBusy`` (роутер → 503 + Retry-After):
+  под штормом логинов лучше быстро отказать части, чем копить очередь с
+  латентностью в минуты;
+* **rehash-on-login** — ``needs_rehash`` сравнивает cost хэша с текущим
+  ``BCRYPT_ROUNDS``; после успешного входа роутер перехэширует пароль, так
+  что смена cost расходится по пользователям без принудительного сброса.
+
+Модуль намеренно лёгкий (bcrypt и ``config/settings``): spawn-процессы пула
+импортируют его заново, и тянуть сюда JWT/БД было бы лишним стартом воркера.
+Синхронные ``hash_password``/``verify_password`` остаются для скриптов и
+тестов (реэкспорт из ``api/auth/service.py``).
+"""
+import asyncio
+import logging
+import multiprocessing
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import bcrypt
+
+from uk_management_bot.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_ROUNDS = settings.BCRYPT_ROUNDS
+PASSWORD_HASH_WORKERS = settings.PASSWORD_HASH_WORKERS
+PASSWORD_HASH_MAX_PENDING = settings.PASSWORD_HASH_MAX_PENDING
+
+_BCRYPT_COST = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class PasswordHasherBusy(Exception):
+    """Очередь пула заполнена — операцию не ставим, отвечаем 503."""
+
+    retry_after = 1
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds or BCRYPT_ROUNDS)).decode()
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    """Verify a bcrypt password. Returns False on any malformed-hash error
+    instead of leaking the bcrypt ValueError to the caller — a corrupted
+    stored hash (wrong format, missing salt, truncated by shell-escape, etc.)
+    must look like a failed credential check (401), not a 500 server error.
+    """
+    try:
+        return bcrypt.checkpw(plain.encode(), hashed.encode())
+    except (ValueError, TypeError):
+        return False
+
+
+def hash_cost(hashed: str) -> Optional[int]:
+    """Cost (log2 раундов) из bcrypt-хэша; None — не bcrypt."""
+    match = _BCRYPT_COST.match(hashed or "")
+    return int(match.group(1)) if match else None
+
+
+def needs_rehash(hashed: str) -> bool:
+    """Хэш посчитан с cost, отличным от текущего ``BCRYPT_ROUNDS``."""
+    cost = hash_cost(hashed)
+    return cost is not None and cost != BCRYPT_ROUNDS
+
+
+class PasswordHasher:
+    """Пул процессов для bcrypt с границей очереди (одна на воркер API).
+
+    ``pending`` — операции, отправленные в пул и ещё не вернувшиеся (и
+    исполняемые, и ждущие свободного процесса). Пул создаётся лениво: воркер,
+    не видевший логинов, процессов не держит. Упавший процесс ломает весь
+    ``ProcessPoolExecutor`` — тогда пул пересоздаётся, а операция один раз
+    повторяется.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.pending = 0
+        self.counters: Counter = Counter()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, не fork: воркер API многопоточен (драйвер БД, Redis), а
+            # fork копирует захваченные чужими потоками блокировки.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, kind: str, fn, *args):
+        if self.pending >= self.max_pending:
+            self.counters["rejected"] += 1
+            raise PasswordHasherBusy()
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                result = await loop.run_in_executor(self._pool(), fn, *args)
+            except BrokenProcessPool:
+                logger.warning("password hasher pool broken, restarting")
+                self.counters["restart"] += 1
+                self._discard_pool()
+                result = await loop.run_in_executor(self._pool(), fn, *args)
+        finally:
+            self.pending -= 1
+        self.counters[kind] += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password, BCRYPT_ROUNDS)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run("verify", verify_password, plain, hashed)
+
+    def stats(self) -> dict:
+        return {"pending": self.pending, **self.counters}
+
+    def _discard_pool(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        self._discard_pool()
+
+
+_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        _hasher = PasswordHasher()
+    return _hasher
+
+
+def set_password_hasher(hasher: Optional[PasswordHasher]) -> None:
+    global _hasher
+    _hasher = hasher
+
+
+def reset_password_hasher() -> None:
+    """Остановить пул (shutdown API, тесты); следующий вызов создаст новый."""
+    global _hasher
+    if _hasher is not None:
+        _hasher.shutdown()
+    _hasher = None
@@ -11,9 +11,11 @@ from uk_management_bot.api.auth.schemas import (
     MFARequiredResponse, VerifyOTPRequest,
     RefreshRequestOptional, LogoutRequestOptional,
 )
+from uk_management_bot.api.auth.passwords import (
+    PasswordHasherBusy, get_password_hasher, needs_rehash,
+)
 from uk_management_bot.api.auth.service import (
     verify_telegram_widget, verify_twa_init_data,
-    verify_password, hash_password,
     create_access_token, create_refresh_token_value,
     ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS,
     TWA_REFRESH_TOKEN_EXPIRE_HOURS,
@@ -51,6 +53,16 @@ _ACCESS_TTL = ACCESS_TOKEN_EXPIRE_MINUTES * 60
 _REFRESH_TTL = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
 
 
+def _hasher_busy(exc: PasswordHasherBusy) -> HTTPException:
+    """Password-hash pool saturated (api/auth/passwords.py): fail fast with
+    503 + Retry-After instead of queueing the request behind the burst."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy. Retry shortly.",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 def _cookie_secure() -> bool:
     """Cookies are insecure-friendly in DEBUG so local http://localhost works."""
     return not settings.DEBUG
@@ -155,12 +167,28 @@ async def login_twa(request: Request, data: TWALogin, db: AsyncSession = Depends
 @router.post("/login")
 @limiter.limit("10/minute")
 async def login_password(request: Request, data: PasswordLogin, db: AsyncSession = Depends(get_db)):
+    hasher = get_password_hasher()
     user = await user_by_email(db, data.email)
-    if not user or not user.password_hash or not verify_password(data.password, user.password_hash):
+    if not user or not user.password_hash:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    try:
+        valid = await hasher.verify(data.password, user.password_hash)
+    except PasswordHasherBusy as exc:
+        raise _hasher_busy(exc)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     if user.status != "approved":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not approved")
 
+    # Смена BCRYPT_ROUNDS расходится по пользователям при входе: открытый
+    # пароль есть только сейчас. Пул занят — не мешаем входу, перехэшируем
+    # в следующий раз.
+    if needs_rehash(user.password_hash):
+        try:
+            await persist_password_hash(db, user, await hasher.hash(data.password))
+        except PasswordHasherBusy:
+            pass
+
     # MFA: require Telegram OTP
     if not user.telegram_id:
         raise HTTPException(
@@ -331,11 +359,17 @@ async def set_password(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="current_password_required",
             )
-        if not verify_password(data.current_password, db_user.password_hash):
+
+    hasher = get_password_hasher()
+    try:
+        if db_user.password_hash and not await hasher.verify(data.current_password, db_user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="current_password_invalid",
             )
+        new_hash = await hasher.hash(data.password)
+    except PasswordHasherBusy as exc:
+        raise _hasher_busy(exc)
 
-    await persist_password_hash(db, db_user, hash_password(data.password))
+    await persist_password_hash(db, db_user, new_hash)
     return {"ok": True}
@@ -9,11 +9,13 @@ from datetime import datetime, timezone, timedelta
 from typing import Optional
 from urllib.parse import unquote, parse_qsl
 
-import bcrypt
 import redis.asyncio as aioredis
 from jose import jwt, JWTError
 from jose.exceptions import ExpiredSignatureError, JWTClaimsError
 
+from uk_management_bot.api.auth.passwords import (  # noqa: F401 — реэкспорт
+    hash_password, verify_password,
+)
 from uk_management_bot.config.settings import settings
 from uk_management_bot.utils.http_errors import describe_http_error
 
@@ -107,22 +109,6 @@ TWA_REFRESH_TOKEN_EXPIRE_HOURS = 24
 AUTH_DATE_MAX_AGE_SECONDS = 300
 
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-
-
-def verify_password(plain: str, hashed: str) -> bool:
-    """Verify a bcrypt password. Returns False on any malformed-hash error
-    instead of leaking the bcrypt ValueError to the caller — a corrupted
-    stored hash (wrong format, missing salt, truncated by shell-escape, etc.)
-    must look like a failed credential check (401), not a 500 server error.
-    """
-    try:
-        return bcrypt.checkpw(plain.encode(), hashed.encode())
-    except (ValueError, TypeError):
-        return False
-
-
 def create_access_token(
     user_id: int,
     roles: list[str],
@@ -3,23 +3,25 @@
 - `GET /api/v2/public/board-config`  — без аутентификации, отдаёт конфиг странице.
 - `PUT /api/v2/board-config`         — только менеджер, сохраняет правки.
 
-Кэш намеренно не используется: конфиг — одна строка с PK-доступом, запрос
-тривиально дёшев, а per-worker кэш при `--workers 2` отдавал бы устаревшие
-данные с одного воркера после правки на другом.
+Публичный GET кэшируется в `service.public_config_cache` (ETag/304 для
+киосков); межворкерную свежесть после PUT даёт эпоха, которую сдвигает
+`merge_and_save_board_config`.
 """
 import logging
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from uk_management_bot.api.board_config.schemas import BoardConfigResponse, BoardConfigUpdateIn
 from uk_management_bot.api.board_config.service import (
     load_board_config,
     merge_and_save_board_config,
+    public_config_cache,
     to_public_response,
 )
 from uk_management_bot.api.dependencies import get_db, require_roles
 from uk_management_bot.api.rate_limit import limiter
+from uk_management_bot.api.response_cache import not_modified
 from uk_management_bot.database.models.user import User
 
 logger = logging.getLogger(__name__)
@@ -31,15 +33,20 @@ router = APIRouter()
 @limiter.limit("120/minute")
 async def get_board_config(
     request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-) -> BoardConfigResponse:
+):
     """Конфиг витрины для публичной страницы. Без аутентификации.
 
     Если строки ещё нет (миграция не накатана) — отдаём дефолт, страница
     не должна белеть.
     """
-    cfg = await load_board_config(db)
-    return to_public_response(cfg)
+
+    async def build() -> BoardConfigResponse:
+        return to_public_response(await load_board_config(db))
+
+    entry = await public_config_cache.get("public", build)
+    return not_modified(request, response, entry) or entry.value
 
 
 @router.put("/board-config", response_model=BoardConfigResponse)
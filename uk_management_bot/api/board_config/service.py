@@ -17,6 +17,7 @@ from sqlalchemy.exc import OperationalError, ProgrammingError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from uk_management_bot.api.board_config.defaults import DEFAULT_BOARD_CONFIG, enabled_module_ids
+from uk_management_bot.api.response_cache import ResponseCache
 from uk_management_bot.config.settings import settings
 from uk_management_bot.api.board_config.schemas import (
     BoardConfigResponse,
@@ -41,6 +42,21 @@ DAY_SHORT = {
 }
 CLOSED_LABEL = {"ru": "Выходной", "uz": "Dam olish kuni"}
 
+# Кэш ПУБЛИЧНЫХ ответов из конфига (`/public/board-config`, `/announcements`
+# по языкам): табло-киоски и TWA опрашивают их постоянно, а конфиг меняется
+# раз в дни. Раньше кэша не было — per-worker кэш при `--workers 2` отдавал бы
+# устаревшее после правки на другом воркере. Эпоха решает это:
+# `merge_and_save_board_config` (единая точка записи) делает `invalidate()`.
+# Без Redis — потолок устаревания на чужом воркере TTL. Фоновые потребители
+# (work_reports sync/autopublish) читают `load_board_config` напрямую.
+PUBLIC_CACHE_TTL_SECONDS = 30
+public_config_cache = ResponseCache(
+    "board_config",
+    ttl=PUBLIC_CACHE_TTL_SECONDS,
+    max_entries=8,
+    epoch_key="board_config:public_cache_epoch",
+)
+
 
 async def load_board_config(db: AsyncSession) -> StoredBoardConfigData:
     """Загрузить строку board_config (id=1) или отдать дефолт.
@@ -138,6 +154,7 @@ async def merge_and_save_board_config(
         row.data = normalized.model_dump(mode="json")
         row.updated_by = updated_by
     await db.commit()
+    await public_config_cache.invalidate()
 
     return normalized
 
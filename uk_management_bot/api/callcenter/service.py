@@ -3,7 +3,7 @@
 Module-level async функции `(db, *, plain-параметры) -> ORM|примитивы`.
 HTTPException, парсинг и сериализация — в router.py.
 """
-from sqlalchemy import select, or_, func
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from uk_management_bot.database.models.user import User
@@ -42,10 +42,7 @@ async def search_approved_applicants(db: AsyncSession, *, q: str):
             # Только approved-жители: менеджер не должен выбрать того, кому потом
             # нельзя создать заявку (план «Обходчик», R52).
             User.status == "approved",
-            or_(
-                User.roles.like('%"applicant"%'),
-                legacy_role_filter("applicant"),
-            ),
+            legacy_role_filter("applicant"),
             ci_contains_any(
                 (User.phone, User.first_name, User.last_name),
                 pattern,
@@ -145,6 +145,18 @@ async def lifespan(app: FastAPI):
         set_shared_bot(None)
     except Exception:
         _logger.exception("Error closing API notification bot")
+    # Close the shared upstream HTTP clients (integrations/http_clients.py).
+    try:
+        from uk_management_bot.integrations.http_clients import close_http_clients
+        await close_http_clients()
+    except Exception:
+        _logger.exception("Error closing upstream HTTP clients")
+    # Stop the password-hash process pool (api/auth/passwords.py).
+    try:
+        from uk_management_bot.api.auth.passwords import reset_password_hasher
+        reset_password_hasher()
+    except Exception:
+        _logger.exception("Error stopping password hasher pool")
     # Dispose DB connection pools
     try:
         from uk_management_bot.database.session import async_engine
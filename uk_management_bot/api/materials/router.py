@@ -25,6 +25,7 @@ from uk_management_bot.api.materials import service as api_service
 from uk_management_bot.api.materials.schemas import (
     AdjustmentCreate,
     AdjustmentOut,
+    IssueBulkCreate,
     IssueCard,
     IssueCreate,
     MaterialCard,
@@ -159,6 +160,23 @@ async def create_issue(
     return issue
 
 
+@router.post("/issues/bulk", response_model=list[IssueCard], status_code=201)
+async def create_issues_bulk(
+    body: IssueBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(_manager_only),
+):
+    # Всё или ничего: 409/422 по любой строке — get_db откатывает остальные.
+    try:
+        issues = await api_service.create_issues_bulk_tx(
+            db, request_number=body.request_number, items=body.items,
+            created_by=user.id,
+        )
+    except MaterialServiceError as exc:
+        raise _http_error(exc)
+    return issues
+
+
 @router.post("/adjustments", response_model=AdjustmentOut, status_code=201)
 async def create_adjustment(
     body: AdjustmentCreate,
@@ -189,15 +207,23 @@ async def list_operations(
     date_to: Optional[str] = Query(None),
     limit: int = Query(50, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(
+        None, max_length=128,
+        description="курсор следующей страницы (next_cursor); при нём offset не применяется",
+    ),
+    exact_total: bool = Query(False, description="точный count вместо подсчёта с потолком"),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(_manager_only),
 ):
     dt_from, dt_to = _date_bounds(date_from, date_to)
-    return await material_service.list_operations(
-        db, op_type=op_type, material_id=material_id,
-        request_number=request_number, date_from=dt_from, date_to=dt_to,
-        limit=limit, offset=offset,
-    )
+    try:
+        return await material_service.list_operations(
+            db, op_type=op_type, material_id=material_id,
+            request_number=request_number, date_from=dt_from, date_to=dt_to,
+            limit=limit, offset=offset, cursor=cursor, exact_total=exact_total,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
 
 
 _OPS_CSV_HEADER = [
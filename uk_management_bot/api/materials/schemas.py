@@ -8,7 +8,7 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 # ── Номенклатура ────────────────────────────────────────────────────
@@ -62,6 +62,18 @@ class IssueCreate(BaseModel):
     reason: Optional[str] = None
 
 
+class IssueBulkLine(BaseModel):
+    material_id: int
+    qty: Decimal
+
+
+class IssueBulkCreate(BaseModel):
+    """Расход нескольких материалов на одну заявку одной транзакцией."""
+
+    request_number: str
+    items: List[IssueBulkLine] = Field(min_length=1, max_length=50)
+
+
 class AdjustmentCreate(BaseModel):
     """Два взаимоисключающих режима: инвентаризация (qty обязателен) или
     сторно (qty запрещён — объём берётся из исходной операции)."""
@@ -154,8 +166,13 @@ class OperationRow(BaseModel):
 
 
 class OperationsPage(BaseModel):
+    # total считается не дальше потолка (total_capped=True — «не меньше»),
+    # точный — по exact_total=true
     total: int
+    total_capped: bool = False
     items: List[OperationRow]
+    # keyset-курсор следующей страницы; None — страница последняя
+    next_cursor: Optional[str] = None
 
 
 class RequestMaterialsOut(BaseModel):
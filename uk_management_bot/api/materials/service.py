@@ -73,6 +73,15 @@ async def create_issue_tx(
     return issue
 
 
+async def create_issues_bulk_tx(db: AsyncSession, *, request_number, items, created_by):
+    issues = await material_service.issue_materials_bulk(
+        db, request_number=request_number, created_by=created_by,
+        items=[material_service.IssueLine(i.material_id, i.qty) for i in items],
+    )
+    await db.commit()
+    return issues
+
+
 async def adjust_tx(
     db: AsyncSession, *, material_id, direction, reason, created_by,
     qty, unit_price, reversal_of_issue_id, reversal_of_receipt_id,
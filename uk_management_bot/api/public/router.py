@@ -5,15 +5,15 @@ addresses, executor or user identifiers — so it is safe to serve openly.
 """
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-import time
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from uk_management_bot.api.dependencies import get_db
 from uk_management_bot.api.public import service
 from uk_management_bot.api.rate_limit import limiter
+from uk_management_bot.api.response_cache import ResponseCache, not_modified
 from uk_management_bot.utils.constants import (
     REQUEST_STATUS_COMPLETED,
     REQUEST_STATUS_RETURNED,
@@ -35,11 +35,13 @@ PER_STATUS_LIMIT = 10
 
 # Short server-side cache. Residents behind one building NAT share a rate-limit
 # bucket and a lobby kiosk polls continuously; caching the assembled payload
-# means that traffic hits memory, not the DB. Time-based invalidation only, no
-# locks — at the TTL boundary a few concurrent requests may each rebuild once,
-# which is fine for this read-only anonymized payload. Per-worker cache.
+# means that traffic hits memory, not the DB. Time-based invalidation only —
+# the payload is read-only and anonymized. The unified response cache adds what
+# the old single-slot tuple lacked: one rebuild per worker at the TTL boundary
+# (single-flight), a stale window during that rebuild, an L2 copy in Redis so
+# one worker's rebuild serves the others, and an ETag so polling kiosks get 304.
 _CACHE_TTL_SECONDS = 30
-_board_cache: "Optional[tuple[PublicBoardOut, float]]" = None
+_CACHE_STALE_SECONDS = 30
 
 
 # ---------------------------------------------------------------------------
@@ -61,6 +63,16 @@ class PublicBoardOut(BaseModel):
     avg_rating: Optional[float]
 
 
+_board_cache = ResponseCache(
+    "public_board",
+    ttl=_CACHE_TTL_SECONDS,
+    stale_ttl=_CACHE_STALE_SECONDS,
+    max_entries=1,
+    shared=True,
+    model=PublicBoardOut,
+)
+
+
 # ---------------------------------------------------------------------------
 # Endpoint
 # ---------------------------------------------------------------------------
@@ -69,17 +81,18 @@ class PublicBoardOut(BaseModel):
 @limiter.limit("120/minute")
 async def get_public_board(
     request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-) -> PublicBoardOut:
+):
     """Anonymized aggregate board data for the public УК landing page.
 
     Intentionally has NO authentication dependency.
     """
-    global _board_cache
-    now = time.monotonic()
-    if _board_cache is not None and _board_cache[1] > now:
-        return _board_cache[0]
+    entry = await _board_cache.get("board", lambda: _build_board(db))
+    return not_modified(request, response, entry) or entry.value
+
 
+async def _build_board(db: AsyncSession) -> PublicBoardOut:
     # --- status_counts: one GROUP BY, then 0-fill all known statuses ---
     counts_raw = await service.status_counts_raw(db)
     # Проекция наружу (PR4 contract): канон «Возвращена» сворачивается в
@@ -116,12 +129,10 @@ async def get_public_board(
     # --- avg_rating: arithmetic mean of resident acceptance stars (1-5) ---
     avg_rating = await service.avg_rating(db)
 
-    board = PublicBoardOut(
+    return PublicBoardOut(
         status_counts=status_counts,
         active_requests=active_requests,
         active_executors=active_executors,
         avg_resolution_hours=avg_resolution_hours,
         avg_rating=avg_rating,
     )
-    _board_cache = (board, now + _CACHE_TTL_SECONDS)
-    return board
@@ -11,7 +11,7 @@ AST-гейт `tests/api/test_requests_router_inventory.py` держит прям
 import logging
 from typing import Optional
 from fastapi import (
-    APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, Request,
+    APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, Request, Response,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -173,6 +173,7 @@ async def get_kanban(
 
 @router.get("", response_model=list[RequestCard])
 async def list_requests(
+    response: Response,
     status: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     executor_id: Optional[int] = Query(None),
@@ -180,21 +181,34 @@ async def list_requests(
     scope: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(
+        None, max_length=128,
+        description="курсор следующей страницы (X-Next-Cursor); при нём offset не применяется",
+    ),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     # Server-enforced object-level scoping живёт в сервисе: клиентский `scope`
     # не является authz-входом и в выборку не передаётся.
-    rows = await svc.list_requests_rows(
-        db,
-        user=user,
-        status=status,
-        category=category,
-        executor_id=executor_id,
-        source=source,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        rows, next_cursor = await svc.list_requests_rows(
+            db,
+            user=user,
+            status=status,
+            category=category,
+            executor_id=executor_id,
+            source=source,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+    except ValueError:
+        # `status` здесь — query-параметр, модуль fastapi.status им затенён.
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    # Тело остаётся списком карточек (контракт клиентов); курсор следующей
+    # страницы — в заголовке, его нет на последней странице.
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [_make_request_card(r, eu) for r, eu in rows]
 
 
@@ -12,11 +12,13 @@ AST-гейт `tests/api/test_requests_router_inventory.py` фиксирует о
 прямого ORM в роутере на нуле.
 """
 
-import json
+import base64
+import binascii
 import logging
+from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
@@ -26,7 +28,7 @@ from uk_management_bot.api.requests.schemas import RequestCard
 from uk_management_bot.database.models.request import Request as RequestModel
 from uk_management_bot.database.models.request_assignment import RequestAssignment
 from uk_management_bot.database.models.request_comment import RequestComment
-from uk_management_bot.database.models.shift import Shift
+from uk_management_bot.database.models.request_visibility import RequestVisibility
 from uk_management_bot.database.models.user import User
 from uk_management_bot.database.models.user_apartment import UserApartment
 from uk_management_bot.utils.constants import ACCEPTANCE_MODE_RESIDENT
@@ -144,6 +146,23 @@ async def kanban_rows(
     return active_rows, terminal_rows, terminal_totals
 
 
+def encode_list_cursor(created_at: datetime, request_number: str) -> str:
+    """Непрозрачный keyset-курсор ``(created_at, request_number)`` последней
+    карточки страницы (формат — как у журналов access_control)."""
+    raw = f"{created_at.isoformat()}|{request_number}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_list_cursor(cursor: str) -> tuple[datetime, str]:
+    """Разобрать курсор; битый → ValueError (роутер отвечает 400)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        moment, request_number = raw.rsplit("|", 1)
+        return datetime.fromisoformat(moment), request_number
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("invalid cursor") from None
+
+
 async def list_requests_rows(
     db: AsyncSession,
     *,
@@ -154,12 +173,19 @@ async def list_requests_rows(
     source: Optional[str],
     limit: int,
     offset: int,
-) -> list:
-    """Список заявок с server-enforced object-level scoping.
+    cursor: Optional[str] = None,
+) -> tuple[list, Optional[str]]:
+    """Список заявок с server-enforced object-level scoping → (строки, next_cursor).
 
     Only managers may list across all users. For everyone else,
     ownership/assignment filtering is applied unconditionally (клиентский
     `scope`-параметр не является authz-входом и сюда не передаётся).
+
+    Скоуп исполнителя — один semi-join по проекции ``request_visibility``
+    (назначение, группа на смене, ``executor_id``; правило и пересчёт —
+    ``services/request_visibility.py``). Порядок ``(created_at, request_number)
+    DESC``; с ``cursor`` страница берётся keyset'ом и ``offset`` не
+    применяется. ``next_cursor`` — None на последней странице.
     """
     ExecutorUser = aliased(User)
     query = (
@@ -169,39 +195,10 @@ async def list_requests_rows(
     user_roles = _parse_user_roles(user)
     if "manager" not in user_roles:
         if "executor" in user_roles:
-            # Executor: individual assignments + group (if in shift) + executor_id fallback
-            conditions = []
-            # 1. Individual assignments
-            assignment_sub = select(RequestAssignment.request_number).where(
-                RequestAssignment.executor_id == user.id,
-                RequestAssignment.status == "active",
-            )
-            conditions.append(RequestModel.request_number.in_(assignment_sub))
-            # 2. Group assignments (only if executor has active shift)
-            active_shift = await db.execute(
-                select(Shift).where(Shift.user_id == user.id, Shift.status == "active")
-            )
-            if active_shift.scalars().first():
-                specs = []
-                if user.specialization:
-                    try:
-                        raw = user.specialization
-                        if isinstance(raw, str) and raw.startswith("["):
-                            specs = json.loads(raw)
-                        else:
-                            specs = [raw] if raw else []
-                    except Exception:
-                        specs = [user.specialization] if user.specialization else []
-                if specs:
-                    group_sub = select(RequestAssignment.request_number).where(
-                        RequestAssignment.assignment_type == "group",
-                        RequestAssignment.group_specialization.in_(specs),
-                        RequestAssignment.status == "active",
-                    )
-                    conditions.append(RequestModel.request_number.in_(group_sub))
-            # 3. Fallback: executor_id
-            conditions.append(RequestModel.executor_id == user.id)
-            query = query.filter(or_(*conditions))
+            query = query.filter(RequestModel.request_number.in_(
+                select(RequestVisibility.request_number)
+                .where(RequestVisibility.executor_id == user.id)
+            ))
         else:
             # Applicant: own requests only
             query = query.filter(RequestModel.user_id == user.id)
@@ -213,11 +210,27 @@ async def list_requests_rows(
         query = query.filter(RequestModel.executor_id == executor_id)
     if source:
         query = query.filter(RequestModel.source == source)
-
-    result = await db.execute(
-        query.order_by(RequestModel.created_at.desc()).offset(offset).limit(limit)
-    )
-    return result.all()
+    if cursor is not None:
+        created_at, request_number = decode_list_cursor(cursor)
+        query = query.filter(or_(
+            RequestModel.created_at < created_at,
+            and_(RequestModel.created_at == created_at,
+                 RequestModel.request_number < request_number),
+        ))
+    else:
+        query = query.offset(offset)
+
+    rows = (await db.execute(
+        query.order_by(RequestModel.created_at.desc(), RequestModel.request_number.desc())
+        .limit(limit + 1)
+    )).all()
+    if len(rows) <= limit:
+        return rows, None
+    del rows[limit:]
+    last = rows[-1][0]
+    if last.created_at is None:
+        return rows, None
+    return rows, encode_list_cursor(last.created_at, last.request_number)
 
 
 async def acceptance_rows(db: AsyncSession, *, user: User) -> list:
@@ -0,0 +1,273 @@
+"""Двухуровневый кэш ответов публичных эндпоинтов.
+
+Раньше у каждого публичного эндпоинта был свой кэш со своим вытеснением:
+однослотовый ``_board_cache`` (табло), dict на 32 записи с эпохой Redis
+(лента work-reports), а витрина/TWA перечитывали board_config на каждый
+запрос. Здесь — один слой для всех:
+
+* **L1** — ограниченный LRU в процессе (``max_entries``), на воркер;
+* **L2** (``shared=True``) — Redis: промах L1 сначала ищет готовый ответ,
+  посчитанный другим воркером, и только потом идёт в БД (при ``epoch_key``
+  L2 читается только с прочитанной эпохой);
+* **эпоха пространства имён** (``epoch_key``) — писатель делает
+  ``invalidate()`` (INCR в Redis), и записи всех воркеров с прежней эпохой
+  перестают быть валидными разом. Эпоха входит и в ключ L2;
+* **single-flight** — одновременные промахи одного ключа в воркере ждут
+  одного загрузчика, а не идут в БД каждый (thundering herd на границе TTL);
+* **stale-while-revalidate** (``stale_ttl``) — после TTL запись ещё
+  ``stale_ttl`` секунд отдаётся всем, пока ОДИН запрос её пересчитывает.
+  Пересчитывает сам запрос, своей сессией (фоновая задача пережила бы
+  request-scoped сессию);
+* **ETag** — считается один раз при заполнении, ``not_modified`` отвечает 304.
+
+Redis недоступен → эпоха ``None``: записи L1 валидны по TTL, L2 не отвечает —
+та же честная деградация, что у ``work_reports.coordination``.
+
+Метрики (hit/stale/miss/coalesced/shared_hit/revalidate/error) — по
+пространству имён, на воркер; отдаются в ``/metrics`` (``stats()``).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from uk_management_bot.services.redis_pubsub import get_pubsub_redis
+
+logger = logging.getLogger(__name__)
+
+_caches: "dict[str, ResponseCache]" = {}
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    value: Any
+    etag: str
+    fresh_until: float
+    stale_until: float
+    epoch: Optional[int]
+
+
+def _encode(value: Any) -> str:
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def _etag(body: str) -> str:
+    return '"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"'
+
+
+class ResponseCache:
+    """Кэш одного пространства имён (см. модуль).
+
+    ``model`` обязателен при ``shared=True``: им ответ из L2 валидируется
+    обратно в объект. Без L2 значения могут быть любыми JSON-сериализуемыми.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        ttl: float,
+        stale_ttl: float = 0,
+        max_entries: int = 128,
+        epoch_key: Optional[str] = None,
+        shared: bool = False,
+        model: Optional[type[BaseModel]] = None,
+    ) -> None:
+        if shared and model is None:
+            raise ValueError("shared ResponseCache needs a model to decode L2 values")
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.epoch_key = epoch_key
+        self.shared = shared
+        self.model = model
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.counters: Counter = Counter()
+        _caches[namespace] = self
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Сбросить L1 этого воркера (L2 и эпоху не трогает)."""
+        self._entries.clear()
+
+    async def epoch(self) -> Optional[int]:
+        """Текущая эпоха пространства; None — без эпохи или Redis недоступен."""
+        if self.epoch_key is None:
+            return None
+        try:
+            redis = await get_pubsub_redis()
+            value = await redis.get(self.epoch_key)
+            return int(value) if value is not None else 0
+        except Exception as e:
+            logger.debug("response_cache[%s]: эпоха недоступна (%s)", self.namespace, e)
+            return None
+
+    async def invalidate(self) -> Optional[int]:
+        """Для писателей: сбросить L1 и сдвинуть эпоху (кэш всех воркеров).
+
+        Возвращает новую эпоху; None — Redis недоступен, другие воркеры
+        доедят свои записи по TTL.
+        """
+        self.clear()
+        if self.epoch_key is None:
+            return None
+        try:
+            redis = await get_pubsub_redis()
+            return int(await redis.incr(self.epoch_key))
+        except Exception as e:
+            logger.warning(
+                "response_cache[%s]: redis недоступен (%s) — кэш других воркеров истечёт по TTL",
+                self.namespace, e,
+            )
+            return None
+
+    async def get(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> CacheEntry:
+        """Запись по ключу; при промахе/устаревании — ``loader()`` (single-flight)."""
+        epoch = await self.epoch()
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and (epoch is None or entry.epoch == epoch):
+            if now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                self.counters["hit"] += 1
+                return entry
+            if now < entry.stale_until and key in self._inflight:
+                # Кто-то уже пересчитывает — не ждём его.
+                self.counters["stale"] += 1
+                return entry
+            if now < entry.stale_until:
+                self.counters["revalidate"] += 1
+                return await self._load(key, loader, epoch)
+
+        inflight = self._inflight.get(key)
+        while inflight is not None:
+            try:
+                result = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # Загрузчика отменили (клиент ушёл) — пробуем сами.
+                inflight = self._inflight.get(key)
+                continue
+            self.counters["coalesced"] += 1
+            return result
+
+        if self._shared_enabled(epoch):
+            entry = await self._shared_get(key, epoch or 0)
+            if entry is not None:
+                self.counters["shared_hit"] += 1
+                self._store(key, entry)
+                return entry
+
+        self.counters["miss"] += 1
+        return await self._load(key, loader, epoch)
+
+    async def _load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]], epoch: Optional[int]
+    ) -> CacheEntry:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+            body = _encode(value)
+            now = time.monotonic()
+            entry = CacheEntry(
+                value=value,
+                etag=_etag(body),
+                fresh_until=now + self.ttl,
+                stale_until=now + self.ttl + self.stale_ttl,
+                epoch=epoch,
+            )
+            self._store(key, entry)
+            if self._shared_enabled(epoch):
+                await self._shared_set(key, epoch or 0, entry.etag, body)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            self.counters["error"] += 1
+            future.set_exception(e)
+            # Ожидающих может не быть — не оставляем «never retrieved».
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _store(self, key: Hashable, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _shared_enabled(self, epoch: Optional[int]) -> bool:
+        # Эпоха есть, но не прочиталась — L2 мог пережить invalidate(), не читаем.
+        return self.shared and (self.epoch_key is None or epoch is not None)
+
+    def _shared_key(self, key: Hashable, epoch: int) -> str:
+        return f"response_cache:{self.namespace}:{epoch}:{key}"
+
+    async def _shared_get(self, key: Hashable, epoch: int) -> Optional[CacheEntry]:
+        try:
+            redis = await get_pubsub_redis()
+            raw = await redis.get(self._shared_key(key, epoch))
+            if raw is None:
+                return None
+            stored = json.loads(raw)
+            remaining = stored["expires_at"] - time.time()
+            if remaining <= 0:
+                return None
+            now = time.monotonic()
+            return CacheEntry(
+                value=self.model.model_validate_json(stored["body"]),
+                etag=stored["etag"],
+                fresh_until=now + remaining,
+                stale_until=now + remaining + self.stale_ttl,
+                epoch=epoch,
+            )
+        except Exception as e:
+            logger.debug("response_cache[%s]: L2 недоступен (%s)", self.namespace, e)
+            return None
+
+    async def _shared_set(self, key: Hashable, epoch: int, etag: str, body: str) -> None:
+        stored = json.dumps({"etag": etag, "body": body, "expires_at": time.time() + self.ttl})
+        try:
+            redis = await get_pubsub_redis()
+            await redis.set(
+                self._shared_key(key, epoch), stored, ex=max(1, int(self.ttl + self.stale_ttl))
+            )
+        except Exception as e:
+            logger.debug("response_cache[%s]: L2 недоступен (%s)", self.namespace, e)
+
+
+def not_modified(request: Request, response: Response, entry: CacheEntry) -> Optional[Response]:
+    """Поставить ETag в ответ; 304, если клиент прислал тот же ``If-None-Match``."""
+    response.headers["ETag"] = entry.etag
+    if request.headers.get("if-none-match") == entry.etag:
+        return Response(status_code=304, headers={"ETag": entry.etag})
+    return None
+
+
+def stats() -> dict[str, dict[str, int]]:
+    """Счётчики всех пространств имён этого воркера (для /metrics)."""
+    return {namespace: dict(cache.counters) for namespace, cache in _caches.items()}
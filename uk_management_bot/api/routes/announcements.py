@@ -6,13 +6,20 @@
 
 Контракт ответа сохранён (`{announcements, working_hours, emergency_phones}`),
 чтобы фронт HomePage почти не менялся. Локализация — `?lang=ru|uz`.
+Ответ кэшируется по языку в `board_config.service.public_config_cache`
+(сбрасывается сохранением конфига) и отдаётся с ETag.
 """
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response
 
-from uk_management_bot.api.board_config.schemas import LocalizedText
-from uk_management_bot.api.board_config.service import format_working_hours, load_board_config
+from uk_management_bot.api.board_config.schemas import LocalizedText, StoredBoardConfigData
+from uk_management_bot.api.board_config.service import (
+    format_working_hours,
+    load_board_config,
+    public_config_cache,
+)
 from uk_management_bot.api.dependencies import get_db
 from uk_management_bot.api.rate_limit import limiter
+from uk_management_bot.api.response_cache import not_modified
 
 router = APIRouter()
 
@@ -20,18 +27,26 @@ router = APIRouter()
 # ⚠️ имя `get_announcements` импортируется напрямую в api/main.py — не переименовывать.
 @router.get("/api/v2/announcements")
 @limiter.limit("120/minute")
-async def get_announcements(request: Request, db=Depends(get_db), lang: str = "ru"):
+async def get_announcements(
+    request: Request, response: Response, db=Depends(get_db), lang: str = "ru"
+):
     """Контент главной TWA из board_config. Без аутентификации (публичный)."""
     lang = "uz" if lang.startswith("uz") else "ru"
 
+    async def build() -> dict:
+        return _build_announcements(await load_board_config(db), lang)
+
+    entry = await public_config_cache.get(("announcements", lang), build)
+    return not_modified(request, response, entry) or entry.value
+
+
+def _build_announcements(cfg: StoredBoardConfigData, lang: str) -> dict:
     # Пустой/пробельный UZ допустим схемой → fallback на RU (как табло,
     # ResidentBoardPage). strip и в RU-ветке — чтобы карточка из одних пробелов
     # отсеивалась одинаково.
     def loc(t: LocalizedText) -> str:
         return (t.uz.strip() or t.ru.strip()) if lang == "uz" else t.ru.strip()
 
-    cfg = await load_board_config(db)
-
     announcements: list[dict] = []
 
     # Новости: сортируем сырые cfg.announcements (важные вперёд, свежие выше,
@@ -11,8 +11,11 @@ import logging
 from fastapi import APIRouter, Depends, Header, HTTPException
 from fastapi.responses import Response
 
+from uk_management_bot.api import response_cache
+from uk_management_bot.api.auth.passwords import get_password_hasher
 from uk_management_bot.api.rate_limit import rate_limit_backend_status
 from uk_management_bot.config.settings import settings
+from uk_management_bot.integrations import http_clients
 
 _logger = logging.getLogger(__name__)
 
@@ -124,6 +127,24 @@ async def _compute_outbox_metrics() -> dict:
         return {"enabled": True, "error": "internal_error"}
 
 
+async def _compute_autopublish_backlog() -> dict | None:
+    """Очередь автопубликации отчётов (`autopublish_backlog`) для `/metrics`.
+    None — фича выключена, БД недоступна или расчёт упал: гейджей нет."""
+    if not settings.WORK_REPORTS_ENABLED:
+        return None
+    from uk_management_bot.database.session import AsyncSessionLocal
+    if AsyncSessionLocal is None:
+        return None
+    from uk_management_bot.services import work_report_service
+
+    try:
+        async with AsyncSessionLocal() as db:
+            return await work_report_service.autopublish_backlog(db)
+    except Exception:
+        _logger.exception("autopublish backlog computation failed")
+        return None
+
+
 @router.get("/api/health/outbox", dependencies=[Depends(require_health_token)])
 async def outbox_health():
     """Outbox lag metrics for monitoring / alerting.
@@ -168,4 +189,73 @@ async def prometheus_metrics():
             registry=registry,
         ).set(metrics["stuck_in_flight"])
 
+    # Автопубликация отчётов: рост возраста старейшего черновика — конвейер
+    # не успевает (media-service деградировал или упёрся в потолок медиа/с).
+    backlog = await _compute_autopublish_backlog()
+    if backlog and backlog["enabled"]:
+        Gauge(
+            "uk_work_reports_autopublish_backlog",
+            "Pending work-report drafts awaiting autopublish",
+            registry=registry,
+        ).set(backlog["backlog"])
+        Gauge(
+            "uk_work_reports_autopublish_backlog_age_seconds",
+            "Age of the oldest pending work-report draft awaiting autopublish (seconds)",
+            registry=registry,
+        ).set(backlog["backlog_age_seconds"])
+
+    # Кэш ответов публичных эндпоинтов (api/response_cache.py): счётчики
+    # этого воркера с его старта, по пространству имён и исходу.
+    cache_requests = Gauge(
+        "uk_response_cache_requests",
+        "Response cache lookups by namespace and result (per worker, since start)",
+        ["namespace", "result"],
+        registry=registry,
+    )
+    for namespace, counters in response_cache.stats().items():
+        for result, value in counters.items():
+            cache_requests.labels(namespace=namespace, result=result).set(value)
+
+    # Пул bcrypt (api/auth/passwords.py): глубина очереди сейчас и исходы
+    # операций этого воркера; рост rejected — шторм логинов упёрся в границу.
+    hasher_stats = get_password_hasher().stats()
+    Gauge(
+        "uk_password_hasher_pending",
+        "Password hash/verify operations in flight or queued (per worker)",
+        registry=registry,
+    ).set(hasher_stats.pop("pending"))
+    hasher_ops = Gauge(
+        "uk_password_hasher_operations",
+        "Password hasher operations by result (per worker, since start)",
+        ["result"],
+        registry=registry,
+    )
+    for result, value in hasher_stats.items():
+        hasher_ops.labels(result=result).set(value)
+
+    # Общие HTTP-клиенты апстримов (integrations/http_clients.py): доля
+    # переиспользованных соединений и время до заголовков ответа.
+    upstream_gauges = {
+        name: Gauge(f"uk_http_upstream_{name}", help_text, ["upstream"], registry=registry)
+        for name, help_text in (
+            ("requests", "Upstream HTTP responses received (per worker, since start)"),
+            ("new_connections", "Upstream TCP connections opened (per worker, since start)"),
+            ("connection_reuse_ratio", "Share of upstream requests served on a pooled connection"),
+            ("server_errors", "Upstream 5xx responses (per worker, since start)"),
+            ("latency_seconds_sum", "Sum of upstream time-to-headers, seconds"),
+            ("latency_seconds_max", "Max upstream time-to-headers, seconds"),
+        )
+    }
+    for upstream, counters in http_clients.stats().items():
+        requests_total = counters.get("requests", 0)
+        new_connections = counters.get("new_connections", 0)
+        values = {
+            **counters,
+            "connection_reuse_ratio": (
+                max(0.0, 1 - new_connections / requests_total) if requests_total else 0.0
+            ),
+        }
+        for name, gauge in upstream_gauges.items():
+            gauge.labels(upstream=upstream).set(values.get(name, 0))
+
     return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
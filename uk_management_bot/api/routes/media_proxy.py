@@ -19,6 +19,7 @@ from uk_management_bot.api.dependencies import get_current_user, get_db
 from uk_management_bot.api.dependencies_access import check_request_access
 from uk_management_bot.config.settings import settings
 from uk_management_bot.database.models.user import User
+from uk_management_bot.integrations.http_clients import UPSTREAM_MEDIA, get_http_client
 from uk_management_bot.integrations.http_retry import (
     get_with_retries,
     stream_with_retries,
@@ -122,23 +123,25 @@ async def proxy_media_upload(
             detail="Unsupported file content (allowed: JPEG, PNG, GIF, MP4, MOV)",
         )
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(
-            f"{media_url}/api/v1/media/upload",
-            headers=headers,
-            files={"file": (file.filename, file_bytes, sniffed_ct)},
-            data={
-                "request_number": request_number,
-                "category": category.value,
-                "uploaded_by": str(user.id),
-            },
-        )
-        if resp.status_code != 200 and resp.status_code != 201:
-            # AUD3-34: статус — да, тело downstream — нет. В ответе media-service
-            # может оказаться что угодно, включая эхо загруженного контента.
-            _logger.error("Media service upload error %s for %s", resp.status_code, request_number)
-            raise HTTPException(status_code=resp.status_code, detail="Media service error")
-        return resp.json()
+    # Общий клиент media-service (integrations/http_clients.py): пул и
+    # keep-alive на процесс, таймаут апстрима — MEDIA_SERVICE_TIMEOUT.
+    client = get_http_client(UPSTREAM_MEDIA)
+    resp = await client.post(
+        f"{media_url}/api/v1/media/upload",
+        headers=headers,
+        files={"file": (file.filename, file_bytes, sniffed_ct)},
+        data={
+            "request_number": request_number,
+            "category": category.value,
+            "uploaded_by": str(user.id),
+        },
+    )
+    if resp.status_code != 200 and resp.status_code != 201:
+        # AUD3-34: статус — да, тело downstream — нет. В ответе media-service
+        # может оказаться что угодно, включая эхо загруженного контента.
+        _logger.error("Media service upload error %s for %s", resp.status_code, request_number)
+        raise HTTPException(status_code=resp.status_code, detail="Media service error")
+    return resp.json()
 
 
 @router.get("/api/v2/media/request/{request_number}")
@@ -165,19 +168,19 @@ async def proxy_media_list(
     # ARCH-03: идемпотентный GET — ретраим транзиентные сбои media-service.
     # Явная деградация: при исчерпании попыток (transport error) возвращаем
     # пустой список, а не 500 — список вложений не критичен для рендера.
-    async with httpx.AsyncClient(timeout=10) as client:
-        try:
-            resp = await get_with_retries(
-                client,
-                f"{media_url}/api/v1/media/request/{request_number}",
-                headers=headers,
-            )
-        except httpx.TransportError as exc:
-            _logger.warning("Media service unreachable for list %s: %s", request_number, exc)
-            return []
-        if resp.status_code != 200:
-            return []
-        return resp.json()
+    try:
+        resp = await get_with_retries(
+            get_http_client(UPSTREAM_MEDIA),
+            f"{media_url}/api/v1/media/request/{request_number}",
+            headers=headers,
+            timeout=10,
+        )
+    except httpx.TransportError as exc:
+        _logger.warning("Media service unreachable for list %s: %s", request_number, exc)
+        return []
+    if resp.status_code != 200:
+        return []
+    return resp.json()
 
 
 @router.get("/api/v2/media/{media_id}/file")
@@ -210,50 +213,48 @@ async def proxy_media_file(
     # Явная деградация: при исчерпании попыток (transport error) → 503, а не
     # необработанное исключение/500.
     #
-    # 1-2) Метаданные и гейт доступа — короткие буферизуемые вызовы, их клиент
-    # живёт ровно в этом блоке.
-    async with httpx.AsyncClient(timeout=60) as client:
-        try:
-            meta_resp = await get_with_retries(
-                client,
-                f"{media_url}/api/v1/media/{media_id}",
-                headers=headers,
-            )
-        except httpx.TransportError as exc:
-            _logger.warning("Media service unreachable for meta %s: %s", media_id, exc)
-            raise HTTPException(status_code=503, detail="Media service unavailable")
-        if meta_resp.status_code != 200:
-            raise HTTPException(status_code=meta_resp.status_code, detail="Media not found")
-        request_number = meta_resp.json().get("request_number")
-        if not request_number:
-            raise HTTPException(status_code=404, detail="Media has no associated request")
-
-        # Authorization gate — raises 403/404 if the user can't see it.
-        await check_request_access(request_number, db, user)
+    # 1-2) Метаданные и гейт доступа — короткие буферизуемые вызовы.
+    client = get_http_client(UPSTREAM_MEDIA)
+    try:
+        meta_resp = await get_with_retries(
+            client,
+            f"{media_url}/api/v1/media/{media_id}",
+            headers=headers,
+            timeout=60,
+        )
+    except httpx.TransportError as exc:
+        _logger.warning("Media service unreachable for meta %s: %s", media_id, exc)
+        raise HTTPException(status_code=503, detail="Media service unavailable")
+    if meta_resp.status_code != 200:
+        raise HTTPException(status_code=meta_resp.status_code, detail="Media not found")
+    request_number = meta_resp.json().get("request_number")
+    if not request_number:
+        raise HTTPException(status_code=404, detail="Media has no associated request")
+
+    # Authorization gate — raises 403/404 if the user can't see it.
+    await check_request_access(request_number, db, user)
 
     # 3) AUD5-APIFE-15: байты отдаются ПОТОКОМ, а не через `resp.content`.
     # Раньше файл (до 50 МБ) целиком поднимался в память API-процесса на каждый
     # <img>; при нескольких параллельных просмотрах это прямой путь к OOM.
     #
-    # Клиент здесь НЕ в `async with`: тело дренит Starlette уже ПОСЛЕ возврата
-    # из функции, поэтому соединение обязано пережить её область видимости.
+    # Ответ апстрима здесь НЕ в `async with`: тело дренит Starlette уже ПОСЛЕ
+    # возврата из функции, поэтому поток обязан пережить её область видимости.
     # Закрывает его `finally` генератора — то есть и при обрыве клиента тоже
-    # (Starlette бросает в генератор при disconnect). Форма скопирована с
+    # (Starlette бросает в генератор при disconnect); соединение при этом
+    # возвращается в пул общего клиента. Форма скопирована с
     # `api/work_reports/public_router.py`, где этот вывод уже сделан.
-    client = httpx.AsyncClient(timeout=60)
-
     async def _close() -> None:
         await upstream.aclose()
-        await client.aclose()
 
     try:
         upstream = await stream_with_retries(
             client,
             f"{media_url}/api/v1/media/{media_id}/file",
             headers=headers,
+            timeout=60,
         )
     except httpx.TransportError as exc:
-        await client.aclose()
         _logger.warning("Media service unreachable for file %s: %s", media_id, exc)
         raise HTTPException(status_code=503, detail="Media service unavailable")
 
@@ -4,6 +4,7 @@
 (`/employees/pending` — до динамического `/employees/{user_id}`).
 """
 import logging
+from dataclasses import asdict
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -19,7 +20,7 @@ from uk_management_bot.api.users.rename import (
     rename_user_http,
 )
 from uk_management_bot.api.shifts.schemas import (
-    EmployeeBrief, EmployeeDetail,
+    EmployeeBrief, EmployeeDetail, EmployeeStatsOut,
     DeleteEmployeeRequest, ActiveRequestsCount,
     CreateInviteRequest, CreateInviteResponse,
     MeterEntryToggleRequest,
@@ -55,6 +56,7 @@ async def list_employees(
     verification_status: Optional[str] = Query(None),
     limit: int = Query(50, le=200),
     offset: int = Query(0, ge=0),
+    with_stats: bool = Query(False),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(require_roles("manager")),
 ):
@@ -68,12 +70,17 @@ async def list_employees(
         limit=limit,
         offset=offset,
     )
+    # Счётчики карточек всей страницы — один сгруппированный запрос.
+    stats = await service.get_employee_stats(db, [u.id for u in users]) if with_stats else {}
 
     briefs = []
     for u in users:
         # Inject active_shift_id into the object so model_validator can see it
         u.__dict__['active_shift_id'] = active_shifts.get(u.id)
-        briefs.append(EmployeeBrief.model_validate(u))
+        brief = EmployeeBrief.model_validate(u)
+        if u.id in stats:
+            brief.stats = EmployeeStatsOut(**asdict(stats[u.id]))
+        briefs.append(brief)
     return briefs
 
 
@@ -62,6 +62,14 @@ def _validate_specializations(values: list[str], *, allow_universal: bool = Fals
     return values
 
 
+class EmployeeStatsOut(BaseModel):
+    total_shifts: int
+    completed_shifts: int
+    active_shifts: int
+    active_requests: int
+    rating: Optional[float]
+
+
 class EmployeeBrief(BaseModel):
     id: int
     first_name: Optional[str]
@@ -72,6 +80,8 @@ class EmployeeBrief(BaseModel):
     verification_status: str
     status: str = "approved"
     roles: list[str] = []  # parsed from User.roles (JSON) — нужен для бейджа роли в очереди
+    # Только при `GET /employees?with_stats=true` — одним запросом на страницу.
+    stats: Optional[EmployeeStatsOut] = None
 
     model_config = {"from_attributes": True}
 
@@ -21,10 +21,12 @@ AST-гейт `tests/api/test_shifts_router_inventory.py` фиксирует от
 
 from .employees import (
     ACTIVE_REQUEST_STATUSES,
+    EmployeeStats,
     _is_staff,
     activate_employee,
     count_active_requests,
     decline_employee,
+    get_employee_stats,
     get_employee_with_stats,
     get_user,
     list_employees,
@@ -84,10 +86,12 @@ from .web_transfers import (
 __all__ = [
     # employees
     "ACTIVE_REQUEST_STATUSES",
+    "EmployeeStats",
     "_is_staff",
     "activate_employee",
     "count_active_requests",
     "decline_employee",
+    "get_employee_stats",
     "get_employee_with_stats",
     "get_user",
     "list_employees",
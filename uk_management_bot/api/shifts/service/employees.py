@@ -2,17 +2,18 @@
 верификация/статусы/роли-капабилити, soft-delete (AUD5-ARCH-3 волна 5,
 block-move из api/shifts/service.py — код байт-в-байт)."""
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Iterable, Optional
 
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from uk_management_bot.database.models.rating import Rating
 from uk_management_bot.database.models.request import Request
 from uk_management_bot.database.models.shift import Shift
 from uk_management_bot.database.models.user import User
-from uk_management_bot.utils.auth_helpers import parse_roles_safe
+from uk_management_bot.utils.auth_helpers import legacy_role_filter, parse_roles_safe
 from uk_management_bot.utils.sql_search import (
     ci_contains_any,
     escape_like as _escape_like,
@@ -61,7 +62,7 @@ async def list_employees(
     """
     scoped_role = role or "executor"
     query = select(User).where(
-        User.roles.like(f'%"{_escape_like(scoped_role)}"%'),
+        legacy_role_filter(scoped_role),
         User.deleted_at.is_(None),
     )
 
@@ -179,11 +180,7 @@ async def list_pending_staff(db: AsyncSession) -> list[User]:
             User.status == "pending",
             User.deleted_at.is_(None),
             User.verification_status != "rejected",
-            or_(
-                User.roles.like('%"manager"%'),
-                User.roles.like('%"executor"%'),
-                User.roles.like('%"inspector"%'),
-            ),
+            legacy_role_filter("manager", "executor", "inspector"),
         )
         .order_by(User.created_at)
     )
@@ -277,6 +274,94 @@ async def soft_delete_employee(
     await db.commit()
 
 
+@dataclass(frozen=True)
+class EmployeeStats:
+    """Счётчики карточки сотрудника (см. `get_employee_stats`)."""
+
+    total_shifts: int = 0
+    completed_shifts: int = 0
+    active_shifts: int = 0
+    active_requests: int = 0
+    rating: Optional[float] = None
+
+
+async def get_employee_stats(
+    db: AsyncSession, user_ids: Iterable[int]
+) -> dict[int, EmployeeStats]:
+    """Статистика карточки для страницы сотрудников — один запрос на любой размер.
+
+    Смены, активные заявки и оценки агрегируются каждый своим GROUP BY (с
+    FILTER для разрезов по статусу смены) и LEFT JOIN'ятся к пользователям
+    страницы: прежняя карточка делала count на каждый счётчик, а список — по
+    вызову на строку. Отсутствующие id в результат не попадают; у сотрудника
+    без смен/заявок — нули и ``rating=None``.
+    """
+    ids = sorted(set(user_ids))
+    if not ids:
+        return {}
+
+    shifts = (
+        select(
+            Shift.user_id.label("user_id"),
+            func.count(Shift.id).label("total"),
+            func.count(Shift.id).filter(Shift.status == "completed").label("completed"),
+            func.count(Shift.id).filter(Shift.status == "active").label("active"),
+        )
+        .where(Shift.user_id.in_(ids))
+        .group_by(Shift.user_id)
+        .subquery()
+    )
+    requests = (
+        select(
+            Request.executor_id.label("user_id"),
+            func.count().label("active"),
+        )
+        .where(
+            Request.executor_id.in_(ids),
+            Request.status.in_(ACTIVE_REQUEST_STATUSES),
+        )
+        .group_by(Request.executor_id)
+        .subquery()
+    )
+    # Средний балл — оценки жителей через requests.executor_id (как и раньше
+    # в карточке: RequestAssignment нет у легаси-заявок).
+    ratings = (
+        select(
+            Request.executor_id.label("user_id"),
+            func.avg(Rating.rating).label("rating"),
+        )
+        .select_from(Rating)
+        .join(Request, Request.request_number == Rating.request_number)
+        .where(Request.executor_id.in_(ids))
+        .group_by(Request.executor_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            User.id,
+            shifts.c.total,
+            shifts.c.completed,
+            shifts.c.active,
+            requests.c.active,
+            ratings.c.rating,
+        )
+        .outerjoin(shifts, shifts.c.user_id == User.id)
+        .outerjoin(requests, requests.c.user_id == User.id)
+        .outerjoin(ratings, ratings.c.user_id == User.id)
+        .where(User.id.in_(ids))
+    )
+    return {
+        user_id: EmployeeStats(
+            total_shifts=total or 0,
+            completed_shifts=completed or 0,
+            active_shifts=active or 0,
+            active_requests=active_requests or 0,
+            rating=float(rating) if rating is not None else None,
+        )
+        for user_id, total, completed, active, active_requests, rating in result.all()
+    }
+
+
 async def get_employee_with_stats(
     db: AsyncSession, user_id: int
 ) -> Optional[tuple[User, Optional[Shift], int, int, Optional[float]]]:
@@ -302,27 +387,5 @@ async def get_employee_with_stats(
     )
     active_shift_obj = shift_result.scalars().first()
 
-    total_result = await db.execute(
-        select(func.count(Shift.id)).where(Shift.user_id == user_id)
-    )
-    total_shifts = total_result.scalar() or 0
-
-    completed_result = await db.execute(
-        select(func.count(Shift.id)).where(Shift.user_id == user_id, Shift.status == "completed")
-    )
-    total_completed = completed_result.scalar() or 0
-
-    # Средний балл заявок исполнителя: оценки жителей (1–5) при приёмке.
-    # Джойн через requests.executor_id, а не RequestAssignment — поле пишет
-    # канонический движок, и оно есть у легаси-заявок без строк assignment.
-    # (Раньше тут был avg(Shift.quality_rating) — колонку не пишет никто,
-    # карточка всегда показывала «—».)
-    rating_result = await db.execute(
-        select(func.avg(Rating.rating))
-        .join(Request, Request.request_number == Rating.request_number)
-        .where(Request.executor_id == user_id)
-    )
-    rating = rating_result.scalar()
-    rating = float(rating) if rating is not None else None
-
-    return emp, active_shift_obj, total_shifts, total_completed, rating
+    stats = (await get_employee_stats(db, [user_id]))[user_id]
+    return emp, active_shift_obj, stats.total_shifts, stats.completed_shifts, stats.rating
@@ -106,10 +106,7 @@ async def get_stats(db: AsyncSession, *, period_start: datetime,
     total_exec_result = await db.execute(
         select(func.count(User.id)).where(
             User.status == "approved",
-            or_(
-                legacy_role_filter("executor"),
-                User.roles.like('%"executor"%'),
-            ),
+            legacy_role_filter("executor"),
         )
     )
     total_executors = total_exec_result.scalar() or 0
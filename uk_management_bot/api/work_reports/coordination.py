@@ -19,7 +19,8 @@ from uk_management_bot.services.redis_pubsub import get_pubsub_redis
 
 logger = logging.getLogger(__name__)
 
-_EPOCH_KEY = "work_reports:public_cache_epoch"
+# Ключ эпохи публичного кэша: его же передают ResponseCache(epoch_key=...).
+EPOCH_KEY = "work_reports:public_cache_epoch"
 _RECONCILE_SLOT_KEY = "work_reports:reconcile_slot"
 
 
@@ -32,7 +33,7 @@ async def cache_epoch() -> Optional[int]:
     """
     try:
         redis = await get_pubsub_redis()
-        value = await redis.get(_EPOCH_KEY)
+        value = await redis.get(EPOCH_KEY)
         return int(value) if value is not None else 0
     except Exception as e:
         logger.debug("cache_epoch: redis недоступен (%s)", e)
@@ -47,7 +48,7 @@ async def bump_cache_epoch() -> Optional[int]:
     """
     try:
         redis = await get_pubsub_redis()
-        return int(await redis.incr(_EPOCH_KEY))
+        return int(await redis.incr(EPOCH_KEY))
     except Exception as e:
         logger.warning(
             "bump_cache_epoch: redis недоступен (%s) — кэш других воркеров истечёт по TTL", e
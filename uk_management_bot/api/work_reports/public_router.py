@@ -34,9 +34,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from uk_management_bot.api.dependencies import get_db
 from uk_management_bot.api.rate_limit import limiter
+from uk_management_bot.api.response_cache import ResponseCache, not_modified
 from uk_management_bot.api.work_reports import coordination
 from uk_management_bot.api.work_reports import service as api_service
 from uk_management_bot.config.settings import settings
+from uk_management_bot.integrations.http_clients import UPSTREAM_MEDIA, get_http_client
 from uk_management_bot.services.work_report_service import revoke_stale_publications
 
 logger = logging.getLogger(__name__)
@@ -77,19 +79,23 @@ def _empty_feed(limit: int, offset: int) -> PublicWorkReportsOut:
 # ---------------------------------------------------------------------------
 
 # Keyed by (limit, offset) — unlike api/public/router.py's single-slot
-# _board_cache (fine for a parameterless endpoint), this endpoint's payload
+# board (fine for a parameterless endpoint), this endpoint's payload
 # varies by query params, so a single slot would serve the wrong page.
-# AUD6-P2-05: значение хранит и ЭПОХУ (coordination.cache_epoch) — при
+# AUD6-P2-05: запись хранит и ЭПОХУ (coordination.EPOCH_KEY) — при
 # uvicorn --workers 2 ревокация в одном воркере иначе не трогала кэш другого,
 # и отозванный отчёт жил в публичной ленте до троттл+TTL. Запись валидна,
 # только если её эпоха совпадает с текущей; при недоступном Redis эпоха None —
 # честная деградация к прежнему поведению (потолок троттл+TTL, не «ровно
-# троттл», как утверждал старый комментарий).
+# троттл», как утверждал старый комментарий). Без stale-окна и без L2: отозванный
+# отчёт не должен пережить ни TTL, ни недоступность эпохи.
 _FEED_CACHE_TTL_SECONDS = 30
 _FEED_CACHE_MAX_ENTRIES = 32
-_work_reports_feed_cache: dict[
-    tuple[int, int], tuple[PublicWorkReportsOut, float, Optional[int]]
-] = {}
+_work_reports_feed_cache = ResponseCache(
+    "work_reports_feed",
+    ttl=_FEED_CACHE_TTL_SECONDS,
+    max_entries=_FEED_CACHE_MAX_ENTRIES,
+    epoch_key=coordination.EPOCH_KEY,
+)
 
 # revoke_stale_publications is real DB write work (it commits); riding it
 # on every public GET would be wasteful and racy under load, so it only
@@ -104,10 +110,11 @@ _last_revoke_check_at: Optional[float] = None
 @limiter.limit("120/minute")
 async def get_public_work_reports(
     request: Request,
+    response: Response,
     limit: int = Query(12, ge=1, le=50),
     offset: int = Query(0, ge=0),
     db: AsyncSession = Depends(get_db),
-) -> PublicWorkReportsOut:
+):
     """Anonymized public feed of published visual work reports.
 
     Intentionally has NO authentication dependency. Flag off → empty
@@ -118,9 +125,7 @@ async def get_public_work_reports(
     if not settings.WORK_REPORTS_ENABLED:
         return _empty_feed(limit, offset)
 
-    cache_key = (limit, offset)
     now = time.monotonic()
-    epoch = await coordination.cache_epoch()
 
     # Ревокация проверяется ДО чтения кэша, а не после. Иначе окна складывались
     # бы: попадание в кэш возвращало бы ответ, ни разу не дав ревокации
@@ -131,8 +136,7 @@ async def get_public_work_reports(
         try:
             revoked = await revoke_stale_publications(db)
             if revoked:
-                _work_reports_feed_cache.clear()
-                epoch = await coordination.bump_cache_epoch() or epoch
+                await _work_reports_feed_cache.invalidate()
         except Exception as e:
             # Broad on purpose — this is best-effort background maintenance
             # riding along on a public GET; a bug in it must never break the
@@ -144,19 +148,21 @@ async def get_public_work_reports(
             await db.rollback()
         _last_revoke_check_at = now
 
-    cached = _work_reports_feed_cache.get(cache_key)
-    if cached is not None and cached[1] > now and (epoch is None or cached[2] == epoch):
-        return cached[0]
-
     try:
-        rows, total = await api_service.published_page(db, limit=limit, offset=offset)
+        entry = await _work_reports_feed_cache.get(
+            (limit, offset), lambda: _build_feed(db, limit, offset)
+        )
     except (OperationalError, ProgrammingError) as e:
         # Table not migrated yet — same graceful-degrade convention as
         # api/board_config/service.py's load_board_config: never 500 the
-        # public page over a not-yet-migrated table.
+        # public page over a not-yet-migrated table. Not cached.
         logger.warning("work_reports table unavailable for public feed: %s", e)
         return _empty_feed(limit, offset)
+    return not_modified(request, response, entry) or entry.value
+
 
+async def _build_feed(db: AsyncSession, limit: int, offset: int) -> PublicWorkReportsOut:
+    rows, total = await api_service.published_page(db, limit=limit, offset=offset)
     items = [
         PublicWorkReportOut(
             id=r.id,
@@ -168,17 +174,7 @@ async def get_public_work_reports(
         )
         for r in rows
     ]
-    result = PublicWorkReportsOut(items=items, total=total, limit=limit, offset=offset)
-
-    if cache_key not in _work_reports_feed_cache and len(_work_reports_feed_cache) >= _FEED_CACHE_MAX_ENTRIES:
-        # Simplest correct eviction for a 30s TTL cache capped at 32 entries:
-        # drop the oldest-inserted key (dict preserves insertion order).
-        # Not an LRU — over-engineering for this size/TTL.
-        evict_key = next(iter(_work_reports_feed_cache))
-        del _work_reports_feed_cache[evict_key]
-    _work_reports_feed_cache[cache_key] = (result, now + _FEED_CACHE_TTL_SECONDS, epoch)
-
-    return result
+    return PublicWorkReportsOut(items=items, total=total, limit=limit, offset=offset)
 
 
 # ---------------------------------------------------------------------------
@@ -322,20 +318,23 @@ async def get_public_work_report_media(
     # returns, before Starlette ever drains a byte. The manual
     # send(stream=True) + explicit aclose() (in _close()/the generator's
     # finally) is the only shape whose lifetime actually matches.
-    client = httpx.AsyncClient(timeout=60)
+    #
+    # The client itself is the shared media-service one
+    # (integrations/http_clients.py): closing the response returns its
+    # connection to the keep-alive pool instead of tearing down TCP+TLS.
+    client = get_http_client(UPSTREAM_MEDIA)
 
     async def _close() -> None:
         await upstream_response.aclose()
-        await client.aclose()
 
     try:
         upstream_path = "file" if original else "preview"
         upstream_request = client.build_request(
-            "GET", f"{media_url}/api/v1/media/{media_id}/{upstream_path}", headers=headers
+            "GET", f"{media_url}/api/v1/media/{media_id}/{upstream_path}",
+            headers=headers, timeout=60,
         )
         upstream_response = await client.send(upstream_request, stream=True)
     except httpx.TransportError:
-        await client.aclose()
         raise HTTPException(status_code=503, detail="Media service unavailable")
 
     if upstream_response.status_code != 200:
@@ -1,9 +1,8 @@
 """httpx client for polling InfraSafe-side state (used by reconciliation)."""
 import logging
 
-import httpx
-
 from uk_management_bot.config.settings import settings
+from uk_management_bot.integrations.http_clients import UPSTREAM_INFRASAFE, get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +26,10 @@ async def fetch_infrasafe_external_buildings() -> set[str]:
         if settings.INFRASAFE_INVENTORY_TOKEN
         else {}
     )
-    async with httpx.AsyncClient(timeout=INFRASAFE_API_TIMEOUT) as client:
-        resp = await client.get(url, headers=headers)
-        resp.raise_for_status()
-        data = resp.json()
+    client = get_http_client(UPSTREAM_INFRASAFE)
+    resp = await client.get(url, headers=headers, timeout=INFRASAFE_API_TIMEOUT)
+    resp.raise_for_status()
+    data = resp.json()
     items = data.get("data", data) if isinstance(data, dict) else data
     return {
         str(item["external_id"])
@@ -65,10 +64,10 @@ async def fetch_infrasafe_uk_request_numbers() -> set[str]:
         if settings.INFRASAFE_INVENTORY_TOKEN
         else {}
     )
-    async with httpx.AsyncClient(timeout=INFRASAFE_API_TIMEOUT) as client:
-        resp = await client.get(url, headers=headers)
-        resp.raise_for_status()
-        data = resp.json()
+    client = get_http_client(UPSTREAM_INFRASAFE)
+    resp = await client.get(url, headers=headers, timeout=INFRASAFE_API_TIMEOUT)
+    resp.raise_for_status()
+    data = resp.json()
     items = data.get("data", data) if isinstance(data, dict) else data
     return {
         str(item["uk_request_number"])
@@ -142,6 +142,12 @@ class Settings:
     if JWT_USE_NEXT_SECRET and not JWT_SECRET_NEXT:
         raise ValueError("JWT_USE_NEXT_SECRET=true requires JWT_SECRET_NEXT to be set")
 
+    # Хэширование паролей (api/auth/passwords.py): cost bcrypt, число
+    # процессов пула и граница очереди, сверх которой логин сразу получает 503.
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+
     # ARCH-010: неизменяемый идентификатор инсталляции — левая часть UUIDv5-name
     # исходящих вебхуков (services/webhook_sender.py). Менять НЕЛЬЗЯ: смена
     # значения меняет все будущие event_id и ломает дедуп InfraSafe.
@@ -175,6 +181,10 @@ class Settings:
         raise ValueError(
             f"DISPLAY_TZ is not a valid IANA zone: {DISPLAY_TZ!r}"
         ) from _tz_exc
+
+    # Номеров в блоке, который процесс арендует у счётчика дня
+    # (services/request_number_service.py); 1 — без блоков.
+    REQUEST_NUMBER_BLOCK_SIZE = max(1, int(os.getenv("REQUEST_NUMBER_BLOCK_SIZE", "10")))
     
     # Rate limiting для /join команды
     JOIN_RATE_LIMIT_WINDOW = int(os.getenv("JOIN_RATE_LIMIT_WINDOW", "600"))  # 10 минут
@@ -262,6 +272,20 @@ class Settings:
     # (shared with the bot side) — both deployments use one key per env.
     MEDIA_SERVICE_API_KEY = os.getenv("MEDIA_SERVICE_API_KEY") or os.getenv("MEDIA_API_KEY", "")
 
+    # Общие HTTP-клиенты апстримов (integrations/http_clients.py): пул и
+    # keep-alive на процесс. HTTP_<UPSTREAM>_MAX_CONNECTIONS (media, infrasafe,
+    # infrasafe_webhook) переопределяет общий лимит; HTTP/2 требует пакет h2.
+    HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "50"))
+    HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "10"))
+    HTTP_POOL_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "30"))
+    HTTP_POOL_CONNECT_TIMEOUT = float(os.getenv("HTTP_POOL_CONNECT_TIMEOUT", "5"))
+    HTTP_CLIENT_HTTP2 = os.getenv("HTTP_CLIENT_HTTP2", "false").lower() in ("1", "true", "yes")
+    HTTP_UPSTREAM_MAX_CONNECTIONS = {
+        upstream: int(os.environ[f"HTTP_{upstream.upper()}_MAX_CONNECTIONS"])
+        for upstream in ("media", "infrasafe", "infrasafe_webhook")
+        if os.getenv(f"HTTP_{upstream.upper()}_MAX_CONNECTIONS")
+    }
+
     # Resource Accounting (external «Учёт ресурсов УК» — iframe launch-ticket).
     # Backend выпускает одноразовый ticket, дёргая партнёрский API server-to-
     # server; RESOURCE_SERVICE_TOKEN живёт только на бэкенде и НЕ уходит в браузер.
@@ -272,6 +296,26 @@ class Settings:
     # Work reports (visual before/after board)
     WORK_REPORTS_ENABLED = os.getenv("WORK_REPORTS_ENABLED", "False").lower() == "true"
     PUBLIC_MEDIA_MAX_BYTES = int(os.getenv("PUBLIC_MEDIA_MAX_BYTES", str(8 * 1024 * 1024)))
+    # Конвейер автопубликации (services/work_reports/autopublish.py): сколько
+    # отчётов публикуется одновременно, сколько подборов медиа идёт параллельно
+    # и потолок медиа в секунду на процесс — каждая публикация греет превью,
+    # а прогрев одного фото — скачивание файла из Telegram тем же токеном бота.
+    WORK_REPORTS_AUTOPUBLISH_CONCURRENCY = int(os.getenv("WORK_REPORTS_AUTOPUBLISH_CONCURRENCY", "4"))
+    WORK_REPORTS_AUTOPUBLISH_PREFETCH_CONCURRENCY = int(
+        os.getenv("WORK_REPORTS_AUTOPUBLISH_PREFETCH_CONCURRENCY", "8")
+    )
+    WORK_REPORTS_AUTOPUBLISH_MEDIA_PER_SECOND = float(
+        os.getenv("WORK_REPORTS_AUTOPUBLISH_MEDIA_PER_SECOND", "10")
+    )
+
+    # Склад материалов: потолок подсчёта total журнала операций
+    # (services/material_service/reads.py; дальше — «не меньше», total_capped).
+    MATERIAL_OPERATIONS_TOTAL_CAP = int(os.getenv("MATERIAL_OPERATIONS_TOTAL_CAP", "10000"))
+
+    # Рекомендации по сменам (services/recommendation_engine.py): снимок анализа
+    # живёт столько секунд — менеджер листает экран рекомендаций и возвращается
+    # к нему, а правила за минуту не меняются. 0 — без кэша.
+    RECOMMENDATION_CACHE_TTL_SECONDS = float(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", "60"))
 
     # Group Intake: мониторинг ТГ-групп жителей → заявки (план rev.3).
     # Живёт в ВЫДЕЛЕННОМ боте (свой токен, свой polling-процесс
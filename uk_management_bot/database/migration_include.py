@@ -4,6 +4,7 @@
 allowlist можно было юнит-тестировать без исполнения env.py (который в конце
 запускает миграции). env.py и тест импортируют ОДНУ И ТУ ЖЕ функцию — SSOT.
 """
+import re
 
 # media_* — чужой сервис (собственная Base) живёт в общей dev-БД. В UK-контракт
 # (squashed baseline + drift-гейт ``alembic check``, PRC-05) НЕ входит. Исключаем
@@ -26,10 +27,28 @@ FUNCTIONAL_INDEXES_EXCLUDED = frozenset({
 })
 
 
+# Партиции помесячно партиционированных таблиц (миграция 018): модель описывает
+# только родителя, а партиции (``<parent>_pYYYYMM``, ``_default``, ``_legacy``)
+# создаются/удаляются в рантайме. Шаблон привязан к ТОЧНОМУ списку родителей и
+# строгой форме суффикса — прочие таблицы с тем же префиксом drift-гейт видит.
+PARTITIONED_PARENTS = frozenset({"access_events"})
+_PARTITION_SUFFIX = re.compile(r"_(p\d{6}|default|legacy)")
+
+
+def is_partition_name(name: str) -> bool:
+    """Имя — партиция одной из ``PARTITIONED_PARENTS``."""
+    for parent in PARTITIONED_PARENTS:
+        if name.startswith(parent) and _PARTITION_SUFFIX.fullmatch(name[len(parent):]):
+            return True
+    return False
+
+
 def include_object(obj, name, type_, reflected, compare_to):  # noqa: ANN001
     """Return False → объект исключается из autogenerate/`alembic check`."""
     if type_ == "table" and name in MEDIA_TABLES_EXCLUDED:
         return False
+    if type_ == "table" and reflected and is_partition_name(name):
+        return False
     if type_ == "index" and name in FUNCTIONAL_INDEXES_EXCLUDED:
         return False
     return True
@@ -1,6 +1,7 @@
 # Импорт всех моделей для автоматического создания таблиц
 
 from .user import User
+from .user_role import UserRole
 from .request import Request
 from .shift import Shift
 from .shift_template import ShiftTemplate
@@ -33,6 +34,9 @@ from .invite_nonce import InviteNonce
 # Resident-board public page config
 from .board_config import BoardConfig
 
+# Lease'ы задач планировщика (ownership job'а между репликами воркера)
+from .scheduler_job_lease import SchedulerJobLease
+
 # Singleton-конфиг автоматического менеджера (авто-назначение заявок)
 from .auto_manager_config import AutoManagerConfig
 
@@ -40,7 +44,10 @@ from .auto_manager_config import AutoManagerConfig
 from .feedback import Feedback
 
 # Складской учёт материалов (закупки и движение матсредств)
-from .material import Material, MaterialReceipt, MaterialIssue, MaterialIssueAllocation
+from .material import (
+    Material, MaterialReceipt, MaterialIssue, MaterialIssueAllocation,
+    MaterialMovement,
+)
 
 # Визуальные отчёты о выполненных работах (публичная лента «до/после»)
 from .work_report import WorkReport
@@ -48,12 +55,14 @@ from .work_report import WorkReport
 # Комментарии и назначения заявок
 from .request_comment import RequestComment
 from .request_assignment import RequestAssignment
+from .request_visibility import RequestVisibility
 
 # Group Intake: реестр мониторимых ТГ-групп
 from .monitored_group import MonitoredGroup
 
 __all__ = [
     'User',
+    'UserRole',
     'Request',
     'Shift',
     'ShiftTemplate',
@@ -79,6 +88,7 @@ __all__ = [
     'WebhookInbox',
     'InviteNonce',
     'BoardConfig',
+    'SchedulerJobLease',
     'AutoManagerConfig',
     'Feedback',
     'RequestNumberCounter',
@@ -86,8 +96,10 @@ __all__ = [
     'MaterialReceipt',
     'MaterialIssue',
     'MaterialIssueAllocation',
+    'MaterialMovement',
     'WorkReport',
     'RequestComment',
     'RequestAssignment',
+    'RequestVisibility',
     'MonitoredGroup',
 ]
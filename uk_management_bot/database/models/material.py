@@ -1,11 +1,12 @@
 """Модели складского учёта материалов (закупки и движение матсредств).
 
-Четыре таблицы одного агрегата:
+Пять таблиц одного агрегата:
 
 * ``materials`` — номенклатура (справочник, soft-delete через is_active)
 * ``material_receipts`` — приход = партия (FIFO-лот)
 * ``material_issues`` — расход (по заявке / хознужды / недостача)
 * ``material_issue_allocations`` — FIFO-связка расход↔партия (аудит себестоимости)
+* ``material_movements`` — единый журнал движений (приходы и расходы подряд)
 
 Политика учёта:
 
@@ -20,7 +21,10 @@
   создании расхода.
 * ``material_name``/``unit`` в операциях — snapshot на момент операции:
   переименование карточки материала не переписывает историю.
-* Остатки — агрегат SUM(qty_remaining) по партиям, денормализованной таблицы нет.
+* Источник остатка — ``qty_remaining`` партий: SUM(qty_remaining) /
+  SUM(qty_remaining × unit_price) по партиям с остатком, index-only сканом
+  ``ix_material_receipts_open_stock``. Отдельной сводки-строки на материал
+  нет: её UPSERT из каждого движения сериализовал приходы с расходами.
 """
 
 from sqlalchemy import (
@@ -35,9 +39,15 @@ from sqlalchemy import (
     Numeric,
     String,
     Text,
+    UniqueConstraint,
+    event,
+    insert,
+    literal,
+    null,
+    select,
     text,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship
 from sqlalchemy.sql import func
 
 from uk_management_bot.database.session import Base
@@ -145,6 +155,13 @@ class MaterialReceipt(Base):
             "id",
             postgresql_where=text("qty_remaining > 0"),
         ),
+        # Остатки: агрегат открытых партий без обращения к таблице (миграция 022)
+        Index(
+            "ix_material_receipts_open_stock",
+            "material_id",
+            postgresql_include=["qty_remaining", "unit_price"],
+            postgresql_where=text("qty_remaining > 0"),
+        ),
     )
 
     def __repr__(self):
@@ -239,3 +256,85 @@ class MaterialIssueAllocation(Base):
             f"<MaterialIssueAllocation(issue_id={self.issue_id}, "
             f"receipt_id={self.receipt_id}, qty={self.qty})>"
         )
+
+
+class MaterialMovement(Base):
+    """Журнал движений: строка на каждый приход и расход, append-only.
+
+    Журнал операций API раньше собирал ``UNION ALL`` партий и расходов, считал
+    ``count(*)`` всего объединения и листал OFFSET'ом — каждая страница
+    сканировала всю историю склада. Здесь то же объединение построчно с
+    индексами под keyset по ``(created_at, id)`` (в целом, по типу, по
+    материалу). Пишет хук ``_record_material_movements`` при вставке
+    ``MaterialReceipt``/``MaterialIssue`` — приход, списание, корректировки и
+    сторно проходят через них. ``op_id`` — id исходной операции.
+    """
+
+    __tablename__ = "material_movements"
+
+    id = Column(Integer, primary_key=True)
+    op_type = Column(String(10), nullable=False)  # receipt | issue
+    op_id = Column(Integer, nullable=False)
+    material_id = Column(Integer, ForeignKey("materials.id"), nullable=False)
+    material_name = Column(String(200), nullable=False)
+    unit = Column(String(20), nullable=False)
+    doc_type = Column(String(20), nullable=False)
+    qty = Column(Numeric(12, 3), nullable=False)
+    amount = Column(Numeric(14, 2), nullable=False)
+    request_number = Column(String(15), nullable=True)
+    supplier = Column(String(200), nullable=True)
+    reason = Column(Text, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("op_type", "op_id", name="uq_material_movements_op"),
+        Index("ix_material_movements_created", "created_at", "id"),
+        Index("ix_material_movements_type_created", "op_type", "created_at", "id"),
+        Index("ix_material_movements_material_created", "material_id", "created_at", "id"),
+        Index("ix_material_movements_request_number", "request_number"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<MaterialMovement(id={self.id}, op_type={self.op_type}, "
+            f"op_id={self.op_id})>"
+        )
+
+
+_MOVEMENT_COLUMNS = (
+    "op_type", "op_id", "material_id", "material_name", "unit", "doc_type", "qty",
+    "amount", "request_number", "supplier", "reason", "created_by", "created_at",
+)
+
+
+def _receipt_movements(ids: list[int]):
+    r = MaterialReceipt
+    return select(
+        literal("receipt"), r.id, r.material_id, r.material_name, r.unit, r.doc_type,
+        r.qty, r.total_amount, null(), r.supplier, r.note, r.created_by, r.created_at,
+    ).where(r.id.in_(ids)).order_by(r.id)
+
+
+def _issue_movements(ids: list[int]):
+    i = MaterialIssue
+    return select(
+        literal("issue"), i.id, i.material_id, i.material_name, i.unit, i.doc_type,
+        i.qty, i.total_cost, i.request_number, null(), i.reason, i.created_by, i.created_at,
+    ).where(i.id.in_(ids)).order_by(i.id)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_material_movements(session: Session, flush_context) -> None:
+    receipts = [o.id for o in session.new if isinstance(o, MaterialReceipt)]
+    issues = [o.id for o in session.new if isinstance(o, MaterialIssue)]
+    if not (receipts or issues):
+        return
+    # INSERT … SELECT из только что вставленных строк: created_at (server
+    # default) копируется в БД как есть, без дочитки в ORM посреди flush.
+    connection = session.connection()
+    table = MaterialMovement.__table__
+    if receipts:
+        connection.execute(insert(table).from_select(_MOVEMENT_COLUMNS, _receipt_movements(receipts)))
+    if issues:
+        connection.execute(insert(table).from_select(_MOVEMENT_COLUMNS, _issue_movements(issues)))
@@ -9,6 +9,10 @@ MAX ломался после 999 (`-1000` < `-999`).
 Счётчик монотонен: удаление заявки с максимальным суффиксом НЕ приводит
 к переиспользованию номера (self-seed из MAX(requests) выполняется только
 при отсутствии строки дня).
+
+last_seq — верхняя граница уже РОЗДАННЫХ номеров, не последний номер заявки:
+процессы арендуют блоки по ``REQUEST_NUMBER_BLOCK_SIZE`` (см.
+request_number_service), остаток блока, не дошедший до заявок, остаётся дырой.
 """
 
 from sqlalchemy import Column, Integer, String
@@ -0,0 +1,111 @@
+"""
+Видимость заявок исполнителям (request_visibility) — материализованная проекция
+
+Список заявок исполнителя (``api/requests/service.list_requests_rows``) раньше
+собирал скоуп на каждом вызове: запрос активной смены, разбор JSON
+``specialization`` в Python и ``OR`` из двух ``IN (подзапрос)`` по
+``request_assignments`` плюс фолбэк по ``requests.executor_id``. Такой ``OR``
+планировщик не покрывает одним индексом, и с ростом истории назначений
+список деградировал. Здесь тот же ответ построчно
+``(executor_id, request_number, reason)``:
+
+* ``assignment`` — активное назначение на исполнителя;
+* ``group`` — активное групповое назначение на его специализацию, пока у
+  исполнителя есть активная смена;
+* ``executor`` — ``requests.executor_id``.
+
+Строки пересчитывает ``services/request_visibility.py``. ORM-хук ниже ловит
+изменения назначений, исполнителя заявки, смен и специализаций в той же
+транзакции; массовые ``update(RequestAssignment)`` доменных операций
+workflow-раннера хук не видит — раннер пересчитывает заявку сам. Прочая
+запись мимо ORM чинится сверкой (``scripts/check_request_visibility.py``).
+"""
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, delete, event, inspect
+from sqlalchemy.orm import Session
+
+from uk_management_bot.database.session import Base
+from uk_management_bot.database.models.request import Request
+from uk_management_bot.database.models.request_assignment import RequestAssignment
+from uk_management_bot.database.models.shift import Shift
+from uk_management_bot.database.models.user import User
+
+VISIBILITY_ASSIGNMENT = "assignment"
+VISIBILITY_GROUP = "group"
+VISIBILITY_EXECUTOR = "executor"
+
+
+class RequestVisibility(Base):
+    __tablename__ = "request_visibility"
+
+    executor_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    request_number = Column(
+        String(15), ForeignKey("requests.request_number", ondelete="CASCADE"), primary_key=True
+    )
+    reason = Column(String(16), primary_key=True)
+
+    __table_args__ = (
+        # PK (executor_id, …) обслуживает список исполнителя; этот — пересчёт
+        # строк одной заявки при смене назначения.
+        Index("ix_request_visibility_request_number", "request_number"),
+    )
+
+
+def _changed(obj, *attrs: str) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attrs)
+
+
+def _previous(obj, attr: str) -> list:
+    return [v for v in inspect(obj).attrs[attr].history.deleted if v is not None]
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_request_visibility(session: Session, flush_context) -> None:
+    requests: set[str] = set()
+    executors: set[int] = set()
+    gone_requests: set[str] = set()
+    gone_users: set[int] = set()
+
+    for obj in session.new:
+        if isinstance(obj, RequestAssignment):
+            requests.add(obj.request_number)
+        elif isinstance(obj, Request) and obj.executor_id is not None:
+            requests.add(obj.request_number)
+        elif isinstance(obj, Shift) and obj.user_id is not None:
+            executors.add(obj.user_id)
+    for obj in session.dirty:
+        if isinstance(obj, RequestAssignment):
+            requests.add(obj.request_number)
+            requests.update(_previous(obj, "request_number"))
+        elif isinstance(obj, Request) and _changed(obj, "executor_id"):
+            requests.add(obj.request_number)
+        elif isinstance(obj, Shift) and _changed(obj, "status", "user_id"):
+            executors.update(_previous(obj, "user_id"))
+            if obj.user_id is not None:
+                executors.add(obj.user_id)
+        elif isinstance(obj, User) and _changed(obj, "specialization"):
+            executors.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, RequestAssignment):
+            requests.add(obj.request_number)
+        elif isinstance(obj, Request):
+            gone_requests.add(obj.request_number)
+        elif isinstance(obj, Shift) and obj.user_id is not None:
+            executors.add(obj.user_id)
+        elif isinstance(obj, User):
+            gone_users.add(obj.id)
+
+    if not (requests or executors or gone_requests or gone_users):
+        return
+
+    # Ленивый импорт: сервис импортирует модели на уровне модуля.
+    from uk_management_bot.services import request_visibility
+
+    connection = session.connection()
+    table = RequestVisibility.__table__
+    if gone_requests:
+        connection.execute(delete(table).where(table.c.request_number.in_(gone_requests)))
+    if gone_users:
+        connection.execute(delete(table).where(table.c.executor_id.in_(gone_users)))
+    request_visibility.refresh_requests(connection, requests - gone_requests)
+    request_visibility.refresh_group_visibility(connection, executors - gone_users)
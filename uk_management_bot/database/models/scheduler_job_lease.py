@@ -0,0 +1,26 @@
+"""
+Lease на задачу планировщика — кто из реплик исполняет job сейчас
+
+Одна строка на ``job_id``. Реплика, чей условный UPDATE прошёл (lease
+свободен и с последнего завершения прошло не меньше ``min_gap``), исполняет
+тик; остальные его пропускают. ``expires_at`` продлевается heartbeat'ом, пока
+job идёт — упавший воркер не держит задачу дольше TTL. Логика —
+``services/scheduler_leases.py``.
+"""
+from sqlalchemy import Column, DateTime, String
+
+from uk_management_bot.database.session import Base
+
+
+class SchedulerJobLease(Base):
+    __tablename__ = "scheduler_job_leases"
+
+    job_id = Column(String(64), primary_key=True)
+    # Последний владелец (SCHEDULER_WORKER_ID) — и после release, для диагностики.
+    owner = Column(String(128), nullable=True)
+    acquired_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<SchedulerJobLease(job_id={self.job_id}, owner={self.owner}, expires_at={self.expires_at})>"
@@ -0,0 +1,63 @@
+"""
+Индекс ролей пользователя (user_roles) — нормализованная копия ``User.roles``
+
+``User.roles`` — JSON-массив в TEXT-колонке; фильтр «у пользователя есть
+роль X» был ``LIKE '%"X"%'``, который не использует индекс: каждый поиск
+менеджеров/исполнителей для уведомлений и назначений — seq scan по users.
+Здесь та же информация построчно ``(user_id, role)`` с индексом по роли
+(``auth_helpers.legacy_role_filter`` ходит сюда).
+
+Источник истины остаётся ``User.roles``: таблицу синхронизирует
+``after_flush``-хук ниже — любой ORM-flush, где у пользователя изменились
+``roles`` (или пользователь создан/удалён), переписывает его строки в той же
+транзакции. Массовые ``update(User)`` и сырой SQL мимо ORM хук не видят —
+для них сверка ``services/user_role_index.py``
+(``scripts/check_user_roles.py``).
+"""
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, delete, event, inspect, insert
+from sqlalchemy.orm import Session
+
+from uk_management_bot.database.session import Base
+from uk_management_bot.database.models.user import User
+
+
+class UserRole(Base):
+    __tablename__ = "user_roles"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    role = Column(String(50), primary_key=True)
+
+    __table_args__ = (
+        # PK (user_id, role) обслуживает «роли пользователя»; этот — «пользователи с ролью».
+        Index("ix_user_roles_role_user_id", "role", "user_id"),
+    )
+
+
+def role_rows(user_id: int, roles_value) -> list[dict]:
+    """Строки user_roles для значения ``User.roles`` (JSON или legacy CSV)."""
+    # Ленивый импорт: auth_helpers импортирует модели на уровне модуля.
+    from uk_management_bot.utils.auth_helpers import parse_roles_safe
+
+    return [{"user_id": user_id, "role": role} for role in sorted(set(parse_roles_safe(roles_value)))]
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_user_roles(session: Session, flush_context) -> None:
+    # В after_flush new/dirty/deleted и история атрибутов ещё до-flush'евые,
+    # а id новых пользователей уже выданы.
+    created = [obj for obj in session.new if isinstance(obj, User)]
+    updated = [
+        obj for obj in session.dirty
+        if isinstance(obj, User) and inspect(obj).attrs.roles.history.has_changes()
+    ]
+    removed = [obj.id for obj in session.deleted if isinstance(obj, User)]
+    if not (created or updated or removed):
+        return
+
+    connection = session.connection()
+    stale_ids = [user.id for user in updated] + removed
+    if stale_ids:
+        connection.execute(delete(UserRole.__table__).where(UserRole.user_id.in_(stale_ids)))
+    rows = [row for user in created + updated for row in role_rows(user.id, user.roles)]
+    if rows:
+        connection.execute(insert(UserRole.__table__), rows)
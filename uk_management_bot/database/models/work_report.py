@@ -34,6 +34,8 @@ class WorkReport(Base):
             name="ck_work_reports_status"),
         CheckConstraint("source IN ('auto','manual')", name="ck_work_reports_source"),
         Index("ix_work_reports_status_published_at", "status", "published_at"),
+        # Захват автопубликации и возраст очереди (миграция 024).
+        Index("ix_work_reports_status_created_at", "status", "created_at"),
     )
     id = Column(Integer, primary_key=True)
 
@@ -65,5 +67,13 @@ class WorkReport(Base):
     state_changed_at = Column(DateTime(timezone=True), nullable=True)   # для отлова зависшего publishing
     moderated_by    = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
 
+    # Конвейер автопубликации (services/work_reports/autopublish.py, миграция 024).
+    # claimed_until — lease захвата, после ошибки — backoff до повторной попытки;
+    # ready_at — медиа подобраны, следующий тик продолжает сразу с публикации;
+    # attempts — подряд неудачных попыток.
+    autopublish_claimed_until = Column(DateTime(timezone=True), nullable=True)
+    autopublish_ready_at      = Column(DateTime(timezone=True), nullable=True)
+    autopublish_attempts      = Column(Integer, nullable=False, default=0, server_default="0")
+
     def __repr__(self):
         return f"<WorkReport(id={self.id}, request_number={self.request_number}, status={self.status})>"
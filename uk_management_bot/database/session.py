@@ -1,4 +1,5 @@
 import asyncio
+import os
 from contextlib import contextmanager
 from typing import Callable, Optional, TypeVar
 
@@ -12,12 +13,17 @@ from uk_management_bot.config.settings import settings
 # SYNC DATABASE ENGINE (legacy, постепенно мигрируем)
 # ==============================================
 
+# Размер пулов на процесс. Дефолт — бот/API; воркер планировщика
+# (scheduler_main) получает свой пул по числу потоков SCHEDULER_THREADS.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
 # Создаем синхронный движок базы данных
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    pool_size=10,
-    max_overflow=10,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
     pool_timeout=60,
     pool_recycle=3600,  # Переиспользование соединений каждый час
     pool_pre_ping=True,  # Проверка соединений перед использованием
@@ -39,8 +45,8 @@ if "postgresql" in settings.DATABASE_URL:
     async_engine = create_async_engine(
         async_database_url,
         echo=settings.DEBUG,
-        pool_size=10,
-        max_overflow=10,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
         pool_timeout=60,
         pool_recycle=3600,
         pool_pre_ping=True,
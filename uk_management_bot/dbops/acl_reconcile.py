@@ -12,8 +12,10 @@ default-privilege, а не до него):
    получила бы INSERT/UPDATE/DELETE наравне с обычной прикладной таблицей, и
    runtime (`uk_bot_runtime`/`uk_api_runtime`) мог бы подделать записанную
    ревизию, обойдя ``db_preflight``.
-2. Access-domain (immut+other, 22 таблицы: 20 из ``0001_prc05_initial_baseline.py``
-   + 2 parking из ``0007_parking_spots_acl.py``)
+2. Access-domain (immut+other, 24 таблицы: 20 из ``0001_prc05_initial_baseline.py``
+   + 2 parking из ``0007_parking_spots_acl.py`` + ``access_review_heads`` из
+   ``0016_access_review_heads.py`` + ``access_retention_watermarks`` из
+   ``0017_access_retention_watermarks.py``)
    — явный REVOKE блáнкет-DML у ``uk_app_rw``. На проде (существующая БД)
    default privileges retroactively эти таблицы не задевают (они старше
    ownership-transfer), поэтому там это no-op; на fresh-install без этого шага
@@ -26,7 +28,8 @@ default-privilege, а не до него):
    же, как таблицы, и без явного revoke ``uk_app_rw`` сохраняла бы
    ``nextval()``/``currval()``/``last_value`` на audit-sequences — утечка
    объёма событий в обход table-level ACL, независимо от того, что сам
-   table-level REVOKE уже применён.
+   table-level REVOKE уже применён. И партиции этих таблиц (``pg_inherits``,
+   миграция 018) — по той же причине.
 
 Вызывается только из `entrypoint-migrate.sh`, ПОСЛЕ `alembic upgrade head`.
 Подключается тем же credential'ом, что и Alembic (`uk_migrator`) — поэтому,
@@ -60,9 +63,10 @@ def _validate_identifier(name: str) -> str:
 # Там, где роль обязана быть (REQUIRE_MIGRATION_OWNER=1 — прод migrate-job,
 # новый PostgreSQL least-privilege CI job), отсутствие роли — явная ошибка.
 
-# Те же 22 access-domain таблицы (immut+other), что в
-# alembic/versions/0001_prc05_initial_baseline.py:1298-1337 и
-# alembic/versions/0007_parking_spots_acl.py — только имена, без разбивки на
+# Те же 24 access-domain таблицы (immut+other), что в
+# alembic/versions/0001_prc05_initial_baseline.py:1298-1337,
+# alembic/versions/0007_parking_spots_acl.py, 0016_access_review_heads.py и
+# 0017_access_retention_watermarks.py — только имена, без разбивки на
 # immut/other: обеим подгруппам одинаково не место в блáнкет-гранте uk_app_rw,
 # у них своя ACL через access_app_rw.
 # Список сверяется с `__tablename__` моделей access_control/ гейтом
@@ -75,6 +79,7 @@ ACCESS_DOMAIN_TABLES = [
     "access_rules", "access_passes", "resident_access_requests", "camera_events",
     "controller_sync_events", "barrier_commands", "access_entry_confirmations",
     "vehicle_presence_sessions", "parking_spots", "parking_spot_assignments",
+    "access_review_heads", "access_retention_watermarks",
 ]
 
 # Находит backing-sequences access-domain таблиц через pg_depend, а не по
@@ -94,6 +99,18 @@ _SEQUENCES_FOR_TABLES_SQL = """
     WHERE t.relname = ANY(:tables)
 """
 
+# Партиции access-domain таблиц (миграция 018: ``access_events_pYYYYMM``,
+# ``_legacy``, ``_default``): обычные relkind 'r', создаются и позже, функцией
+# ``access_control_ensure_partitions`` — default privilege раздал бы их
+# ``uk_app_rw`` так же, как таблицы. Ищутся через pg_inherits, не по имени.
+_PARTITIONS_FOR_TABLES_SQL = """
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class p ON p.oid = i.inhparent
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE p.relname = ANY(:tables)
+"""
+
 
 def main() -> None:
     database_url = os.getenv("DATABASE_URL")
@@ -157,6 +174,13 @@ def main() -> None:
                 safe_seq = _validate_identifier(seq_name)
                 conn.execute(text(f'REVOKE ALL ON "{safe_seq}" FROM uk_app_rw'))
 
+            part_rows = conn.execute(
+                text(_PARTITIONS_FOR_TABLES_SQL), {"tables": ACCESS_DOMAIN_TABLES}
+            ).fetchall()
+            for (part_name,) in part_rows:
+                safe_part = _validate_identifier(part_name)
+                conn.execute(text(f'REVOKE ALL ON "{safe_part}" FROM uk_app_rw'))
+
             conn.commit()
             print(
                 "acl_reconcile: alembic_version carve-out + access-domain "
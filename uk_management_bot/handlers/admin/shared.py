@@ -134,8 +134,8 @@ async def auto_assign_request_by_category(request: Request, db: Session, manager
             logger.info(f"[AUTO_ASSIGN] Заявка {request.request_number} уже назначена группе {specialization}, пропускаем")
             return ASSIGN_ALREADY_GROUP
 
-        approved_users = svc.list_approved_users()
-        logger.info(f"[AUTO_ASSIGN] Approved-пользователей всего: {len(approved_users)}")
+        approved_users = svc.list_approved_users(ROLE_EXECUTOR)
+        logger.info(f"[AUTO_ASSIGN] Approved-исполнителей всего: {len(approved_users)}")
 
         # BUG-166: общий предикат. `auto_manager/rule_engine.select_executor`
         # построен как зеркало этой функции — оставить здесь голое `in` значило
@@ -24,6 +24,7 @@ import logging
 from uk_management_bot.database.models.request import Request
 from uk_management_bot.database.models.user import User
 from uk_management_bot.database.session import run_db
+from uk_management_bot.utils.auth_helpers import legacy_role_filter
 from uk_management_bot.utils.helpers import get_text, get_user_language
 from uk_management_bot.utils.datetime_utils import utc_now
 from uk_management_bot.utils.business_time import fmt_datetime
@@ -145,7 +146,7 @@ def _apply_reply(db, request_number: str, telegram_id: int, reply_text: str, lan
     notices: list[_ManagerNotice] = []
     try:
         managers = db.query(User).filter(
-            User.roles.contains('manager') | User.roles.contains('admin')
+            legacy_role_filter('manager', 'admin')
         ).all()
 
         for manager in managers:
@@ -51,6 +51,7 @@ from uk_management_bot.utils.workflow_predicates import (
 )
 
 from uk_management_bot.utils.button_texts import get_acceptance_texts
+from uk_management_bot.utils.auth_helpers import legacy_role_filter
 from uk_management_bot.utils.helpers import get_text
 
 import logging
@@ -211,7 +212,7 @@ def _collect_return_notifications(db, request_number: str, outcome, return_reaso
     manager_text = None
     if request is not None:
         managers = db.query(User).filter(
-            User.roles.contains('"manager"'),
+            legacy_role_filter("manager"),
             User.status == "approved"
         ).all()
         manager_ids = [m.telegram_id for m in managers if m.telegram_id]
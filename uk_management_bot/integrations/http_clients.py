@@ -0,0 +1,167 @@
+"""Общие HTTP-клиенты к апстримам: пул соединений и keep-alive на процесс.
+
+Раньше прокси медиа, сверка с InfraSafe и доставка вебхуков создавали
+``httpx.AsyncClient`` на каждый вызов (или батч) — то есть новое TCP+TLS
+соединение на каждую картинку, страницу сверки и вебхук. Здесь — по одному
+долгоживущему клиенту на апстрим:
+
+* **лимиты пула и keep-alive** — ``HTTP_POOL_MAX_CONNECTIONS``,
+  ``HTTP_POOL_MAX_KEEPALIVE``, ``HTTP_POOL_KEEPALIVE_EXPIRY`` (общие) и
+  ``HTTP_<UPSTREAM>_MAX_CONNECTIONS`` (на апстрим);
+* **HTTP/2** — ``HTTP_CLIENT_HTTP2=true``; нужен пакет ``h2``, без него
+  клиент честно остаётся на HTTP/1.1 с предупреждением в лог;
+* **таймаут апстрима** — дефолт клиента; вызов с иным бюджетом передаёт
+  ``timeout=`` в сам запрос (httpx это позволяет), а не заводит свой клиент;
+* **метрики** — запросы, новые соединения (доля переиспользования =
+  1 − new/requests) и время до заголовков ответа; ``stats()`` → ``/metrics``.
+
+Клиенты привязаны к event loop'у, в котором созданы (пул httpcore держит
+сокеты этого loop'а): вызов из другого loop'а получает свой набор. Закрытие —
+``close_http_clients()`` в lifespan API и в shutdown бота.
+"""
+import asyncio
+import importlib.util
+import logging
+import time
+from collections import Counter
+
+import httpx
+
+from uk_management_bot.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_MEDIA = "media"
+UPSTREAM_INFRASAFE = "infrasafe"
+UPSTREAM_INFRASAFE_WEBHOOK = "infrasafe_webhook"
+
+HTTP_POOL_MAX_CONNECTIONS = settings.HTTP_POOL_MAX_CONNECTIONS
+HTTP_POOL_MAX_KEEPALIVE = settings.HTTP_POOL_MAX_KEEPALIVE
+HTTP_POOL_KEEPALIVE_EXPIRY = settings.HTTP_POOL_KEEPALIVE_EXPIRY
+HTTP_POOL_CONNECT_TIMEOUT = settings.HTTP_POOL_CONNECT_TIMEOUT
+HTTP_CLIENT_HTTP2 = settings.HTTP_CLIENT_HTTP2
+
+# Таймаут по умолчанию (секунды) — общий бюджет запроса к апстриму.
+_UPSTREAM_TIMEOUTS = {
+    UPSTREAM_MEDIA: float(settings.MEDIA_SERVICE_TIMEOUT),
+    UPSTREAM_INFRASAFE: 30.0,
+    UPSTREAM_INFRASAFE_WEBHOOK: float(settings.INFRASAFE_WEBHOOK_TIMEOUT),
+}
+
+_stats: dict[str, Counter] = {}
+_latency_max: dict[str, float] = {}
+_http2_warned = False
+
+
+def _http2_enabled() -> bool:
+    global _http2_warned
+    if not HTTP_CLIENT_HTTP2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        if not _http2_warned:
+            logger.warning("HTTP_CLIENT_HTTP2=true, but package 'h2' is not installed — using HTTP/1.1")
+            _http2_warned = True
+        return False
+    return True
+
+
+def _max_connections(upstream: str) -> int:
+    return settings.HTTP_UPSTREAM_MAX_CONNECTIONS.get(upstream, HTTP_POOL_MAX_CONNECTIONS)
+
+
+def _hooks(upstream: str) -> dict:
+    counters = _stats.setdefault(upstream, Counter())
+
+    async def on_request(request: httpx.Request) -> None:
+        # Трейс httpcore — единственное место, где видно, открылось ли новое
+        # соединение или запрос ушёл по живому из пула.
+        async def trace(event: str, info: dict) -> None:
+            if event.endswith("connect_tcp.started"):
+                counters["new_connections"] += 1
+
+        request.extensions["trace"] = trace
+        request.extensions["uk_started"] = time.perf_counter()
+
+    async def on_response(response: httpx.Response) -> None:
+        started = response.request.extensions.get("uk_started")
+        counters["requests"] += 1
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            counters["latency_seconds_sum"] += elapsed
+            _latency_max[upstream] = max(_latency_max.get(upstream, 0.0), elapsed)
+        if response.status_code >= 500:
+            counters["server_errors"] += 1
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def client_kwargs(upstream: str, **overrides) -> dict:
+    """Параметры ``httpx.AsyncClient`` для апстрима (пул, таймауты, хуки метрик).
+
+    Для клиентов со своим жизненным циклом (``MediaServiceClient`` бота) —
+    те же лимиты и метрики, что у реестра.
+    """
+    timeout = overrides.pop("timeout", _UPSTREAM_TIMEOUTS.get(upstream, 30.0))
+    kwargs = {
+        "timeout": httpx.Timeout(timeout, connect=min(HTTP_POOL_CONNECT_TIMEOUT, timeout)),
+        "limits": httpx.Limits(
+            max_connections=_max_connections(upstream),
+            max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_POOL_KEEPALIVE_EXPIRY,
+        ),
+        "event_hooks": _hooks(upstream),
+    }
+    if _http2_enabled():
+        kwargs["http2"] = True
+    kwargs.update(overrides)
+    return kwargs
+
+
+# loop → {upstream: client}. Клиенты закрытых loop'ов (тесты, asyncio.run в
+# потоках) вычищаются при следующем обращении без ``aclose()``: корутине
+# закрытия нужен loop-владелец сокетов, а он уже закрыт. Запросов по ним быть
+# не может — сокеты закрывают транспорты при сборке мусора, после того как
+# реестр отпустил ссылку (долгоживущие loop'ы API/бота закрывают свои клиенты
+# явно через ``close_http_clients()``).
+_clients: "dict[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = {}
+
+
+def get_http_client(upstream: str) -> httpx.AsyncClient:
+    """Общий клиент апстрима для текущего event loop'а. НЕ закрывать у себя."""
+    loop = asyncio.get_running_loop()
+    per_loop = _clients.get(loop)
+    if per_loop is None:
+        for stale in [known for known in _clients if known.is_closed()]:
+            del _clients[stale]
+        per_loop = _clients[loop] = {}
+    client = per_loop.get(upstream)
+    if client is None or getattr(client, "is_closed", False):
+        client = httpx.AsyncClient(**client_kwargs(upstream))
+        per_loop[upstream] = client
+    return client
+
+
+async def close_http_clients() -> None:
+    """Закрыть клиенты текущего loop'а (lifespan API / shutdown бота)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    for upstream, client in (_clients.pop(loop, None) or {}).items():
+        try:
+            await client.aclose()
+        except Exception:
+            logger.exception("Error closing %s HTTP client", upstream)
+
+
+def reset_http_clients() -> None:
+    """Забыть все клиенты без закрытия (тесты подменяют ``httpx.AsyncClient``)."""
+    _clients.clear()
+
+
+def stats() -> dict[str, dict]:
+    """Счётчики по апстримам этого процесса с его старта."""
+    out = {}
+    for upstream, counters in _stats.items():
+        out[upstream] = {**counters, "latency_seconds_max": _latency_max.get(upstream, 0.0)}
+    return out
@@ -9,6 +9,7 @@ from typing import List, Optional, Dict, Any, BinaryIO, Union
 import httpx
 from pathlib import Path
 
+from uk_management_bot.integrations.http_clients import UPSTREAM_MEDIA, client_kwargs
 from uk_management_bot.integrations.http_retry import get_with_retries
 
 logger = logging.getLogger(__name__)
@@ -33,11 +34,14 @@ class MediaServiceClient:
         headers = {}
         if api_key:
             headers["X-API-Key"] = api_key
-        self.client = httpx.AsyncClient(
+        # Лимиты пула, keep-alive и метрики — общие для апстрима media
+        # (integrations/http_clients.py); жизненный цикл свой (close()).
+        self.client = httpx.AsyncClient(**client_kwargs(
+            UPSTREAM_MEDIA,
             timeout=timeout,
             base_url=f"{self.base_url}/api/v1",
             headers=headers,
-        )
+        ))
 
     async def upload_request_media(
         self,
@@ -72,10 +72,13 @@ from uk_management_bot.utils.structured_logger import setup_structured_logging,
 from uk_management_bot.utils.health_server import start_health_server, stop_health_server
 
 # Планировщик смен
-from uk_management_bot.utils.shift_scheduler import start_scheduler, stop_scheduler, get_scheduler_status
+from uk_management_bot.utils.shift_scheduler import (
+    SCHEDULER_IN_BOT, start_scheduler, stop_scheduler, get_scheduler_status,
+)
 
 # Интеграции
 from uk_management_bot.integrations import get_media_client, close_media_client
+from uk_management_bot.integrations.http_clients import close_http_clients
 from uk_management_bot.utils.business_time import fmt_date, fmt_time_seconds
 from uk_management_bot.utils.datetime_utils import utc_now
 
@@ -133,7 +136,13 @@ async def initialize_scheduler(bot: Bot):
     COD-02: НЕ создаём здесь долгоживущий ``NotificationService`` с сессией,
     которую тут же закрываем — job'ы строят свой ``NotificationService`` на
     свежей сессии (см. ShiftScheduler._notifier). Передаём только бот.
+
+    С ``SCHEDULER_IN_BOT=false`` (прод-compose) задачи ведёт отдельный воркер
+    ``scheduler_main`` — бот только обрабатывает апдейты.
     """
+    if not SCHEDULER_IN_BOT:
+        logger.info("Планировщик смен вынесен в отдельный воркер (SCHEDULER_IN_BOT=false)")
+        return
     try:
         # Запускаем планировщик (уведомления — через единый диспетчерский бот)
         await start_scheduler(bot=bot)
@@ -170,7 +179,12 @@ async def send_startup_notification(bot: Bot):
     try:
         # Получаем статус планировщика
         scheduler_status = await get_scheduler_status()
-        scheduler_info = f"🕐 Планировщик: {scheduler_status['jobs_count']} задач" if scheduler_status['is_running'] else "⏸️ Планировщик: Остановлен"
+        if not SCHEDULER_IN_BOT:
+            scheduler_info = "🕐 Планировщик: отдельный воркер"
+        elif scheduler_status['is_running']:
+            scheduler_info = f"🕐 Планировщик: {scheduler_status['jobs_count']} задач"
+        else:
+            scheduler_info = "⏸️ Планировщик: Остановлен"
 
         # Проверяем статус медиа-сервиса
         media_status = "✅ Активен" if settings.MEDIA_SERVICE_ENABLED else "⏸️ Отключен"
@@ -492,6 +506,10 @@ async def main():
         except Exception as e:
             logger.error(f"Ошибка закрытия Media Service клиента: {e}")
 
+        # Закрываем общие HTTP-клиенты апстримов (ошибки закрытия логирует сам
+        # close_http_clients, наружу не бросает)
+        await close_http_clients()
+
         # Останавливаем health сервер
         stop_health_server()
         await bot.session.close()
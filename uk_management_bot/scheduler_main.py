@@ -0,0 +1,77 @@
+"""Entrypoint ВЫДЕЛЕННОГО воркера планировщика (utils/shift_scheduler.py).
+
+Фоновые задачи смен, автоназначения, автоменеджера и отчётов раньше жили в
+процессе бота: их DB-фазы делили с хендлерами пул потоков и пул соединений,
+и тяжёлый тик был виден как задержка ответов бота. Здесь они исполняются
+отдельным процессом:
+
+  * свой пул потоков (``SCHEDULER_THREADS``) и свой пул соединений — размер
+    задаёт compose через ``DB_POOL_SIZE``/``DB_MAX_OVERFLOW``;
+  * реплик может быть несколько: тик каждой задачи достаётся одной из них по
+    lease'у (services/scheduler_leases.py);
+  * polling'а нет — уведомления уходят send-only ботом на ОСНОВНОМ токене
+    (прецедент group_intake_main: конфликтует только getUpdates);
+  * health-сервер на ``SCHEDULER_HEALTH_PORT`` — /health для HEALTHCHECK
+    образа и /metrics с гистограммами длительности job'ов.
+
+Бот при этом запускается с ``SCHEDULER_IN_BOT=false``.
+"""
+import asyncio
+import os
+import signal
+
+from uk_management_bot.config.settings import settings
+from uk_management_bot.utils.structured_logger import setup_structured_logging, get_logger
+from uk_management_bot.utils.telegram_client import build_bot
+
+setup_structured_logging()
+logger = get_logger(__name__, component="scheduler_main")
+
+SCHEDULER_HEALTH_PORT = int(os.getenv("SCHEDULER_HEALTH_PORT", "8000"))
+
+
+async def main() -> None:
+    """Запуск планировщика до SIGTERM/SIGINT."""
+    import uk_management_bot.database.models  # noqa: F401 — регистрация моделей
+
+    from uk_management_bot.database.session import async_engine, engine
+    from uk_management_bot.integrations import close_media_client
+    from uk_management_bot.integrations.http_clients import close_http_clients
+    from uk_management_bot.services.notification_service import set_shared_bot
+    from uk_management_bot.utils.health_server import start_health_server, stop_health_server
+    from uk_management_bot.utils.shift_scheduler import (
+        SCHEDULER_THREADS, get_scheduler_status, start_scheduler, stop_scheduler,
+    )
+
+    sender = build_bot(settings.BOT_TOKEN)
+    set_shared_bot(sender)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    start_health_server(host='0.0.0.0', port=SCHEDULER_HEALTH_PORT)
+    try:
+        await start_scheduler(bot=sender)
+        status = await get_scheduler_status()
+        logger.info(
+            f"Воркер планировщика {status['worker_id']}: {status['jobs_count']} задач, "
+            f"потоков {SCHEDULER_THREADS}"
+        )
+        await stop.wait()
+    finally:
+        await stop_scheduler()
+        await close_media_client()
+        await close_http_clients()
+        stop_health_server()
+        set_shared_bot(None)
+        await sender.session.close()
+        engine.dispose()
+        if async_engine is not None:
+            await async_engine.dispose()
+        logger.info("Воркер планировщика остановлен")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
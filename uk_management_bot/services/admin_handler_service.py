@@ -29,13 +29,14 @@ from __future__ import annotations
 import logging
 from typing import List, Optional
 
-from sqlalchemy import String, or_
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from uk_management_bot.database.models.request import Request
 from uk_management_bot.database.models.request_assignment import RequestAssignment
 from uk_management_bot.database.models.shift import Shift
 from uk_management_bot.database.models.user import User
+from uk_management_bot.utils.auth_helpers import legacy_role_filter
 from uk_management_bot.utils.constants import (
     REQUEST_STATUS_APPROVED,
     REQUEST_STATUS_CANCELLED,
@@ -145,19 +146,20 @@ class AdminHandlerService:
             .first()
         )
 
-    def list_approved_users(self) -> List[User]:
-        return self.db.query(User).filter(User.status == "approved").all()
+    def list_approved_users(self, *roles: str) -> List[User]:
+        """Approved-пользователи; с ``roles`` — только имеющие одну из ролей.
+
+        Фильтр по ролям — индекс user_roles (``legacy_role_filter``), а не
+        полная выборка approved с разбором ``roles`` в Python.
+        """
+        query = self.db.query(User).filter(User.status == "approved")
+        if roles:
+            query = query.filter(legacy_role_filter(*roles))
+        return query.order_by(User.id).all()
 
     def list_approved_executors(self) -> List[User]:
-        """Approved-пользователи с ролью executor (JSONB-contains по roles)."""
-        return (
-            self.db.query(User)
-            .filter(
-                User.roles.cast(String).contains('"executor"'),
-                User.status == "approved",
-            )
-            .all()
-        )
+        """Approved-пользователи с ролью executor."""
+        return self.list_approved_users("executor")
 
     # ── Списки заявок (manager-view) ─────────────────────────────────────────
 
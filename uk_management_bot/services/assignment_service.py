@@ -22,6 +22,7 @@ from uk_management_bot.utils.constants import (
     AUDIT_ACTION_REQUEST_ASSIGNED,
 )
 from uk_management_bot.services.notification_service import NotificationService
+from uk_management_bot.utils.auth_helpers import legacy_role_filter
 # AUD5-DEAD-4: импорт был под `try/except ImportError` с флагом
 # ADVANCED_ASSIGNMENT_AVAILABLE. Модуль свой, его зависимости — stdlib,
 # SQLAlchemy и модели проекта: при их отсутствии не поднимется вообще ничего.
@@ -312,7 +313,7 @@ class AssignmentService:
         # Получаем пользователей с ролью исполнителя и нужной специализацией
         users = self.db.query(User).filter(
             and_(
-                User.roles.contains('["executor"]'),  # JSON содержит роль executor
+                legacy_role_filter('executor'),  # роль executor (индекс user_roles)
                 User.specialization.contains(specialization),  # JSON содержит специализацию
                 User.status == "approved"  # Пользователь одобрен
             )
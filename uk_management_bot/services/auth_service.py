@@ -594,14 +594,11 @@ class AuthService:
         in the JSON array stored in User.roles TEXT column.
         """
         from sqlalchemy import or_
-        # CODE-07: матчим точный элемент JSON-массива — "role" в кавычках
-        # (ловит и ["role"], и [..., "role", ...], не ловит подстроки).
-        exact_match = f'"{role}"'
+        # CODE-07: точный элемент набора ролей (индекс user_roles, без подстрок).
         return self.db.query(User).filter(
             User.status == "approved",
             or_(
                 User.active_role == role,
-                User.roles.contains(exact_match),
                 legacy_role_filter(role),
             )
         ).all()
@@ -0,0 +1,126 @@
+"""Общий срез диспетчерского тика — один на все политики назначения.
+
+Кто-кому-что раньше решали три независимые задачи планировщика: тик
+авто-менеджера (2 мин), автоназначение заявок исполнителям смен (10 мин) и
+синхронизация назначений со сменами (30 мин). Каждая сама перечитывала
+открытые заявки, смены, нагрузку и approved-пользователей, а путь
+уведомления менеджеров вдобавок тянул `list_approved_users()` отдельно.
+Теперь `AutoManagerOrchestrator.run_once` — единственный тик планировщика
+назначений: срез строится здесь постоянным числом запросов, все политики
+читают его, а записи тика уходят одной пачкой `run_commands_bulk`.
+
+Политики поверх среза:
+
+* очереди авто-менеджера (main/residual) — `orchestrator._process_queue`;
+* «автоназначение исполнителям смен» — её живая часть и есть residual-очередь
+  («Новая» без назначения); прежний движок фильтровал `status == 'new'` при
+  каноне «Новая» и не назначал ничего;
+* «синхронизация со сменами» — `stale_assignments`: активное
+  индивидуальное назначение открытой заявки дня у исполнителя без смены в
+  этот день. Канонического системного переназначения из «В работе» нет
+  (SYSTEM_DISPATCH_ASSIGN — только из «Новой»), поэтому срез такие заявки
+  не переписывает, а отдаёт менеджерам; прежний путь отменял строку
+  RequestAssignment мимо workflow и оставлял `Request.executor_id` висеть.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from uk_management_bot.database.models.request import Request
+from uk_management_bot.database.models.request_assignment import RequestAssignment
+from uk_management_bot.database.models.shift import Shift
+from uk_management_bot.services.admin_handler_service import AdminHandlerService
+from uk_management_bot.services.auto_manager.rule_engine import (
+    DutySnapshot,
+    build_duty_snapshot,
+)
+from uk_management_bot.utils.auth_helpers import get_user_roles
+from uk_management_bot.utils.business_time import business_day_window, business_today
+from uk_management_bot.utils.constants import ROLE_EXECUTOR, ROLE_MANAGER
+from uk_management_bot.utils.workflow_predicates import active_status_clause
+
+
+@dataclass(frozen=True)
+class StaleAssignment:
+    """Заявка, назначенная исполнителю, у которого сегодня нет смены."""
+
+    request_number: str
+    executor_id: int
+
+
+@dataclass
+class DispatchSnapshot:
+    """Срез тика: дежурство, получатели-менеджеры, назначения вне смены."""
+
+    duty: DutySnapshot
+    managers: list[tuple[int, str]] = field(default_factory=list)  # (telegram_id, language)
+    stale_assignments: list[StaleAssignment] = field(default_factory=list)
+
+
+@dataclass
+class DispatchReport:
+    """Итог тика для планировщика (статистика и сводка менеджерам)."""
+
+    assigned: int = 0
+    escalated: int = 0
+    # Только впервые замеченные за TTL дедупа — повторно менеджерам не шлём.
+    stale_assignments: list[StaleAssignment] = field(default_factory=list)
+
+
+def find_stale_assignments(db: Session, now: datetime) -> list[StaleAssignment]:
+    """Один запрос: активные индивидуальные назначения открытых заявок бизнес-
+    дня, чей исполнитель не стоит в этот день ни в одной planned/active смене.
+
+    Окно — только сегодня: прежняя задача проверяла ещё и завтра, но заявок,
+    созданных завтра, не бывает. Финализированные заявки не в счёт —
+    переназначать там нечего.
+    """
+    day_start, day_end = business_day_window(business_today(now))
+    rows = (
+        db.query(RequestAssignment.request_number, RequestAssignment.executor_id)
+        .join(Request, RequestAssignment.request_number == Request.request_number)
+        .filter(
+            RequestAssignment.status == "active",
+            RequestAssignment.executor_id.isnot(None),
+            active_status_clause(),
+            Request.created_at >= day_start,
+            Request.created_at < day_end,
+            ~RequestAssignment.executor_id.in_(
+                db.query(Shift.user_id).filter(
+                    Shift.user_id.isnot(None),
+                    Shift.start_time >= day_start,
+                    Shift.start_time < day_end,
+                    Shift.status.in_(("planned", "active")),
+                )
+            ),
+        )
+        .order_by(RequestAssignment.request_number)
+        .all()
+    )
+    return [StaleAssignment(number, executor_id) for number, executor_id in rows]
+
+
+def build_dispatch_snapshot(db: Session, now: datetime) -> DispatchSnapshot:
+    """Срез тика за четыре запроса, независимо от длины очередей.
+
+    approved-пользователи с ролью executor ИЛИ manager берутся одной выборкой
+    и делятся в Python — раньше менеджеров дочитывал путь уведомления; смены
+    и нагрузка — `build_duty_snapshot` поверх уже загруженных исполнителей.
+    """
+    users = AdminHandlerService(db).list_approved_users(ROLE_EXECUTOR, ROLE_MANAGER)
+    executors = []
+    managers = []
+    for user in users:
+        roles = get_user_roles(user)
+        if ROLE_EXECUTOR in roles:
+            executors.append(user)
+        if ROLE_MANAGER in roles and user.telegram_id:
+            managers.append((user.telegram_id, user.language or "ru"))
+    return DispatchSnapshot(
+        duty=build_duty_snapshot(db, now, approved_users=executors),
+        managers=managers,
+        stale_assignments=find_stale_assignments(db, now),
+    )
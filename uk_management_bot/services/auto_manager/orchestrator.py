@@ -1,9 +1,14 @@
-"""Auto-manager orchestrator — авто-назначение ночных заявок дежурным.
+"""Auto-manager orchestrator — диспетчерский тик: авто-назначение дежурным.
 
 `AutoManagerOrchestrator` — один экземпляр на процесс (создаётся в
-`ShiftScheduler.__init__`, PR-задача 6 — здесь НЕ подключается): держит
-между tick-ами анти-starvation keyset-курсоры по двум очередям + cooldown
-(`_retry_after`) + дедуп уведомлений менеджерам (`_notified`).
+`ShiftScheduler.__init__`): держит между tick-ами анти-starvation
+keyset-курсоры по двум очередям + cooldown (`_retry_after`) + дедуп
+уведомлений менеджерам (`_notified`, `_stale_notified`).
+
+Единственная задача планировщика, решающая «кто берёт заявку»: срез тика
+(`dispatch_planner.build_dispatch_snapshot`) общий для обеих очередей и для
+проверки назначений вне смены, все записи тика — одна пачка
+`run_commands_bulk` (см. docstring dispatch_planner.py).
 
 Две очереди, свой курсор у каждой:
   * "main" — status=«В работе», executor_id IS NULL, есть активное
@@ -25,8 +30,9 @@
     Фильтр по Request.assignment_type вместо джойна RequestAssignment
     безопасен именно потому, что ОБА писателя держат инвариант, а не потому,
     что писатель один. Есть один пограничный случай: shift_assignment_service.
-    py::sync_request_assignments_with_shifts (планировщик) отменяет строки
-    RequestAssignment напрямую, не трогая поля Request, но её фильтр matчит
+    py::sync_request_assignments_with_shifts отменяет строки RequestAssignment
+    напрямую, не трогая поля Request (планировщик её больше не зовёт, но
+    метод жив), однако её фильтр matчит
     только строки с конкретным executor_id (SQL `NULL NOT IN (...)` не
     матчит) — group-заявки (executor_id IS NULL, ровно фильтр main-очереди)
     она не трогает никогда, так что для main-очереди устаревания не возникает,
@@ -41,9 +47,11 @@ Keyset-курсор `(created_at, request_number)` + wrap-around (см.
 ВЗЯТОЙ В ОБРАБОТКУ заявкой независимо от исхода — недостижимых «хвостов»
 нет, даже если ни одна заявка в очереди не находит дежурного.
 
-Назначение — единственный канонический write-path (`run_command_sync`,
+Назначение — единственный канонический write-path (`run_commands_bulk`,
 system-принципал "auto_manager"): SYSTEM_AUTO_PROMOTE для main-очереди,
-SYSTEM_DISPATCH_ASSIGN (executor или group) для residual.
+SYSTEM_DISPATCH_ASSIGN (executor) или ASSIGN_GROUP для residual. Команды
+копятся в плане тика и применяются одной транзакцией — каждая в своём
+SAVEPOINT, так что гонка на одной заявке откатывает только её.
 """
 
 from __future__ import annotations
@@ -63,22 +71,16 @@ from uk_management_bot.database.models.request import Request
 from uk_management_bot.database.models.user import User
 from uk_management_bot.database.session import SessionLocal
 from uk_management_bot.keyboards.requests import get_category_display, resolve_category_key
-from uk_management_bot.services.admin_handler_service import AdminHandlerService
 from uk_management_bot.services.auto_manager.config import is_window_active, load_config_sync
-from uk_management_bot.services.auto_manager.rule_engine import (
-    build_duty_snapshot,
-    select_executor,
-)
-from uk_management_bot.services.workflow_runner import (
-    RequestNotFound,
-    WorkflowError,
-    run_command_sync,
-)
-from uk_management_bot.utils.auth_helpers import get_user_roles
-from uk_management_bot.utils.constants import (
-    REQUEST_STATUS_NEW,
-    ROLE_MANAGER,
+from uk_management_bot.services.auto_manager.dispatch_planner import (
+    DispatchReport,
+    DispatchSnapshot,
+    StaleAssignment,
+    build_dispatch_snapshot,
 )
+from uk_management_bot.services.auto_manager.rule_engine import select_executor
+from uk_management_bot.services.workflow_runner import BulkCommand, run_commands_bulk
+from uk_management_bot.utils.constants import REQUEST_STATUS_NEW
 from uk_management_bot.utils.helpers import get_text
 from uk_management_bot.utils.request_workflow import Action, ActionCommand, PrincipalRef
 from uk_management_bot.utils.telegram_client import SEND_TIMEOUT
@@ -130,11 +132,21 @@ class _ManagerNotifyJob:
     specialization: str
 
 
+@dataclass
+class _PlannedCommand:
+    """Команда плана тика и то, что сделать после её успешной записи."""
+    command: BulkCommand
+    executor_id: Optional[int] = None
+    executor_notify: Optional[_ExecutorNotifyJob] = None
+
+
 @dataclass
 class _TickPlan:
+    commands: list[_PlannedCommand] = field(default_factory=list)
     kanban_refreshes: list[str] = field(default_factory=list)
     executor_notifies: list[_ExecutorNotifyJob] = field(default_factory=list)
     manager_notifies: list[_ManagerNotifyJob] = field(default_factory=list)
+    report: DispatchReport = field(default_factory=DispatchReport)
 
 
 def _now_utc() -> datetime:
@@ -188,8 +200,8 @@ class AutoManagerOrchestrator:
         self._retry_after: dict[str, datetime] = {}
         # request_number -> когда последний раз уведомили менеджеров (dedup TTL).
         self._notified: dict[str, datetime] = {}
-        # Кэш получателей-менеджеров на ОДИН тик (сбрасывается в _db_phase).
-        self._managers_cache: Optional[list[tuple[int, str]]] = None
+        # То же для назначений вне смены — сводка менеджерам не чаще TTL.
+        self._stale_notified: dict[str, datetime] = {}
 
     def _get_bot(self):
         if self._bot is not None:
@@ -201,7 +213,7 @@ class AutoManagerOrchestrator:
     # Публичный вход
     # ------------------------------------------------------------------ #
 
-    async def run_once(self) -> None:
+    async def run_once(self) -> Optional[DispatchReport]:
         now = _now_utc()
         # AUD6-P2-01: раньше весь тик — sync-SQLAlchemy ПРЯМО на event loop'е
         # бота (job каждые 2 мин), а сессия жила и через await bot.send_message
@@ -210,24 +222,48 @@ class AutoManagerOrchestrator:
         # единого await; рассылка и realtime идут после, по примитивам плана.
         plan = await asyncio.to_thread(self._db_phase, now)
         if plan is None:
-            return
+            return None
         for request_number in plan.kanban_refreshes:
             await self._publish_kanban_refresh(request_number)
         for job in plan.executor_notifies:
             await self._send_executor_notify(job)
         for job in plan.manager_notifies:
             await self._send_manager_notify(job)
+        return plan.report
 
     def _db_phase(self, now: datetime) -> Optional[_TickPlan]:
-        """Sync-фаза тика: конфиг, очереди, назначения. Никаких await внутри."""
+        """Sync-фаза тика: конфиг, срез, план, одна пачка записей. Без await.
+
+        Чтение сессии закрывается до записи: `run_commands_bulk` открывает
+        свою (как и прежний поштучный `run_command_sync`).
+        """
         db = SessionLocal()
         try:
-            cfg = load_config_sync(db)
-            if not cfg["enabled"] or not is_window_active(cfg, now):
-                return None
-
-            self._prune_expired(now)
-
+            plan = self._plan(db, now)
+        finally:
+            db.close()
+        if plan is not None and plan.commands:
+            self._apply(plan, now)
+        return plan
+
+    def _plan(self, db: Session, now: datetime) -> Optional[_TickPlan]:
+        cfg = load_config_sync(db)
+        # Выключатель автоназначения гасит весь тик, включая сводку о
+        # назначениях вне смены: менеджер, снявший тумблер, разбирает заявки сам.
+        if not cfg["enabled"]:
+            return None
+
+        self._prune_expired(now)
+
+        plan = _TickPlan()
+        # AUD6-P2-14: срез (кандидаты, активные смены, нагрузка, менеджеры,
+        # назначения вне смены) — постоянным числом запросов один раз на
+        # тик, не на каждую заявку и не на каждую политику.
+        snapshot = build_dispatch_snapshot(db, now)
+        plan.report.stale_assignments = self._fresh_stale(snapshot.stale_assignments, now)
+
+        # Очереди — только в окне авто-менеджера; сводка вне смены — всегда.
+        if is_window_active(cfg, now):
             limit = cfg["max_requests_per_run"]
             has_residual = db.query(Request.request_number).filter(
                 _residual_queue_filter()).first() is not None
@@ -241,19 +277,34 @@ class AutoManagerOrchestrator:
                 residual_slots = 0
             main_slots = limit - residual_slots
 
-            plan = _TickPlan()
-            # AUD6-P2-14: срез дежурства (кандидаты, активные смены, нагрузка)
-            # собирается ТРЕМЯ запросами один раз на тик — не на каждую заявку.
-            snapshot = build_duty_snapshot(db, now)
-            self._managers_cache = None
-
             if main_slots > 0:
                 self._process_queue(db, now, "main", main_slots, snapshot, plan)
             if residual_slots > 0:
                 self._process_queue(db, now, "residual", residual_slots, snapshot, plan)
-            return plan
-        finally:
-            db.close()
+        return plan
+
+    def _apply(self, plan: _TickPlan, now: datetime) -> None:
+        """Все записи тика — одна транзакция `run_commands_bulk`.
+
+        WorkflowError элемента (гонка: менеджер/другой процесс переназначил
+        заявку между срезом и записью) откатывает только его SAVEPOINT — это
+        нормальный исход, НЕ «нет дежурного»: без cooldown и manager-notify.
+        """
+        outcomes = run_commands_bulk(
+            SessionLocal, [planned.command for planned in plan.commands], now=now)
+        for planned, outcome in zip(plan.commands, outcomes):
+            if not outcome.ok:
+                logger.debug("[AUTO_MANAGER] %s %s пропущен: %s",
+                             planned.command.command.action.name,
+                             outcome.request_number, outcome.error)
+                continue
+            # Для ASSIGN_GROUP статус не менялся (заявка осталась «Новая»), но на
+            # карточке появилась группа — канбан без refresh покажет её без
+            # специализации.
+            plan.kanban_refreshes.append(outcome.request_number)
+            if planned.executor_id is not None:
+                plan.report.assigned += 1
+                plan.executor_notifies.append(planned.executor_notify)
 
     # ------------------------------------------------------------------ #
     # Cooldown/dedup housekeeping
@@ -265,6 +316,16 @@ class AutoManagerOrchestrator:
         по месту (сравнение с `now`)."""
         self._retry_after = {k: v for k, v in self._retry_after.items() if v > now}
         self._notified = {k: v for k, v in self._notified.items() if now - v < _NOTIFY_TTL}
+        self._stale_notified = {
+            k: v for k, v in self._stale_notified.items() if now - v < _NOTIFY_TTL}
+
+    def _fresh_stale(self, stale: list[StaleAssignment],
+                     now: datetime) -> list[StaleAssignment]:
+        """Назначения вне смены, о которых менеджеры ещё не слышали за TTL."""
+        fresh = [item for item in stale if item.request_number not in self._stale_notified]
+        for item in fresh:
+            self._stale_notified[item.request_number] = now
+        return fresh
 
     def _get_cursor(self, queue: str) -> Optional[tuple[datetime, str]]:
         return self._cursor_main if queue == "main" else self._cursor_residual
@@ -280,7 +341,7 @@ class AutoManagerOrchestrator:
     # ------------------------------------------------------------------ #
 
     def _process_queue(self, db: Session, now: datetime, queue: str, slots: int,
-                       snapshot, plan: _TickPlan) -> None:
+                       snapshot: DispatchSnapshot, plan: _TickPlan) -> None:
         filt = _main_queue_filter() if queue == "main" else _residual_queue_filter()
         cursor = self._get_cursor(queue)
 
@@ -382,81 +443,73 @@ class AutoManagerOrchestrator:
                          request_number, e)
 
     def _process_item(self, db: Session, req: Request, queue: str, now: datetime,
-                      snapshot, plan: _TickPlan) -> None:
+                      snapshot: DispatchSnapshot, plan: _TickPlan) -> None:
         if queue == "main":
             self._process_main_item(db, req, now, snapshot, plan)
         else:
             self._process_residual_item(db, req, now, snapshot, plan)
 
     @staticmethod
-    def _queue_executor_notify(plan: _TickPlan, candidate: User, req: Request) -> None:
-        """Снимок-примитивы для рассылки после закрытия сессии (AUD6-P2-01)."""
-        plan.executor_notifies.append(_ExecutorNotifyJob(
-            telegram_id=candidate.telegram_id,
-            language=candidate.language or "ru",
-            request_number=req.request_number,
-            category=req.category,
-            address=req.address or "",
+    def _plan_command(plan: _TickPlan, req: Request, action: Action, payload: dict,
+                      candidate: Optional[User] = None) -> None:
+        """Команда в пачку тика + снимок-примитивы для рассылки после записи
+        (AUD6-P2-01: ORM-объекты за границу сессии не уходят)."""
+        notify = None
+        if candidate is not None:
+            notify = _ExecutorNotifyJob(
+                telegram_id=candidate.telegram_id,
+                language=candidate.language or "ru",
+                request_number=req.request_number,
+                category=req.category,
+                address=req.address or "",
+            )
+        plan.commands.append(_PlannedCommand(
+            command=BulkCommand(
+                request_number=req.request_number,
+                principal=_AUTO_MANAGER_PRINCIPAL,
+                command=ActionCommand(
+                    command_id=f"auto_manager:{req.request_number}",
+                    action=action,
+                    payload=payload,
+                ),
+            ),
+            executor_id=candidate.id if candidate is not None else None,
+            executor_notify=notify,
         ))
 
     @staticmethod
-    def _bump_load(snapshot, executor_id: int) -> None:
+    def _bump_load(snapshot: DispatchSnapshot, executor_id: int) -> None:
         """Внутритиковый учёт назначений (AUD6-P2-14): срез нагрузки снят один
-        раз на тик, поэтому успешное назначение инкрементирует его вручную —
-        иначе пачка однотипных заявок в одном тике ушла бы одному исполнителю."""
-        snapshot.load_by_user[executor_id] = snapshot.load_by_user.get(executor_id, 0) + 1
+        раз на тик, поэтому запланированное назначение инкрементирует его
+        вручную — иначе пачка однотипных заявок в одном тике ушла бы одному
+        исполнителю. Откат элемента пачки нагрузку не возвращает: срез живёт
+        до конца тика, а завышение на гонке лишь чуть сдвигает ranking."""
+        load = snapshot.duty.load_by_user
+        load[executor_id] = load.get(executor_id, 0) + 1
 
     def _process_main_item(self, db: Session, req: Request, now: datetime,
-                           snapshot, plan: _TickPlan) -> None:
+                           snapshot: DispatchSnapshot, plan: _TickPlan) -> None:
         specialization = req.assigned_group
-        candidate = select_executor(db, specialization, now, snapshot=snapshot)
+        candidate = select_executor(db, specialization, now, snapshot=snapshot.duty)
 
         if candidate is None:
             self._retry_after[req.request_number] = now + _RETRY_COOLDOWN
-            self._queue_manager_notify(db, req, specialization, now, plan)
-            return
-
-        command = ActionCommand(
-            command_id=f"auto_manager:{req.request_number}",
-            action=Action.SYSTEM_AUTO_PROMOTE,
-            payload={"executor_id": candidate.id},
-        )
-        try:
-            run_command_sync(SessionLocal, req.request_number,
-                             _AUTO_MANAGER_PRINCIPAL, command, now=now)
-        except (WorkflowError, RequestNotFound) as e:
-            # Гонка: менеджер/другой процесс уже переназначил заявку между
-            # выбором кандидата и нашим write — нормальный исход, НЕ «нет
-            # дежурного» (дежурный был, просто опоздали) — без manager-notify.
-            logger.debug("[AUTO_MANAGER] SYSTEM_AUTO_PROMOTE %s пропущен: %s",
-                         req.request_number, e)
+            self._queue_manager_notify(req, specialization, now, snapshot, plan)
             return
 
+        self._plan_command(plan, req, Action.SYSTEM_AUTO_PROMOTE,
+                           {"executor_id": candidate.id}, candidate)
         self._bump_load(snapshot, candidate.id)
-        plan.kanban_refreshes.append(req.request_number)
-        self._queue_executor_notify(plan, candidate, req)
 
     def _process_residual_item(self, db: Session, req: Request, now: datetime,
-                               snapshot, plan: _TickPlan) -> None:
+                               snapshot: DispatchSnapshot, plan: _TickPlan) -> None:
         specialization = get_specialization_for_category(req.category)
-        candidate = select_executor(db, specialization, now, snapshot=snapshot)
+        candidate = select_executor(db, specialization, now, snapshot=snapshot.duty)
 
         if candidate is not None:
-            command = ActionCommand(
-                command_id=f"auto_manager:{req.request_number}",
-                action=Action.SYSTEM_DISPATCH_ASSIGN,
-                payload={"executor_id": candidate.id},
-            )
-            try:
-                run_command_sync(SessionLocal, req.request_number,
-                                 _AUTO_MANAGER_PRINCIPAL, command, now=now)
-            except (WorkflowError, RequestNotFound) as e:
-                logger.debug("[AUTO_MANAGER] SYSTEM_DISPATCH_ASSIGN(executor) %s пропущен: %s",
-                             req.request_number, e)
-                return
+            self._plan_command(plan, req, Action.SYSTEM_DISPATCH_ASSIGN,
+                               {"executor_id": candidate.id}, candidate)
             self._bump_load(snapshot, candidate.id)
-            plan.kanban_refreshes.append(req.request_number)
-            self._queue_executor_notify(plan, candidate, req)
             return
 
         # Нет дежурного — адресуем группе, НЕ меняя статус (тот же канонический
@@ -467,48 +520,26 @@ class AutoManagerOrchestrator:
         # создания. Best-effort: пишем cooldown/уведомляем менеджеров независимо
         # от исхода записи — факт «нет индивидуального дежурного» верен в обоих
         # случаях.
-        command = ActionCommand(
-            command_id=f"auto_manager:{req.request_number}",
-            action=Action.ASSIGN_GROUP,
-            payload={"group": specialization},
-        )
-        try:
-            run_command_sync(SessionLocal, req.request_number,
-                             _AUTO_MANAGER_PRINCIPAL, command, now=now)
-        except (WorkflowError, RequestNotFound) as e:
-            logger.debug("[AUTO_MANAGER] ASSIGN_GROUP %s пропущен: %s",
-                         req.request_number, e)
-        else:
-            # Статус не менялся (заявка осталась «Новая»), но на карточке
-            # появилась группа — канбан без refresh покажет её без специализации.
-            plan.kanban_refreshes.append(req.request_number)
-
+        self._plan_command(plan, req, Action.ASSIGN_GROUP, {"group": specialization})
         self._retry_after[req.request_number] = now + _RETRY_COOLDOWN
-        self._queue_manager_notify(db, req, specialization, now, plan)
+        self._queue_manager_notify(req, specialization, now, snapshot, plan)
 
     # ------------------------------------------------------------------ #
     # Notifications (best-effort, mirror handlers/admin/shared.py)
     # ------------------------------------------------------------------ #
 
-    def _queue_manager_notify(self, db: Session, req: Request, specialization: str,
-                              now: datetime, plan: _TickPlan) -> None:
+    def _queue_manager_notify(self, req: Request, specialization: str, now: datetime,
+                              snapshot: DispatchSnapshot, plan: _TickPlan) -> None:
         """Db-фаза: dedup TTL + получатели-примитивы; отправка — после тика."""
         last_notified = self._notified.get(req.request_number)
         if last_notified is not None and now - last_notified < _NOTIFY_TTL:
             return
 
-        # AUD6-P2-14: список менеджеров — один раз на тик, а не на каждую
-        # «нет дежурного»-заявку (list_approved_users — полная выборка).
-        if self._managers_cache is None:
-            svc = AdminHandlerService(db)
-            self._managers_cache = [
-                (u.telegram_id, u.language or "ru")
-                for u in svc.list_approved_users()
-                if ROLE_MANAGER in get_user_roles(u) and u.telegram_id
-            ]
-
+        # Получатели — из среза тика (одна выборка вместе с исполнителями),
+        # а не list_approved_users() на каждую «нет дежурного»-заявку.
+        plan.report.escalated += 1
         plan.manager_notifies.append(_ManagerNotifyJob(
-            recipients=list(self._managers_cache),
+            recipients=list(snapshot.managers),
             request_number=req.request_number,
             specialization=specialization,
         ))
@@ -8,7 +8,7 @@
 Кандидат-фильтр (approved + роль executor + специализация) мирроит
 `handlers/admin/shared.py::auto_assign_request_by_category` дословно: та же
 пара `get_user_roles`/`parse_specializations` поверх `list_approved_users()`
-(не `list_approved_executors()` — см. docstring `select_executor`).
+(см. docstring `select_executor`).
 """
 from __future__ import annotations
 
@@ -70,10 +70,15 @@ class DutySnapshot:
     load_by_user: dict[int, int] = field(default_factory=dict)
 
 
-def build_duty_snapshot(db: Session, now: datetime) -> DutySnapshot:
-    """Три запроса: approved-пользователи, активные смены, нагрузка GROUP BY."""
-    svc = AdminHandlerService(db)
-    approved_users = svc.list_approved_users()
+def build_duty_snapshot(db: Session, now: datetime,
+                        approved_users: Optional[list[User]] = None) -> DutySnapshot:
+    """Три запроса: approved-пользователи, активные смены, нагрузка GROUP BY.
+
+    `approved_users` — уже загруженные исполнители (срез диспетчерского тика
+    берёт их одной выборкой с менеджерами); тогда запросов два.
+    """
+    if approved_users is None:
+        approved_users = AdminHandlerService(db).list_approved_users(ROLE_EXECUTOR)
     executor_ids = [
         u.id for u in approved_users if ROLE_EXECUTOR in get_user_roles(u)
     ]
@@ -146,16 +151,11 @@ def select_executor(db: Session, specialization: str, now: datetime,
            `specialization` по общему предикату `matches_required_specs`
            (BUG-166): подходит точное совпадение либо джокер `universal`.
            Голое `in` здесь было расхождением с шагом 2, который джокер
-           учитывал. Используем
-           `AdminHandlerService.list_approved_users()` + этот же ручной
-           Python-фильтр, а не `list_approved_executors()`: последний матчит
-           роль SQL-уровня ("executor" as quoted JSON-токен через
-           `.cast(String).contains`), что не эквивалентно каноническому
-           парсеру ролей (`get_user_roles`/`parse_roles_safe`, который
-           понимает и JSON-список, и CSV-строку). Задача явно требует
-           мирроить `auto_assign_request_by_category`, которая построена
-           именно на `list_approved_users()` + ручном фильтре — сохраняем ту
-           же семантику 1:1, а не более широкий/узкий SQL-вариант.
+           учитывал. Выборка — `AdminHandlerService.list_approved_users(
+           ROLE_EXECUTOR)`: индекс user_roles строится тем же каноническим
+           парсером (`parse_roles_safe`, JSON-список и CSV), так что SQL-фильтр
+           совпадает с ручным `get_user_roles`; ручная проверка оставлена как
+           зеркало `auto_assign_request_by_category`.
         2. Кандидат допускается, только если хотя бы ОДНА из его активных
            СЕЙЧАС смен (статус "active" + start_time<=now<=end_time/NULL)
            может обработать `specialization` (`Shift.can_handle_specialization`
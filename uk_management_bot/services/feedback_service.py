@@ -10,7 +10,7 @@ from __future__ import annotations
 import html
 import logging
 
-from sqlalchemy import and_, or_, select
+from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 
 from uk_management_bot.database.models.feedback import Feedback
@@ -20,9 +20,8 @@ from uk_management_bot.utils.helpers import get_text
 
 logger = logging.getLogger(__name__)
 
-# Менеджеры: новый JSON-формат roles ИЛИ legacy одиночное поле role; только
-# активные (не удалённые, одобренные).
-_MANAGER_FILTER = or_(User.roles.like('%"manager"%'), legacy_role_filter("manager"))
+# Менеджеры (индекс user_roles); только активные (не удалённые, одобренные).
+_MANAGER_FILTER = legacy_role_filter("manager")
 _ACTIVE_FILTER = and_(User.deleted_at.is_(None), User.status == "approved")
 
 # Лимиты Telegram
@@ -10,8 +10,11 @@ sync/async-обёртки. FIFO-математика одна на оба пут
   со ссылкой на исходную операцию).
 * Отрицательные остатки запрещены: нехватка → ``InsufficientStockError``.
 * Конкурентность: партии лочатся ``with_for_update()`` со стабильным
-  ``ORDER BY created_at, id`` (нет дедлоков); на sqlite (тесты) FOR UPDATE
+  ``ORDER BY created_at, id`` (нет дедлоков) и только старейшие, покрывающие
+  списание (``_core._fifo_chunk_stmt``); на sqlite (тесты) FOR UPDATE
   молча опускается — как в остальном репо.
+* Остатки — агрегат только партий с остатком (``_core._open_stock_subquery``,
+  покрывающий partial-индекс); общей строки-сводки на материал нет.
 * Commit — у вызывающего (sync-путь бота добавляет RequestComment в той же
   сессии; async-путь коммитит в API-роутере).
 """
@@ -20,7 +23,8 @@ sync/async-обёртки. FIFO-математика одна на оба пут
 # dotted-path, тела определений байт-в-байт. Раскрой: _core (ошибки/DTO/
 # FIFO-ядро/shared-строители apply), sync_ops (sync-слой бота), catalog
 # (карточки API), movements (приход/списание/корректировки/сторно), reads
-# (остатки/журнал/отчёты), _sa (SQL-хелперы журнала).
+# (остатки/журнал/отчёты).
+# _sa (SQL-хелперы UNION-журнала) удалён: журнал читает material_movements.
 
 # `_escape_like` реэкспортируется (его импортирует api/materials/service.py);
 # поиск по названию материала обязан идти через `ci_contains` — см. докстринг
@@ -35,6 +39,7 @@ from ._core import (
     Allocation,
     BatchView,
     InsufficientStockError,
+    IssueLine,
     MaterialConflictError,
     MaterialNotFoundError,
     MaterialServiceError,
@@ -47,7 +52,7 @@ from ._core import (
     validate_unit,
 )
 from .catalog import create_material, update_material
-from .movements import adjust, create_receipt, issue_material
+from .movements import adjust, create_receipt, issue_material, issue_materials_bulk
 from .reads import (
     get_procurement,
     get_request_materials,
@@ -64,6 +69,7 @@ __all__ = [
     "Allocation",
     "BatchView",
     "InsufficientStockError",
+    "IssueLine",
     "MaterialConflictError",
     "MaterialNotFoundError",
     "MaterialServiceError",
@@ -81,6 +87,7 @@ __all__ = [
     "get_stock",
     "is_postgres",
     "issue_material",
+    "issue_materials_bulk",
     "issue_material_sync",
     "list_materials_with_stock",
     "list_operations",
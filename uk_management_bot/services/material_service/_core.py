@@ -10,6 +10,8 @@ from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from typing import Optional
 
+from sqlalchemy import func, select
+
 from uk_management_bot.database.models.material import (
     ISSUE_DOC_TYPES,
     MATERIAL_UNITS,
@@ -22,6 +24,9 @@ from uk_management_bot.database.models.material import (
 _MONEY = Decimal("0.01")
 _QTY = Decimal("0.001")
 
+# Партий за один шаг FIFO-обхода (см. _fifo_chunk_stmt).
+_FIFO_CHUNK = 4
+
 
 # ===========================================================================
 # Ошибки (роутер мапит: Validation → 422, Conflict/Insufficient → 409, NotFound → 404)
@@ -50,9 +55,11 @@ class RequestNotFoundError(MaterialValidationError):
 class InsufficientStockError(MaterialConflictError):
     """Остатка недостаточно для списания (→ 409)."""
 
-    def __init__(self, available: Decimal):
+    def __init__(self, available: Decimal, material_id: Optional[int] = None):
         self.available = available
-        super().__init__(f"недостаточно остатка: доступно {available}")
+        self.material_id = material_id
+        where = f" материала {material_id}" if material_id is not None else ""
+        super().__init__(f"недостаточно остатка{where}: доступно {available}")
 
 
 # ===========================================================================
@@ -68,6 +75,14 @@ class BatchView:
     unit_price: Decimal
 
 
+@dataclass(frozen=True)
+class IssueLine:
+    """Строка bulk-расхода на заявку (``issue_materials_bulk``)."""
+
+    material_id: int
+    qty: object  # валидирует parse_qty
+
+
 @dataclass(frozen=True)
 class Allocation:
     """Строка списания из конкретной партии."""
@@ -170,6 +185,70 @@ def _validate_issue_target(doc_type: str, request_number: Optional[str],
             )
 
 
+# ===========================================================================
+# Остатки: агрегат партий с остатком (общий для sync- и async-чтения)
+# ===========================================================================
+
+def _open_stock_subquery():
+    """``(material_id, qty, value)`` по партиям с ``qty_remaining > 0``.
+
+    На PostgreSQL — index-only скан ``ix_material_receipts_open_stock``
+    (partial, INCLUDE qty_remaining/unit_price): закрытые партии не читаются.
+    ``value`` без округления — ``money()`` при выдаче.
+    """
+    r = MaterialReceipt
+    return (
+        select(
+            r.material_id,
+            func.sum(r.qty_remaining).label("qty"),
+            func.sum(r.qty_remaining * r.unit_price).label("value"),
+        )
+        .where(r.qty_remaining > 0)
+        .group_by(r.material_id)
+        .subquery("open_stock")
+    )
+
+
+# ===========================================================================
+# FIFO-обход под локом: лочатся только самые старые партии, покрывающие qty
+# ===========================================================================
+
+def _fifo_chunk_stmt(material_id: int, locked: list[MaterialReceipt]):
+    """Следующие ``_FIFO_CHUNK`` партий с остатком после уже залоченных — FOR UPDATE.
+
+    Раньше списание лочило ВСЕ открытые партии материала, и расход 1 шт.
+    популярного расходника держал весь его склад. Обход кусками по
+    (created_at, id) лочит ровно столько старейших партий, сколько нужно на
+    qty (плюс хвост последнего куска); порядок локов прежний — дедлоков нет.
+    Продолжение — исключением уже взятых id, а не keyset по created_at:
+    сравнение с параметром-датой зависит от формата хранения (SQLite).
+    SKIP LOCKED не используется: пропуск занятой старой партии нарушил бы FIFO
+    (себестоимость) и давал бы ложную нехватку.
+    """
+    stmt = select(MaterialReceipt).where(
+        MaterialReceipt.material_id == material_id,
+        MaterialReceipt.qty_remaining > 0,
+    )
+    if locked:
+        stmt = stmt.where(MaterialReceipt.id.not_in([b.id for b in locked]))
+    return (
+        stmt.order_by(MaterialReceipt.created_at, MaterialReceipt.id)
+        .limit(_FIFO_CHUNK)
+        .with_for_update()
+    )
+
+
+def _fifo_covered(batches: list[MaterialReceipt], qty: Decimal) -> bool:
+    return sum((Decimal(str(b.qty_remaining)) for b in batches), Decimal("0")) >= qty
+
+
+def _batch_views(batches: list[MaterialReceipt]) -> list[BatchView]:
+    return [
+        BatchView(b.id, Decimal(str(b.qty_remaining)), Decimal(str(b.unit_price)))
+        for b in batches
+    ]
+
+
 # ===========================================================================
 # Общий apply: чистые шаги (декремент/сборка строк) + тонкие sync/async-зеркала
 # (flush — корутина на AsyncSession, поэтому единой функции быть не может)
@@ -23,14 +23,18 @@ from uk_management_bot.database.models.request import Request
 
 from ._core import (
     Allocation,
-    BatchView,
+    InsufficientStockError,
+    IssueLine,
     MaterialConflictError,
     MaterialNotFoundError,
     MaterialValidationError,
     RequestNotFoundError,
+    _batch_views,
     _build_allocations,
     _build_issue,
     _decrement_batches,
+    _fifo_chunk_stmt,
+    _fifo_covered,
     _validate_issue_target,
     allocate_fifo,
     money,
@@ -60,6 +64,22 @@ async def _apply_issue_async(db: AsyncSession, batches: list[MaterialReceipt],
     return issue
 
 
+async def _lock_fifo_batches(db: AsyncSession, material_id: int,
+                             qty: Decimal) -> list[MaterialReceipt]:
+    """Async-зеркало _lock_fifo_batches_sync."""
+    batches: list[MaterialReceipt] = []
+    while not _fifo_covered(batches, qty):
+        chunk = (
+            await db.execute(
+                _fifo_chunk_stmt(material_id, batches)
+            )
+        ).scalars().all()
+        if not chunk:
+            break
+        batches.extend(chunk)
+    return batches
+
+
 # ===========================================================================
 # ASYNC (API)
 # ===========================================================================
@@ -129,34 +149,48 @@ async def issue_material(db: AsyncSession, *, material_id: int, qty,
         if exists is None:
             raise RequestNotFoundError(f"заявка {request_number} не найдена")
 
-    batches = (
-        (
-            await db.execute(
-                select(MaterialReceipt)
-                .where(
-                    MaterialReceipt.material_id == material_id,
-                    MaterialReceipt.qty_remaining > 0,
-                )
-                .order_by(MaterialReceipt.created_at, MaterialReceipt.id)
-                .with_for_update()
-            )
-        )
-        .scalars()
-        .all()
-    )
-    allocations = allocate_fifo(
-        [BatchView(b.id, Decimal(str(b.qty_remaining)), Decimal(str(b.unit_price)))
-         for b in batches],
-        qty,
-    )
+    batches = await _lock_fifo_batches(db, material_id, qty)
+    allocations = allocate_fifo(_batch_views(batches), qty)
     return await _apply_issue_async(
-        db, list(batches), allocations,
+        db, batches, allocations,
         material=material, qty=qty, doc_type=doc_type,
         request_number=request_number, reason=reason, created_by=created_by,
         reversal_of_receipt_id=_reversal_of_receipt_id,
     )
 
 
+async def issue_materials_bulk(db: AsyncSession, *, request_number: str,
+                               items: list[IssueLine],
+                               created_by: int) -> list[MaterialIssue]:
+    """Списать несколько материалов на одну заявку — всё или ничего.
+
+    Один расход на строку (журнал и сторно — как у одиночного списания);
+    ошибка любой строки пролетает наверх, и вызывающий не коммитит ничего.
+    Материалы обрабатываются по возрастанию id — встречные bulk-расходы
+    берут локи партий и сводки в одном порядке. Commit у вызывающего.
+
+    Returns:
+        Расходы в порядке ``items``.
+    """
+    if not items:
+        raise MaterialValidationError("пустой список расхода")
+    material_ids = [line.material_id for line in items]
+    if len(set(material_ids)) != len(material_ids):
+        raise MaterialValidationError("материал повторяется в списке расхода")
+
+    issues: dict[int, MaterialIssue] = {}
+    for line in sorted(items, key=lambda line: line.material_id):
+        try:
+            issues[line.material_id] = await issue_material(
+                db, material_id=line.material_id, qty=line.qty,
+                created_by=created_by, doc_type="request",
+                request_number=request_number,
+            )
+        except InsufficientStockError as exc:
+            raise InsufficientStockError(exc.available, line.material_id) from exc
+    return [issues[material_id] for material_id in material_ids]
+
+
 async def adjust(db: AsyncSession, *, material_id: int, direction: str,
                  reason: str, created_by: int, qty=None, unit_price=None,
                  reversal_of_issue_id: Optional[int] = None,
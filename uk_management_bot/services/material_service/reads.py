@@ -4,15 +4,19 @@ Block-move из services/material_service.py (AUD5-ARCH-3 волна 9), тел
 байт-в-байт.
 """
 
+import base64
+import binascii
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from uk_management_bot.config.settings import settings
 from uk_management_bot.database.models.material import (
     Material,
     MaterialIssue,
+    MaterialMovement,
     MaterialReceipt,
 )
 from uk_management_bot.database.models.request import Request
@@ -22,8 +26,10 @@ from uk_management_bot.utils.sql_search import (
     is_postgres,
 )
 
-from ._core import money
-from ._sa import sa_false, sa_literal, sa_null_str
+from ._core import _open_stock_subquery, money
+
+# Потолок подсчёта total журнала операций (дальше — «не меньше», total_capped).
+OPERATIONS_TOTAL_CAP = settings.MATERIAL_OPERATIONS_TOTAL_CAP
 
 # ===========================================================================
 # ASYNC — чтение (остатки, журнал, отчёты)
@@ -31,11 +37,11 @@ from ._sa import sa_false, sa_literal, sa_null_str
 
 async def get_stock(db: AsyncSession, *, q: Optional[str] = None,
                     only_low: bool = False) -> list[dict]:
-    """Остатки по материалам: qty + сумма по ценам партий + флаг low_stock."""
-    stock = func.coalesce(func.sum(MaterialReceipt.qty_remaining), 0)
-    value = func.coalesce(
-        func.sum(MaterialReceipt.qty_remaining * MaterialReceipt.unit_price), 0
-    )
+    """Остатки по материалам: qty + сумма по ценам партий + флаг low_stock.
+
+    Агрегирует только партии с остатком (``_core._open_stock_subquery``).
+    """
+    stock = _open_stock_subquery()
     query = (
         select(
             Material.id,
@@ -44,19 +50,11 @@ async def get_stock(db: AsyncSession, *, q: Optional[str] = None,
             Material.category,
             Material.min_stock,
             Material.is_active,
-            stock.label("stock"),
-            value.label("stock_value"),
-        )
-        .outerjoin(
-            MaterialReceipt,
-            (MaterialReceipt.material_id == Material.id)
-            & (MaterialReceipt.qty_remaining > 0),
+            func.coalesce(stock.c.qty, 0).label("stock"),
+            func.coalesce(stock.c.value, 0).label("stock_value"),
         )
+        .outerjoin(stock, stock.c.material_id == Material.id)
         .where(Material.is_active.is_(True))
-        .group_by(
-            Material.id, Material.name, Material.unit,
-            Material.category, Material.min_stock, Material.is_active,
-        )
         .order_by(Material.name)
     )
     if q:
@@ -88,76 +86,94 @@ async def get_stock(db: AsyncSession, *, q: Optional[str] = None,
     return result
 
 
+def encode_operations_cursor(movement_id: int) -> str:
+    """Непрозрачный keyset-курсор журнала: id строки material_movements."""
+    return base64.urlsafe_b64encode(str(movement_id).encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_operations_cursor(cursor: str) -> int:
+    """Разобрать курсор; битый → ValueError (роутер отвечает 400)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        return int(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("invalid cursor") from None
+
+
 async def list_operations(db: AsyncSession, *, op_type: Optional[str] = None,
                           material_id: Optional[int] = None,
                           request_number: Optional[str] = None,
                           date_from=None, date_to=None,
-                          limit: int = 50, offset: int = 0) -> dict:
-    """Журнал операций: UNION ALL приход+расход, новые сверху."""
-    receipts_q = select(
-        sa_literal("receipt").label("op_type"),
-        MaterialReceipt.id.label("id"),
-        MaterialReceipt.material_id.label("material_id"),
-        MaterialReceipt.material_name.label("material_name"),
-        MaterialReceipt.unit.label("unit"),
-        MaterialReceipt.doc_type.label("doc_type"),
-        MaterialReceipt.qty.label("qty"),
-        MaterialReceipt.total_amount.label("amount"),
-        sa_null_str().label("request_number"),
-        MaterialReceipt.supplier.label("supplier"),
-        MaterialReceipt.note.label("reason"),
-        MaterialReceipt.created_by.label("created_by"),
-        MaterialReceipt.created_at.label("created_at"),
-    )
-    issues_q = select(
-        sa_literal("issue").label("op_type"),
-        MaterialIssue.id.label("id"),
-        MaterialIssue.material_id.label("material_id"),
-        MaterialIssue.material_name.label("material_name"),
-        MaterialIssue.unit.label("unit"),
-        MaterialIssue.doc_type.label("doc_type"),
-        MaterialIssue.qty.label("qty"),
-        MaterialIssue.total_cost.label("amount"),
-        MaterialIssue.request_number.label("request_number"),
-        sa_null_str().label("supplier"),
-        MaterialIssue.reason.label("reason"),
-        MaterialIssue.created_by.label("created_by"),
-        MaterialIssue.created_at.label("created_at"),
-    )
+                          limit: int = 50, offset: int = 0,
+                          cursor: Optional[str] = None,
+                          exact_total: bool = False) -> dict:
+    """Журнал операций из ``material_movements``, новые сверху.
+
+    Порядок ``created_at DESC, id DESC``; с ``cursor`` страница берётся
+    keyset'ом (``offset`` не применяется). Курсор несёт только id строки
+    журнала, граница по ``created_at`` читается подзапросом — сравнение идёт
+    значением из БД, а не параметром-датой (формат хранения на SQLite).
+
+    ``total`` считается не дальше ``OPERATIONS_TOTAL_CAP`` строк
+    (``total_capped=True`` — «не меньше»); ``exact_total`` — полный count.
+
+    Raises:
+        ValueError: битый курсор.
+    """
+    mm = MaterialMovement
+    conds = []
+    if op_type is not None:
+        conds.append(mm.op_type == op_type)
     if material_id is not None:
-        receipts_q = receipts_q.where(MaterialReceipt.material_id == material_id)
-        issues_q = issues_q.where(MaterialIssue.material_id == material_id)
-    if date_from is not None:
-        receipts_q = receipts_q.where(MaterialReceipt.created_at >= date_from)
-        issues_q = issues_q.where(MaterialIssue.created_at >= date_from)
-    if date_to is not None:
-        receipts_q = receipts_q.where(MaterialReceipt.created_at <= date_to)
-        issues_q = issues_q.where(MaterialIssue.created_at <= date_to)
+        conds.append(mm.material_id == material_id)
     if request_number:
         # Приход не привязан к заявкам — остаются только расходы
-        receipts_q = receipts_q.where(sa_false())
-        issues_q = issues_q.where(MaterialIssue.request_number == request_number)
-    if op_type == "receipt":
-        issues_q = issues_q.where(sa_false())
-    elif op_type == "issue":
-        receipts_q = receipts_q.where(sa_false())
-
-    from sqlalchemy import union_all
-
-    union = union_all(receipts_q, issues_q).subquery()
-    total = (
-        await db.execute(select(func.count()).select_from(union))
-    ).scalar_one()
-    rows = (
-        await db.execute(
-            select(union)
-            .order_by(union.c.created_at.desc(), union.c.op_type, union.c.id.desc())
-            .offset(offset)
-            .limit(limit)
-        )
-    ).all()
-    items = [dict(r._mapping) for r in rows]
-    return {"total": total, "items": items}
+        conds.append(mm.request_number == request_number)
+    if date_from is not None:
+        conds.append(mm.created_at >= date_from)
+    if date_to is not None:
+        conds.append(mm.created_at <= date_to)
+
+    if exact_total:
+        total = (await db.execute(select(func.count()).select_from(mm).where(*conds))).scalar_one()
+        capped = False
+    else:
+        head = select(mm.id).where(*conds).limit(OPERATIONS_TOTAL_CAP + 1).subquery()
+        total = (await db.execute(select(func.count()).select_from(head))).scalar_one()
+        capped = total > OPERATIONS_TOTAL_CAP
+        total = min(total, OPERATIONS_TOTAL_CAP)
+
+    query = select(mm).where(*conds).order_by(mm.created_at.desc(), mm.id.desc())
+    if cursor is not None:
+        after_id = decode_operations_cursor(cursor)
+        after_at = select(mm.created_at).where(mm.id == after_id).scalar_subquery()
+        query = query.where(or_(
+            mm.created_at < after_at,
+            and_(mm.created_at == after_at, mm.id < after_id),
+        ))
+    else:
+        query = query.offset(offset)
+    rows = (await db.execute(query.limit(limit + 1))).scalars().all()
+    next_cursor = encode_operations_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    items = [
+        {
+            "op_type": row.op_type,
+            "id": row.op_id,
+            "material_id": row.material_id,
+            "material_name": row.material_name,
+            "unit": row.unit,
+            "doc_type": row.doc_type,
+            "qty": row.qty,
+            "amount": row.amount,
+            "request_number": row.request_number,
+            "supplier": row.supplier,
+            "reason": row.reason,
+            "created_by": row.created_by,
+            "created_at": row.created_at,
+        }
+        for row in rows[:limit]
+    ]
+    return {"total": total, "total_capped": capped, "items": items, "next_cursor": next_cursor}
 
 
 async def get_request_materials(db: AsyncSession, request_number: str) -> dict:
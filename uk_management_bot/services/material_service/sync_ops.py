@@ -19,13 +19,16 @@ from uk_management_bot.database.models.request import Request
 
 from ._core import (
     Allocation,
-    BatchView,
     MaterialNotFoundError,
     MaterialValidationError,
     RequestNotFoundError,
+    _batch_views,
     _build_allocations,
     _build_issue,
     _decrement_batches,
+    _fifo_chunk_stmt,
+    _fifo_covered,
+    _open_stock_subquery,
     _validate_issue_target,
     allocate_fifo,
     parse_qty,
@@ -46,12 +49,11 @@ def _get_active_material_sync(db: Session, material_id: int) -> Material:
 
 def list_materials_with_stock(db: Session) -> list[dict]:
     """Активные материалы с остатком > 0 (для клавиатуры бота)."""
-    stock = func.coalesce(func.sum(MaterialReceipt.qty_remaining), 0)
+    stock = _open_stock_subquery()
     rows = (
-        db.query(Material.id, Material.name, Material.unit, stock.label("stock"))
-        .join(MaterialReceipt, MaterialReceipt.material_id == Material.id)
-        .filter(Material.is_active.is_(True), MaterialReceipt.qty_remaining > 0)
-        .group_by(Material.id, Material.name, Material.unit)
+        db.query(Material.id, Material.name, Material.unit, stock.c.qty.label("stock"))
+        .join(stock, stock.c.material_id == Material.id)
+        .filter(Material.is_active.is_(True))
         .order_by(Material.name)
         .all()
     )
@@ -65,7 +67,7 @@ def get_material_stock_sync(db: Session, material_id: int) -> Decimal:
     """Текущий остаток материала (без лока — для отображения)."""
     stock = (
         db.query(func.coalesce(func.sum(MaterialReceipt.qty_remaining), 0))
-        .filter(MaterialReceipt.material_id == material_id)
+        .filter(MaterialReceipt.material_id == material_id, MaterialReceipt.qty_remaining > 0)
         .scalar()
     )
     return Decimal(str(stock))
@@ -77,8 +79,8 @@ def issue_material_sync(db: Session, *, material_id: int, qty,
                         reason: Optional[str] = None) -> MaterialIssue:
     """Списать материал (FIFO) — sync-путь бота.
 
-    Лочит партии FOR UPDATE, аллоцирует, декрементирует qty_remaining,
-    пишет issue+allocations. Commit НЕ делает — вызывающий хендлер добавляет
+    Лочит FOR UPDATE старейшие партии, покрывающие qty, аллоцирует,
+    декрементирует qty_remaining, пишет issue+allocations. Commit НЕ делает — вызывающий хендлер добавляет
     RequestComment в той же сессии и коммитит один раз (атомарность).
     """
     qty = parse_qty(qty)
@@ -93,21 +95,8 @@ def issue_material_sync(db: Session, *, material_id: int, qty,
         if exists is None:
             raise RequestNotFoundError(f"заявка {request_number} не найдена")
 
-    batches = (
-        db.query(MaterialReceipt)
-        .filter(
-            MaterialReceipt.material_id == material_id,
-            MaterialReceipt.qty_remaining > 0,
-        )
-        .order_by(MaterialReceipt.created_at, MaterialReceipt.id)
-        .with_for_update()
-        .all()
-    )
-    allocations = allocate_fifo(
-        [BatchView(b.id, Decimal(str(b.qty_remaining)), Decimal(str(b.unit_price)))
-         for b in batches],
-        qty,
-    )
+    batches = _lock_fifo_batches_sync(db, material_id, qty)
+    allocations = allocate_fifo(_batch_views(batches), qty)
     return _apply_issue(
         db, batches, allocations,
         material=material, qty=qty, doc_type=doc_type,
@@ -115,6 +104,20 @@ def issue_material_sync(db: Session, *, material_id: int, qty,
     )
 
 
+def _lock_fifo_batches_sync(db: Session, material_id: int,
+                            qty: Decimal) -> list[MaterialReceipt]:
+    """Залочить старейшие партии, покрывающие qty (или все — при нехватке)."""
+    batches: list[MaterialReceipt] = []
+    while not _fifo_covered(batches, qty):
+        chunk = db.execute(
+            _fifo_chunk_stmt(material_id, batches)
+        ).scalars().all()
+        if not chunk:
+            break
+        batches.extend(chunk)
+    return batches
+
+
 def _apply_issue(db: Session, batches: list[MaterialReceipt],
                  allocations: list[Allocation], *, material: Material,
                  qty: Decimal, doc_type: str, request_number: Optional[str],
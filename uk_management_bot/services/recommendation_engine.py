@@ -3,21 +3,27 @@
 Анализирует данные и предоставляет actionable рекомендации
 """
 import logging
-from datetime import timedelta
+import threading
+import time
+import weakref
+from datetime import date, timedelta
 from uk_management_bot.utils.datetime_utils import utc_now
-from uk_management_bot.utils.business_time import business_day_window, business_today
-from typing import Dict, List, Any
+from uk_management_bot.utils.business_time import BUSINESS_TZ, business_day_window, business_today
+from typing import Dict, List, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import case, func, text
 from dataclasses import dataclass
 from enum import Enum
 
+from uk_management_bot.config.settings import settings
 from uk_management_bot.database.models.shift import Shift
 from uk_management_bot.database.models.request import Request
 from uk_management_bot.services.shift_analytics import ShiftAnalytics
 
 logger = logging.getLogger(__name__)
 
+RECOMMENDATION_CACHE_TTL_SECONDS = settings.RECOMMENDATION_CACHE_TTL_SECONDS
+
 class RecommendationType(Enum):
     """Типы рекомендаций"""
     SHIFT_OPTIMIZATION = "shift_optimization"
@@ -50,6 +56,47 @@ class Recommendation:
     metrics: Dict[str, Any]
     confidence: float  # 0-100%
 
+@dataclass(frozen=True)
+class ExecutorStats:
+    """Смены одного исполнителя за окно анализа."""
+    user_id: int
+    request_load: int                 # сумма current_request_count
+    avg_efficiency: Optional[float]   # среднее по сменам с оценкой
+    scored_shifts: int                # смен с efficiency_score
+
+
+@dataclass(frozen=True)
+class AnalysisSnapshot:
+    """Всё, что читают правила рекомендаций, — посчитано один раз.
+
+    Раньше каждое правило перечитывало свои смены и заявки (а дневной тренд —
+    по запросу на день окна); теперь три агрегатных запроса: смены целиком
+    (FILTER-агрегаты), смены по исполнителю, заявки по бизнес-дню.
+    """
+    period_days: int
+    total_shifts: int
+    inefficient_shifts: int           # efficiency_score < 60
+    slow_shifts: int                  # average_response_time > 180 мин
+    avg_quality: Optional[float]
+    executors: Tuple[ExecutorStats, ...]
+    daily_loads: Tuple[int, ...]      # от старых дней к новым
+
+
+# Кэш снимков: движок БД → {(период, последний бизнес-день): (истекает, снимок)}.
+# Ключ по движку, а не по сессии: экран рекомендаций открывают разные
+# сессии бота, а данные у них общие.
+_SNAPSHOTS: "weakref.WeakKeyDictionary[Any, Dict[Tuple[int, date], Tuple[float, AnalysisSnapshot]]]" = (
+    weakref.WeakKeyDictionary()
+)
+_SNAPSHOTS_LOCK = threading.Lock()
+
+
+def reset_analysis_cache() -> None:
+    """Сбросить кэш снимков (тесты, бенчмарк)."""
+    with _SNAPSHOTS_LOCK:
+        _SNAPSHOTS.clear()
+
+
 class RecommendationEngine:
     """
     Интеллектуальная система рекомендаций для смен
@@ -78,13 +125,14 @@ class RecommendationEngine:
             Список приоритизированных рекомендаций
         """
         try:
-            # Анализируем различные аспекты системы
-            shift_recs = await self._analyze_shift_optimization(period_days)
-            workload_recs = await self._analyze_workload_balance(period_days) 
-            performance_recs = await self._analyze_performance_issues(period_days)
-            capacity_recs = await self._analyze_capacity_planning(period_days)
-            quality_recs = await self._analyze_quality_enhancement(period_days)
-            bottleneck_recs = await self._identify_bottlenecks(period_days)
+            # Один снимок на все правила (см. AnalysisSnapshot)
+            snapshot = self.get_analysis_snapshot(period_days)
+            shift_recs = await self._analyze_shift_optimization(snapshot)
+            workload_recs = await self._analyze_workload_balance(snapshot)
+            performance_recs = await self._analyze_performance_issues(snapshot)
+            capacity_recs = await self._analyze_capacity_planning(snapshot)
+            quality_recs = await self._analyze_quality_enhancement(snapshot)
+            bottleneck_recs = await self._identify_bottlenecks(snapshot)
             
             # Объединяем все рекомендации
             all_recommendations = (
@@ -126,30 +174,89 @@ class RecommendationEngine:
     
     
     
+    # =================== СНИМОК АНАЛИЗА ===================
+
+    def get_analysis_snapshot(self, period_days: int = 30) -> AnalysisSnapshot:
+        """Снимок анализа за окно с кэшем на RECOMMENDATION_CACHE_TTL_SECONDS.
+
+        Ключ — окно анализа (период и последний бизнес-день), так что смена
+        бизнес-дня сама даёт новый снимок.
+        """
+        key = (period_days, business_today())
+        try:
+            bind = self.db.get_bind()
+            with _SNAPSHOTS_LOCK:
+                cached = _SNAPSHOTS.get(bind, {}).get(key)
+        except TypeError:
+            bind, cached = None, None  # движок без weakref — без кэша
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        snapshot = self._build_snapshot(period_days)
+        if bind is not None and RECOMMENDATION_CACHE_TTL_SECONDS > 0:
+            with _SNAPSHOTS_LOCK:
+                per_bind = _SNAPSHOTS.setdefault(bind, {})
+                # Истёкшие окна не копим: ключей немного, чистим при записи
+                now = time.monotonic()
+                for stale in [k for k, (expires, _) in per_bind.items() if expires <= now]:
+                    del per_bind[stale]
+                per_bind[key] = (now + RECOMMENDATION_CACHE_TTL_SECONDS, snapshot)
+        return snapshot
+
+    def _build_snapshot(self, period_days: int) -> AnalysisSnapshot:
+        """Три агрегатных запроса: смены целиком, смены по исполнителю, заявки по дням."""
+        start_date = utc_now() - timedelta(days=period_days)
+        in_window = Shift.start_time >= start_date
+
+        total, inefficient, slow, avg_quality = self.db.query(
+            func.count(Shift.id),
+            func.count(Shift.id).filter(Shift.efficiency_score < 60),
+            func.count(Shift.id).filter(Shift.average_response_time > 180),  # Больше 3 часов
+            func.avg(Shift.quality_rating),
+        ).filter(in_window).one()
+
+        # QA-02: исполнитель смены — user_id, не executor_id
+        executors = tuple(
+            ExecutorStats(
+                user_id=user_id,
+                request_load=int(load or 0),
+                avg_efficiency=float(avg_eff) if avg_eff is not None else None,
+                scored_shifts=int(scored or 0),
+            )
+            for user_id, load, avg_eff, scored in self.db.query(
+                Shift.user_id,
+                func.sum(func.coalesce(Shift.current_request_count, 0)),
+                func.avg(Shift.efficiency_score),
+                func.count(Shift.efficiency_score),
+            ).filter(in_window, Shift.user_id.isnot(None)).group_by(Shift.user_id).order_by(Shift.user_id)
+        )
+
+        return AnalysisSnapshot(
+            period_days=period_days,
+            total_shifts=int(total or 0),
+            inefficient_shifts=int(inefficient or 0),
+            slow_shifts=int(slow or 0),
+            avg_quality=float(avg_quality) if avg_quality is not None else None,
+            executors=executors,
+            daily_loads=tuple(self._daily_request_counts(period_days)),
+        )
+
     # =================== ПРИВАТНЫЕ МЕТОДЫ АНАЛИЗА ===================
     
-    async def _analyze_shift_optimization(self, period_days: int) -> List[Recommendation]:
+    async def _analyze_shift_optimization(self, snapshot: AnalysisSnapshot) -> List[Recommendation]:
         """Анализ оптимизации смен"""
         recommendations = []
         
-        end_date = utc_now()
-        start_date = end_date - timedelta(days=period_days)
+        # Неэффективные смены (<60%)
+        inefficient_shifts = snapshot.inefficient_shifts
         
-        # Найдем неэффективные смены
-        inefficient_shifts = self.db.query(Shift).filter(
-            and_(
-                Shift.start_time >= start_date,
-                Shift.efficiency_score < 60
-            )
-        ).all()
-        
-        if len(inefficient_shifts) > 5:
+        if inefficient_shifts > 5:
             recommendations.append(Recommendation(
                 id="shift_opt_001",
                 type=RecommendationType.SHIFT_OPTIMIZATION,
                 priority=RecommendationPriority.HIGH,
                 title="Оптимизация неэффективных смен",
-                description=f"Обнаружено {len(inefficient_shifts)} смен с низкой эффективностью (<60%)",
+                description=f"Обнаружено {inefficient_shifts} смен с низкой эффективностью (<60%)",
                 impact="Повышение общей эффективности на 15-25%",
                 effort="Средняя",
                 timeline="1-2 недели",
@@ -159,34 +266,19 @@ class RecommendationEngine:
                     "Провести обучение исполнителей",
                     "Оптимизировать временные рамки смен"
                 ],
-                metrics={"inefficient_shifts": len(inefficient_shifts)},
+                metrics={"inefficient_shifts": inefficient_shifts},
                 confidence=85.0
             ))
         
         return recommendations
     
-    async def _analyze_workload_balance(self, period_days: int) -> List[Recommendation]:
+    async def _analyze_workload_balance(self, snapshot: AnalysisSnapshot) -> List[Recommendation]:
         """Анализ балансировки нагрузки"""
         recommendations = []
         
         # Найдем дисбаланс между исполнителями
-        end_date = utc_now()
-        start_date = end_date - timedelta(days=period_days)
-        
-        executor_loads = {}
-        shifts = self.db.query(Shift).filter(
-            Shift.start_time >= start_date
-        ).all()
-        
-        for shift in shifts:
-            executor_id = shift.user_id  # QA-02: Shift PK исполнителя — user_id, не executor_id
-            if executor_id:
-                if executor_id not in executor_loads:
-                    executor_loads[executor_id] = 0
-                executor_loads[executor_id] += shift.current_request_count or 0
-
-        if len(executor_loads) > 1:
-            loads = list(executor_loads.values())
+        if len(snapshot.executors) > 1:
+            loads = [e.request_load for e in snapshot.executors]
             avg_load = sum(loads) / len(loads)
             max_load = max(loads)
             min_load = min(loads)
@@ -214,33 +306,17 @@ class RecommendationEngine:
         
         return recommendations
     
-    async def _analyze_performance_issues(self, period_days: int) -> List[Recommendation]:
+    async def _analyze_performance_issues(self, snapshot: AnalysisSnapshot) -> List[Recommendation]:
         """Анализ проблем производительности"""
         recommendations = []
         
         # Поиск исполнителей с низкой производительностью
-        end_date = utc_now()
-        start_date = end_date - timedelta(days=period_days)
-        
-        shifts = self.db.query(Shift).filter(
-            and_(
-                Shift.start_time >= start_date,
-                Shift.efficiency_score.isnot(None)
-            )
-        ).all()
-        
-        executor_performance = {}
-        for shift in shifts:
-            if shift.user_id:  # QA-02: user_id вместо несуществующего executor_id
-                if shift.user_id not in executor_performance:
-                    executor_performance[shift.user_id] = []
-                executor_performance[shift.user_id].append(shift.efficiency_score)
-        
-        low_performers = []
-        for executor_id, scores in executor_performance.items():
-            avg_score = sum(scores) / len(scores)
-            if avg_score < 65 and len(scores) >= 3:  # Минимум 3 смены для статистики
-                low_performers.append((executor_id, avg_score))
+        low_performers = [
+            (e.user_id, e.avg_efficiency)
+            for e in snapshot.executors
+            # Минимум 3 смены для статистики
+            if e.scored_shifts >= 3 and e.avg_efficiency is not None and e.avg_efficiency < 65
+        ]
         
         if low_performers:
             recommendations.append(Recommendation(
@@ -264,12 +340,12 @@ class RecommendationEngine:
         
         return recommendations
     
-    async def _analyze_capacity_planning(self, period_days: int) -> List[Recommendation]:
+    async def _analyze_capacity_planning(self, snapshot: AnalysisSnapshot) -> List[Recommendation]:
         """Анализ планирования мощности"""
         recommendations = []
         
         # Анализ трендов загрузки
-        daily_loads = await self._get_daily_load_trend(period_days)
+        daily_loads = list(snapshot.daily_loads)
         if daily_loads:
             trend = self._calculate_trend(daily_loads)
             
@@ -294,25 +370,13 @@ class RecommendationEngine:
         
         return recommendations
     
-    async def _analyze_quality_enhancement(self, period_days: int) -> List[Recommendation]:
+    async def _analyze_quality_enhancement(self, snapshot: AnalysisSnapshot) -> List[Recommendation]:
         """Анализ улучшения качества"""
         recommendations = []
         
-        end_date = utc_now()
-        start_date = end_date - timedelta(days=period_days)
-        
         # Анализ рейтингов качества
-        quality_ratings = self.db.query(Shift.quality_rating).filter(
-            and_(
-                Shift.start_time >= start_date,
-                Shift.quality_rating.isnot(None)
-            )
-        ).all()
-        
-        if quality_ratings:
-            ratings = [r[0] for r in quality_ratings]
-            avg_quality = sum(ratings) / len(ratings)
-            
+        avg_quality = snapshot.avg_quality
+        if avg_quality is not None:
             if avg_quality < 4.0:  # Ниже "хорошо"
                 recommendations.append(Recommendation(
                     id="quality_001",
@@ -335,24 +399,13 @@ class RecommendationEngine:
         
         return recommendations
     
-    async def _identify_bottlenecks(self, period_days: int) -> List[Recommendation]:
+    async def _identify_bottlenecks(self, snapshot: AnalysisSnapshot) -> List[Recommendation]:
         """Идентификация узких мест"""
         recommendations = []
         
         # Анализ времени отклика
-        end_date = utc_now()
-        start_date = end_date - timedelta(days=period_days)
-        
-        slow_shifts = self.db.query(Shift).filter(
-            and_(
-                Shift.start_time >= start_date,
-                Shift.average_response_time > 180  # Больше 3 часов
-            )
-        ).count()
-        
-        total_shifts = self.db.query(Shift).filter(
-            Shift.start_time >= start_date
-        ).count()
+        slow_shifts = snapshot.slow_shifts
+        total_shifts = snapshot.total_shifts
         
         if total_shifts > 0 and (slow_shifts / total_shifts) > 0.3:  # Более 30% медленных смен
             recommendations.append(Recommendation(
@@ -412,21 +465,44 @@ class RecommendationEngine:
     
     
     
-    async def _get_daily_load_trend(self, period_days: int) -> List[int]:
-        """Получить тренд дневной нагрузки (по бизнес-дням, ARCH-135(б))"""
-        end_date = business_today()
-        daily_loads = []
+    def _daily_request_counts(self, period_days: int) -> List[int]:
+        """Заявки по бизнес-дням окна одним запросом, от старых к новым.
+
+        Postgres: generate_series по дням окна, границы дня — timezone()
+        бизнес-зоны (то же окно, что business_day_window, включая переходы
+        на летнее время), LEFT JOIN даёт нули пустым дням. Остальные диалекты
+        (SQLite dev/тесты) не умеют зоны — день заявки считает CASE по
+        границам из business_day_window.
+        """
+        if period_days <= 0:
+            return []
+        last_day = business_today()
+        first_day = last_day - timedelta(days=period_days - 1)
 
-        for i in range(period_days):
-            date_to_check = end_date - timedelta(days=i)
-            day_start, day_end = business_day_window(date_to_check)
-            daily_count = self.db.query(Request).filter(
-                Request.created_at >= day_start,
-                Request.created_at < day_end,
-            ).count()
-            daily_loads.append(daily_count)
+        if self.db.get_bind().dialect.name == "postgresql":
+            rows = self.db.execute(text(
+                "SELECT d.day::date AS day, count(r.request_number) AS n "
+                "FROM generate_series(CAST(:first AS timestamp), CAST(:last AS timestamp), "
+                "interval '1 day') AS d(day) "
+                "LEFT JOIN requests r "
+                "ON r.created_at >= timezone(:tz, d.day) "
+                "AND r.created_at < timezone(:tz, d.day + interval '1 day') "
+                "GROUP BY d.day ORDER BY d.day"
+            ), {"first": first_day, "last": last_day, "tz": BUSINESS_TZ.key}).all()
+            return [int(n) for _, n in rows]
 
-        return list(reversed(daily_loads))  # От старых к новым
+        bounds = [business_day_window(first_day + timedelta(days=i))[0] for i in range(period_days)]
+        bounds.append(business_day_window(last_day)[1])
+        bucket = case(
+            *[(Request.created_at < bounds[i + 1], i) for i in range(period_days)]
+        )
+        counts = [0] * period_days
+        for index, n in self.db.query(bucket, func.count()).filter(
+            Request.created_at >= bounds[0],
+            Request.created_at < bounds[-1],
+        ).group_by(bucket):
+            counts[index] = n
+        return counts
     
     def _calculate_trend(self, values: List[int]) -> float:
         """Расчет тренда (простая линейная регрессия)"""
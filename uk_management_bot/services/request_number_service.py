@@ -18,24 +18,60 @@ DISPLAY_TZ канон показа (`utils/business_time.BUSINESS_TZ`) стал
 счётчики по прежним префиксам. Поэтому здесь СВОЯ прибитая REQUEST_NUMBER_TZ
 (менять после запуска нельзя). Имена `BUSINESS_TZ`/`business_today` остаются
 ре-экспортом для внешних потребителей, но генератор ими больше не пользуется.
+
+Блоки номеров. Инкремент строки дня в транзакции создания держал row-lock
+счётчика до commit'а всей вставки заявки, и всё создание заявок (бот, TWA API,
+group intake, колл-центр) выстраивалось в очередь на этой строке. Теперь
+процесс арендует у счётчика блок из ``REQUEST_NUMBER_BLOCK_SIZE`` номеров
+ОТДЕЛЬНОЙ короткой транзакцией (UPSERT ``last_seq + size``, сразу commit) и
+раздаёт номера из пула в памяти — лок счётчика держится только на время
+аренды. Аренда идёт через выделенный движок в одно соединение, а не через
+пул вызывающего: его транзакция уже держит соединение, и второе из того же
+пула при исчерпании пула взаимно блокировало бы держателей до pool_timeout.
+Аренды процесса выстраиваются в очередь на этом соединении. Цена:
+
+* дыры — неиспользованный остаток блока теряется при рестарте процесса и на
+  смене дня (не больше ``size - 1`` номеров на процесс), а номер, выданный
+  транзакции создания, которая затем откатилась, не возвращается в пул:
+  счётчик уже сдвинут арендой. Номера уникальны и монотонны в процессе, но
+  не сплошные;
+* номера разных процессов внутри дня не упорядочены по времени создания
+  (порядок списков — ``created_at``, номер — только тай-брейк).
+
+Смена дня строгая и только вперёд: префикс считается на каждую выдачу, пул
+переходит на более поздний префикс и сбрасывается; вызывающий, посчитавший
+префикс до полуночи и пришедший после, получает номер текущего дня, а не
+откатывает пул на вчерашний. Блоки выдаются только для «сегодня» на Engine
+не-SQLite; явная ``creation_date``, SQLite (писатель там и так один на всю
+БД) и ``REQUEST_NUMBER_BLOCK_SIZE=1`` — прежний инкремент в транзакции
+вызывающего.
 """
 import re
 import logging
+import threading
+import weakref
+from collections import deque
 from datetime import date
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import text
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from zoneinfo import ZoneInfo
 
+from uk_management_bot.config.settings import settings
 from uk_management_bot.utils.business_time import BUSINESS_TZ, business_today
 from uk_management_bot.utils.datetime_utils import utc_now
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["BUSINESS_TZ", "business_today", "RequestNumberService", "REQUEST_NUMBER_TZ"]
+__all__ = [
+    "BUSINESS_TZ", "business_today", "RequestNumberService", "REQUEST_NUMBER_TZ",
+    "REQUEST_NUMBER_BLOCK_SIZE", "reset_number_blocks",
+]
 
 # Часть идентификатора заявки (префикс YYMMDD). НЕ менять после запуска и НЕ
 # заменять на BUSINESS_TZ/DISPLAY_TZ — см. модульный докстринг (ARCH-137 B3).
@@ -47,11 +83,15 @@ def request_number_today() -> date:
     return utc_now().astimezone(REQUEST_NUMBER_TZ).date()
 
 
-# Атомарный счётчик дня. Self-seed: при отсутствии строки дня стартуем с
-# ЧИСЛОВОГО MAX(suffix) существующих заявок (+1) — покрывает заявки, созданные
-# старым кодом до переключения генератора (суффикс начинается с 8-й позиции:
-# префикс 'YYMMDD-' = 7 символов). Дальше — чистый инкремент: удаление заявки
-# с MAX-суффиксом НЕ приводит к повторной выдаче номера.
+# Номеров в блоке, который процесс арендует у счётчика дня (1 — без блоков).
+REQUEST_NUMBER_BLOCK_SIZE = settings.REQUEST_NUMBER_BLOCK_SIZE
+
+# Атомарный счётчик дня: сдвинуть last_seq на :size и вернуть новый last_seq —
+# выдан диапазон (last_seq - size, last_seq]. Self-seed: при отсутствии строки
+# дня стартуем с ЧИСЛОВОГО MAX(suffix) существующих заявок — покрывает заявки,
+# созданные старым кодом до переключения генератора (суффикс начинается с 8-й
+# позиции: префикс 'YYMMDD-' = 7 символов). Дальше — чистый инкремент:
+# удаление заявки с MAX-суффиксом НЕ приводит к повторной выдаче номера.
 # Работает на Postgres и SQLite (3.35+: ON CONFLICT + RETURNING).
 _NEXT_SEQ_SQL = text("""
     INSERT INTO request_number_counters (day_prefix, last_seq)
@@ -61,13 +101,113 @@ _NEXT_SEQ_SQL = text("""
             SELECT MAX(CAST(SUBSTR(request_number, 8) AS INTEGER))
             FROM requests
             WHERE request_number LIKE :pattern
-        ), 0) + 1
+        ), 0) + :size
     )
     ON CONFLICT (day_prefix)
-    DO UPDATE SET last_seq = request_number_counters.last_seq + 1
+    DO UPDATE SET last_seq = request_number_counters.last_seq + :size
     RETURNING last_seq
 """)
 
+
+class _NumberBlocks:
+    """Пул арендованных номеров процесса для одной БД (одного Engine).
+
+    Хранит диапазоны только текущего префикса: выдача с более поздним
+    префиксом сбрасывает пул (строгая смена дня), с более ранним — получает
+    текущий префикс пула (YYMMDD сравнимы как строки); блок устаревшего
+    префикса, пришедший после смены, отбрасывается. Несколько одновременных
+    аренд (две корутины увидели пустой пул) не теряют номеров — диапазоны
+    встают в очередь.
+
+    Выданный номер назад не принимается: если транзакция, взявшая его,
+    откатилась (ошибка вставки, отмена), номер пропадает — аренда блока уже
+    закоммичена отдельно. Поэтому дыры в нумерации дают не только остатки
+    блоков на выходе процесса, но и откаты.
+    """
+
+    def __init__(self, lease_engine=None) -> None:
+        self.lease_engine = lease_engine
+        self._lock = threading.Lock()
+        self._prefix: Optional[str] = None
+        self._ranges: deque = deque()  # [first, last] включительно
+
+    def take(self, prefix: str) -> tuple[str, Optional[int]]:
+        """(префикс, номер) из пула; номер None — нужна аренда под этот префикс."""
+        with self._lock:
+            if self._prefix is None or prefix > self._prefix:
+                self._prefix = prefix
+                self._ranges.clear()
+            while self._ranges:
+                block = self._ranges[0]
+                if block[0] <= block[1]:
+                    seq = block[0]
+                    block[0] += 1
+                    return self._prefix, seq
+                self._ranges.popleft()
+            return self._prefix, None
+
+    def put(self, prefix: str, first: int, last: int) -> None:
+        with self._lock:
+            if prefix == self._prefix:
+                self._ranges.append([first, last])
+
+    def close(self) -> None:
+        if isinstance(self.lease_engine, AsyncEngine):
+            # dispose() у AsyncEngine — корутина; пул просто отпускаем.
+            self.lease_engine.sync_engine.dispose(close=False)
+        elif self.lease_engine is not None:
+            self.lease_engine.dispose()
+
+
+def _lease_engine(engine):
+    """Движок аренды блоков: своё единственное соединение к той же БД.
+
+    Creator основного пула переиспользуется, чтобы connect_args (ssl,
+    search_path) совпадали с движком вызывающего.
+    """
+    if isinstance(engine, AsyncEngine):
+        pool = AsyncAdaptedQueuePool(
+            engine.sync_engine.pool._creator, pool_size=1, max_overflow=0,
+            recycle=3600, pre_ping=True,
+        )
+        return create_async_engine(engine.url, pool=pool)
+    pool = QueuePool(engine.pool._creator, pool_size=1, max_overflow=0, recycle=3600, pre_ping=True)
+    return create_engine(engine.url, pool=pool)
+
+
+# Пулы по Engine (у AsyncEngine — по его sync_engine): у каждой БД свой
+# счётчик, номер из блока одной БД в другой недействителен.
+_BLOCKS: "weakref.WeakKeyDictionary[Engine, _NumberBlocks]" = weakref.WeakKeyDictionary()
+_BLOCKS_LOCK = threading.Lock()
+
+
+def _blocks_for(engine) -> _NumberBlocks:
+    key = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    with _BLOCKS_LOCK:
+        blocks = _BLOCKS.get(key)
+        if blocks is None:
+            blocks = _BLOCKS[key] = _NumberBlocks(_lease_engine(engine))
+        return blocks
+
+
+def reset_number_blocks() -> None:
+    """Сбросить пулы процесса (тесты; ручная правка request_number_counters)."""
+    with _BLOCKS_LOCK:
+        pools = list(_BLOCKS.values())
+        _BLOCKS.clear()
+    for blocks in pools:
+        blocks.close()
+
+
+def _block_engine(bind, creation_date: Optional[date]):
+    """Engine для аренды блока или None — тогда инкремент в транзакции вызывающего."""
+    if creation_date is not None or REQUEST_NUMBER_BLOCK_SIZE == 1:
+        return None
+    if not isinstance(bind, (Engine, AsyncEngine)) or bind.dialect.name == "sqlite":
+        return None
+    return bind
+
+
 # BUG-122: single source of truth for the request-number shape. The sequence is
 # 3+ digits so a building can roll past 999 requests/day (YYMMDD-NNN+).
 # Consumers (media proxy, cancel/view callback matchers) build their patterns
@@ -88,35 +228,64 @@ class RequestNumberService:
         return f"{prefix}-{seq:03d}"
 
     @staticmethod
-    def _params(creation_date: Optional[date]) -> tuple[str, dict]:
+    def _params(creation_date: Optional[date], size: int = 1) -> tuple[str, dict]:
         prefix = (creation_date or request_number_today()).strftime("%y%m%d")
-        return prefix, {"prefix": prefix, "pattern": f"{prefix}-%"}
+        return prefix, RequestNumberService._prefix_params(prefix, size)
+
+    @staticmethod
+    def _prefix_params(prefix: str, size: int = 1) -> dict:
+        return {"prefix": prefix, "pattern": f"{prefix}-%", "size": size}
 
     @staticmethod
     def next_number(db: Session, creation_date: Optional[date] = None) -> str:
-        """Следующий номер заявки (sync). Вызывать в ТОЙ ЖЕ транзакции, что
-        и INSERT заявки, без сетевого I/O до commit — row-lock счётчика дня
-        держится до конца транзакции.
+        """Следующий номер заявки (sync).
+
+        Из блока процесса, если он есть (см. модульный докстринг); иначе
+        инкремент в ТОЙ ЖЕ транзакции, что и INSERT заявки, — тогда row-lock
+        счётчика дня держится до конца транзакции, и до commit'а не должно
+        быть сетевого I/O.
 
         Никаких fallback'ов: ошибка БД — это ошибка (time-fallback старой
         версии выдавал коллизионные номера и удалён).
         """
         if db is None:
             raise ValueError("next_number requires a database session")
+        engine = _block_engine(db.get_bind(), creation_date)
         prefix, params = RequestNumberService._params(creation_date)
-        seq = db.execute(_NEXT_SEQ_SQL, params).scalar_one()
+        if engine is None:
+            seq = db.execute(_NEXT_SEQ_SQL, params).scalar_one()
+        else:
+            blocks = _blocks_for(engine)
+            prefix, seq = blocks.take(prefix)
+            while seq is None:
+                params = RequestNumberService._prefix_params(prefix, REQUEST_NUMBER_BLOCK_SIZE)
+                with blocks.lease_engine.begin() as conn:
+                    last = conn.execute(_NEXT_SEQ_SQL, params).scalar_one()
+                blocks.put(prefix, last - REQUEST_NUMBER_BLOCK_SIZE + 1, last)
+                prefix, seq = blocks.take(prefix)
         number = RequestNumberService._format(prefix, seq)
         logger.info(f"Generated request number: {number}")
         return number
 
     @staticmethod
     async def next_number_async(db: AsyncSession, creation_date: Optional[date] = None) -> str:
-        """Async-вариант next_number — в переданной AsyncSession-транзакции."""
+        """Async-вариант next_number (блок процесса или транзакция вызывающего)."""
         if db is None:
             raise ValueError("next_number_async requires a database session")
+        engine = _block_engine(db.bind, creation_date)
         prefix, params = RequestNumberService._params(creation_date)
-        result = await db.execute(_NEXT_SEQ_SQL, params)
-        number = RequestNumberService._format(prefix, result.scalar_one())
+        if engine is None:
+            seq = (await db.execute(_NEXT_SEQ_SQL, params)).scalar_one()
+        else:
+            blocks = _blocks_for(engine)
+            prefix, seq = blocks.take(prefix)
+            while seq is None:
+                params = RequestNumberService._prefix_params(prefix, REQUEST_NUMBER_BLOCK_SIZE)
+                async with blocks.lease_engine.begin() as conn:
+                    last = (await conn.execute(_NEXT_SEQ_SQL, params)).scalar_one()
+                blocks.put(prefix, last - REQUEST_NUMBER_BLOCK_SIZE + 1, last)
+                prefix, seq = blocks.take(prefix)
+        number = RequestNumberService._format(prefix, seq)
         logger.info(f"Generated request number: {number}")
         return number
 
@@ -0,0 +1,194 @@
+"""
+Пересчёт проекции ``request_visibility`` — какие заявки видит исполнитель
+
+Правило то же, что раньше собирал на каждом вызове список заявок
+исполнителя (``api/requests/service.list_requests_rows``):
+
+* ``assignment`` — активное назначение с ``executor_id`` исполнителя;
+* ``group`` — активное групповое назначение на одну из его специализаций,
+  если у исполнителя есть смена в статусе ``active``;
+* ``executor`` — заявка с ``requests.executor_id`` исполнителя.
+
+Пересчёт — set-based и точечный: по набору заявок (смена назначения или
+исполнителя) или по набору исполнителей (смена/специализация влияют только
+на ``group``-строки). Зовут его ORM-хук ``models/request_visibility.py`` и
+workflow-раннер после массовых доменных операций над назначениями; сверка
+``find_drift``/``repair`` — для записи мимо ORM
+(``scripts/check_request_visibility.py``).
+"""
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from uk_management_bot.database.models.request import Request
+from uk_management_bot.database.models.request_assignment import RequestAssignment
+from uk_management_bot.database.models.request_visibility import (
+    VISIBILITY_ASSIGNMENT,
+    VISIBILITY_EXECUTOR,
+    VISIBILITY_GROUP,
+    RequestVisibility,
+)
+from uk_management_bot.database.models.shift import Shift
+from uk_management_bot.database.models.user import User
+
+logger = logging.getLogger(__name__)
+
+VisibilityKey = Tuple[int, str, str]  # (executor_id, request_number, reason)
+
+ALL_REASONS = (VISIBILITY_ASSIGNMENT, VISIBILITY_GROUP, VISIBILITY_EXECUTOR)
+
+
+def executor_specs(raw) -> List[str]:
+    """Специализации исполнителя в том виде, как их сопоставлял список заявок:
+    JSON-массив либо одиночная строка; битый JSON — строка целиком."""
+    if not raw:
+        return []
+    if isinstance(raw, str) and raw.startswith("["):
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            return [raw]
+        if isinstance(parsed, list):
+            return [spec for spec in parsed if isinstance(spec, str)]
+    return [raw]
+
+
+def _on_shift_specs(conn, executor_ids: Optional[Set[int]]) -> Dict[int, Set[str]]:
+    stmt = select(User.id, User.specialization).where(
+        User.id.in_(select(Shift.user_id).where(Shift.status == "active"))
+    )
+    if executor_ids is not None:
+        stmt = stmt.where(User.id.in_(executor_ids))
+    specs = {}
+    for user_id, raw in conn.execute(stmt):
+        parsed = set(executor_specs(raw))
+        if parsed:
+            specs[user_id] = parsed
+    return specs
+
+
+def expected_rows(
+    conn,
+    *,
+    request_numbers: Optional[Iterable[str]] = None,
+    executor_ids: Optional[Iterable[int]] = None,
+    reasons: Tuple[str, ...] = ALL_REASONS,
+) -> Set[VisibilityKey]:
+    """Строки проекции по правилу видимости; ``None`` в фильтре — без ограничения."""
+    numbers = set(request_numbers) if request_numbers is not None else None
+    executors = set(executor_ids) if executor_ids is not None else None
+    rows: Set[VisibilityKey] = set()
+
+    if VISIBILITY_ASSIGNMENT in reasons:
+        stmt = select(RequestAssignment.executor_id, RequestAssignment.request_number).where(
+            RequestAssignment.status == "active",
+            RequestAssignment.executor_id.is_not(None),
+        )
+        if numbers is not None:
+            stmt = stmt.where(RequestAssignment.request_number.in_(numbers))
+        if executors is not None:
+            stmt = stmt.where(RequestAssignment.executor_id.in_(executors))
+        rows.update((uid, number, VISIBILITY_ASSIGNMENT) for uid, number in conn.execute(stmt))
+
+    if VISIBILITY_EXECUTOR in reasons:
+        stmt = select(Request.executor_id, Request.request_number).where(
+            Request.executor_id.is_not(None)
+        )
+        if numbers is not None:
+            stmt = stmt.where(Request.request_number.in_(numbers))
+        if executors is not None:
+            stmt = stmt.where(Request.executor_id.in_(executors))
+        rows.update((uid, number, VISIBILITY_EXECUTOR) for uid, number in conn.execute(stmt))
+
+    if VISIBILITY_GROUP in reasons:
+        specs = _on_shift_specs(conn, executors)
+        wanted = set().union(*specs.values()) if specs else set()
+        if wanted:
+            stmt = select(RequestAssignment.request_number, RequestAssignment.group_specialization).where(
+                RequestAssignment.status == "active",
+                RequestAssignment.assignment_type == "group",
+                RequestAssignment.group_specialization.in_(wanted),
+            )
+            if numbers is not None:
+                stmt = stmt.where(RequestAssignment.request_number.in_(numbers))
+            for number, spec in conn.execute(stmt):
+                rows.update(
+                    (uid, number, VISIBILITY_GROUP) for uid, have in specs.items() if spec in have
+                )
+    return rows
+
+
+def _insert(conn, rows: Set[VisibilityKey]) -> None:
+    if rows:
+        conn.execute(
+            insert(RequestVisibility.__table__),
+            [{"executor_id": uid, "request_number": number, "reason": reason}
+             for uid, number, reason in sorted(rows)],
+        )
+
+
+def refresh_requests(conn: Connection, request_numbers: Iterable[str]) -> None:
+    """Переписать строки проекции заявок (назначение или исполнитель изменились)."""
+    numbers = set(request_numbers)
+    if not numbers:
+        return
+    table = RequestVisibility.__table__
+    conn.execute(delete(table).where(table.c.request_number.in_(numbers)))
+    _insert(conn, expected_rows(conn, request_numbers=numbers))
+
+
+def refresh_group_visibility(conn: Connection, executor_ids: Iterable[int]) -> None:
+    """Переписать ``group``-строки исполнителей (смена или специализация изменились)."""
+    executors = set(executor_ids)
+    if not executors:
+        return
+    table = RequestVisibility.__table__
+    conn.execute(
+        delete(table).where(table.c.executor_id.in_(executors), table.c.reason == VISIBILITY_GROUP)
+    )
+    _insert(conn, expected_rows(conn, executor_ids=executors, reasons=(VISIBILITY_GROUP,)))
+
+
+@dataclass
+class VisibilityDrift:
+    missing: List[VisibilityKey] = field(default_factory=list)  # по правилу видна, строки нет
+    extra: List[VisibilityKey] = field(default_factory=list)  # строка есть, правило не выполняется
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.extra
+
+
+def find_drift(db: Session) -> VisibilityDrift:
+    """Сравнить request_visibility с правилом видимости по всем заявкам."""
+    expected = expected_rows(db)
+    actual: Set[VisibilityKey] = set(
+        db.execute(
+            select(RequestVisibility.executor_id, RequestVisibility.request_number,
+                   RequestVisibility.reason)
+        ).tuples()
+    )
+    return VisibilityDrift(missing=sorted(expected - actual), extra=sorted(actual - expected))
+
+
+def repair(db: Session, drift: VisibilityDrift) -> int:
+    """Привести request_visibility к правилу; коммит — за вызывающим."""
+    if drift.extra:
+        db.execute(
+            delete(RequestVisibility).where(
+                tuple_(RequestVisibility.executor_id, RequestVisibility.request_number,
+                       RequestVisibility.reason).in_(drift.extra)
+            )
+        )
+    _insert(db, set(drift.missing))
+    fixed = len(drift.missing) + len(drift.extra)
+    if fixed:
+        logger.warning(
+            f"request_visibility repaired: {len(drift.missing)} missing, {len(drift.extra)} extra"
+        )
+    return fixed
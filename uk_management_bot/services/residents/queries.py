@@ -31,6 +31,7 @@ from uk_management_bot.database.models.user_verification import (
     UserDocument, UserVerification,
 )
 from uk_management_bot.database.models.yard import Yard
+from uk_management_bot.utils.auth_helpers import legacy_role_filter
 # Поиск по кириллице на проде работает только через эти хелперы — локаль
 # кластера `C` ломает голый ILIKE (см. докстринг `utils/sql_search`).
 from uk_management_bot.utils.sql_search import (
@@ -51,7 +52,7 @@ BELONGING_STATUSES = (
 def _resident_scope():
     """Общий WHERE «это житель»: роль applicant + не soft-deleted."""
     return (
-        User.roles.like(f'%"{RESIDENT_ROLE}"%'),
+        legacy_role_filter(RESIDENT_ROLE),
         User.deleted_at.is_(None),
     )
 
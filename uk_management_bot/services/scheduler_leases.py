@@ -0,0 +1,88 @@
+"""Lease'ы задач планировщика: один исполнитель тика на все реплики воркера.
+
+Перед тиком реплика пытается взять lease строки ``scheduler_job_leases``
+условным UPDATE — атомарно и на Postgres (READ COMMITTED перепроверяет WHERE
+после снятия блокировки строки конкурентом), и на sqlite тестов. Тик
+достаётся реплике, если:
+
+* lease свободен или протух (``expires_at`` в прошлом) — упавший владелец
+  держит задачу не дольше TTL;
+* с начала прошлого прогона (``acquired_at``) прошло не меньше ``min_gap`` —
+  реплики с разной фазой интервального триггера (или с расходящимися на
+  секунды часами у cron) не исполняют один и тот же период дважды. Считаем
+  от старта, а не от завершения: иначе job, идущий дольше ``interval -
+  min_gap``, пропускал бы каждый второй тик.
+
+Пока job идёт, владелец продлевает ``expires_at`` (``renew_lease``), по
+завершении — ``release_lease`` (lease свободен, ``finished_at`` = сейчас).
+Функции синхронные и коммитят сами: планировщик зовёт их из своего
+lease-потока на короткой собственной сессии (``ShiftScheduler._lease_call``).
+"""
+import os
+import socket
+from datetime import timedelta
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from uk_management_bot.database.models.scheduler_job_lease import SchedulerJobLease
+from uk_management_bot.utils.datetime_utils import utc_now
+
+# Идентификатор реплики в lease'ах; по умолчанию hostname:pid (в compose
+# hostname = id контейнера, то есть разный у реплик).
+SCHEDULER_WORKER_ID = os.getenv("SCHEDULER_WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _ensure_row(db: Session, job_id: str) -> None:
+    if db.get(SchedulerJobLease, job_id) is not None:
+        return
+    try:
+        with db.begin_nested():
+            db.add(SchedulerJobLease(job_id=job_id))
+    except IntegrityError:
+        # Строку только что создала другая реплика — тоже годится.
+        pass
+
+
+def try_acquire_lease(db: Session, job_id: str, owner: str, ttl: timedelta, min_gap: timedelta) -> bool:
+    """Взять lease на тик ``job_id``; False — тик исполняет (или только что исполнил) другой."""
+    _ensure_row(db, job_id)
+    now = utc_now()
+    result = db.execute(
+        update(SchedulerJobLease)
+        .where(
+            SchedulerJobLease.job_id == job_id,
+            or_(SchedulerJobLease.expires_at.is_(None), SchedulerJobLease.expires_at <= now),
+            or_(SchedulerJobLease.acquired_at.is_(None), SchedulerJobLease.acquired_at <= now - min_gap),
+        )
+        .values(owner=owner, acquired_at=now, expires_at=now + ttl)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def renew_lease(db: Session, job_id: str, owner: str, ttl: timedelta) -> bool:
+    """Продлить свой lease; False — lease протух и его забрала другая реплика."""
+    result = db.execute(
+        update(SchedulerJobLease)
+        .where(SchedulerJobLease.job_id == job_id, SchedulerJobLease.owner == owner)
+        .values(expires_at=utc_now() + ttl)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def release_lease(db: Session, job_id: str, owner: str) -> None:
+    """Освободить lease после тика (только свой) и отметить время завершения."""
+    now = utc_now()
+    db.execute(
+        update(SchedulerJobLease)
+        .where(SchedulerJobLease.job_id == job_id, SchedulerJobLease.owner == owner)
+        .values(expires_at=now, finished_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
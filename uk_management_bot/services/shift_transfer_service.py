@@ -408,7 +408,7 @@ class ShiftTransferService:
         Фильтр в Python ПОСЛЕ выборки → ``limit`` применяем после него.
         """
         users = self.db.query(User).filter(
-            User.roles.contains("executor"),
+            legacy_role_filter("executor"),
             User.status == "approved",
             User.id != exclude_user_id,
         ).order_by(User.first_name).all()
@@ -16,7 +16,7 @@ from sqlalchemy.orm import Session
 from uk_management_bot.database.models.user import User
 from uk_management_bot.database.models.audit import AuditLog
 from uk_management_bot.utils.helpers import get_text
-from uk_management_bot.utils.auth_helpers import parse_roles_safe
+from uk_management_bot.utils.auth_helpers import legacy_role_filter, parse_roles_safe
 from uk_management_bot.utils.specializations import parse_specializations
 from uk_management_bot.constants.specializations import CANONICAL_SPECIALIZATIONS
 
@@ -223,7 +223,7 @@ class SpecializationService:
             stats = {}
             
             # Получаем всех исполнителей
-            executors = self.db.query(User).filter(User.roles.contains('executor')).all()
+            executors = self.db.query(User).filter(legacy_role_filter('executor')).all()
             
             # Подсчитываем количество по каждой специализации
             for spec in self.AVAILABLE_SPECIALIZATIONS:
@@ -251,7 +251,7 @@ class SpecializationService:
             detailed_stats = {}
             
             # Получаем всех исполнителей
-            executors = self.db.query(User).filter(User.roles.contains('executor')).all()
+            executors = self.db.query(User).filter(legacy_role_filter('executor')).all()
             
             # Инициализируем структуру для каждой специализации
             for spec in self.AVAILABLE_SPECIALIZATIONS:
@@ -305,7 +305,7 @@ class SpecializationService:
             
             # Ищем исполнителей с данной специализацией
             query = self.db.query(User).filter(
-                User.roles.contains('executor'),
+                legacy_role_filter('executor'),
                 User.specialization.contains(specialization)
             ).order_by(User.status.desc(), User.created_at.desc())
             
@@ -443,7 +443,7 @@ class SpecializationService:
                 return []
             
             return self.db.query(User).filter(
-                User.roles.contains('executor'),
+                legacy_role_filter('executor'),
                 User.specialization.contains(specialization),
                 User.status == 'approved'  # Только одобренные
             ).all()
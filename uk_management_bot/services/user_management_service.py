@@ -12,7 +12,7 @@ import json
 import logging
 from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import and_
 
 from uk_management_bot.database.models.user import User
 from uk_management_bot.utils.auth_helpers import legacy_role_filter, parse_roles_safe
@@ -39,53 +39,31 @@ class UserManagementService:
         """
         try:
             # Статистика жителей (заявителей) по статусам
-            # Поддерживаем как новую систему ролей (JSON), так и старую (role поле)
+            # Роли — через индекс user_roles (legacy_role_filter)
             residents_pending = self.db.query(User).filter(
                 and_(
                     User.status == 'pending',
-                    or_(
-                        User.roles.contains('applicant'),
-                        and_(
-                            or_(User.roles.is_(None), User.roles == ''),
-                            legacy_role_filter('applicant')
-                        )
-                    )
+                    legacy_role_filter('applicant')
                 )
             ).count()
             
             residents_approved = self.db.query(User).filter(
                 and_(
                     User.status == 'approved',
-                    or_(
-                        User.roles.contains('applicant'),
-                        and_(
-                            or_(User.roles.is_(None), User.roles == ''),
-                            legacy_role_filter('applicant')
-                        )
-                    )
+                    legacy_role_filter('applicant')
                 )
             ).count()
             
             residents_blocked = self.db.query(User).filter(
                 and_(
                     User.status == 'blocked',
-                    or_(
-                        User.roles.contains('applicant'),
-                        and_(
-                            or_(User.roles.is_(None), User.roles == ''),
-                            legacy_role_filter('applicant')
-                        )
-                    )
+                    legacy_role_filter('applicant')
                 )
             ).count()
             
             # Подсчет сотрудников (executor, manager или inspector)
             staff_count = self.db.query(User).filter(
-                or_(
-                    User.roles.contains('executor'),
-                    User.roles.contains('manager'),
-                    User.roles.contains('inspector')
-                )
+                legacy_role_filter('executor', 'manager', 'inspector')
             ).count()
             
             # Общее количество пользователей
@@ -123,18 +101,10 @@ class UserManagementService:
         """
         try:
             # Сотрудники в ожидании (executor или manager со статусом pending)
-            # Проверяем оба поля: role (старая система) и roles (новая система)
             pending_employees = self.db.query(User).filter(
                 and_(
                     User.status == 'pending',
-                    or_(
-                        User.roles.like('%"executor"%'),
-                        User.roles.like('%"manager"%'),
-                        User.roles.like('%"inspector"%'),
-                        legacy_role_filter('executor'),
-                        legacy_role_filter('manager'),
-                        legacy_role_filter('inspector')
-                    )
+                    legacy_role_filter('executor', 'manager', 'inspector')
                 )
             ).count()
 
@@ -142,14 +112,7 @@ class UserManagementService:
             active_employees = self.db.query(User).filter(
                 and_(
                     User.status == 'approved',
-                    or_(
-                        User.roles.like('%"executor"%'),
-                        User.roles.like('%"manager"%'),
-                        User.roles.like('%"inspector"%'),
-                        legacy_role_filter('executor'),
-                        legacy_role_filter('manager'),
-                        legacy_role_filter('inspector')
-                    )
+                    legacy_role_filter('executor', 'manager', 'inspector')
                 )
             ).count()
 
@@ -157,31 +120,18 @@ class UserManagementService:
             blocked_employees = self.db.query(User).filter(
                 and_(
                     User.status == 'blocked',
-                    or_(
-                        User.roles.like('%"executor"%'),
-                        User.roles.like('%"manager"%'),
-                        User.roles.like('%"inspector"%'),
-                        legacy_role_filter('executor'),
-                        legacy_role_filter('manager'),
-                        legacy_role_filter('inspector')
-                    )
+                    legacy_role_filter('executor', 'manager', 'inspector')
                 )
             ).count()
 
             # Исполнители (executor)
             executors = self.db.query(User).filter(
-                or_(
-                    User.roles.like('%"executor"%'),
-                    legacy_role_filter('executor')
-                )
+                legacy_role_filter('executor')
             ).count()
 
             # Менеджеры (manager)
             managers = self.db.query(User).filter(
-                or_(
-                    User.roles.like('%"manager"%'),
-                    legacy_role_filter('manager')
-                )
+                legacy_role_filter('manager')
             ).count()
             
             stats = {
@@ -225,19 +175,11 @@ class UserManagementService:
             # Базовый запрос: только жители (applicant)
             # CODE-05: роли 'resident' не существует в USER_ROLES — мёртвая ветка удалена.
             # Исключаем пользователей, которые являются только сотрудниками
-            # Поддерживаем как новую систему ролей (JSON), так и старую (role поле)
+            # Роли — через индекс user_roles (legacy_role_filter)
             query = self.db.query(User).filter(
                 and_(
                     User.status == status,
-                    or_(
-                        # Новая система ролей (JSON поле roles)
-                        User.roles.contains('applicant'),
-                        # Старая система ролей (поле role) - для обратной совместимости
-                        and_(
-                            or_(User.roles.is_(None), User.roles == ''),
-                            legacy_role_filter('applicant')
-                        )
-                    )
+                    legacy_role_filter('applicant')
                 )
             )
             
@@ -312,11 +254,7 @@ class UserManagementService:
             # Запрос сотрудников (executor, manager или inspector)
             # Включаем всех сотрудников, независимо от других ролей
             query = self.db.query(User).filter(
-                or_(
-                    User.roles.contains('executor'),
-                    User.roles.contains('manager'),
-                    User.roles.contains('inspector')
-                )
+                legacy_role_filter('executor', 'manager', 'inspector')
             )
             
             # Сортировка по активности (approved сначала)
@@ -392,7 +330,7 @@ class UserManagementService:
                     db_query = db_query.filter(User.status == filters['status'])
                 
                 if filters.get('role'):
-                    db_query = db_query.filter(User.roles.contains(filters['role']))
+                    db_query = db_query.filter(legacy_role_filter(filters['role']))
                 
                 if filters.get('specialization'):
                     db_query = db_query.filter(User.specialization.contains(filters['specialization']))
@@ -448,13 +386,7 @@ class UserManagementService:
                 self.db.query(User)
                 .filter(
                     and_(
-                        or_(
-                            User.roles.contains('applicant'),
-                            and_(
-                                or_(User.roles.is_(None), User.roles == ''),
-                                legacy_role_filter('applicant'),
-                            ),
-                        ),
+                        legacy_role_filter('applicant'),
                         ci_contains_any(
                             (User.first_name, User.last_name,
                              User.username, User.phone),
@@ -661,16 +593,8 @@ class UserManagementService:
         """
         try:
             # Базовый запрос для сотрудников (executor, manager или inspector)
-            # Проверяем оба поля: role (старая система) и roles (новая система)
             base_query = self.db.query(User).filter(
-                or_(
-                    User.roles.like('%"executor"%'),
-                    User.roles.like('%"manager"%'),
-                    User.roles.like('%"inspector"%'),
-                    legacy_role_filter('executor'),
-                    legacy_role_filter('manager'),
-                    legacy_role_filter('inspector')
-                )
+                legacy_role_filter('executor', 'manager', 'inspector')
             )
 
             # Применяем фильтры в зависимости от типа списка
@@ -682,17 +606,11 @@ class UserManagementService:
                 query = base_query.filter(User.status == 'blocked')
             elif list_type == 'executors':
                 query = base_query.filter(
-                    or_(
-                        User.roles.like('%"executor"%'),
-                        legacy_role_filter('executor')
-                    )
+                    legacy_role_filter('executor')
                 )
             elif list_type == 'managers':
                 query = base_query.filter(
-                    or_(
-                        User.roles.like('%"manager"%'),
-                        legacy_role_filter('manager')
-                    )
+                    legacy_role_filter('manager')
                 )
             else:
                 query = base_query
@@ -740,16 +658,8 @@ class UserManagementService:
         """
         try:
             # Базовый запрос для сотрудников
-            # Проверяем оба поля: role (старая система) и roles (новая система)
             base_query = self.db.query(User).filter(
-                or_(
-                    User.roles.like('%"executor"%'),
-                    User.roles.like('%"manager"%'),
-                    User.roles.like('%"inspector"%'),
-                    legacy_role_filter('executor'),
-                    legacy_role_filter('manager'),
-                    legacy_role_filter('inspector')
-                )
+                legacy_role_filter('executor', 'manager', 'inspector')
             )
 
             # Поиск по имени, фамилии, username или телефону
@@ -0,0 +1,72 @@
+"""
+Сверка индекса ролей ``user_roles`` с источником истины ``User.roles``
+
+ORM-хук (models/user_role.py) держит индекс в актуальном состоянии при
+обычной записи; расхождение появляется только от записи мимо ORM (массовый
+``update(User)``, ручной SQL, восстановление из бэкапа одной таблицы). Тогда
+фильтры по ролям (``auth_helpers.legacy_role_filter``) молча теряют или
+находят лишних пользователей — отсюда периодическая/ручная сверка
+``scripts/check_user_roles.py``.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import List, Set, Tuple
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from uk_management_bot.database.models.user import User
+from uk_management_bot.database.models.user_role import UserRole, role_rows
+
+logger = logging.getLogger(__name__)
+
+RoleKey = Tuple[int, str]
+
+
+@dataclass
+class RoleIndexDrift:
+    missing: List[RoleKey] = field(default_factory=list)  # роль в users.roles, строки нет
+    extra: List[RoleKey] = field(default_factory=list)  # строка есть, роли в users.roles нет
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.extra
+
+
+def find_drift(db: Session, batch_size: int = 5000) -> RoleIndexDrift:
+    """Сравнить user_roles с разбором ``User.roles`` по всем пользователям."""
+    expected: Set[RoleKey] = set()
+    users = db.execute(
+        select(User.id, User.roles).execution_options(yield_per=batch_size)
+    )
+    for user_id, roles in users:
+        expected.update((row["user_id"], row["role"]) for row in role_rows(user_id, roles))
+
+    actual: Set[RoleKey] = set(
+        db.execute(
+            select(UserRole.user_id, UserRole.role).execution_options(yield_per=batch_size)
+        ).tuples()
+    )
+    return RoleIndexDrift(
+        missing=sorted(expected - actual),
+        extra=sorted(actual - expected),
+    )
+
+
+def repair(db: Session, drift: RoleIndexDrift) -> int:
+    """Привести user_roles к ``User.roles``; коммит — за вызывающим."""
+    if drift.extra:
+        db.execute(
+            delete(UserRole).where(tuple_(UserRole.user_id, UserRole.role).in_(drift.extra))
+        )
+    if drift.missing:
+        db.execute(
+            insert(UserRole),
+            [{"user_id": user_id, "role": role} for user_id, role in drift.missing],
+        )
+    fixed = len(drift.missing) + len(drift.extra)
+    if fixed:
+        logger.warning(
+            f"user_roles repaired: {len(drift.missing)} missing, {len(drift.extra)} extra"
+        )
+    return fixed
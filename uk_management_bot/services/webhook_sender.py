@@ -17,6 +17,7 @@ from sqlalchemy.orm import Session
 
 from uk_management_bot.config.settings import settings
 from uk_management_bot.database.models.webhook_outbox import WebhookOutbox
+from uk_management_bot.integrations.http_clients import UPSTREAM_INFRASAFE_WEBHOOK, get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -467,10 +468,12 @@ async def process_outbox() -> None:
                     f"{base_url}{claim['endpoint']}", claim["payload"], secret, client
                 )
 
-        async with httpx.AsyncClient() as client:
-            results = await asyncio.gather(
-                *(_deliver(c, client) for c in claims), return_exceptions=True
-            )
+        # Общий клиент вебхуков (integrations/http_clients.py): keep-alive между
+        # батчами, а не новое TLS-соединение на каждый тик.
+        client = get_http_client(UPSTREAM_INFRASAFE_WEBHOOK)
+        results = await asyncio.gather(
+            *(_deliver(c, client) for c in claims), return_exceptions=True
+        )
 
         # ── Фаза 3: финализация новой транзакцией, CAS по claim_token ──
         async with AsyncSessionLocal() as db:
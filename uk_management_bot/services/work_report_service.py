@@ -12,7 +12,7 @@
 * ``saga.py`` — `publish_report`, `unpublish_report`, `reject_report`,
   `reopen_report`;
 * ``previews.py`` — `warm_report_previews`, `warm_recent_previews`;
-* ``autopublish.py`` — `autopublish_ready_drafts`;
+* ``autopublish.py`` — `autopublish_ready_drafts`, `autopublish_backlog`;
 * ``reconcile.py`` — `reconcile_publication_locks`.
 
 Этот модуль остаётся ЕДИНСТВЕННОЙ публичной точкой входа: колл-сайты и тесты
@@ -31,6 +31,7 @@ from uk_management_bot.services.work_reports.addressing import (
 from uk_management_bot.services.work_reports.autopublish import (
     _AUTOPUBLISH_BATCH_LIMIT,
     _AUTOPUBLISH_TIME_BUDGET_SECONDS,
+    autopublish_backlog,
     autopublish_ready_drafts,
 )
 from uk_management_bot.services.work_reports.errors import (
@@ -116,6 +117,7 @@ __all__ = [
     "_WARM_CHUNK",
     # autopublish.py
     "autopublish_ready_drafts",
+    "autopublish_backlog",
     "_AUTOPUBLISH_BATCH_LIMIT",
     "_AUTOPUBLISH_TIME_BUDGET_SECONDS",
     # reconcile.py
@@ -41,7 +41,8 @@
 * ``sync.py`` — `sync_pending_drafts` + `revoke_stale_publications`;
 * ``saga.py`` — publish/unpublish/reject/reopen;
 * ``previews.py`` — прогрев превью;
-* ``autopublish.py`` — `autopublish_ready_drafts`;
+* ``autopublish.py`` — `autopublish_ready_drafts` (конвейер с lease и
+  возобновлением, миграция 024), `autopublish_backlog`;
 * ``reconcile.py`` — `reconcile_publication_locks`.
 
 Публичная точка входа — ПО-ПРЕЖНЕМУ фасад
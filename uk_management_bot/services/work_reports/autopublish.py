@@ -1,23 +1,46 @@
 """Режим «без модерации»: `autopublish_ready_drafts` — дозаполнить черновики
-медиа и опубликовать готовые через ту же сагу `publish_report`."""
+медиа и опубликовать готовые через ту же сагу `publish_report`.
 
+Конвейер (миграция 024): захват черновиков lease'ом под FOR UPDATE SKIP
+LOCKED → параллельный подбор медиа → параллельная публикация под потолком
+медиа/с. Прогресс лежит в строке отчёта, поэтому тик, не уложившийся в
+бюджет, продолжает со следующего, а не начинает заново."""
+
+import asyncio
 import logging
 import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from uk_management_bot.api.board_config.service import load_board_config
+from uk_management_bot.config.settings import settings
 from uk_management_bot.database.models.work_report import WorkReport
 
 logger = logging.getLogger(__name__)
 
-_AUTOPUBLISH_BATCH_LIMIT = 20
+# Пакет захвата. Публикации идут параллельно (на PG), поэтому окно шире
+# прежних 20 последовательных: бюджет времени всё равно ограничивает тик.
+_AUTOPUBLISH_BATCH_LIMIT = 50
 # AUD6-P1-3: потолок времени на пакет автопубликации. При деградировавшем
 # media-service каждый отчёт может стоить до ~90 с сетевых таймаутов — без
-# потолка пакет из 20 растягивался на десятки минут внутри /sync и тика.
+# потолка пакет растягивался на десятки минут внутри /sync и тика.
 _AUTOPUBLISH_TIME_BUDGET_SECONDS = 60.0
+# Lease захвата: бюджет + хвост публикации, начатой перед самым дедлайном.
+# Протухший lease (процесс упал посреди пакета) снимается сам — черновик
+# берёт следующий тик.
+_AUTOPUBLISH_LEASE_SECONDS = 300
+# Backoff после неудачи: 1, 2, 4 … минут, не больше часа. Без него черновик,
+# на котором стабильно падает media-service, занимал голову очереди каждого
+# тика.
+_AUTOPUBLISH_BACKOFF_BASE_SECONDS = 60
+_AUTOPUBLISH_BACKOFF_MAX_SECONDS = 3600
+# Сколько живёт отметка «медиа подобраны»: старше — подбор повторяется, чтобы
+# не публиковать выборку, сделанную до того, как исполнитель дослал фото.
+_AUTOPUBLISH_READY_TTL_SECONDS = 1800
 
 
 def _svc():
@@ -30,6 +53,233 @@ def _svc():
     return work_report_service
 
 
+@dataclass
+class _Claim:
+    """Снапшот захваченного черновика: всё, что конвейеру нужно вне сессии."""
+
+    id: int
+    request_number: str
+    attempts: int
+    resume: bool = False
+    media_count: int = 0
+
+
+class _MediaRateLimiter:
+    """Потолок медиа в секунду на процесс.
+
+    Каждая публикация греет превью всех своих фото (`warm_report_previews`),
+    а прогрев одного фото — скачивание файла из Telegram тем же токеном бота,
+    которым бот отвечает жителям. Параллельные публикации без потолка
+    выбирали бы лимит Bot API разом, и 429 получал бы сам бот. Слоты выдаются
+    по очереди: вызов резервирует `cost / rate` секунд и ждёт своего начала.
+    """
+
+    def __init__(self, per_second: float):
+        self._interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, cost: int) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + max(cost, 1) * self._interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+_limiter: Optional[_MediaRateLimiter] = None
+
+
+def _media_limiter() -> _MediaRateLimiter:
+    """Один лимитер на процесс: /sync менеджера и тик бота тратят один и тот
+    же лимит Telegram. Создаётся лениво — asyncio.Lock вне цикла событий
+    создавать нельзя."""
+    global _limiter
+    if _limiter is None:
+        _limiter = _MediaRateLimiter(settings.WORK_REPORTS_AUTOPUBLISH_MEDIA_PER_SECOND)
+    return _limiter
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite отдаёт naive datetime, Postgres — aware.
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _backoff(attempts: int) -> timedelta:
+    seconds = _AUTOPUBLISH_BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, _AUTOPUBLISH_BACKOFF_MAX_SECONDS))
+
+
+async def _claim(
+    db: AsyncSession, pending_clause, category_clause, lease_until: datetime, now: datetime
+) -> list[_Claim]:
+    """Захват пакета короткой транзакцией.
+
+    FOR UPDATE SKIP LOCKED + lease (паттерн `webhook_sender._claimable_stmt`):
+    /sync менеджера и тик бота, пришедшие одновременно, берут дизъюнктные
+    черновики, а row-лок живёт до commit'а захвата, НЕ на время сети
+    (AUD6-P1-3). Черновик с живым lease или backoff пропускается.
+    """
+    stmt = select(WorkReport).where(
+        pending_clause,
+        or_(
+            WorkReport.autopublish_claimed_until.is_(None),
+            WorkReport.autopublish_claimed_until <= now,
+        ),
+    )
+    if category_clause is not None:
+        stmt = stmt.where(category_clause)
+    rows = (
+        await db.execute(
+            stmt.order_by(WorkReport.created_at, WorkReport.id)
+            .limit(_svc()._AUTOPUBLISH_BATCH_LIMIT)
+            .with_for_update(skip_locked=True)
+        )
+    ).scalars().all()
+
+    ready_cutoff = now - timedelta(seconds=_AUTOPUBLISH_READY_TTL_SECONDS)
+    claims: list[_Claim] = []
+    for row in rows:
+        ready_at = _as_utc(row.autopublish_ready_at)
+        resume = (
+            row.status == "pending"
+            and bool(row.after_media_ids)
+            and ready_at is not None
+            and ready_at > ready_cutoff
+        )
+        claims.append(_Claim(
+            id=row.id,
+            request_number=row.request_number,
+            attempts=row.autopublish_attempts or 0,
+            resume=resume,
+            media_count=len(row.before_media_ids or []) + len(row.after_media_ids or []),
+        ))
+        row.autopublish_claimed_until = lease_until
+    await db.commit()
+    return claims
+
+
+async def _prefetch(media_client: Any, claims: list[_Claim], deadline: float) -> dict:
+    """Подбор медиа для пакета параллельно (только сеть, БД не трогает).
+
+    Возвращает {report_id: (before_ids, after_ids) | Exception}; черновики,
+    не успевшие до дедлайна, в ответ не попадают — их подберёт следующий тик.
+    """
+    if not claims:
+        return {}
+    semaphore = asyncio.Semaphore(max(1, settings.WORK_REPORTS_AUTOPUBLISH_PREFETCH_CONCURRENCY))
+
+    async def _one(claim: _Claim):
+        async with semaphore:
+            return await _svc().fetch_media_selection(media_client, claim.request_number)
+
+    tasks = {asyncio.ensure_future(_one(claim)): claim for claim in claims}
+    done, unfinished = await asyncio.wait(
+        tasks, timeout=max(0.0, deadline - time.monotonic())
+    )
+    for task in unfinished:
+        task.cancel()
+    if unfinished:
+        await asyncio.gather(*unfinished, return_exceptions=True)
+        logger.warning(
+            "autopublish: бюджет времени пакета исчерпан на автозаполнении — "
+            "обработано %d из %d кандидатов", len(done), len(claims),
+        )
+    # fetch ходит в media-service, а его клиент бросает на любой не-2xx
+    # (`raise_for_status`) и на транспортных сбоях. Исключение остаётся
+    # результатом своего отчёта и не роняет пакет, а с ним и весь POST /sync.
+    return {tasks[task].id: task.exception() or task.result() for task in done}
+
+
+async def _publish_ready(
+    db: AsyncSession,
+    media_client: Any,
+    ready: list[_Claim],
+    triggered_by: Optional[int],
+    deadline: float,
+) -> dict:
+    """Публикация готовых отчётов с ограниченным параллелизмом.
+
+    Каждая параллельная публикация — в СВОЕЙ сессии: AsyncSession не
+    допускает конкурентного использования, а сага коммитит по шагам. На
+    SQLite писатель один на всю БД (и тестовая in-memory БД — одно
+    соединение), поэтому там публикации идут по одной в сессии вызывающего.
+
+    Возвращает {report_id: True | Exception | None}; None — до публикации не
+    дошло (бюджет исчерпан), отметка готовности остаётся для следующего тика.
+    """
+    bind = db.bind
+    parallel = bind is not None and bind.dialect.name != "sqlite"
+    factory = async_sessionmaker(bind, expire_on_commit=False) if parallel else None
+    semaphore = asyncio.Semaphore(
+        max(1, settings.WORK_REPORTS_AUTOPUBLISH_CONCURRENCY) if parallel else 1
+    )
+    limiter = _media_limiter()
+
+    async def _one(claim: _Claim):
+        async with semaphore:
+            if time.monotonic() > deadline:
+                return None
+            await limiter.acquire(claim.media_count)
+            # Широкий except по той же причине, что и у подбора медиа:
+            # publish_report берёт publication-lock через media-service, и его
+            # недоступность не должна срывать остальной пакет и весь /sync.
+            try:
+                if factory is None:
+                    await _svc().publish_report(
+                        db, media_client, claim.id, triggered_by, automatic=True
+                    )
+                else:
+                    async with factory() as session:
+                        await _svc().publish_report(
+                            session, media_client, claim.id, triggered_by, automatic=True
+                        )
+            except Exception as e:
+                return e
+            return True
+
+    results = await asyncio.gather(*(_one(claim) for claim in ready))
+    return {claim.id: outcome for claim, outcome in zip(ready, results)}
+
+
+def _lease_update(report_id: int, lease_until: datetime):
+    """UPDATE строки, всё ещё принадлежащей ЭТОМУ пакету: протухший lease мог
+    забрать другой воркер, и его прогресс мы не перетираем."""
+    return update(WorkReport).where(
+        WorkReport.id == report_id,
+        WorkReport.autopublish_claimed_until == lease_until,
+    )
+
+
+async def _backlog(db: AsyncSession, category_clause) -> tuple[int, float]:
+    """Очередь автопубликации: число черновиков `pending` и возраст старейшего."""
+    stmt = select(func.count(), func.min(WorkReport.created_at)).where(
+        WorkReport.status == "pending"
+    )
+    if category_clause is not None:
+        stmt = stmt.where(category_clause)
+    count, oldest = (await db.execute(stmt)).one()
+    oldest = _as_utc(oldest)
+    age = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0.0
+    return count or 0, max(age, 0.0)
+
+
+async def autopublish_backlog(db: AsyncSession) -> dict:
+    """Очередь автопубликации для `/metrics`: сколько черновиков ждут и как
+    давно ждёт старейший. Выключенный режим — пустая очередь."""
+    cfg = await load_board_config(db)
+    if not cfg.work_reports.autopublish:
+        return {"enabled": False, "backlog": 0, "backlog_age_seconds": 0.0}
+    categories = cfg.work_reports.categories
+    count, age = await _backlog(
+        db, WorkReport.category_key.in_(categories) if categories else None
+    )
+    return {"enabled": True, "backlog": count, "backlog_age_seconds": age}
+
+
 async def autopublish_ready_drafts(
     db: AsyncSession, media_client: Any, triggered_by: Optional[int] = None
 ) -> dict:
@@ -59,7 +309,20 @@ async def autopublish_ready_drafts(
     Черновик без одной из сторон остаётся `needs_media` (autofill сам его туда
     переводит) и в ленту не уезжает — то есть «без модерации» не означает
     «опубликовать что угодно». Ошибка публикации одного отчёта не срывает
-    остальные: пакет продолжается, счётчик `failed` растёт.
+    остальные: пакет продолжается, счётчик `failed` растёт, а сам черновик
+    уходит в backoff.
+
+    Фазы пакета:
+
+    1. захват (`_claim`) — lease под FOR UPDATE SKIP LOCKED, одна короткая
+       транзакция;
+    2. подбор медиа (`_prefetch`) — параллельно, без транзакции; черновики с
+       живой отметкой `autopublish_ready_at` его пропускают;
+    3. запись подбора — короткая per-report транзакция с перепроверкой
+       статуса под локом;
+    4. публикация (`_publish_ready`) — параллельно под потолком медиа/с;
+    5. итог — снять lease, у неудачных выставить backoff; не дошедшие до
+       публикации сохраняют отметку готовности, следующий тик продолжит с них.
     """
     cfg = await load_board_config(db)
     if not cfg.work_reports.autopublish:
@@ -84,22 +347,6 @@ async def autopublish_ready_drafts(
         WorkReport.category_key.in_(allowed_categories) if allowed_categories else None
     )
 
-    # AUD6-P1-3: БЕЗ with_for_update — раньше пакет держал FOR UPDATE сразу на
-    # 20 строках через все сетевые вызовы автозаполнения (до минут при
-    # недоступном media), блокируя параллельный /sync менеджера на тех же
-    # строках. Теперь сеть идёт до лока, а запись — короткой per-report
-    # транзакцией с перепроверкой статуса (строка могла уехать, пока ходили
-    # в сеть).
-    stmt = select(WorkReport).where(pending_clause)
-    if category_clause is not None:
-        stmt = stmt.where(category_clause)
-    candidates = (
-        (await db.execute(
-            stmt.order_by(WorkReport.created_at)
-            .limit(_svc()._AUTOPUBLISH_BATCH_LIMIT)
-        )).scalars().all()
-    )
-
     # Отдельный счётчик, а не «доливка» в left_for_moderation: причины разные
     # (нет фото vs категория вне списка), и сводка в /sync должна их различать.
     skipped_by_category = 0
@@ -111,88 +358,123 @@ async def autopublish_ready_drafts(
             )
         ).scalar_one()
 
+    now = datetime.now(timezone.utc)
+    lease_until = now + timedelta(seconds=_AUTOPUBLISH_LEASE_SECONDS)
+    claims = await _claim(db, pending_clause, category_clause, lease_until, now)
+
     # AUD6-P1-3: общий бюджет времени пакета. При деградировавшем media каждый
-    # отчёт может стоить до ~90 с сетевых таймаутов — без потолка пакет из 20
-    # растягивался на десятки минут; частичный результат честнее зависшего
-    # /sync (недоделанные отчёты подберёт следующий тик/синк).
+    # отчёт может стоить до ~90 с сетевых таймаутов — частичный результат
+    # честнее зависшего /sync (недоделанное продолжит следующий тик/синк).
     deadline = time.monotonic() + _svc()._AUTOPUBLISH_TIME_BUDGET_SECONDS
 
-    ready_ids: list[int] = []
+    fetched = await _prefetch(media_client, [c for c in claims if not c.resume], deadline)
+
+    ready: list[_Claim] = [c for c in claims if c.resume]
+    failed_claims: list[_Claim] = []
+    released: list[int] = []
     left = 0
-    failed = 0
-    for report in candidates:
-        if time.monotonic() > deadline:
-            logger.warning(
-                "autopublish: бюджет времени пакета исчерпан на автозаполнении — "
-                "обработано %d из %d кандидатов",
-                len(ready_ids) + left + failed, len(candidates),
-            )
-            break
-        # fetch ходит в media-service, а его клиент бросает на любой не-2xx
-        # (`raise_for_status`) и на транспортных сбоях. Без этого перехвата
-        # один сбойный запрос ронял весь POST /sync пятисоткой — вместе с
-        # синком и ревокацией, которые к media-service отношения не имеют.
-        try:
-            before_ids, after_ids = await _svc().fetch_media_selection(
-                media_client, report.request_number
-            )
-        except Exception as e:
-            failed += 1
+    for claim in claims:
+        if claim.resume or claim.id not in fetched:
+            continue
+        selection = fetched[claim.id]
+        if isinstance(selection, BaseException):
+            failed_claims.append(claim)
             logger.warning(
-                "autopublish: автозаполнение отчёта %s не удалось: %s", report.id, e
+                "autopublish: автозаполнение отчёта %s не удалось: %s", claim.id, selection
             )
             continue
+        before_ids, after_ids = selection
         # Короткая пишущая транзакция: лок + перепроверка статуса + запись.
         # Пока ходили в сеть, строку мог забрать publish/PATCH — перепроверяем
         # pending_clause под локом и молча пропускаем уехавшие.
         row = (
             await db.execute(
                 select(WorkReport)
-                .where(WorkReport.id == report.id, pending_clause)
+                .where(
+                    WorkReport.id == claim.id,
+                    pending_clause,
+                    WorkReport.autopublish_claimed_until == lease_until,
+                )
                 .with_for_update()
             )
         ).scalar_one_or_none()
         if row is None:
             await db.commit()  # снять пустую транзакцию от select
+            released.append(claim.id)
             continue
         _svc().apply_media_selection(row, before_ids, after_ids)
         # Тот же критерий готовности, что в publish_report: нужен результат,
         # «до» опционально.
-        ready = bool(row.after_media_ids)
-        await db.commit()
-        if ready:
-            ready_ids.append(report.id)
+        if row.after_media_ids:
+            row.autopublish_ready_at = datetime.now(timezone.utc)
+            claim.media_count = len(before_ids) + len(after_ids)
+            ready.append(claim)
         else:
+            # Ждёт фото от людей, не конвейер: lease снимаем сразу, следующий
+            # тик посмотрит снова.
+            row.autopublish_ready_at = None
+            row.autopublish_claimed_until = None
+            row.autopublish_attempts = 0
             left += 1
+        await db.commit()
+
+    outcomes = await _publish_ready(db, media_client, ready, triggered_by, deadline)
 
     published = 0
-    for report_id in ready_ids:
-        if time.monotonic() > deadline:
-            logger.warning(
-                "autopublish: бюджет времени пакета исчерпан на публикации — "
-                "опубликовано %d из %d готовых", published, len(ready_ids),
-            )
-            break
-        # Широкий except по той же причине, что и у fetch выше: publish_report
-        # берёт publication-lock через media-service, и его недоступность не
-        # должна срывать остальной пакет и весь /sync.
-        try:
-            await _svc().publish_report(db, media_client, report_id, triggered_by, automatic=True)
+    deferred = 0
+    for claim in ready:
+        outcome = outcomes[claim.id]
+        if outcome is True:
             published += 1
-        except Exception as e:
-            failed += 1
-            logger.warning("autopublish: отчёт %s не опубликован: %s", report_id, e)
+            await db.execute(_lease_update(claim.id, lease_until).values(
+                autopublish_claimed_until=None, autopublish_ready_at=None, autopublish_attempts=0,
+            ))
+        elif outcome is None:
+            deferred += 1
+            released.append(claim.id)
+        else:
+            failed_claims.append(claim)
+            logger.warning("autopublish: отчёт %s не опубликован: %s", claim.id, outcome)
+    if deferred:
+        logger.warning(
+            "autopublish: бюджет времени пакета исчерпан на публикации — "
+            "опубликовано %d из %d готовых, остальные продолжит следующий тик",
+            published, len(ready),
+        )
+
+    # Не дошедшие до подбора в бюджет — тоже на следующий тик, без штрафа.
+    deferred += sum(1 for c in claims if not c.resume and c.id not in fetched)
+    released.extend(c.id for c in claims if not c.resume and c.id not in fetched)
+    for report_id in released:
+        await db.execute(
+            _lease_update(report_id, lease_until).values(autopublish_claimed_until=None)
+        )
+    retry_now = datetime.now(timezone.utc)
+    for claim in failed_claims:
+        attempts = claim.attempts + 1
+        await db.execute(_lease_update(claim.id, lease_until).values(
+            autopublish_claimed_until=retry_now + _backoff(attempts),
+            autopublish_ready_at=None,
+            autopublish_attempts=attempts,
+        ))
+    await db.commit()
 
-    if published or failed or skipped_by_category:
+    failed = len(failed_claims)
+    backlog, backlog_age = await _backlog(db, category_clause)
+    if published or failed or skipped_by_category or deferred:
         logger.info(
             "autopublish: опубликовано %d, оставлено на модерации %d, "
-            "пропущено по категории %d, ошибок %d",
-            published, left, skipped_by_category, failed,
+            "пропущено по категории %d, ошибок %d, отложено %d, в очереди %d "
+            "(старейшему %.0f с)",
+            published, left, skipped_by_category, failed, deferred, backlog, backlog_age,
         )
     return {
         "published": published,
         "left_for_moderation": left,
         "skipped_by_category": skipped_by_category,
         "failed": failed,
+        "deferred": deferred,
+        "backlog": backlog,
+        "backlog_age_seconds": backlog_age,
         "enabled": True,
     }
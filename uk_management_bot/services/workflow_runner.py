@@ -18,7 +18,9 @@ write-path для workflow-переходов заявки. Каждый:
 legacy-кодировке Исполнено+is_returned (см. _storage_status в request_workflow).
 
 sync/async — тонкие обёртки над ОДНИМ чистым решением (_decide); расходится
-только ORM-I/O (загрузка/применение).
+только ORM-I/O (загрузка/применение). `run_commands_bulk` — sync-вариант для
+пачки команд по разным заявкам: тот же _decide/_apply_sync, но общий лок,
+set-based загрузка и один commit (исходы — поштучно).
 """
 
 from __future__ import annotations
@@ -36,7 +38,9 @@ from uk_management_bot.database.models.audit import AuditLog
 from uk_management_bot.database.models.rating import Rating
 from uk_management_bot.database.models.request import Request
 from uk_management_bot.database.models.request_assignment import RequestAssignment
+from uk_management_bot.database.models.shift import Shift
 from uk_management_bot.database.models.user import User
+from uk_management_bot.services.request_visibility import refresh_requests
 from uk_management_bot.services.webhook_payloads import (
     emit_request_status_changed,
     emit_request_status_changed_sync,
@@ -47,9 +51,11 @@ from uk_management_bot.utils.constants import (
     ACCEPTANCE_MODE_RESIDENT,
     ROLE_EXECUTOR,
 )
+from uk_management_bot.utils.datetime_utils import utc_now
 from uk_management_bot.utils.shifts import (
     is_on_shift_now_async,
     is_on_shift_now_sync,
+    on_shift_window,
 )
 from uk_management_bot.utils.specializations import parse_specializations
 from uk_management_bot.utils.request_workflow import (
@@ -138,6 +144,35 @@ def _new_state_from(req: Request) -> RequestState:
     )
 
 
+def _actor_from_user(user: User, approved_apartment_ids: frozenset[int]) -> ActorContext:
+    return ActorContext(
+        kind="user", user_id=user.id, system_actor=None,
+        roles=frozenset(get_user_roles(user)),
+        active_role=get_active_role(user),
+        approved_apartment_ids=approved_apartment_ids,
+        specializations=frozenset(parse_specializations(user)),
+    )
+
+
+def _snapshot_from(req: Request, has_rating: bool, active,
+                   has_shift: bool) -> WorkflowSnapshot:
+    """Snapshot из уже загруженных фактов; ``active`` — (executor_id,
+    assignment_type, group_specialization) активного назначения или None.
+    Общий для одиночного и bulk-пути — snapshot собирается одинаково."""
+    a_exec = active[0] if active else None
+    a_type = active[1] if active else None
+    a_group = active[2] if active else None
+    return WorkflowSnapshot(
+        request=_new_state_from(req),
+        has_rating=has_rating,
+        active_assignment_executor_id=a_exec,
+        actor_has_active_shift=has_shift,
+        active_assignment_type=a_type,
+        active_assignment_group=a_group,
+        active_assignment_unclaimed=(a_type == "group" and a_exec is None),
+    )
+
+
 def _build_audit(ev: EventIntent, req: Request, actor: ActorContext) -> AuditLog:
     """audit-EventIntent → строка AuditLog (с сохранением исторических ключей
     old_status/new_status/actor, на которые опираются preflight-запросы)."""
@@ -191,13 +226,7 @@ def _load_actor_context_sync(db: Session, principal: PrincipalRef) -> ActorConte
         from uk_management_bot.utils.request_workflow import NotAuthorized
         raise NotAuthorized(f"unknown user {principal.user_id}")
     from uk_management_bot.utils.workflow_predicates import get_approved_apartment_ids
-    return ActorContext(
-        kind="user", user_id=user.id, system_actor=None,
-        roles=frozenset(get_user_roles(user)),
-        active_role=get_active_role(user),
-        approved_apartment_ids=get_approved_apartment_ids(db, user.id),
-        specializations=frozenset(parse_specializations(user)),
-    )
+    return _actor_from_user(user, get_approved_apartment_ids(db, user.id))
 
 
 def _build_snapshot_sync(db: Session, req: Request,
@@ -214,18 +243,16 @@ def _build_snapshot_sync(db: Session, req: Request,
     has_shift = False
     if actor.kind == "user" and ROLE_EXECUTOR in actor.roles:
         has_shift = is_on_shift_now_sync(db, actor.user_id)
-    a_exec = active[0] if active else None
-    a_type = active[1] if active else None
-    a_group = active[2] if active else None
-    return WorkflowSnapshot(
-        request=_new_state_from(req),
-        has_rating=has_rating,
-        active_assignment_executor_id=a_exec,
-        actor_has_active_shift=has_shift,
-        active_assignment_type=a_type,
-        active_assignment_group=a_group,
-        active_assignment_unclaimed=(a_type == "group" and a_exec is None),
-    )
+    return _snapshot_from(req, has_rating, active, has_shift)
+
+
+# Доменные операции, которые пишут request_assignments массовым UPDATE мимо
+# ORM-хука request_visibility: после них раннер пересчитывает видимость заявки
+# сам (после flush — чтобы patch исполнителя и новое назначение уже были в БД).
+_ASSIGNMENT_OPS = frozenset({
+    "cancel_active_assignments", "claim_group_assignment",
+    "promote_group_assignment", "create_assignment",
+})
 
 
 def _apply_sync(db: Session, req: Request, result: TransitionResult,
@@ -243,6 +270,9 @@ def _apply_sync(db: Session, req: Request, result: TransitionResult,
         req.status_version = (req.status_version or 0) + 1
     for dop in result.domain_ops:
         _apply_domain_op_sync(db, req, dop, actor)
+    if any(dop.kind in _ASSIGNMENT_OPS for dop in result.domain_ops):
+        db.flush()
+        refresh_requests(db.connection(), [req.request_number])
     for ev in result.events:
         if ev.kind == "audit":
             db.add(_build_audit(ev, req, actor))
@@ -346,6 +376,168 @@ def run_command_sync(session_factory, request_number: str,
         db.close()
 
 
+# ===========================================================================
+# SYNC BULK — пачка команд по РАЗНЫМ заявкам в одной транзакции
+# ===========================================================================
+
+@dataclass(frozen=True)
+class BulkCommand:
+    """Элемент пачки ``run_commands_bulk``: та же тройка, что у
+    ``run_command_sync`` (номер заявки, принципал, команда)."""
+    request_number: str
+    principal: PrincipalRef
+    command: Command
+
+
+@dataclass(frozen=True)
+class BulkItemOutcome:
+    """Исход одного элемента пачки: ``outcome`` при успехе, ``error`` — то,
+    что ``run_command_sync`` поднял бы для этой команды (запись элемента
+    откачена, остальные элементы это не задевает)."""
+    request_number: str
+    outcome: Optional[CommandOutcome] = None
+    error: Optional[WorkflowError] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _load_actor_contexts_bulk_sync(
+        db: Session, principals: list[PrincipalRef]) -> dict[int, ActorContext]:
+    """ActorContext'ы всех user-принципалов пачки двумя запросами (users +
+    одобренные квартиры) вместо пары запросов на команду. Неизвестного
+    пользователя в словаре нет — элемент получит NotAuthorized, как в
+    ``_load_actor_context_sync``."""
+    from uk_management_bot.database.models.user_apartment import UserApartment
+
+    user_ids = {p.user_id for p in principals if p.kind != "system"}
+    if not user_ids:
+        return {}
+    users = db.query(User).filter(User.id.in_(user_ids)).all()
+    approved: dict[int, set[int]] = {u.id: set() for u in users}
+    for user_id, apartment_id in db.query(
+            UserApartment.user_id, UserApartment.apartment_id).filter(
+            UserApartment.user_id.in_(user_ids),
+            UserApartment.status == "approved"):
+        approved[user_id].add(apartment_id)
+    return {u.id: _actor_from_user(u, frozenset(approved[u.id])) for u in users}
+
+
+def _build_snapshots_bulk_sync(db: Session, reqs: dict[str, Request],
+                               actors: list[ActorContext]):
+    """Факты snapshot'ов всей пачки тремя запросами: оценки, активные
+    назначения и «на смене сейчас» для исполнителей-акторов (WR-05:
+    ``on_shift_window`` без привязки к пользователю).
+
+    Возвращает (has_rating: set номеров, active: номер → строка назначения,
+    on_shift: set user_id)."""
+    numbers = list(reqs)
+    rated = {n for (n,) in db.query(Rating.request_number).filter(
+        Rating.request_number.in_(numbers)).distinct()}
+    active: dict[str, tuple] = {}
+    for row in db.query(
+            RequestAssignment.request_number,
+            RequestAssignment.executor_id,
+            RequestAssignment.assignment_type,
+            RequestAssignment.group_specialization,
+    ).filter(
+            RequestAssignment.request_number.in_(numbers),
+            RequestAssignment.status == "active"):
+        active.setdefault(row[0], tuple(row[1:]))
+    executors = {a.user_id for a in actors
+                 if a.kind == "user" and ROLE_EXECUTOR in a.roles}
+    on_shift: set[int] = set()
+    if executors:
+        on_shift = {uid for (uid,) in db.query(Shift.user_id).filter(
+            Shift.user_id.in_(executors), on_shift_window(utc_now())).distinct()}
+    return rated, active, on_shift
+
+
+def run_commands_bulk(session_factory, items: list[BulkCommand],
+                      now: Optional[datetime] = None) -> list[BulkItemOutcome]:
+    """Пачка workflow-команд по разным заявкам — одна сессия, одна транзакция.
+
+    Для массовых переходов (авто-назначение, тики авто-менеджера, перенос
+    заявок между сменами, массовые действия менеджера), где поштучный
+    ``run_command_sync`` платит на каждую заявку свою сессию, FOR UPDATE,
+    загрузку актора и три probe'а snapshot'а. Здесь:
+
+      1. все заявки лочатся одним ``SELECT … IN (…) ORDER BY request_number
+         FOR UPDATE`` — детерминированный порядок, две пачки не дедлочатся;
+      2. ActorContext'ы и факты snapshot'ов грузятся set-based запросами;
+      3. по каждому элементу — то же чистое ``_decide`` и тот же ``_apply_sync``
+         внутри SAVEPOINT: WorkflowError элемента (включая RequestNotFound,
+         NotAuthorized и rowcount-guard'ы domain-op'ов) откатывает только его
+         и возвращается в ``BulkItemOutcome.error``;
+      4. patch'и, audit и outbox всех успешных элементов — один commit.
+
+    Прочие исключения (БД, SystemUserMissing) откатывают пачку целиком и
+    пробрасываются — как у ``run_command_sync``. Элементы обязаны ссылаться на
+    разные заявки (snapshot каждой берётся ДО применения пачки), дубликат —
+    ValueError. Исходы возвращаются в порядке ``items``; эквивалентность
+    поштучному пути закреплена property-тестом (tests/services/
+    test_workflow_runner_bulk.py).
+    """
+    numbers = [it.request_number for it in items]
+    if len(set(numbers)) != len(numbers):
+        raise ValueError("run_commands_bulk: номера заявок в пачке должны быть уникальны")
+    if not items:
+        return []
+    now = now or datetime.now(timezone.utc)
+    db: Session = session_factory()
+    try:
+        reqs = {r.request_number: r for r in (
+            db.query(Request)
+            .filter(Request.request_number.in_(numbers))
+            .order_by(Request.request_number)
+            .with_for_update().all())}
+        users = _load_actor_contexts_bulk_sync(db, [it.principal for it in items])
+        actors: dict[str, ActorContext] = {}
+        for it in items:
+            p = it.principal
+            if p.kind == "system":
+                actors[it.request_number] = ActorContext(
+                    kind="system", user_id=None, system_actor=p.system_actor)
+            elif p.user_id in users:
+                actors[it.request_number] = users[p.user_id]
+        rated, active, on_shift = _build_snapshots_bulk_sync(
+            db, reqs, list(actors.values()))
+
+        results: list[BulkItemOutcome] = []
+        for it in items:
+            number = it.request_number
+            try:
+                req = reqs.get(number)
+                if req is None:
+                    raise RequestNotFound(number)
+                actor = actors.get(number)
+                if actor is None:
+                    from uk_management_bot.utils.request_workflow import NotAuthorized
+                    raise NotAuthorized(f"unknown user {it.principal.user_id}")
+                snap = _snapshot_from(
+                    req, number in rated, active.get(number),
+                    actor.kind == "user" and ROLE_EXECUTOR in actor.roles
+                    and actor.user_id in on_shift)
+                cmd = it.command
+                if isinstance(cmd, LegacyStatusIntent):
+                    cmd = resolve_command(snap, actor, cmd)
+                result = _decide(snap, cmd, actor, it.principal, now)
+                with db.begin_nested():
+                    _apply_sync(db, req, result, actor, it.principal, now)
+                results.append(BulkItemOutcome(
+                    number, outcome=_build_outcome(req, snap, result)))
+            except WorkflowError as e:
+                results.append(BulkItemOutcome(number, error=e))
+        db.commit()
+        return results
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 # ===========================================================================
 # ASYNC (зеркало sync; делит чистое _decide → parity)
 # ===========================================================================
@@ -365,13 +557,7 @@ async def _load_actor_context_async(db: AsyncSession,
         select(UserApartment.apartment_id).where(
             UserApartment.user_id == user.id,
             UserApartment.status == "approved"))).all()
-    return ActorContext(
-        kind="user", user_id=user.id, system_actor=None,
-        roles=frozenset(get_user_roles(user)),
-        active_role=get_active_role(user),
-        approved_apartment_ids=frozenset(r[0] for r in rows),
-        specializations=frozenset(parse_specializations(user)),
-    )
+    return _actor_from_user(user, frozenset(r[0] for r in rows))
 
 
 async def _build_snapshot_async(db: AsyncSession, req: Request,
@@ -388,18 +574,7 @@ async def _build_snapshot_async(db: AsyncSession, req: Request,
     has_shift = False
     if actor.kind == "user" and ROLE_EXECUTOR in actor.roles:
         has_shift = await is_on_shift_now_async(db, actor.user_id)
-    a_exec = active[0] if active else None
-    a_type = active[1] if active else None
-    a_group = active[2] if active else None
-    return WorkflowSnapshot(
-        request=_new_state_from(req),
-        has_rating=has_rating,
-        active_assignment_executor_id=a_exec,
-        actor_has_active_shift=has_shift,
-        active_assignment_type=a_type,
-        active_assignment_group=a_group,
-        active_assignment_unclaimed=(a_type == "group" and a_exec is None),
-    )
+    return _snapshot_from(req, has_rating, active, has_shift)
 
 
 async def _apply_async(db: AsyncSession, req: Request, result: TransitionResult,
@@ -415,6 +590,10 @@ async def _apply_async(db: AsyncSession, req: Request, result: TransitionResult,
         req.status_version = (req.status_version or 0) + 1
     for dop in result.domain_ops:
         await _apply_domain_op_async(db, req, dop, actor)
+    if any(dop.kind in _ASSIGNMENT_OPS for dop in result.domain_ops):
+        await db.flush()
+        number = req.request_number
+        await db.run_sync(lambda sync_db: refresh_requests(sync_db.connection(), [number]))
     for ev in result.events:
         if ev.kind == "audit":
             db.add(_build_audit(ev, req, actor))
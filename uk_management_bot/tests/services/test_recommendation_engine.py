@@ -213,39 +213,104 @@ class TestCalculateTrend:
 
 # ---------------------------------------------------------------------------
 # QA-02 regression: Shift identifies the executor via user_id, NOT executor_id.
-# Methods aggregating shift load/performance must read shift.user_id — reading
-# the non-existent shift.executor_id raised AttributeError at runtime and broke
-# "Рекомендации по оптимизации". MagicMock(spec=Shift) makes .executor_id raise,
-# so these tests fail on the pre-fix code.
+# The per-executor aggregate groups by Shift.user_id — the non-existent
+# shift.executor_id raised AttributeError at runtime and broke
+# "Рекомендации по оптимизации".
 # ---------------------------------------------------------------------------
 
+@pytest.fixture()
+def sqlite_db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from uk_management_bot.database.session import Base
+    from uk_management_bot.services.recommendation_engine import reset_analysis_cache
+
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=eng)
+    session = sessionmaker(bind=eng)()
+    reset_analysis_cache()
+    yield session
+    session.close()
+    eng.dispose()
+
+
+def _add_shift(db, user_id, *, count=5, efficiency=50.0, response=None, quality=None, days_ago=1):
+    from datetime import timedelta
+
+    from uk_management_bot.utils.datetime_utils import utc_now
+
+    db.add(Shift(user_id=user_id, status="completed",
+                 start_time=utc_now() - timedelta(days=days_ago),
+                 current_request_count=count, efficiency_score=efficiency,
+                 average_response_time=response, quality_rating=quality))
+
+
 class TestQA02UsesUserId:
-    def _db_with_shifts(self, shifts):
-        db = MagicMock()
-        q = MagicMock()
-        q.filter.return_value.all.return_value = shifts
-        q.all.return_value = shifts
-        db.query.return_value = q
-        return db
-
-    def _shift(self, user_id, count=5, efficiency=50.0):
-        s = MagicMock(spec=Shift)
-        s.user_id = user_id
-        s.current_request_count = count
-        s.efficiency_score = efficiency
-        return s
+    @pytest.mark.asyncio
+    async def test_workload_balance_groups_by_user_id(self, sqlite_db):
+        _add_shift(sqlite_db, 1, count=10)
+        _add_shift(sqlite_db, 2, count=1)
+        sqlite_db.commit()
+        engine = _make_engine(sqlite_db)
+        result = await engine._analyze_workload_balance(engine.get_analysis_snapshot(7))
+        assert [r.id for r in result] == ["balance_001"]
 
     @pytest.mark.asyncio
-    async def test_workload_balance_no_attribute_error(self):
-        shifts = [self._shift(1, count=10), self._shift(2, count=1)]
-        engine = _make_engine(self._db_with_shifts(shifts))
-        result = await engine._analyze_workload_balance(7)
-        assert isinstance(result, list)
+    async def test_performance_issues_groups_by_user_id(self, sqlite_db):
+        for _ in range(3):
+            _add_shift(sqlite_db, 1, efficiency=40.0)
+        sqlite_db.commit()
+        engine = _make_engine(sqlite_db)
+        result = await engine._analyze_performance_issues(engine.get_analysis_snapshot(7))
+        assert result[0].metrics == {"low_performers": 1}
+
+
+# ---------------------------------------------------------------------------
+# AnalysisSnapshot: три агрегатных запроса на все правила + кэш окна
+# ---------------------------------------------------------------------------
+
+class TestAnalysisSnapshot:
+    def _count_queries(self, db):
+        from sqlalchemy import event
+
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda *args: statements.append(args[2]))
+        return statements
+
+    def test_snapshot_aggregates_match_rules_inputs(self, sqlite_db):
+        _add_shift(sqlite_db, 1, count=4, efficiency=50.0, response=200, quality=3.0)
+        _add_shift(sqlite_db, 1, count=2, efficiency=None, response=100, quality=5.0)
+        _add_shift(sqlite_db, 2, count=3, efficiency=90.0)
+        _add_shift(sqlite_db, 2, count=9, efficiency=10.0, days_ago=40)  # вне окна
+        sqlite_db.commit()
+
+        snapshot = _make_engine(sqlite_db).get_analysis_snapshot(30)
+
+        assert snapshot.total_shifts == 3
+        assert snapshot.inefficient_shifts == 1
+        assert snapshot.slow_shifts == 1
+        assert snapshot.avg_quality == pytest.approx(4.0)
+        assert [(e.user_id, e.request_load, e.scored_shifts) for e in snapshot.executors] == [
+            (1, 6, 1), (2, 3, 1),
+        ]
+        assert len(snapshot.daily_loads) == 30
 
     @pytest.mark.asyncio
-    async def test_performance_issues_no_attribute_error(self):
-        shifts = [self._shift(1, efficiency=40.0) for _ in range(3)]
-        engine = _make_engine(self._db_with_shifts(shifts))
-        result = await engine._analyze_performance_issues(7)
-        assert isinstance(result, list)
+    async def test_recommendations_use_three_queries_and_cache_the_window(self, sqlite_db):
+        _add_shift(sqlite_db, 1)
+        sqlite_db.commit()
+        statements = self._count_queries(sqlite_db)
+        engine = _make_engine(sqlite_db)
+
+        result = await engine.generate_comprehensive_recommendations(period_days=30)
+        assert "error" not in result
+        assert len(statements) == 3
+
+        await _make_engine(sqlite_db).generate_comprehensive_recommendations(period_days=30)
+        assert len(statements) == 3, "снимок того же окна не должен пересчитываться"
 
+        await engine.generate_comprehensive_recommendations(period_days=7)
+        assert len(statements) == 6
@@ -9,12 +9,15 @@ import pytest
 from datetime import date
 from unittest.mock import MagicMock
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from uk_management_bot.services.request_number_service import (
     BUSINESS_TZ,
     RequestNumberService,
+    _NumberBlocks,
+    _lease_engine,
     business_today,
 )
 
@@ -175,6 +178,61 @@ class TestNextNumber:
         assert RequestNumberService.next_number(db, TARGET) == "260402-001"
 
 
+class TestNumberBlocks:
+    """Пул арендованных блоков процесса (сам UPSERT блока — PG-контур
+    test_request_number_concurrency.py; на SQLite блоки не выдаются)."""
+
+    def test_empty_pool_asks_for_lease(self):
+        assert _NumberBlocks().take("260402") == ("260402", None)
+
+    def test_blocks_are_drained_in_order(self):
+        blocks = _NumberBlocks()
+        blocks.take("260402")
+        blocks.put("260402", 11, 12)
+        blocks.put("260402", 21, 21)
+        taken = [blocks.take("260402")[1] for _ in range(4)]
+        assert taken == [11, 12, 21, None]
+
+    def test_day_rollover_drops_previous_day(self):
+        """Строгая смена дня: остаток вчерашнего блока не выдаётся с новым префиксом."""
+        blocks = _NumberBlocks()
+        blocks.take("260402")
+        blocks.put("260402", 1, 10)
+        assert blocks.take("260402") == ("260402", 1)
+        assert blocks.take("260403") == ("260403", None)
+
+    def test_late_caller_does_not_roll_pool_back(self):
+        """Префикс, посчитанный до полуночи, не откатывает пул на вчерашний день."""
+        blocks = _NumberBlocks()
+        blocks.take("260403")
+        blocks.put("260403", 1, 10)
+        assert blocks.take("260402") == ("260403", 1)
+        assert blocks.take("260403") == ("260403", 2)
+
+    def test_stale_lease_after_rollover_is_ignored(self):
+        """Блок вчерашнего дня, арендованный до смены и вернувшийся после, отброшен."""
+        blocks = _NumberBlocks()
+        blocks.take("260402")
+        assert blocks.take("260403") == ("260403", None)
+        blocks.put("260402", 1, 10)
+        assert blocks.take("260403") == ("260403", None)
+
+    def test_lease_engine_has_its_own_single_connection(self, tmp_path):
+        """Аренда не берёт второе соединение из пула вызывающего."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'blocks.db'}", poolclass=QueuePool,
+                               pool_size=1, max_overflow=0, pool_timeout=0.1)
+        lease = _lease_engine(engine)
+        try:
+            with engine.connect():
+                with lease.begin() as conn:
+                    assert conn.execute(text("SELECT 1")).scalar_one() == 1
+            assert lease.pool is not engine.pool
+            assert lease.pool.size() == 1
+        finally:
+            lease.dispose()
+            engine.dispose()
+
+
 # ---------------------------------------------------------------------------
 # parse_request_number
 # ---------------------------------------------------------------------------
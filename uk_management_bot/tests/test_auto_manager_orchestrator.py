@@ -2,7 +2,7 @@
 
 Паттерн sqlite-фикстуры — как в test_auto_manager_rule_engine.py/
 test_auto_manager_window.py; builders для User/Shift/Request/RequestAssignment
-мирроят те же файлы. `run_command_sync` пишет через СВОЮ сессию (session_factory,
+мирроят те же файлы. `run_commands_bulk` пишет через СВОЮ сессию (session_factory,
 как auto_dispatch_new_request_sync в services/dispatch.py) — поэтому тесты
 монтируют `orchestrator.SessionLocal` на тестовый sessionmaker, привязанный к
 ТОМУ ЖЕ sqlite-engine, что и фикстура (in-memory sqlite = один connection на
@@ -16,7 +16,7 @@ from __future__ import annotations
 from datetime import datetime, timedelta, timezone
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 import uk_management_bot.services.auto_manager.orchestrator as orch_mod
@@ -29,7 +29,7 @@ from uk_management_bot.database.models.user import User
 from uk_management_bot.database.session import Base
 from uk_management_bot.services.auto_manager.config import save_config_sync
 from uk_management_bot.services.auto_manager.orchestrator import AutoManagerOrchestrator
-from uk_management_bot.services.workflow_runner import WorkflowError
+from uk_management_bot.services.workflow_runner import BulkItemOutcome, WorkflowError
 from uk_management_bot.utils.constants import REQUEST_STATUS_IN_PROGRESS, REQUEST_STATUS_NEW
 
 SPECIALIZATION = "plumber"
@@ -70,7 +70,7 @@ def env(monkeypatch):
                 roles='["applicant"]', status="approved"))
     db.commit()
 
-    # orchestrator.py references SessionLocal/run_command_sync/select_executor as bare
+    # orchestrator.py references SessionLocal/run_commands_bulk/select_executor as bare
     # module-level names — patching the module attribute redirects every call site.
     monkeypatch.setattr(orch_mod, "SessionLocal", TestSessionLocal)
 
@@ -166,7 +166,7 @@ def _patch_publish(monkeypatch) -> list:
 
 
 def _refresh_request(session_factory, number) -> Request:
-    """Свежее чтение (run_command_sync пишет ЧЕРЕЗ ДРУГУЮ сессию)."""
+    """Свежее чтение (run_commands_bulk пишет ЧЕРЕЗ ДРУГУЮ сессию)."""
     fresh = session_factory()
     try:
         return fresh.query(Request).filter(Request.request_number == number).one()
@@ -462,19 +462,26 @@ async def test_workflow_error_race_skips_gracefully_and_tick_continues(env, monk
     _group_request(db, RACE_REQ, created_at=FIXED_NOW - timedelta(hours=2))
     _group_request(db, OK_REQ, created_at=FIXED_NOW - timedelta(hours=1))
 
-    # Симулируем гонку: между выбором кандидата (select_executor) и записью
-    # (run_command_sync) менеджер (или другой процесс) успел переназначить
-    # RACE_REQ — run_command_sync в реальности вернул бы WorkflowError
-    # (rowcount-guard promote_group_assignment/authorize). Здесь мы форсируем
-    # ровно этот исход для RACE_REQ, не трогая нормальный путь для OK_REQ.
-    original_run_command_sync = orch_mod.run_command_sync
-
-    def racing_run_command_sync(session_factory, request_number, principal, command, now=None):
-        if request_number == RACE_REQ:
-            raise WorkflowError("simulated race: already reassigned")
-        return original_run_command_sync(session_factory, request_number, principal, command, now=now)
-
-    monkeypatch.setattr(orch_mod, "run_command_sync", racing_run_command_sync)
+    # Симулируем гонку: между срезом тика (select_executor) и записью пачки
+    # менеджер (или другой процесс) успел переназначить RACE_REQ —
+    # run_commands_bulk в реальности вернул бы для неё WorkflowError в исходе
+    # элемента (rowcount-guard promote_group_assignment/authorize, откат
+    # SAVEPOINT). Здесь мы форсируем ровно этот исход для RACE_REQ, не трогая
+    # нормальный путь для OK_REQ в той же пачке.
+    original_run_commands_bulk = orch_mod.run_commands_bulk
+
+    def racing_run_commands_bulk(session_factory, items, now=None):
+        ok = original_run_commands_bulk(
+            session_factory, [it for it in items if it.request_number != RACE_REQ], now=now)
+        by_number = {o.request_number: o for o in ok}
+        return [
+            by_number.get(it.request_number)
+            or BulkItemOutcome(it.request_number,
+                               error=WorkflowError("simulated race: already reassigned"))
+            for it in items
+        ]
+
+    monkeypatch.setattr(orch_mod, "run_commands_bulk", racing_run_commands_bulk)
 
     fake_bot = FakeBot()
     orchestrator = AutoManagerOrchestrator(bot=fake_bot)
@@ -674,3 +681,131 @@ async def test_run_once_splits_slots_between_main_and_residual_same_tick(env, mo
     # Ровно одно уведомление на заявку (dedup по request_number) — 6+2=8, не
     # 10+10 (остальные не должны были попасть в тик вовсе).
     assert len(fake_bot.sent) == 8
+
+
+# ─────────────────────────── dispatch planner: shared snapshot + one batch ───────────────────────────
+
+def _individual_request(db, number, executor_id, *, created_at=None):
+    """«В работе» у конкретного исполнителя + активное индивидуальное назначение."""
+    r = Request(
+        request_number=number, user_id=APPLICANT_ID, category="plumbing",
+        description="desc", status=REQUEST_STATUS_IN_PROGRESS, executor_id=executor_id,
+        assignment_type="individual", address="Тестовый адрес",
+        created_at=created_at or FIXED_NOW,
+    )
+    db.add(r)
+    db.add(RequestAssignment(
+        request_number=number, assignment_type="individual", executor_id=executor_id,
+        status="active", created_by=SYSTEM_USER_ID,
+    ))
+    db.commit()
+    return r
+
+
+def _count_statements(engine):
+    statements: list[str] = []
+
+    def _on_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", _on_execute)
+
+
+@pytest.mark.asyncio
+async def test_tick_writes_whole_plan_in_one_bulk_call(env, monkeypatch):
+    db, TestSessionLocal = env
+    _always_active_config(db)
+    monkeypatch.setattr(orch_mod, "_now_utc", lambda: FIXED_NOW)
+    _patch_publish(monkeypatch)
+
+    ex = _executor(db, 1, 1001)
+    _shift(db, 1, ex.id)
+    _group_request(db, "260723-501", created_at=FIXED_NOW - timedelta(minutes=2))
+    _residual_request(db, "260723-502", created_at=FIXED_NOW - timedelta(minutes=1))
+
+    batches = []
+    original = orch_mod.run_commands_bulk
+
+    def spy(session_factory, items, now=None):
+        batches.append([it.request_number for it in items])
+        return original(session_factory, items, now=now)
+
+    monkeypatch.setattr(orch_mod, "run_commands_bulk", spy)
+
+    report = await AutoManagerOrchestrator(bot=FakeBot()).run_once()
+
+    assert batches == [["260723-501", "260723-502"]]
+    assert report.assigned == 2
+    assert _refresh_request(TestSessionLocal, "260723-502").executor_id == ex.id
+
+
+@pytest.mark.asyncio
+async def test_tick_reads_are_constant_in_queue_length(env, monkeypatch):
+    """Срез тика не зависит от длины очереди: ни исполнителей, ни менеджеров
+    по заявке не дочитываем (прежде — list_approved_users на каждую заявку
+    пути уведомления, пока не появился кэш)."""
+    db, TestSessionLocal = env
+    _always_active_config(db, max_requests_per_run=20)
+    monkeypatch.setattr(orch_mod, "_now_utc", lambda: FIXED_NOW)
+    _manager(db, 2, 2002)
+    engine = db.get_bind()
+
+    async def tick_statements(count: int, offset: int) -> int:
+        for i in range(count):
+            _group_request(db, f"260723-{offset + i:03d}",
+                           created_at=FIXED_NOW + timedelta(seconds=offset + i))
+        statements, stop = _count_statements(engine)
+        try:
+            await AutoManagerOrchestrator(bot=FakeBot()).run_once()
+        finally:
+            stop()
+        return len(statements)
+
+    few = await tick_statements(2, 600)
+    many = await tick_statements(12, 700)
+    assert few == many
+
+
+@pytest.mark.asyncio
+async def test_stale_assignment_reported_once_per_ttl(env, monkeypatch):
+    db, TestSessionLocal = env
+    _always_active_config(db)
+    current = {"now": FIXED_NOW}
+    monkeypatch.setattr(orch_mod, "_now_utc", lambda: current["now"])
+
+    on_shift = _executor(db, 1, 1001)
+    off_shift = _executor(db, 3, 1003)
+    _shift(db, 1, on_shift.id, status="planned")
+    _individual_request(db, "260723-801", on_shift.id)
+    _individual_request(db, "260723-802", off_shift.id)
+
+    orchestrator = AutoManagerOrchestrator(bot=FakeBot())
+    report = await orchestrator.run_once()
+
+    assert [(s.request_number, s.executor_id) for s in report.stale_assignments] == [
+        ("260723-802", off_shift.id)]
+    # Сводка — не переназначение: строка назначения и исполнитель на месте.
+    assert _refresh_request(TestSessionLocal, "260723-802").executor_id == off_shift.id
+
+    current["now"] = FIXED_NOW + timedelta(minutes=2)
+    assert (await orchestrator.run_once()).stale_assignments == []
+
+
+@pytest.mark.asyncio
+async def test_stale_assignment_reported_outside_window(env, monkeypatch):
+    db, TestSessionLocal = env
+    save_config_sync(db, {
+        "enabled": True, "window_start": "20:00", "window_end": "08:00",
+        "timezone": "UTC", "max_requests_per_run": 10,
+    })
+    outside_now = datetime(2026, 7, 23, 12, 0, tzinfo=timezone.utc)
+    monkeypatch.setattr(orch_mod, "_now_utc", lambda: outside_now)
+
+    ex = _executor(db, 3, 1003)
+    _individual_request(db, "260723-803", ex.id, created_at=outside_now)
+
+    report = await AutoManagerOrchestrator(bot=FakeBot()).run_once()
+
+    assert [s.request_number for s in report.stale_assignments] == ["260723-803"]
+    assert report.assigned == 0
@@ -220,8 +220,8 @@ def test_equal_load_tie_break_survives_reversed_candidate_order(db, monkeypatch)
 
     original = AdminHandlerService.list_approved_users
 
-    def reversed_order(self):
-        return list(reversed(original(self)))
+    def reversed_order(self, *roles):
+        return list(reversed(original(self, *roles)))
 
     monkeypatch.setattr(AdminHandlerService, "list_approved_users", reversed_order)
 
@@ -283,7 +283,7 @@ def test_approved_non_executor_role_excluded(db):
 
 def test_csv_roles_format_still_recognized_as_executor(db):
     # get_user_roles/parse_roles_safe понимает и CSV-формат, не только JSON-список
-    # (в отличие от list_approved_executors' SQL LIKE '"executor"').
+    # (индекс user_roles строится тем же парсером — SQL-фильтр его видит).
     ex = _executor(db, 1, 1001, roles="applicant,executor")
     _shift(db, 1, ex.id)
 
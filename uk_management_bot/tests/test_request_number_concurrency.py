@@ -3,7 +3,9 @@
 SQLite-тесты (test_request_number_service.py) проверяют семантику, но
 advisory/row-locks там не работают (single-writer). Этот контур гоняет
 параллельные транзакции против того же DATABASE_URL, что у бота:
-N конкурентных созданий → номера уникальны и непрерывны; rollover 999→1000.
+N конкурентных созданий → номера уникальны и непрерывны; rollover 999→1000;
+блоки номеров — лок счётчика не держится транзакцией создания, аренда не
+берёт второе соединение из пула вызывающего.
 
 Используется фиктивный день 990101 (2099-01-01) — не пересекается с
 реальными данными; всё созданное удаляется в teardown.
@@ -17,7 +19,12 @@ import pytest
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
-from uk_management_bot.services.request_number_service import RequestNumberService
+from uk_management_bot.services import request_number_service
+from uk_management_bot.services.request_number_service import (
+    REQUEST_NUMBER_BLOCK_SIZE,
+    RequestNumberService,
+    reset_number_blocks,
+)
 
 FAKE_DAY = date(2099, 1, 1)
 FAKE_PREFIX = "990101"
@@ -143,3 +150,98 @@ def test_no_reuse_after_delete_max_postgres(engine, test_user_id):
         s.close()
     assert n2 != n1
     assert int(n2.split("-")[1]) == int(n1.split("-")[1]) + 1
+
+
+_INSERT_REQUEST = text(
+    "INSERT INTO requests (request_number, user_id, category, status,"
+    " description, urgency, is_returned, manager_confirmed, created_at)"
+    " VALUES (:n, :u, 'c', 'Новая', 'd', 'low', false, false, now())"
+)
+
+
+@pytest.fixture()
+def fake_today(monkeypatch):
+    """Блоки выдаются только для «сегодня» — подменяем бизнес-дату фиктивным днём."""
+    if REQUEST_NUMBER_BLOCK_SIZE == 1:
+        pytest.skip("REQUEST_NUMBER_BLOCK_SIZE=1 — блоки выключены")
+    monkeypatch.setattr(request_number_service, "request_number_today", lambda: FAKE_DAY)
+    # Счётчик фиктивного дня вычищается между тестами — остаток блоков тоже.
+    reset_number_blocks()
+    yield
+    reset_number_blocks()
+
+
+def test_blocks_do_not_hold_counter_lock(engine, test_user_id, fake_today):
+    """Незакоммиченная заявка одного процесса не блокирует аренду блока
+    другим (отдельный Engine = отдельный пул); номера не пересекаются."""
+    other = create_engine(engine.url, future=True, pool_size=2)
+    first = sessionmaker(bind=engine, future=True)()
+    try:
+        n1 = RequestNumberService.next_number(first)
+        first.execute(_INSERT_REQUEST, {"n": n1, "u": test_user_id})
+
+        def create_other():
+            s = sessionmaker(bind=other, future=True)()
+            try:
+                number = RequestNumberService.next_number(s)
+                s.execute(_INSERT_REQUEST, {"n": number, "u": test_user_id})
+                s.commit()
+                return number
+            finally:
+                s.close()
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            n2 = pool.submit(create_other).result(timeout=10)
+        first.commit()
+    finally:
+        first.close()
+        other.dispose()
+
+    size = REQUEST_NUMBER_BLOCK_SIZE
+    assert n1 == f"{FAKE_PREFIX}-001"
+    assert n2 == f"{FAKE_PREFIX}-{size + 1:03d}"
+
+
+def test_lease_does_not_need_a_second_pooled_connection(test_user_id, fake_today):
+    """Пул вызывающего исчерпан его же транзакцией: аренда блока идёт через
+    выделенное соединение и не ждёт pool_timeout."""
+    small = create_engine(_database_url(), future=True, pool_size=1, max_overflow=0, pool_timeout=2)
+    s = sessionmaker(bind=small, future=True)()
+    try:
+        s.execute(text("SELECT 1"))
+        number = RequestNumberService.next_number(s)
+        s.execute(_INSERT_REQUEST, {"n": number, "u": test_user_id})
+        s.commit()
+    finally:
+        s.close()
+        reset_number_blocks()
+        small.dispose()
+    assert number == f"{FAKE_PREFIX}-001"
+
+
+def test_parallel_creates_from_blocks_are_unique(engine, test_user_id, fake_today):
+    """Параллельные создания из пула одного процесса: номера уникальны, все из
+    арендованных блоков (не дальше last_seq счётчика)."""
+    N = 24
+    Session = sessionmaker(bind=engine, future=True)
+
+    def create_one(_):
+        s = Session()
+        try:
+            number = RequestNumberService.next_number(s)
+            s.execute(_INSERT_REQUEST, {"n": number, "u": test_user_id})
+            s.commit()
+            return number
+        finally:
+            s.close()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        numbers = list(pool.map(create_one, range(N)))
+
+    assert len(set(numbers)) == N, f"duplicates: {sorted(numbers)}"
+    with engine.connect() as conn:
+        last_seq = conn.execute(text(
+            "SELECT last_seq FROM request_number_counters WHERE day_prefix = :p"
+        ), {"p": FAKE_PREFIX}).scalar_one()
+    assert last_seq % REQUEST_NUMBER_BLOCK_SIZE == 0
+    assert max(int(n.split("-")[1]) for n in numbers) <= last_seq
@@ -7,6 +7,8 @@ and setup_jobs(). All external dependencies (APScheduler, services) are mocked.
 import asyncio
 from unittest.mock import patch, MagicMock, AsyncMock
 
+import pytest
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -57,7 +59,7 @@ class TestShiftSchedulerInit:
         sched = _make_scheduler()
         expected_tasks = {
             'auto_create_shifts', 'rebalance_assignments', 'process_transfers',
-            'cleanup_expired', 'notify_upcoming', 'auto_assign_requests', 'sync_assignments'
+            'cleanup_expired', 'notify_upcoming', 'dispatch_planner'
         }
         assert expected_tasks.issubset(set(sched.task_stats.keys()))
 
@@ -87,7 +89,7 @@ class TestSetupJobs:
         # Should not raise — exception is caught internally
         sched.setup_jobs()
 
-    def test_auto_manager_tick_job_registered(self):
+    def test_dispatch_planner_job_registered(self):
         from datetime import timedelta
         from apscheduler.triggers.interval import IntervalTrigger
 
@@ -95,20 +97,30 @@ class TestSetupJobs:
         mock_apscheduler = sched._mock_apscheduler
         sched.setup_jobs()
 
-        auto_manager_calls = [
+        planner_calls = [
             call for call in mock_apscheduler.add_job.call_args_list
-            if call.kwargs.get("id") == "auto_manager_tick"
+            if call.kwargs.get("id") == "dispatch_planner"
         ]
-        assert len(auto_manager_calls) == 1
+        assert len(planner_calls) == 1
 
-        call = auto_manager_calls[0]
-        assert call.args[0] == sched._auto_manager_tick
+        call = planner_calls[0]
+        # Job регистрируется в обёртке _run_job (lease + метрики) — сам метод в __wrapped__.
+        assert call.args[0].__wrapped__ == sched._dispatch_planner_tick
         trigger = call.args[1]
         assert isinstance(trigger, IntervalTrigger)
         assert trigger.interval == timedelta(minutes=2)
         assert call.kwargs.get("max_instances") == 1
         assert call.kwargs.get("coalesce") is True
 
+    def test_superseded_assignment_jobs_not_registered(self):
+        # Автоназначение заявок и синхронизация со сменами — политики
+        # диспетчерского тика, отдельными задачами их больше нет.
+        sched = _make_scheduler()
+        sched.setup_jobs()
+
+        ids = {call.kwargs.get("id") for call in sched._mock_apscheduler.add_job.call_args_list}
+        assert not ids & {"auto_assign_requests", "sync_assignments", "auto_manager_tick"}
+
 
 # ---------------------------------------------------------------------------
 # start
@@ -442,40 +454,65 @@ class TestNotifyUpcomingShifts:
         assert sched.task_stats["notify_upcoming"]["success"] == 1
 
 
-class TestAutoManagerTick:
-    """Wiring test for _auto_manager_tick — the orchestrator itself already
+class TestDispatchPlannerTick:
+    """Wiring test for _dispatch_planner_tick — the orchestrator itself already
     has its own dedicated test suite (test_auto_manager_orchestrator.py);
-    this only verifies the scheduler delegates correctly and isolates
-    failures."""
+    this only verifies the scheduler delegates correctly, isolates failures
+    and forwards the off-shift summary to managers."""
 
-    def test_calls_orchestrator_run_once(self):
-        sched = _make_scheduler()
+    def _sched(self, report=None, side_effect=None):
+        sched = _make_scheduler(notification_service=MagicMock(
+            send_manager_notification=AsyncMock()))
         sched._auto_manager = MagicMock()
-        sched._auto_manager.run_once = AsyncMock()
+        sched._auto_manager.run_once = AsyncMock(return_value=report, side_effect=side_effect)
+        return sched
 
-        asyncio.get_event_loop().run_until_complete(sched._auto_manager_tick())
+    @pytest.mark.asyncio
+    async def test_calls_orchestrator_run_once(self):
+        sched = self._sched()
+
+        await sched._dispatch_planner_tick()
 
         sched._auto_manager.run_once.assert_awaited_once_with()
+        assert sched.task_stats["dispatch_planner"]["success"] == 1
 
-    def test_does_not_open_own_db_session(self):
+    @pytest.mark.asyncio
+    async def test_does_not_open_own_db_session(self):
         # run_once() manages its own SessionLocal() internally — the tick
         # wrapper must not touch SessionLocal at all.
-        sched = _make_scheduler()
-        sched._auto_manager = MagicMock()
-        sched._auto_manager.run_once = AsyncMock()
+        from uk_management_bot.services.auto_manager.dispatch_planner import DispatchReport
+        sched = self._sched(report=DispatchReport(assigned=3))
 
         with patch(SESSION_LOCAL_PATH) as mock_session_local:
-            asyncio.get_event_loop().run_until_complete(sched._auto_manager_tick())
+            await sched._dispatch_planner_tick()
 
         mock_session_local.assert_not_called()
+        sched.notification_service.send_manager_notification.assert_not_awaited()
 
-    def test_exception_from_run_once_is_caught_and_logged(self):
-        sched = _make_scheduler()
-        sched._auto_manager = MagicMock()
-        sched._auto_manager.run_once = AsyncMock(side_effect=Exception("boom"))
+    @pytest.mark.asyncio
+    async def test_exception_from_run_once_is_caught_and_logged(self):
+        sched = self._sched(side_effect=Exception("boom"))
 
         # Should not raise — scheduler must survive a bad tick.
-        asyncio.get_event_loop().run_until_complete(sched._auto_manager_tick())
+        await sched._dispatch_planner_tick()
+
+        assert sched.task_stats["dispatch_planner"]["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_assignments_summarised_to_managers(self):
+        from uk_management_bot.services.auto_manager.dispatch_planner import (
+            DispatchReport,
+            StaleAssignment,
+        )
+        sched = self._sched(report=DispatchReport(stale_assignments=[
+            StaleAssignment("260723-001", 5), StaleAssignment("260723-002", 6),
+        ]))
+
+        await sched._dispatch_planner_tick()
+
+        sched.notification_service.send_manager_notification.assert_awaited_once()
+        _title, body = sched.notification_service.send_manager_notification.await_args.args
+        assert "260723-001, 260723-002" in body
 
 
 class TestWorkReportsTick:
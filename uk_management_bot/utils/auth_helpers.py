@@ -5,8 +5,9 @@
 import json
 import logging
 from typing import Optional, List
-from sqlalchemy import or_
+from sqlalchemy import select
 from uk_management_bot.database.models.user import User
+from uk_management_bot.database.models.user_role import UserRole
 
 logger = logging.getLogger(__name__)
 
@@ -198,20 +199,21 @@ async def check_user_role(user_id: int, required_role: str, db) -> bool:
 def legacy_role_filter(*roles: str):
     """SQLAlchemy-выражение «у пользователя есть хотя бы одна из ролей».
 
-    DB-060/AUD3-01 (PR-31): legacy-колонка ``User.role`` удалена. Фильтр теперь
-    идёт по JSON-массиву ``User.roles`` (хранится как TEXT, напр.
-    ``'["applicant", "executor"]'``) через ``LIKE '%"role"%'`` — кросс-диалектно
-    (sqlite-тесты + postgres-прод), матчит закавыченный токен роли. Это РАСШИРЯЕТ
-    прежнее ``role == x`` (одна основная роль) до «роль среди всех ролей» —
-    устаревшая колонка расходилась с реальным набором ролей (см. AUD3-01).
+    DB-060/AUD3-01 (PR-31): legacy-колонка ``User.role`` удалена, фильтр идёт
+    по набору ролей ``User.roles`` — «роль среди всех ролей», а не «основная
+    роль» (устаревшая колонка расходилась с реальным набором, см. AUD3-01).
+
+    Раньше это был ``User.roles LIKE '%"role"%'`` по JSON-тексту — seq scan
+    users на каждый вызов. Теперь ``users.id IN (SELECT user_id FROM
+    user_roles WHERE role IN (...))``: индекс ``ix_user_roles_role_user_id``,
+    точное совпадение роли (без подстрок), одинаково на sqlite и postgres.
+    ``user_roles`` синхронизируется с ``User.roles`` ORM-хуком
+    (models/user_role.py).
 
     Args:
         *roles: одна или несколько ролей; результат — ИЛИ по вхождению любой.
     """
-    clauses = [User.roles.like(f'%"{role}"%') for role in roles]
-    if len(clauses) == 1:
-        return clauses[0]
-    return or_(*clauses)
+    return User.id.in_(select(UserRole.user_id).where(UserRole.role.in_(roles)))
 
 
 def sync_legacy_role(user: User, primary_role: str) -> None:
@@ -26,6 +26,8 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
             self._handle_health_check()
         elif self.path == '/ping':
             self._handle_ping()
+        elif self.path == '/metrics':
+            self._handle_metrics()
         else:
             self._send_404()
     
@@ -75,6 +77,23 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
             'timestamp': utc_now().isoformat()
         }, 200)
     
+    def _handle_metrics(self):
+        """Обработка /metrics — Prometheus-метрики job'ов планировщика процесса.
+
+        Порт health-сервера наружу не публикуется (только внутренняя сеть
+        compose), поэтому без токена — в отличие от /metrics API.
+        """
+        from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+
+        registry = CollectorRegistry()
+        registry.register(_SchedulerJobCollector())
+        body = generate_latest(registry)
+        self.send_response(200)
+        self.send_header('Content-type', CONTENT_TYPE_LATEST)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
     def _send_json_response(self, data: Dict[str, Any], status_code: int = 200):
         """Отправка JSON ответа"""
         self.send_response(status_code)
@@ -93,12 +112,57 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
         
         response = {
             'error': 'Not Found',
-            'message': 'Available endpoints: /health, /ping',
+            'message': 'Available endpoints: /health, /ping, /metrics',
             'timestamp': utc_now().isoformat()
         }
         self.wfile.write(json.dumps(response).encode('utf-8'))
 
 
+class _SchedulerJobCollector:
+    """Гистограммы длительности и счётчики пропусков job'ов (utils/shift_scheduler.py)."""
+
+    def collect(self):
+        from prometheus_client.core import GaugeMetricFamily, HistogramMetricFamily
+
+        from uk_management_bot.utils.shift_scheduler import JOB_DURATION_BUCKETS, get_job_metrics
+
+        durations = HistogramMetricFamily(
+            'uk_scheduler_job_duration_seconds',
+            'Scheduler job run duration (per process, since start)',
+            labels=['job'],
+        )
+        skipped = GaugeMetricFamily(
+            'uk_scheduler_job_skipped',
+            'Scheduler ticks not run: lease held elsewhere, previous run still going, misfire',
+            labels=['job', 'reason'],
+        )
+        overran = GaugeMetricFamily(
+            'uk_scheduler_job_overran',
+            'Scheduler runs that took longer than the job interval',
+            labels=['job'],
+        )
+        lost = GaugeMetricFamily(
+            'uk_scheduler_job_lost_lease',
+            'Scheduler runs cancelled because another replica took over the lease',
+            labels=['job'],
+        )
+        for job_id, metrics in get_job_metrics().items():
+            buckets, cumulative = [], 0
+            for bound, count in zip(JOB_DURATION_BUCKETS, metrics['duration_buckets']):
+                cumulative += count
+                buckets.append((str(float(bound)), cumulative))
+            buckets.append(('+Inf', metrics['runs']))
+            durations.add_metric([job_id], buckets, metrics['duration_sum'])
+            for reason in ('lease', 'overrun', 'misfire'):
+                skipped.add_metric([job_id, reason], metrics[f'skipped_{reason}'])
+            overran.add_metric([job_id], metrics['overran'])
+            lost.add_metric([job_id], metrics['lost_lease'])
+        yield durations
+        yield skipped
+        yield overran
+        yield lost
+
+
 class HealthServer:
     """HTTP сервер для health check"""
     
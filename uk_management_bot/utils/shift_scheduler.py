@@ -1,19 +1,49 @@
 """
 Планировщик задач для системы смен - автоматическое выполнение фоновых операций
+
+Где живёт. Штатно — в отдельном процессе ``uk_management_bot/scheduler_main.py``
+(compose-сервис ``scheduler``); бот с ``SCHEDULER_IN_BOT=false`` только
+обрабатывает апдейты. Раньше DB-фазы job'ов делили с хендлерами бота и
+дефолтный пул потоков loop'а, и пул соединений — тяжёлый тик (планирование
+недели, автоназначение) был виден как задержка ответов бота.
+``SCHEDULER_IN_BOT=true`` (дефолт кода — dev-запуск одним процессом)
+возвращает прежнюю схему.
+
+Что вокруг каждого тика (``_run_job``):
+
+* **свой пул потоков** ``SCHEDULER_THREADS`` для DB-фаз (``_offload``) и
+  отдельный поток под lease-запросы — heartbeat не ждёт за тяжёлым тиком;
+* **lease** строки ``scheduler_job_leases`` (services/scheduler_leases.py) —
+  тик исполняет одна реплика воркера; ``SCHEDULER_LEASES=false`` отключает.
+  Потерянный посреди прогона lease (heartbeat не продлил, строку забрала
+  другая реплика) отменяет job и считается в ``lost_lease``;
+* **overrun/skip** — тик, пришедшийся на ещё идущий прогон, пропускается
+  (max_instances=1), пропущенные срабатывания схлопываются в одно
+  (coalesce), опоздавшее больше ``SCHEDULER_MISFIRE_GRACE`` — отбрасывается;
+  всё это считается в ``job_metrics``;
+* **гистограмма длительности** по job'у (``JOB_DURATION_BUCKETS``) →
+  ``/metrics`` health-сервера процесса.
 """
 
 import asyncio
+import functools
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 from uk_management_bot.utils.business_time import business_today
 from typing import Optional, Dict, Any, List
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy.exc import SQLAlchemyError
 
 from uk_management_bot.database.session import SessionLocal
+from uk_management_bot.services import scheduler_leases
 from uk_management_bot.services.auto_manager.orchestrator import AutoManagerOrchestrator
 from uk_management_bot.services.shift_planning_service import ShiftPlanningService
 from uk_management_bot.services.shift_assignment_service import ShiftAssignmentService
@@ -23,6 +53,21 @@ from uk_management_bot.utils.datetime_utils import utc_now
 
 logger = logging.getLogger(__name__)
 
+_TRUE = ("1", "true", "yes")
+
+# false — бот планировщик не запускает (его ведёт scheduler_main).
+SCHEDULER_IN_BOT = os.getenv("SCHEDULER_IN_BOT", "true").lower() in _TRUE
+SCHEDULER_THREADS = int(os.getenv("SCHEDULER_THREADS", "4"))
+SCHEDULER_LEASES = os.getenv("SCHEDULER_LEASES", "true").lower() in _TRUE
+SCHEDULER_LEASE_TTL = timedelta(seconds=int(os.getenv("SCHEDULER_LEASE_TTL", "300")))
+# Минимальный разрыв между тиками cron-задачи на разных репликах (у
+# интервальных — половина интервала).
+SCHEDULER_CRON_MIN_GAP = timedelta(seconds=int(os.getenv("SCHEDULER_CRON_MIN_GAP", "300")))
+SCHEDULER_MISFIRE_GRACE = int(os.getenv("SCHEDULER_MISFIRE_GRACE", "60"))
+
+# Верхние границы корзин гистограммы длительности тика, секунды.
+JOB_DURATION_BUCKETS = (0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800)
+
 
 @dataclass(frozen=True)
 class _ShiftReminder:
@@ -47,9 +92,14 @@ class ShiftScheduler:
         self.notification_service = notification_service
         self._bot = bot
         self.is_running = False
+        # Владелец lease'ов этой реплики (hostname:pid или SCHEDULER_WORKER_ID).
+        self.worker_id = scheduler_leases.SCHEDULER_WORKER_ID
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lease_executor: Optional[ThreadPoolExecutor] = None
 
         # Единственный экземпляр на процесс — держит между tick-ами
-        # анти-starvation курсоры/cooldown/дедуп уведомлений (Task 6).
+        # анти-starvation курсоры/cooldown/дедуп уведомлений (Task 6). Он же —
+        # диспетчерский тик: единственная задача, раздающая заявки.
         self._auto_manager = AutoManagerOrchestrator(bot=bot, notification_service=notification_service)
 
         # Статистика выполнения задач
@@ -59,10 +109,144 @@ class ShiftScheduler:
             'process_transfers': {'success': 0, 'failed': 0, 'last_run': None},
             'cleanup_expired': {'success': 0, 'failed': 0, 'last_run': None},
             'notify_upcoming': {'success': 0, 'failed': 0, 'last_run': None},
-            'auto_assign_requests': {'success': 0, 'failed': 0, 'last_run': None},
-            'sync_assignments': {'success': 0, 'failed': 0, 'last_run': None},
+            'dispatch_planner': {'success': 0, 'failed': 0, 'last_run': None},
             'work_reports_sync': {'success': 0, 'failed': 0, 'last_run': None}
         }
+        # Длительности и пропуски по job_id — заполняет _add_job / _run_job.
+        self.job_metrics: Dict[str, Dict[str, Any]] = {}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=SCHEDULER_THREADS, thread_name_prefix="shift-scheduler"
+            )
+        return self._executor
+
+    async def _offload(self, fn, *args):
+        """DB-фаза job'а в собственном пуле планировщика, не в дефолтном loop'а."""
+        return await asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+
+    async def _lease_call(self, fn, *args):
+        """Lease-запрос на своей короткой сессии в отдельном потоке."""
+        if self._lease_executor is None:
+            self._lease_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scheduler-lease")
+
+        def _work():
+            db = SessionLocal()
+            try:
+                return fn(db, *args)
+            finally:
+                db.close()
+
+        return await asyncio.get_running_loop().run_in_executor(self._lease_executor, _work)
+
+    def _add_job(self, func, trigger, *, id: str, name: str) -> None:
+        """Зарегистрировать job в обёртке ``_run_job`` с общей политикой overrun/skip."""
+        interval = getattr(trigger, "interval", None)
+        min_gap = interval / 2 if interval is not None else SCHEDULER_CRON_MIN_GAP
+        self.job_metrics.setdefault(id, {
+            'runs': 0,
+            'duration_buckets': [0] * len(JOB_DURATION_BUCKETS),
+            'duration_sum': 0.0,
+            'duration_max': 0.0,
+            'overran': 0,
+            'skipped_lease': 0,
+            'skipped_overrun': 0,
+            'skipped_misfire': 0,
+            'lost_lease': 0,
+        })
+
+        @functools.wraps(func)
+        async def _job():
+            await self._run_job(id, func, interval, min_gap)
+
+        self.scheduler.add_job(
+            _job,
+            trigger,
+            id=id,
+            name=name,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=SCHEDULER_MISFIRE_GRACE,
+        )
+
+    def _on_job_skipped(self, event) -> None:
+        """Listener APScheduler: тик не запущен — прошлый ещё идёт или опоздал."""
+        metrics = self.job_metrics.get(event.job_id)
+        if metrics is None:
+            return
+        if event.code == EVENT_JOB_MAX_INSTANCES:
+            metrics['skipped_overrun'] += 1
+        else:
+            metrics['skipped_misfire'] += 1
+
+    async def _run_job(self, job_id: str, func, interval: Optional[timedelta], min_gap: timedelta) -> None:
+        """Тик под lease'ом: захват → heartbeat → job → release, с замером длительности."""
+        metrics = self.job_metrics[job_id]
+        owner = self.worker_id
+        if SCHEDULER_LEASES:
+            try:
+                acquired = await self._lease_call(
+                    scheduler_leases.try_acquire_lease, job_id, owner, SCHEDULER_LEASE_TTL, min_gap
+                )
+            except SQLAlchemyError as e:
+                # Без lease тик не исполняем: лучше пропустить, чем задвоить.
+                logger.error(f"Планировщик: lease для {job_id} не получен: {e}")
+                acquired = False
+            if not acquired:
+                metrics['skipped_lease'] += 1
+                return
+
+        started = time.perf_counter()
+        job = asyncio.create_task(func())
+        heartbeat = asyncio.create_task(self._keep_lease(job_id, owner, job)) if SCHEDULER_LEASES else None
+        try:
+            await job
+        except asyncio.CancelledError:
+            if heartbeat is None or not heartbeat.done() or heartbeat.cancelled() or not heartbeat.result():
+                raise
+            # Lease забрала другая реплика: прогон отменён на ближайшем await.
+            # DB-фаза, уже ушедшая в пул потоков, доработает, но следующие
+            # фазы (уведомления, очередные пачки) не начнутся.
+            metrics['lost_lease'] += 1
+        finally:
+            duration = time.perf_counter() - started
+            self._observe(metrics, duration, interval)
+            if heartbeat is not None:
+                heartbeat.cancel()
+                try:
+                    await self._lease_call(scheduler_leases.release_lease, job_id, owner)
+                except SQLAlchemyError as e:
+                    # Lease протухнет сам через TTL.
+                    logger.warning(f"Планировщик: lease {job_id} не освобождён: {e}")
+
+    async def _keep_lease(self, job_id: str, owner: str, job: asyncio.Task) -> bool:
+        """Продлевать lease, пока идёт ``job``; при потере — отменить его и вернуть True."""
+        while True:
+            await asyncio.sleep(SCHEDULER_LEASE_TTL.total_seconds() / 3)
+            try:
+                held = await self._lease_call(
+                    scheduler_leases.renew_lease, job_id, owner, SCHEDULER_LEASE_TTL
+                )
+            except SQLAlchemyError as e:
+                logger.warning(f"Планировщик: продление lease {job_id} не прошло: {e}")
+                continue
+            if not held:
+                logger.error(f"Планировщик: lease {job_id} перехвачен другой репликой, прогон отменён")
+                job.cancel()
+                return True
+
+    @staticmethod
+    def _observe(metrics: Dict[str, Any], duration: float, interval: Optional[timedelta]) -> None:
+        metrics['runs'] += 1
+        metrics['duration_sum'] += duration
+        metrics['duration_max'] = max(metrics['duration_max'], duration)
+        for i, bound in enumerate(JOB_DURATION_BUCKETS):
+            if duration <= bound:
+                metrics['duration_buckets'][i] += 1
+                break
+        if interval is not None and duration > interval.total_seconds():
+            metrics['overran'] += 1
 
     @property
     def _notifications_enabled(self) -> bool:
@@ -100,118 +284,88 @@ class ShiftScheduler:
         """Настройка всех задач планировщика"""
         try:
             # 1. Автоматическое создание смен (каждый день в 00:30)
-            self.scheduler.add_job(
+            self._add_job(
                 self._auto_create_shifts,
                 CronTrigger(hour=0, minute=30),
                 id='auto_create_shifts',
                 name='Автоматическое создание смен',
-                max_instances=1,
-                coalesce=True
             )
 
             # 2. Перебалансировка назначений (каждый день в 06:00)
-            self.scheduler.add_job(
+            self._add_job(
                 self._rebalance_daily_assignments,
                 CronTrigger(hour=6, minute=0),
                 id='rebalance_assignments',
                 name='Перебалансировка назначений',
-                max_instances=1,
-                coalesce=True
             )
 
             # 3. Обработка истекших передач (каждые 2 часа)
-            self.scheduler.add_job(
+            self._add_job(
                 self._process_expired_transfers,
                 IntervalTrigger(hours=2),
                 id='process_transfers',
                 name='Обработка истекших передач',
-                max_instances=1,
-                coalesce=True
             )
 
             # 4. Очистка устаревших данных (каждую неделю в воскресенье в 02:00)
-            self.scheduler.add_job(
+            self._add_job(
                 self._cleanup_expired_data,
                 CronTrigger(day_of_week=6, hour=2, minute=0),
                 id='cleanup_expired',
                 name='Очистка устаревших данных',
-                max_instances=1,
-                coalesce=True
             )
 
             # 5. Уведомления о предстоящих сменах (каждые 30 минут с 08:00 до 20:00)
-            self.scheduler.add_job(
+            self._add_job(
                 self._notify_upcoming_shifts,
                 CronTrigger(hour='8-20', minute='0,30'),
                 id='notify_upcoming',
                 name='Уведомления о предстоящих сменах',
-                max_instances=1,
-                coalesce=True
             )
 
             # 6. Автоназначение исполнителей на незаполненные смены (каждые 15 минут)
-            self.scheduler.add_job(
+            self._add_job(
                 self._auto_assign_empty_shifts,
                 IntervalTrigger(minutes=15),
                 id='auto_assign_empty',
                 name='Автоназначение на пустые смены',
-                max_instances=1,
-                coalesce=True
-            )
-
-            # 8. Автоназначение заявок исполнителям смен (каждые 10 минут)
-            self.scheduler.add_job(
-                self._auto_assign_requests_to_executors,
-                IntervalTrigger(minutes=10),
-                id='auto_assign_requests',
-                name='Автоназначение заявок исполнителям',
-                max_instances=1,
-                coalesce=True
             )
 
-            # 9. Синхронизация назначений заявок со сменами (каждые 30 минут)
-            self.scheduler.add_job(
-                self._sync_request_assignments,
-                IntervalTrigger(minutes=30),
-                id='sync_assignments',
-                name='Синхронизация назначений со сменами',
-                max_instances=1,
-                coalesce=True
-            )
-
-            # 10. Автоматический менеджер — назначение дежурных на ночные заявки (каждые 2 минуты)
-            self.scheduler.add_job(
-                self._auto_manager_tick,
+            # 8. Диспетчерский тик (каждые 2 минуты): очереди авто-менеджера
+            #    и назначения вне смены по одному срезу. Заменил три задачи —
+            #    автоназначение заявок исполнителям смен (10 мин), синхронизацию
+            #    назначений со сменами (30 мин) и тик авто-менеджера, — каждая
+            #    из которых перечитывала заявки, смены, нагрузку и пользователей.
+            self._add_job(
+                self._dispatch_planner_tick,
                 IntervalTrigger(minutes=2),
-                id='auto_manager_tick',
-                name='Автоматический менеджер — назначение дежурных',
-                max_instances=1,
-                coalesce=True
+                id='dispatch_planner',
+                name='Диспетчерский тик — назначение заявок',
             )
 
-            # 11. Визуальные отчёты «до/после» — автопост/автопубликация/отзыв
-            #     (каждые 10 минут). Без этой задачи тумблер «Автопост» ничего
-            #     не автоматизировал: черновики создавались только когда
-            #     менеджер вручную жал «Синхронизировать» на своей странице, а
-            #     отзыв возвращённых заявок — только когда кто-то открывал
-            #     публичную витрину.
-            self.scheduler.add_job(
+            # 9. Визуальные отчёты «до/после» — автопост/автопубликация/отзыв
+            #    (каждые 10 минут). Без этой задачи тумблер «Автопост» ничего
+            #    не автоматизировал: черновики создавались только когда
+            #    менеджер вручную жал «Синхронизировать» на своей странице, а
+            #    отзыв возвращённых заявок — только когда кто-то открывал
+            #    публичную витрину.
+            self._add_job(
                 self._work_reports_tick,
                 IntervalTrigger(minutes=10),
                 id='work_reports_sync',
                 name='Отчёты о работах — автопост и автопубликация',
-                max_instances=1,
-                coalesce=True
             )
 
             # 7. Еженедельное планирование (понедельник в 08:00)
-            self.scheduler.add_job(
+            self._add_job(
                 self._weekly_planning,
                 CronTrigger(day_of_week=0, hour=8, minute=0),
                 id='weekly_planning',
                 name='Еженедельное планирование',
-                max_instances=1,
-                coalesce=True
+            )
+
+            self.scheduler.add_listener(
+                self._on_job_skipped, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED
             )
 
             logger.info("Задачи планировщика смен настроены успешно")
@@ -246,6 +400,10 @@ class ShiftScheduler:
             if self.is_running:
                 self.scheduler.shutdown()
                 self.is_running = False
+                for executor in (self._executor, self._lease_executor):
+                    if executor is not None:
+                        executor.shutdown(wait=False)
+                self._executor = self._lease_executor = None
                 logger.info("Планировщик смен остановлен")
 
         except Exception as e:
@@ -268,7 +426,9 @@ class ShiftScheduler:
             'is_running': self.is_running,
             'jobs_count': len(jobs_info),
             'jobs': jobs_info,
-            'stats': self.task_stats
+            'stats': self.task_stats,
+            'metrics': self.job_metrics,
+            'worker_id': self.worker_id,
         }
 
     def _auto_create_shifts_sync(self) -> int:
@@ -286,7 +446,7 @@ class ShiftScheduler:
         try:
             logger.info("Запуск автосоздания смен...")
 
-            total_created = await asyncio.to_thread(self._auto_create_shifts_sync)
+            total_created = await self._offload(self._auto_create_shifts_sync)
 
             self.task_stats[task_name]['success'] += 1
             self.task_stats[task_name]['last_run'] = utc_now()
@@ -330,7 +490,7 @@ class ShiftScheduler:
         try:
             logger.info("Запуск перебалансировки назначений...")
 
-            total_rebalanced = await asyncio.to_thread(self._rebalance_daily_assignments_sync)
+            total_rebalanced = await self._offload(self._rebalance_daily_assignments_sync)
 
             self.task_stats[task_name]['success'] += 1
             self.task_stats[task_name]['last_run'] = utc_now()
@@ -411,7 +571,7 @@ class ShiftScheduler:
         try:
             logger.info("Запуск очистки устаревших данных...")
 
-            expired_transfers = await asyncio.to_thread(self._cleanup_expired_data_sync)
+            expired_transfers = await self._offload(self._cleanup_expired_data_sync)
 
             self.task_stats[task_name]['success'] += 1
             self.task_stats[task_name]['last_run'] = utc_now()
@@ -464,7 +624,7 @@ class ShiftScheduler:
             if not self._notifications_enabled:
                 return
 
-            reminders = await asyncio.to_thread(self._collect_upcoming_reminders)
+            reminders = await self._offload(self._collect_upcoming_reminders)
 
             notifications_sent = 0
             if reminders:
@@ -531,7 +691,7 @@ class ShiftScheduler:
     async def _auto_assign_empty_shifts(self):
         """Автоназначение исполнителей на пустые смены"""
         try:
-            assigned = await asyncio.to_thread(self._auto_assign_empty_shifts_sync)
+            assigned = await self._offload(self._auto_assign_empty_shifts_sync)
             if assigned > 0:
                 logger.info(f"Автоназначено {assigned} исполнителей на пустые смены")
 
@@ -553,7 +713,7 @@ class ShiftScheduler:
         try:
             logger.info("Запуск еженедельного планирования...")
 
-            total_shifts = await asyncio.to_thread(self._weekly_planning_sync)
+            total_shifts = await self._offload(self._weekly_planning_sync)
 
             logger.info(f"Еженедельное планирование завершено: {total_shifts} смен запланировано")
 
@@ -567,116 +727,36 @@ class ShiftScheduler:
         except Exception as e:
             logger.error(f"Ошибка еженедельного планирования: {e}")
 
-    def _auto_assign_requests_sync(self) -> int:
-        db = SessionLocal()
-        try:
-            # Выключатель автоназначения гасит и эту джобу: менеджер, снявший
-            # тумблер, вправе ожидать, что заявки никто не раздаёт вообще.
-            # ⚠️ Джоба и без того ничего не назначает — внутри она фильтрует
-            # `status == 'new'`, а канон хранит «Новая» (см. BUG-150/154/158 про
-            # ретайр мёртвого кода). Гейт оставлен, чтобы тумблер был честным,
-            # если движок когда-нибудь оживят; сам код не трогаем.
-            from uk_management_bot.services.auto_manager.config import (
-                is_auto_assign_enabled_sync,
-            )
-            if not is_auto_assign_enabled_sync(db):
-                logger.info("Автоназначение выключено — джоба пропущена")
-                return 0
-
-            assignment_service = ShiftAssignmentService(db)
-
-            # Назначаем заявки на сегодня и завтра (бизнес-день)
-            today = business_today()
-            tomorrow = today + timedelta(days=1)
-
-            total_assigned = 0
-            for target_date in (today, tomorrow):
-                result = assignment_service.auto_assign_requests_to_shift_executors(target_date)
-                if result['status'] == 'success':
-                    total_assigned += result.get('assigned_requests', 0)
-            return total_assigned
-        finally:
-            db.close()
-
-    async def _auto_assign_requests_to_executors(self):
-        """Автоматическое назначение заявок исполнителям смен"""
-        task_name = 'auto_assign_requests'
-        try:
-            logger.info("Запуск автоназначения заявок исполнителям...")
+    async def _dispatch_planner_tick(self):
+        """Диспетчерский тик — назначение дежурных и сводка назначений вне смены.
 
-            total_assigned = await asyncio.to_thread(self._auto_assign_requests_sync)
-
-            self.task_stats[task_name]['success'] += 1
-            self.task_stats[task_name]['last_run'] = utc_now()
-
-            if total_assigned > 0:
-                logger.info(f"Автоназначение заявок завершено: {total_assigned} заявок назначено")
-
-                # Уведомляем менеджеров о значительных назначениях
-                if total_assigned > 5:
-                    await self._notify_managers(
-                        "📋 Автоназначение заявок",
-                        f"Автоматически назначено {total_assigned} заявок исполнителям смен"
-                    )
-
-        except Exception as e:
-            self.task_stats[task_name]['failed'] += 1
-            self.task_stats[task_name]['last_run'] = utc_now()
-            logger.error(f"Ошибка автоназначения заявок: {e}")
-
-    def _sync_request_assignments_sync(self) -> int:
-        db = SessionLocal()
-        try:
-            assignment_service = ShiftAssignmentService(db)
-
-            # Синхронизируем на сегодня и завтра (бизнес-день)
-            today = business_today()
-            tomorrow = today + timedelta(days=1)
-
-            total_reassigned = 0
-            for target_date in (today, tomorrow):
-                result = assignment_service.sync_request_assignments_with_shifts(target_date)
-                if result['status'] == 'success':
-                    total_reassigned += result.get('reassigned', 0)
-            return total_reassigned
-        finally:
-            db.close()
-
-    async def _sync_request_assignments(self):
-        """Синхронизация назначений заявок со сменами"""
-        task_name = 'sync_assignments'
+        `AutoManagerOrchestrator.run_once()` управляет собственной сессией
+        (`SessionLocal()`) внутри себя, поэтому здесь own db-сессия не нужна;
+        сводка менеджерам — на своей короткой сессии `_notify_managers`.
+        """
+        task_name = 'dispatch_planner'
         try:
-            logger.info("Запуск синхронизации назначений...")
-
-            total_reassigned = await asyncio.to_thread(self._sync_request_assignments_sync)
-
-            self.task_stats[task_name]['success'] += 1
-            self.task_stats[task_name]['last_run'] = utc_now()
-
-            if total_reassigned > 0:
-                logger.info(f"Синхронизация завершена: {total_reassigned} переназначений")
-
-                # Уведомляем менеджеров о переназначениях
-                await self._notify_managers(
-                    "🔄 Синхронизация назначений",
-                    f"Переназначено {total_reassigned} заявок в соответствии со сменами"
-                )
-
+            report = await self._auto_manager.run_once()
         except Exception as e:
             self.task_stats[task_name]['failed'] += 1
             self.task_stats[task_name]['last_run'] = utc_now()
-            logger.error(f"Ошибка синхронизации назначений: {e}")
-
-    async def _auto_manager_tick(self):
-        """Тик автоматического менеджера — назначение дежурных на ночные заявки.
+            logger.error(f"Ошибка диспетчерского тика: {e}")
+            return
 
-        `AutoManagerOrchestrator.run_once()` управляет собственной сессией
-        (`SessionLocal()`) внутри себя, поэтому здесь own db-сессия не нужна.
-        """
-        try:
-            await self._auto_manager.run_once()
-        except Exception as e:
-            logger.error(f"Ошибка тика автоматического менеджера: {e}")
+        self.task_stats[task_name]['success'] += 1
+        self.task_stats[task_name]['last_run'] = utc_now()
+        if report is None:
+            return
+        if report.assigned:
+            logger.info(f"Диспетчерский тик: назначено {report.assigned} заявок")
+        if report.stale_assignments:
+            numbers = ", ".join(item.request_number for item in report.stale_assignments[:20])
+            more = len(report.stale_assignments) - 20
+            await self._notify_managers(
+                "🔄 Назначения вне смены",
+                f"У исполнителей без смены сегодня {len(report.stale_assignments)} "
+                f"заявок: {numbers}" + (f" и ещё {more}" if more > 0 else ""),
+            )
 
     async def _work_reports_tick(self):
         """Тик визуальных отчётов «до/после».
@@ -807,6 +887,13 @@ async def stop_scheduler():
     await scheduler.stop()
 
 
+def get_job_metrics() -> Dict[str, Dict[str, Any]]:
+    """Метрики job'ов процесса (для /metrics); пусто, если планировщика здесь нет."""
+    if _scheduler_instance is None:
+        return {}
+    return _scheduler_instance.job_metrics
+
+
 async def get_scheduler_status() -> Dict[str, Any]:
     """Получить статус планировщика"""
     scheduler = get_scheduler()